@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Offline benchmarks - run with: python -m benchmarks.run --help"""
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+Fake Google - local stand-in for the Labs video, Gemini and TTS APIs
+
+Serves the same routes the clients call, so LabsFlowClient, BatchEngine,
+_call_gemini and synthesize_speech_google run unchanged against it once the
+base URLs point here (VEO_LABS_BASE / VEO_GEMINI_BASE / VEO_TTS_BASE, see
+FakeGoogle.env()):
+
+    POST /v1:uploadUserImage                              -> mediaGenerationId
+    POST /v1/video:batchAsyncGenerateVideoText            -> one operation per request
+    POST /v1/video:batchAsyncGenerateVideoStartImage      -> one operation per request
+    POST /v1/video:batchCheckAsyncVideoGenerationStatus   -> PENDING until render_sec elapsed
+    GET  /video/<operation>.mp4                           -> fake mp4 payload
+    POST /v1beta/models/<model>:generateContent           -> JSON text candidate
+    POST /v1/text:synthesize                              -> base64 audioContent
+
+Latency, render time, render failures and 401/429/500 injection are set on
+FakeGoogleConfig. Request counts per route and status are kept in ``stats``.
+
+    with FakeGoogle(FakeGoogleConfig(latency_ms=80, render_sec=5)) as fake:
+        os.environ.update(fake.env())
+        ...
+"""
+
+import base64
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+CHUNK = 64 * 1024
+
+
+def fake_mp4(size: int) -> bytes:
+    """ftyp box followed by zero padding - enough for size/extension checks"""
+    head = b"\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00mp42isom"
+    return head + b"\x00" * max(0, size - len(head))
+
+
+@dataclass
+class FakeGoogleConfig:
+    latency_ms: float = 50.0          # Added to every API response
+    jitter_ms: float = 20.0           # Uniform +/- jitter on latency
+    render_sec: float = 5.0           # Submit -> SUCCESSFUL
+    render_jitter_sec: float = 1.0
+    render_fail_rate: float = 0.0     # Share of operations ending in MEDIA_GENERATION_STATUS_FAILED
+    error_rates: Dict[int, float] = field(default_factory=dict)  # e.g. {429: 0.02, 500: 0.01}
+    video_bytes: int = 2 * 1024 * 1024
+    bandwidth_mbps: float = 0.0       # Per-download cap in MB/s (0 = unlimited)
+    gemini_reply: Any = field(default_factory=lambda: {"title": "bench", "scenes": []})
+    seed: Optional[int] = 1234
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def log_message(self, fmt, *args):  # Quiet: benchmarks print their own results
+        pass
+
+    # ---- plumbing ----
+    def _reply(self, code: int, body: Dict[str, Any], route: str):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if code == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.fake._count(route, code)
+
+    def _payload(self) -> Dict[str, Any]:
+        n = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(n) if n else b""
+        try:
+            return json.loads(raw or b"{}")
+        except ValueError:
+            return {}
+
+    # ---- routes ----
+    def do_POST(self):
+        fake = self.server.fake
+        path = self.path.split("?", 1)[0]
+        payload = self._payload()
+        route = path.rsplit("/", 1)[-1].rsplit(":", 1)[-1]
+        fake._delay()
+        injected = fake._injected_error()
+        if injected:
+            error = {"error": {"code": injected, "message": f"Injected {injected}"}}
+            return self._reply(injected, error, route)
+
+        if path.endswith(":uploadUserImage"):
+            body = {"mediaGenerationId": {"mediaGenerationId": f"media-{uuid.uuid4().hex[:16]}"}}
+        elif path.endswith((":batchAsyncGenerateVideoText", ":batchAsyncGenerateVideoStartImage")):
+            body = {"operations": [fake._new_operation() for _ in payload.get("requests") or [{}]]}
+        elif path.endswith(":batchCheckAsyncVideoGenerationStatus"):
+            names = [(op.get("operation") or {}).get("name", "")
+                     for op in payload.get("operations") or []]
+            body = {"operations": [fake._status(n) for n in names]}
+        elif path.endswith(":generateContent"):
+            text = fake.config.gemini_reply
+            text = text if isinstance(text, str) else json.dumps(text, ensure_ascii=False)
+            body = {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+        elif path.endswith("/text:synthesize"):
+            body = {"audioContent": base64.b64encode(b"ID3" + b"\x00" * 4096).decode("ascii")}
+        else:
+            return self._reply(404, {"error": {"code": 404, "message": f"No route {path}"}}, route)
+        self._reply(200, body, route)
+
+    def do_GET(self):
+        fake = self.server.fake
+        if not self.path.startswith("/video/"):
+            return self._reply(404, {"error": {"code": 404, "message": "Not found"}}, "get")
+        data = fake._video
+        self.send_response(200)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        cap = fake.config.bandwidth_mbps * 1024 * 1024
+        start = time.monotonic()
+        for off in range(0, len(data), CHUNK):
+            self.wfile.write(data[off:off + CHUNK])
+            if cap:
+                ahead = (off + CHUNK) / cap - (time.monotonic() - start)
+                if ahead > 0:
+                    time.sleep(ahead)
+        fake._count("video", 200)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+    fake: "FakeGoogle"
+
+
+class FakeGoogle:
+    """The stand-in server; runs on a background thread until stop()"""
+
+    def __init__(self, config: Optional[FakeGoogleConfig] = None, host: str = "127.0.0.1",
+                 port: int = 0):
+        self.config = config or FakeGoogleConfig()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._ops: Dict[str, tuple] = {}  # name -> (ready_at, fails)
+        self._video = fake_mp4(self.config.video_bytes)
+        self.stats: Dict[str, Dict[int, int]] = {}
+        self._httpd = _Server((host, port), _Handler)
+        self._httpd.fake = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment that points the clients here; set it before importing services.*"""
+        return {
+            "VEO_LABS_BASE": self.base_url,
+            "VEO_GEMINI_BASE": f"{self.base_url}/v1beta",
+            "VEO_TTS_BASE": self.base_url,
+        }
+
+    def start(self) -> "FakeGoogle":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-google",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---- state ----
+    def seed_operations(self, n: int, ready: bool = False) -> List[str]:
+        """Create n operations directly (for polling benchmarks without the submit cost)"""
+        names = []
+        for _ in range(n):
+            op = self._new_operation(render_sec=0.0 if ready else None)
+            names.append(op["operation"]["name"])
+        return names
+
+    def request_count(self, route: Optional[str] = None) -> int:
+        with self._lock:
+            items = [self.stats.get(route, {})] if route else list(self.stats.values())
+            return sum(sum(codes.values()) for codes in items)
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats.clear()
+
+    def _count(self, route: str, code: int):
+        with self._lock:
+            codes = self.stats.setdefault(route, {})
+            codes[code] = codes.get(code, 0) + 1
+
+    def _delay(self):
+        cfg = self.config
+        with self._lock:
+            ms = cfg.latency_ms + self._rng.uniform(-cfg.jitter_ms, cfg.jitter_ms)
+        if ms > 0:
+            time.sleep(ms / 1000.0)
+
+    def _injected_error(self) -> int:
+        with self._lock:
+            for code, rate in sorted(self.config.error_rates.items()):
+                if rate and self._rng.random() < rate:
+                    return int(code)
+        return 0
+
+    def _new_operation(self, render_sec: Optional[float] = None) -> Dict[str, Any]:
+        cfg = self.config
+        name = f"operations/{uuid.uuid4().hex}"
+        with self._lock:
+            if render_sec is None:
+                jitter = cfg.render_jitter_sec
+                render_sec = cfg.render_sec + self._rng.uniform(-jitter, jitter)
+            fails = self._rng.random() < cfg.render_fail_rate
+            self._ops[name] = (time.time() + max(0.0, render_sec), fails)
+        return {"operation": {"name": name}, "sceneId": uuid.uuid4().hex[:12],
+                "status": "MEDIA_GENERATION_STATUS_PENDING"}
+
+    def _status(self, name: str) -> Dict[str, Any]:
+        with self._lock:
+            entry = self._ops.get(name)
+        item: Dict[str, Any] = {"operation": {"name": name}}
+        if entry is None:
+            item["status"] = "MEDIA_GENERATION_STATUS_FAILED"
+            item["operation"]["error"] = {"message": "Unknown operation"}
+        elif time.time() < entry[0]:
+            item["status"] = "MEDIA_GENERATION_STATUS_PENDING"
+        elif entry[1]:
+            item["status"] = "MEDIA_GENERATION_STATUS_FAILED"
+            item["operation"]["error"] = {"message": "Injected render failure"}
+        else:
+            item["status"] = "MEDIA_GENERATION_STATUS_SUCCESSFUL"
+            video_id = name.rsplit("/", 1)[-1]
+            url = f"{self.base_url}/video/{video_id}.mp4"
+            item["operation"]["metadata"] = {"video": {"fifeUrl": url}}
+        return item
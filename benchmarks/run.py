@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+Offline benchmarks against the local Google stand-in (benchmarks/fake_google.py)
+
+    python -m benchmarks.run                         # 10, 100, 1000 scenes
+    python -m benchmarks.run --sizes 10 100 --save bench.json
+    python -m benchmarks.run --baseline bench.json   # exit 1 on a regression
+    python -m benchmarks.run --latency-ms 150 --errors 429=0.02 500=0.01
+
+Measures, with no network access and no real tokens:
+- submit:   LabsFlowClient.start_one throughput (scenes/s)
+- poll:     batch_check_operations cost per round and per operation
+- download: VideoDownloader bandwidth (MB/s)
+- e2e:      BatchEngine.run wall time for N scenes (submit, poll, download)
+- gemini / tts: client overhead above the injected server latency
+
+Config, generation library, telemetry and thumbnail cache are redirected to
+a temp dir for the run (scratch_user_state); nothing under ~ or the repo is
+touched.
+
+Each result is compared with --baseline (same metric names); a metric more
+than --tolerance worse fails the run, so regressions show up before release.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+
+from benchmarks.fake_google import FakeGoogle, FakeGoogleConfig
+
+TOKENS = ["bench-token-1", "bench-token-2"]
+PROJECT_ID = "bench-project-0000"
+
+
+def _result(value: float, unit: str, higher_is_better: bool, **extra) -> Dict[str, Any]:
+    return {"value": round(value, 4), "unit": unit, "higher_is_better": higher_is_better, **extra}
+
+
+@contextmanager
+def scratch_user_state(work: str) -> Iterator[None]:
+    """
+    Run with config, generation library, telemetry and thumbnail cache inside
+    ``work``, so a benchmark never reads or writes the user's real state.
+    """
+    from services import generation_library, telemetry
+    from utils import config as cfg
+
+    saved = (cfg.CFG_PATH, generation_library._library, telemetry._telemetry)
+    cfg.CFG_PATH = os.path.join(work, "config.json")
+    with open(cfg.CFG_PATH, "w", encoding="utf-8") as f:
+        json.dump({**cfg.get_default_config(),
+                   "library": {"path": os.path.join(work, "library.db")},
+                   "telemetry": {"dir": os.path.join(work, "telemetry")},
+                   "thumbnails": {"cache_dir": os.path.join(work, "thumbs")}}, f)
+    generation_library._library = telemetry._telemetry = None
+    try:
+        yield
+    finally:
+        cfg.CFG_PATH, generation_library._library, telemetry._telemetry = saved
+
+
+def bench_submit(fake: FakeGoogle, n: int, workers: int) -> Dict[str, Any]:
+    from services.google.labs_flow_client import LabsFlowClient
+
+    client = LabsFlowClient(TOKENS)
+
+    def one(i):
+        job = {"prompt": f"Scene {i}"}
+        return client.start_one(job, "veo_3_1_t2v_fast_ultra", "VIDEO_ASPECT_RATIO_LANDSCAPE",
+                                f"Scene {i}: a quiet street at dawn", copies=1,
+                                project_id=PROJECT_ID)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        started = sum(pool.map(one, range(n)))
+    elapsed = time.perf_counter() - t0
+    return _result(started / elapsed, "scenes/s", True, seconds=round(elapsed, 3), workers=workers)
+
+
+def bench_poll(fake: FakeGoogle, n: int, rounds: int = 5) -> Dict[str, Any]:
+    from services.google.labs_flow_client import LabsFlowClient
+
+    client = LabsFlowClient(TOKENS)
+    names = fake.seed_operations(n, ready=True)
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        out = client.batch_check_operations(names, project_id=PROJECT_ID)
+        times.append(time.perf_counter() - t0)
+        assert len(out) == n, f"batch check returned {len(out)}/{n}"
+    # Client-side cost: round time minus the injected server latency
+    overhead = max(0.0, statistics.median(times) - fake.config.latency_ms / 1000.0)
+    return _result(statistics.median(times) * 1000, "ms/round", False,
+                   us_per_op=round(overhead / n * 1e6, 2))
+
+
+def bench_download(fake: FakeGoogle, files: int, workers: int, out_dir: str) -> Dict[str, Any]:
+    from services.utils.video_downloader import VideoDownloader
+
+    dl = VideoDownloader(log_callback=lambda m: None)
+    urls = [f"{fake.base_url}/video/bench{i}.mp4" for i in range(files)]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        paths = list(pool.map(lambda a: dl.download(a[1], os.path.join(out_dir, f"dl_{a[0]}.mp4")),
+                              enumerate(urls)))
+    elapsed = time.perf_counter() - t0
+    total_mb = sum(os.path.getsize(p) for p in paths) / (1024 * 1024)
+    return _result(total_mb / elapsed, "MB/s", True, files=files, workers=workers)
+
+
+def bench_e2e(fake: FakeGoogle, n: int, accounts: int, out_dir: str) -> Dict[str, Any]:
+    from services.account_manager import AccountManager
+    from services.engine.pipeline import BatchEngine, _Lane
+
+    config = {"engine": {"poll_interval": 0.5, "max_poll_rounds": 100000},
+              "telemetry": {"export_on_run": False}}
+    lanes = [_Lane(f"bench{i}", PROJECT_ID, TOKENS, None, 2) for i in range(accounts)]
+    engine = BatchEngine(account_mgr=AccountManager(), config=config, lanes=lanes,
+                         make_thumbs=False, download_workers=8)
+    scenes = [f"Scene {i}: a quiet street at dawn" for i in range(1, n + 1)]
+    fake.reset_stats()
+    t0 = time.perf_counter()
+    cards = engine.run(scenes, out_dir=out_dir, title="bench")
+    elapsed = time.perf_counter() - t0
+    ok = sum(1 for c in cards if c["status"] == "DOWNLOADED")
+    return _result(elapsed, "s", False, downloaded=ok, scenes=n, accounts=accounts,
+                   check_requests=fake.request_count("batchCheckAsyncVideoGenerationStatus"))
+
+
+def bench_gemini(fake: FakeGoogle, calls: int) -> Dict[str, Any]:
+    from services.llm_story_service import _call_gemini
+
+    return _overhead(fake, calls, lambda: _call_gemini("Viết kịch bản 3 cảnh", "bench-key"))
+
+
+def bench_tts(fake: FakeGoogle, calls: int) -> Dict[str, Any]:
+    from services.tts_service import synthesize_speech_google
+
+    return _overhead(fake, calls, lambda: synthesize_speech_google("Xin chào", "vi-VN-Wavenet-A",
+                                                                   api_key="bench-key"))
+
+
+def _overhead(fake: FakeGoogle, calls: int, fn: Callable[[], Any]) -> Dict[str, Any]:
+    times = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    median = statistics.median(times)
+    return _result(max(0.0, median - fake.config.latency_ms / 1000.0) * 1000, "ms", False,
+                   median_ms=round(median * 1000, 2))
+
+
+def run_all(args) -> Dict[str, Dict[str, Any]]:
+    errors = {int(k): float(v) for k, v in (e.split("=", 1) for e in args.errors)}
+    conf = FakeGoogleConfig(latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 4,
+                            render_sec=args.render_sec, render_jitter_sec=args.render_sec / 5,
+                            error_rates=errors, video_bytes=args.video_kb * 1024)
+    results: Dict[str, Dict[str, Any]] = {}
+    work = tempfile.mkdtemp(prefix="veo_bench_")
+    with FakeGoogle(conf) as fake:
+        # The clients read their base URLs at import time
+        os.environ.update(fake.env())
+
+        def record(name, fn, *a):
+            r = results[name] = fn(*a)
+            print(f"{name:<16} {r['value']:>10} {r['unit']}", flush=True)
+
+        try:
+            # Entered after the env update: it imports the Labs client
+            with scratch_user_state(work):
+                for n in args.sizes:
+                    record(f"submit_{n}", bench_submit, fake, n, args.workers)
+                    record(f"poll_{n}", bench_poll, fake, n)
+                record("download", bench_download, fake, args.download_files, args.workers, work)
+                for n in args.sizes:
+                    out = os.path.join(work, f"e2e_{n}")
+                    record(f"e2e_{n}", bench_e2e, fake, n, args.accounts, out)
+                    shutil.rmtree(out, ignore_errors=True)
+                record("gemini_overhead", bench_gemini, fake, args.calls)
+                record("tts_overhead", bench_tts, fake, args.calls)
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            tolerance: float) -> List[str]:
+    """Names of metrics that got worse than baseline by more than tolerance"""
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base or not base.get("value"):
+            continue
+        ratio = r["value"] / base["value"]
+        worse = ratio < 1 - tolerance if r["higher_is_better"] else ratio > 1 + tolerance
+        if worse:
+            regressions.append(f"{name}: {base['value']} -> {r['value']} {r['unit']}")
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="python -m benchmarks.run",
+                                description=__doc__.split("\n\n")[0])
+    p.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Scene counts")
+    p.add_argument("--accounts", type=int, default=4, help="Fake accounts (lanes) for e2e")
+    p.add_argument("--workers", type=int, default=8, help="Concurrent submits / downloads")
+    p.add_argument("--latency-ms", type=float, default=50.0, help="Server latency per API call")
+    p.add_argument("--render-sec", type=float, default=3.0, help="Fake render time per video")
+    p.add_argument("--errors", nargs="*", default=[], metavar="CODE=RATE",
+                   help="Inject HTTP errors, e.g. 429=0.02 500=0.01 401=0.001")
+    p.add_argument("--video-kb", type=int, default=2048, help="Fake mp4 size")
+    p.add_argument("--download-files", type=int, default=32)
+    p.add_argument("--calls", type=int, default=20, help="Gemini / TTS calls")
+    p.add_argument("--save", help="Write results JSON here")
+    p.add_argument("--baseline", help="Results JSON to compare against")
+    p.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    results = run_all(args)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved: {args.save}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("REGRESSIONS:\n  " + "\n  ".join(regressions))
+            return 1
+        print(f"No regressions vs {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Startup benchmark: import time, first paint and first activation of each tab
+
+    python -m benchmarks.startup                      # 5 cold processes, medians
+    python -m benchmarks.startup --save startup.json
+    python -m benchmarks.startup --baseline startup.json   # exit 1 on a regression
+
+Every run is a fresh interpreter (offscreen Qt platform, no display needed):
+- import_main:  ``import main_image2video``
+- first_paint:  process start -> first paint of the main window
+- tab_<name>:   first activation of each tab (panel import + construction)
+
+Regressions are judged like benchmarks.run (same --tolerance semantics).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks.run import _result, compare
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def child() -> Dict[str, float]:
+    """One cold start inside this process; seconds per metric"""
+    t_start = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    import main_image2video as app_main
+
+    out = {"import_main": time.perf_counter() - t_start}
+
+    from PyQt5.QtCore import QEvent, QObject, QTimer
+
+    app = app_main.setup_application()
+
+    class _FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and "first_paint" not in out:
+                out["first_paint"] = time.perf_counter() - t_start
+                QTimer.singleShot(0, app.quit)
+            return False
+
+    window = app_main.MainWindow()
+    watcher = _FirstPaint()
+    window.installEventFilter(watcher)
+    window.show()
+    QTimer.singleShot(10000, app.quit)  # Never hang the parent
+    app.exec_()
+
+    for attr, tab in window._tabs:
+        if tab.panel is None:
+            tab.ensure()
+        out[f"tab_{attr}"] = tab.build_seconds
+    window.hide()  # close() would persist last_active_tab
+    return out
+
+
+def run(runs: int) -> Dict[str, Dict[str, Any]]:
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    samples: Dict[str, List[float]] = {}
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-m", "benchmarks.startup", "--child"], cwd=ROOT,
+                              env=env, capture_output=True, text=True, timeout=300)
+        line = proc.stdout.strip().splitlines()[-1] if proc.stdout.strip() else ""
+        if proc.returncode != 0 or not line.startswith("{"):
+            raise RuntimeError(f"startup child failed ({proc.returncode}): {proc.stderr[-2000:]}")
+        for name, value in json.loads(line).items():
+            samples.setdefault(name, []).append(value)
+    return {name: _result(statistics.median(v) * 1000, "ms", False, runs=len(v))
+            for name, v in samples.items()}
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="python -m benchmarks.startup",
+                                description=__doc__.split("\n\n")[0])
+    p.add_argument("--runs", type=int, default=5, help="Cold processes to start")
+    p.add_argument("--save", help="Write results JSON here")
+    p.add_argument("--baseline", help="Results JSON to compare against")
+    p.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+    p.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = p.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(child()))
+        return 0
+
+    results = run(args.runs)
+    for name, r in results.items():
+        print(f"{name:<22} {r['value']:>10} {r['unit']}", flush=True)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved: {args.save}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("REGRESSIONS:\n  " + "\n  ".join(regressions))
+            return 1
+        print(f"No regressions vs {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
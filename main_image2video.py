@@ -12,70 +12,45 @@ Date: 2025-01-05
 Version: 7.0.0
 """
 
-import sys
+import importlib
 import os
-from PyQt5.QtWidgets import (
-    QApplication, QTabWidget, QMessageBox, QWidget
-)
-from PyQt5.QtCore import Qt
+import sys
+import time
+
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QIcon
+from PyQt5.QtWidgets import QApplication, QMessageBox, QTabWidget, QVBoxLayout, QWidget
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-# Settings Panel
-try:
-    from ui.settings_panel_v3_compact import SettingsPanelV3Compact as SettingsPanel
-except ImportError:
-    try:
-        from ui.settings_panel import SettingsPanel
-    except ImportError:
-        print("⚠️ Warning: SettingsPanel not found, using placeholder")
-        SettingsPanel = None
-
-# Image2Video V7 - NEW VERSION
-try:
-    from ui.image2video_panel_v7_complete import Image2VideoPanelV7 as Image2VideoPanel
-    print("✓ Loaded Image2Video V7")
-except ImportError as e:
-    print(f"⚠️ Image2Video V7 not found, falling back to original: {e}")
-    try:
-        from ui.project_panel import ProjectPanel as Image2VideoPanel
-    except ImportError:
-        print("❌ Error: No Image2Video panel available")
-        Image2VideoPanel = None
-
-# Text2Video V5 - NEW VERSION
-try:
-    from ui.text2video_panel_v5_complete import Text2VideoPanelV5 as Text2VideoPanel
-    print("✓ Loaded Text2Video V5")
-except ImportError as e:
-    print(f"⚠️ Text2Video V5 not found, falling back to original: {e}")
-    try:
-        from ui.text2video_panel import Text2VideoPane as Text2VideoPanel
-    except ImportError:
-        print("❌ Error: No Text2Video panel available")
-        Text2VideoPanel = None
-
-# Video Ads V5 - NEW VERSION
-try:
-    from ui.video_ban_hang_v5_complete import VideoBanHangV5 as VideoAdsPanel
-    print("✓ Loaded Video Ads V5")
-except ImportError as e:
-    print(f"⚠️ Video Ads V5 not found, falling back to original: {e}")
-    try:
-        from ui.video_ban_hang_panel import VideoBanHangPanel as VideoAdsPanel
-    except ImportError:
-        print("❌ Error: No Video Ads panel available")
-        VideoAdsPanel = None
-
-# Clone Video - NEW FEATURE
-try:
-    from ui.clone_video_panel import CloneVideoPanel
-    print("✓ Loaded Clone Video Panel")
-except ImportError as e:
-    print(f"⚠️ Clone Video not found: {e}")
-    CloneVideoPanel = None
+# Tabs: (attribute, tab title, panel name, candidates tried in order).
+# Panel modules (and the services they pull in) are imported when their tab
+# is first shown, so the main window paints before any of them load.
+TAB_SPECS = [
+    ("settings", "⚙️ Cài đặt", "Settings Panel", [
+        ("ui.settings_panel_v3_compact", "SettingsPanelV3Compact"),
+        ("ui.settings_panel", "SettingsPanel"),
+    ]),
+    ("image2video", "🖼️ Image2Video", "Image2Video V7", [
+        ("ui.image2video_panel_v7_complete", "Image2VideoPanelV7"),
+        ("ui.project_panel", "ProjectPanel"),
+    ]),
+    ("text2video", "📝 Text2Video", "Text2Video V5", [
+        ("ui.text2video_panel_v5_complete", "Text2VideoPanelV5"),
+        ("ui.text2video_panel", "Text2VideoPane"),
+    ]),
+    ("video_ads", "🛒 Video bán hàng", "Video Ads V5", [
+        ("ui.video_ban_hang_v5_complete", "VideoBanHangV5"),
+        ("ui.video_ban_hang_panel", "VideoBanHangPanel"),
+    ]),
+    ("clone_video", "🎬 Clone Video", "Clone Video", [
+        ("ui.clone_video_panel", "CloneVideoPanel"),
+    ]),
+    ("telemetry", "📊 Thống kê", "Telemetry", [
+        ("ui.telemetry_dashboard", "TelemetryDashboard"),
+    ]),
+]
 
 # Utils
 try:
@@ -134,6 +109,7 @@ QTabBar::tab:nth-child(2):selected { background: #1E88E5; }  /* Image2Video - Bl
 QTabBar::tab:nth-child(3):selected { background: #26A69A; }  /* Text2Video - Teal */
 QTabBar::tab:nth-child(4):selected { background: #FF7043; }  /* Video Ads - Orange */
 QTabBar::tab:nth-child(5):selected { background: #7C4DFF; }  /* Clone Video - Deep Purple */
+QTabBar::tab:nth-child(6):selected { background: #546E7A; }  /* Telemetry - Blue Grey */
 """
 
 
@@ -142,7 +118,7 @@ class PlaceholderPanel(QWidget):
 
     def __init__(self, panel_name, error_msg="", parent=None):
         super().__init__(parent)
-        from PyQt5.QtWidgets import QVBoxLayout, QLabel
+        from PyQt5.QtWidgets import QLabel, QVBoxLayout
 
         layout = QVBoxLayout(self)
         layout.setAlignment(Qt.AlignCenter)
@@ -152,7 +128,7 @@ class PlaceholderPanel(QWidget):
         icon_label.setAlignment(Qt.AlignCenter)
 
         try:
-            from utils.icon_utils import get_warning_icon, EMOJI_FALLBACKS, IconType
+            from utils.icon_utils import EMOJI_FALLBACKS, IconType, get_warning_icon
             warning_pixmap = get_warning_icon(size=(96, 96))
             if warning_pixmap:
                 icon_label.setPixmap(warning_pixmap)
@@ -193,6 +169,46 @@ class PlaceholderPanel(QWidget):
         layout.addWidget(help_label)
 
 
+def load_panel_class(name, candidates):
+    """Import the first available panel class; (cls, error) with cls None if none load"""
+    error = ""
+    for i, (module, cls_name) in enumerate(candidates):
+        try:
+            cls = getattr(importlib.import_module(module), cls_name)
+            print(f"✓ Loaded {name} ({module})" if i == 0 else f"⚠️ {name}: fell back to {module}")
+            return cls, ""
+        except (ImportError, AttributeError) as e:
+            error = error or str(e)
+            print(f"⚠️ {name}: {module} not available: {e}")
+    return None, error
+
+
+class LazyTab(QWidget):
+    """Tab page that imports and builds its panel the first time it is shown"""
+
+    def __init__(self, name, candidates, parent=None):
+        super().__init__(parent)
+        self.name = name
+        self.candidates = candidates
+        self.panel = None
+        self.build_seconds = 0.0
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+
+    def ensure(self):
+        if self.panel is None:
+            t0 = time.perf_counter()
+            cls, error = load_panel_class(self.name, self.candidates)
+            try:
+                self.panel = cls(self) if cls else PlaceholderPanel(self.name, error, self)
+            except Exception as e:
+                print(f"❌ Error creating {self.name} panel: {e}")
+                self.panel = PlaceholderPanel(self.name, str(e), self)
+            self._layout.addWidget(self.panel)
+            self.build_seconds = time.perf_counter() - t0
+        return self.panel
+
+
 class MainWindow(QTabWidget):
     """Main application window with all panels"""
 
@@ -210,76 +226,40 @@ class MainWindow(QTabWidget):
         # Initialize tabs
         self._init_tabs()
 
-        # Load state
+        # Load state (before connecting, so restoring the tab doesn't build it yet)
         self._load_state()
+        self.currentChanged.connect(self._activate_tab)
 
         # Print initialization info
         self._print_init_info()
 
     def _init_tabs(self):
-        """Initialize all tabs"""
-        try:
-            # Tab 1: Settings
-            if SettingsPanel:
-                self.settings = SettingsPanel(self)
-            else:
-                self.settings = PlaceholderPanel("Settings Panel")
-            self.addTab(self.settings, "⚙️ Cài đặt")
-
-            # Tab 2: Image2Video V7
-            if Image2VideoPanel:
-                try:
-                    self.image2video = Image2VideoPanel(self)
-                except Exception as e:
-                    print(f"❌ Error creating Image2Video panel: {e}")
-                    self.image2video = PlaceholderPanel("Image2Video V7", str(e))
-            else:
-                self.image2video = PlaceholderPanel("Image2Video V7")
-            self.addTab(self.image2video, "🖼️ Image2Video")
-
-            # Tab 3: Text2Video V5
-            if Text2VideoPanel:
-                try:
-                    self.text2video = Text2VideoPanel(self)
-                except Exception as e:
-                    print(f"❌ Error creating Text2Video panel: {e}")
-                    self.text2video = PlaceholderPanel("Text2Video V5", str(e))
-            else:
-                self.text2video = PlaceholderPanel("Text2Video V5")
-            self.addTab(self.text2video, "📝 Text2Video")
-
-            # Tab 4: Video Ads V5
-            if VideoAdsPanel:
-                try:
-                    self.video_ads = VideoAdsPanel(self)
-                except Exception as e:
-                    print(f"❌ Error creating Video Ads panel: {e}")
-                    self.video_ads = PlaceholderPanel("Video Ads V5", str(e))
-            else:
-                self.video_ads = PlaceholderPanel("Video Ads V5")
-            self.addTab(self.video_ads, "🛒 Video bán hàng")
-
-            # Tab 5: Clone Video
-            if CloneVideoPanel:
-                try:
-                    self.clone_video = CloneVideoPanel(self)
-                except Exception as e:
-                    print(f"❌ Error creating Clone Video panel: {e}")
-                    self.clone_video = PlaceholderPanel("Clone Video", str(e))
-            else:
-                self.clone_video = PlaceholderPanel("Clone Video")
-            self.addTab(self.clone_video, "🎬 Clone Video")
-
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "Initialization Error",
-                f"Failed to initialize application:\n\n{e}\n\n"
-                "Please check console for details."
-            )
-            import traceback
-            traceback.print_exc()
-            sys.exit(1)
+        """Add one lazy page per tab; panels are built on first activation"""
+        self._tabs = []
+        for attr, title, name, candidates in TAB_SPECS:
+            setattr(self, attr, None)
+            tab = LazyTab(name, candidates, self)
+            self._tabs.append((attr, tab))
+            self.addTab(tab, title)
+
+    def _activate_tab(self, index):
+        if not 0 <= index < len(self._tabs):
+            return
+        attr, tab = self._tabs[index]
+        if tab.panel is None:
+            try:
+                setattr(self, attr, tab.ensure())
+            except Exception as e:
+                QMessageBox.critical(self, "Initialization Error",
+                                     f"Failed to initialize {tab.name}:\n\n{e}\n\n"
+                                     "Please check console for details.")
+                import traceback
+                traceback.print_exc()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Build the visible tab after the empty window has had its first paint
+        QTimer.singleShot(0, lambda: self._activate_tab(self.currentIndex()))
 
     def _print_init_info(self):
         """Print initialization information"""
@@ -287,18 +267,13 @@ class MainWindow(QTabWidget):
         print("📊 PANEL STATUS")
         print("=" * 70)
 
-        panels = [
-            ("⚙️  Settings", self.settings),
-            ("🖼️  Image2Video", self.image2video),
-            ("📝 Text2Video", self.text2video),
-            ("🛒 Video Ads", self.video_ads),
-            ("🎬 Clone Video", self.clone_video)
-        ]
-
-        for name, panel in panels:
-            panel_type = type(panel).__name__
-            status = "✓" if not isinstance(panel, PlaceholderPanel) else "✗"
-            print(f"{status} {name:15} {panel_type}")
+        for attr, tab in self._tabs:
+            if tab.panel is None:
+                status, panel_type = "…", "(tải khi mở tab)"
+            else:
+                status = "✓" if not isinstance(tab.panel, PlaceholderPanel) else "✗"
+                panel_type = f"{type(tab.panel).__name__} ({tab.build_seconds:.2f}s)"
+            print(f"{status} {tab.name:15} {panel_type}")
 
         print("=" * 70)
         print(f"📅 Version: {get_version()}")
@@ -5,8 +5,12 @@ Provides round-robin load balancing across multiple Google Labs accounts
 Each account uses OAuth Flow Tokens from labs.google.com
 """
 
-from typing import List, Dict, Optional, Tuple
+import time
 from threading import Lock
+from typing import Dict, List, Optional, Set, Tuple
+
+# API key kinds (key_manager providers) validated alongside Labs tokens in pre-flight
+API_KEY_KINDS = ("google", "elevenlabs", "openai")
 
 
 class LabsAccount:
@@ -27,6 +31,15 @@ class LabsAccount:
         self.tokens = [t.strip() for t in tokens if t.strip()]
         self.enabled = enabled
         self.usage_count = 0  # Track how many times this account has been used
+        self.dead_tokens = set()  # Tokens rejected by the last pre-flight check (not persisted)
+
+    def live_tokens(self) -> List[str]:
+        """Tokens not known to be invalid (all tokens if no pre-flight has run)"""
+        return [t for t in self.tokens if t not in self.dead_tokens]
+
+    def is_healthy(self) -> bool:
+        """Enabled and has at least one token that passed (or skipped) pre-flight"""
+        return self.enabled and bool(self.live_tokens())
 
     def to_dict(self) -> Dict:
         """Convert account to dictionary for serialization"""
@@ -67,6 +80,7 @@ class AccountManager:
         self.accounts = accounts or []
         self._current_index = 0
         self._lock = Lock()  # Thread safety for parallel processing
+        self.dead_api_keys: Dict[str, Set[str]] = {}  # kind -> keys rejected by pre-flight
 
     def add_account(self, account: LabsAccount):
         """Add a new account to the manager"""
@@ -98,8 +112,8 @@ class AccountManager:
             if not self.accounts:
                 return None
 
-            # Filter enabled accounts
-            enabled = [acc for acc in self.accounts if acc.enabled]
+            # Filter enabled accounts, skipping ones pre-flight found dead
+            enabled = self._schedulable()
             if not enabled:
                 return None
 
@@ -124,7 +138,7 @@ class AccountManager:
             if not self.accounts:
                 return None
 
-            enabled = [acc for acc in self.accounts if acc.enabled]
+            enabled = self._schedulable()
             if not enabled:
                 return None
 
@@ -139,6 +153,73 @@ class AccountManager:
         with self._lock:
             return [acc for acc in self.accounts if acc.enabled]
 
+    def get_healthy_accounts(self) -> List[LabsAccount]:
+        """Get enabled accounts that still have live tokens after pre-flight"""
+        with self._lock:
+            return [acc for acc in self.accounts if acc.is_healthy()]
+
+    def _schedulable(self) -> List[LabsAccount]:
+        """Healthy accounts, or all enabled ones if pre-flight rejected everything
+
+        Caller holds the lock.
+        """
+        enabled = [acc for acc in self.accounts if acc.enabled]
+        healthy = [acc for acc in enabled if acc.is_healthy()]
+        return healthy or enabled
+
+    def preflight_check(self, ttl: Optional[float] = None, log=None,
+                        api_keys: bool = True) -> Dict[str, int]:
+        """
+        Validate every token of every enabled account, and the configured
+        Gemini / ElevenLabs / OpenAI API keys, in one parallel pass before a
+        batch is planned. Invalid tokens are recorded in
+        ``LabsAccount.dead_tokens`` so round-robin selection and clients skip
+        them; invalid API keys are recorded in ``dead_api_keys``.
+
+        Args:
+            ttl: Cache window in seconds (default: config resilience.preflight_ttl_sec)
+            log: Optional callable(str) for progress messages
+            api_keys: Also check the API keys from the settings
+
+        Returns:
+            Dict mapping account name to number of live tokens
+        """
+        from services import key_check_service as kcs
+
+        with self._lock:
+            enabled = [acc for acc in self.accounts if acc.enabled]
+        items = [("labs", t) for acc in enabled for t in acc.tokens]
+        if api_keys:
+            from services.core.key_manager import get_all_keys
+            items += [(kind, k) for kind in API_KEY_KINDS for k in get_all_keys(kind)]
+        if not items:
+            return {}
+
+        t0 = time.time()
+        results = kcs.check_many(items, ttl=ttl)
+
+        def dead(kind: str, keys: List[str]) -> Set[str]:
+            return {k for k in keys if not results.get((kind, k.strip()), (True, ""))[0]}
+
+        summary = {}
+        with self._lock:
+            for acc in enabled:
+                acc.dead_tokens = dead("labs", acc.tokens)
+                summary[acc.name] = len(acc.live_tokens())
+            if api_keys:
+                self.dead_api_keys = {
+                    kind: dead(kind, [k for i_kind, k in items if i_kind == kind])
+                    for kind in API_KEY_KINDS
+                }
+        if log:
+            no_tokens = [name for name, n in summary.items() if n == 0]
+            bad_keys = [f"{len(keys)} {kind}" for kind, keys in self.dead_api_keys.items() if keys]
+            log(f"[INFO] Pre-flight: {len(items)} token(s)/key(s) checked"
+                f" in {time.time() - t0:.1f}s"
+                + (f" — no valid tokens for: {', '.join(no_tokens)}" if no_tokens else "")
+                + (f" — invalid API keys: {', '.join(bad_keys)}" if bad_keys else ""))
+        return summary
+
     def get_all_accounts(self) -> List[LabsAccount]:
         """Get all accounts (enabled and disabled)"""
         with self._lock:
@@ -263,6 +344,8 @@ def save_account_manager():
                 config = cfg.load()
                 _global_manager.save_to_config(config)
                 cfg.save(config)
+                from services import key_check_service as kcs
+                kcs.invalidate()
             except Exception as e:
                 print(f"[ERR] Failed to save account manager to config: {e}")
 
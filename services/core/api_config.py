@@ -1,16 +1,22 @@
 # -*- coding: utf-8 -*-
 """
 API Configuration - Single Source of Truth for all API models and endpoints
+
+Base URLs can be overridden with VEO_GEMINI_BASE / VEO_LABS_BASE / VEO_TTS_BASE
+(e.g. to run against the local stand-in in benchmarks/fake_google.py).
 """
 
+import os
+
 # Models
 GEMINI_TEXT_MODEL = "gemini-2.5-flash"
 GEMINI_IMAGE_MODEL = "gemini-2.5-flash-image"  # FIXED: was "imagen-3.0-generate-001"
 
 # Base URLs
-GEMINI_BASE = "https://generativelanguage.googleapis.com/v1beta"
+GEMINI_BASE = os.environ.get("VEO_GEMINI_BASE") or "https://generativelanguage.googleapis.com/v1beta"
 WHISK_BASE = "https://labs.google/fx/api/trpc"
-LABS_BASE = "https://aisandbox-pa.googleapis.com"
+LABS_BASE = os.environ.get("VEO_LABS_BASE") or "https://aisandbox-pa.googleapis.com"
+TTS_BASE = os.environ.get("VEO_TTS_BASE") or "https://texttospeech.googleapis.com"
 
 # Timeouts (in seconds)
 DEFAULT_TIMEOUT = 120
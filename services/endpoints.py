@@ -1,4 +1,7 @@
-LABS_BASE='https://aisandbox-pa.googleapis.com'
+import os
+
+# VEO_LABS_BASE points the clients at another server (e.g. benchmarks/fake_google.py)
+LABS_BASE=os.environ.get('VEO_LABS_BASE') or 'https://aisandbox-pa.googleapis.com'
 UPLOAD_IMAGE_URL=f"{LABS_BASE}/v1:uploadUserImage"
 T2V_URL=f"{LABS_BASE}/v1/video:batchAsyncGenerateVideoText"
 I2V_URL=f"{LABS_BASE}/v1/video:batchAsyncGenerateVideoStartImage"
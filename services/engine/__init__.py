@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+Headless engine - Qt-free batch video generation
+
+Run `python -m services.engine --help` for the CLI (run / submit / daemon / status).
+"""
+
+from services.engine.job_queue import DEFAULT_SPOOL_DIR, JobQueue, QueueDaemon
+from services.engine.pipeline import BatchEngine
+from services.engine.prompt_files import parse_prompt_any, parse_prompt_file
+
+__all__ = [
+    'BatchEngine',
+    'JobQueue',
+    'QueueDaemon',
+    'DEFAULT_SPOOL_DIR',
+    'parse_prompt_any',
+    'parse_prompt_file',
+]
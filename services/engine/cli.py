@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Headless CLI for the batch engine (no Qt required)
+
+    python -m services.engine run prompts.json --out ./videos [--images ./imgs]
+    python -m services.engine submit prompts.json --out ./videos [--priority interactive]
+    python -m services.engine daemon [--jobs 2]
+    python -m services.engine status [JOB_ID]
+    python -m services.engine serve [--jobs 4]      (shared engine process for the GUI)
+    python -m services.engine cluster submit|work|status --db //nas/veo/cluster.db
+
+Accounts, tokens and project ids come from the same config file as the GUI.
+"""
+
+import argparse
+import json
+import signal
+import sys
+import threading
+from datetime import datetime
+
+from services.engine.job_queue import (
+    DEFAULT_SPOOL_DIR,
+    JobQueue,
+    QueueDaemon,
+    list_images,
+    run_ticket,
+)
+from services.engine.pipeline import DEFAULT_ASPECT, DEFAULT_MODEL, BatchEngine
+from services.project_scheduler import PRIORITY_CLASSES, deadline_in
+
+ASPECTS = {
+    "16:9": "VIDEO_ASPECT_RATIO_LANDSCAPE",
+    "9:16": "VIDEO_ASPECT_RATIO_PORTRAIT",
+    "1:1": "VIDEO_ASPECT_RATIO_SQUARE",
+}
+
+
+def _print_event(ev: dict):
+    """Console sink: logs and terminal card states, one line each"""
+    kind = ev.get("kind")
+    prefix = f"[{ev['job_id']}] " if ev.get("job_id") else ""
+    ts = datetime.now().strftime("%H:%M:%S")
+    if kind == "log":
+        print(f"{ts} {prefix}[{ev.get('level', 'INFO')}] {ev.get('message', '')}", flush=True)
+    elif kind == "card":
+        card = ev.get("card", {})
+        if card.get("status") not in ("PROCESSING", "READY"):
+            extra = card.get("path") or card.get("error_reason") or ""
+            print(f"{ts} {prefix}Scene {card.get('scene')} Copy {card.get('copy')}: "
+                  f"{card.get('status')} {extra}".rstrip(), flush=True)
+    elif kind == "progress":
+        print(f"{ts} {prefix}{ev.get('done')}/{ev.get('total')} - {ev.get('message', '')}",
+              flush=True)
+    elif kind in ("job_started", "job_finished", "job_failed"):
+        detail = ev.get("error") or ev.get("videos") or ev.get("prompt_file") or ""
+        print(f"{ts} {prefix}{kind} {detail}", flush=True)
+
+
+def _add_job_args(p: argparse.ArgumentParser):
+    p.add_argument("prompt_file", help="Scene prompt JSON (list, {scenes: [...]} or {prompt: ...})")
+    p.add_argument("--out", required=True, help="Output directory for videos")
+    p.add_argument("--images",
+                   help="Directory of start images (I2V), matched to scenes in name order")
+    p.add_argument("--title", help="Filename prefix (default: prompt file name)")
+    p.add_argument("--model", default=DEFAULT_MODEL,
+                   help=f"Video model key (default: {DEFAULT_MODEL})")
+    p.add_argument("--aspect", default="16:9",
+                   help="16:9, 9:16, 1:1 or a VIDEO_ASPECT_RATIO_* value")
+    p.add_argument("--copies", type=int, default=1, help="Videos per scene (1-4)")
+    p.add_argument("--priority", default="batch", choices=sorted(PRIORITY_CLASSES),
+                   help="Queue class: interactive jumps ahead of batch and background jobs")
+    p.add_argument("--deadline", type=float,
+                   help="Seconds from now; earlier deadlines go first within a class")
+
+
+def _options(args) -> dict:
+    return {
+        "title": args.title,
+        "model_key": args.model,
+        "aspect_ratio": ASPECTS.get(args.aspect, args.aspect or DEFAULT_ASPECT),
+        "copies": max(1, min(4, args.copies)),
+        "image_dir": args.images,
+        "priority": args.priority,
+        "deadline": deadline_in(args.deadline),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m services.engine",
+                                     description="Headless Veo batch runner and job queue")
+    parser.add_argument("--spool", default=DEFAULT_SPOOL_DIR, help="Job queue directory")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    _add_job_args(sub.add_parser("run", help="Run one prompt file now (foreground)"))
+    _add_job_args(sub.add_parser("submit", help="Queue a prompt file for the daemon"))
+
+    d = sub.add_parser("daemon", help="Process queued jobs")
+    d.add_argument("--jobs", type=int, default=2, help="Jobs run at the same time")
+    d.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+
+    s = sub.add_parser("status", help="Queue summary or one job's state")
+    s.add_argument("job_id", nargs="?")
+
+    v = sub.add_parser("serve", help="Run the shared engine process (local socket IPC)")
+    v.add_argument("--jobs", type=int, default=4, help="Jobs run at the same time")
+    v.add_argument("--socket", help="Unix socket path (default from config)")
+    v.add_argument("--port", type=int, help="TCP port (Windows)")
+    v.add_argument("--host", default="127.0.0.1", help="TCP host for --port")
+    v.add_argument("--token-file", help="Request token file (default from config)")
+
+    c = sub.add_parser("cluster", help="Split batches across machines via a shared SQLite file")
+    csub = c.add_subparsers(dest="cluster_cmd", required=True)
+    cs = csub.add_parser("submit", help="Queue a prompt file's scenes for all nodes")
+    _add_job_args(cs)
+    cw = csub.add_parser("work", help="Claim and generate scenes until stopped")
+    cw.add_argument("--batch-size", type=int, default=4, help="Scenes claimed per round")
+    cw.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+    cst = csub.add_parser("status", help="Scene counts per state and active leases per node")
+    cst.add_argument("batch_id", nargs="?")
+    for sp in (cs, cw, cst):
+        sp.add_argument("--db", help="Coordinator database (default: config cluster.db_path)")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.cmd == "run":
+        ticket = {"id": "run", "prompt_file": args.prompt_file, "out_dir": args.out,
+                  "options": _options(args)}
+        engine = {}
+
+        def factory(on_event=None):
+            engine["e"] = BatchEngine(on_event=on_event)
+            return engine["e"]
+
+        # Ctrl+C stops submitting/polling but lets running downloads finish
+        signal.signal(signal.SIGINT, lambda *_: engine.get("e") and engine["e"].cancel())
+        try:
+            result = run_ticket(ticket, factory, on_event=_print_event)
+        except ValueError as e:
+            print(f"[ERR] {e}", file=sys.stderr)
+            return 2
+        print(f"Done: {len(result['videos'])} video(s) downloaded for {result['scenes']} scene(s)")
+        return 0 if result["videos"] else 1
+
+    if args.cmd == "serve":
+        from services.engine.ipc import EngineServer
+        address = args.socket or ((args.host, args.port) if args.port else None)
+        server = EngineServer(address, spool_dir=args.spool, max_jobs=args.jobs,
+                              on_event=_print_event, token_path=args.token_file)
+        # shutdown() waits for serve_forever, so it must not run on the signalled thread
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+        print(f"Engine listening on {server.address}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.cmd == "cluster":
+        return _cluster(args)
+
+    queue = JobQueue(args.spool)
+
+    if args.cmd == "submit":
+        if args.images and not list_images(args.images):
+            print(f"[WARN] No images found in {args.images}", file=sys.stderr)
+        print(queue.submit(args.prompt_file, args.out, **_options(args)))
+        return 0
+
+    if args.cmd == "daemon":
+        daemon = QueueDaemon(queue, BatchEngine, max_jobs=args.jobs, on_event=_print_event)
+        signal.signal(signal.SIGINT, lambda *_: daemon.stop())
+        signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+        print(f"Queue daemon on {args.spool} ({args.jobs} concurrent job(s))", flush=True)
+        daemon.serve_forever(once=args.once)
+        return 0
+
+    if args.cmd == "status":
+        if args.job_id:
+            info = queue.status(args.job_id)
+            if info is None:
+                print(f"Unknown job: {args.job_id}", file=sys.stderr)
+                return 1
+            print(json.dumps(info, ensure_ascii=False, indent=2))
+        else:
+            print(json.dumps(queue.counts(), indent=2))
+        return 0
+    return 1
+
+
+def _cluster(args) -> int:
+    from services.engine.cluster import ClusterCoordinator, get_coordinator, run_worker
+    from services.engine.prompt_files import parse_prompt_file
+    from utils import config as cfg
+
+    conf = cfg.load()
+    if args.db:
+        conf = dict(conf, cluster=dict(conf.get("cluster") or {}, db_path=args.db))
+    coord = get_coordinator(conf)
+    if not isinstance(coord, ClusterCoordinator):
+        print("[ERR] No coordinator database: pass --db or set cluster.db_path in config",
+              file=sys.stderr)
+        return 2
+
+    if args.cluster_cmd == "submit":
+        scenes = parse_prompt_file(args.prompt_file)
+        if not scenes:
+            print(f"[ERR] No scenes in prompt file: {args.prompt_file}", file=sys.stderr)
+            return 2
+        opts = _options(args)
+        opts["out_dir"] = args.out
+        opts["title"] = opts["title"] or args.prompt_file.rsplit("/", 1)[-1].rsplit(".", 1)[0]
+        images = list_images(opts.pop("image_dir"))
+        print(coord.enqueue_batch(scenes, opts, images=images or None))
+        return 0
+
+    if args.cluster_cmd == "work":
+        stop = threading.Event()
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        print(f"Cluster node {coord.node_id} on {coord.db_path}", flush=True)
+        n = run_worker(coord, lambda on_event=None: BatchEngine(config=conf, on_event=on_event,
+                                                                coordinator=coord),
+                       batch_size=args.batch_size, stop=stop, on_event=_print_event, once=args.once)
+        print(f"Processed {n} scene(s)")
+        return 0
+
+    print(json.dumps({"tasks": coord.progress(args.batch_id), "leases": coord.nodes()}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+"""
+Cluster Coordinator - shared SQLite file that lets several machines split
+one batch over the same Labs accounts without colliding
+
+Put the database on a network share every node can reach and point each
+node's config at it:
+
+    "cluster": {"db_path": "//nas/veo/cluster.db", "slots_per_account": 2,
+                "submits_per_minute": 6}
+
+The coordinator holds:
+- account leases: at most ``slots_per_account`` concurrent submits per
+  account across all nodes; new work goes to the least-busy account
+- per-token rate buckets: token-bucket limit on submits for each bearer token
+- a task queue: one row per scene; nodes claim scenes with a visibility
+  timeout, so a crashed node's scenes are picked up again
+
+Every mutation runs in a BEGIN IMMEDIATE transaction. WAL is not used because
+it does not work on network filesystems.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.project_scheduler import PRIORITY_BATCH, priority_of
+
+SLOTS_PER_ACCOUNT = 2
+SUBMITS_PER_MINUTE = 6  # Per token; Labs starts returning 429 around here
+BUCKET_BURST = 2
+LEASE_TTL = 600.0  # A submit holding a lease longer than this is considered dead
+TASK_TTL = 3600.0  # Claimed scenes return to the queue if not finished in time
+BUSY_TIMEOUT_MS = 30000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    id TEXT PRIMARY KEY,
+    account TEXT NOT NULL,
+    node TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_leases_account ON leases(account);
+CREATE TABLE IF NOT EXISTS buckets (
+    token_key TEXT PRIMARY KEY,
+    level REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch TEXT NOT NULL,
+    scene INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    node TEXT,
+    visible_at REAL NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    priority INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_claim ON tasks(state, visible_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_batch ON tasks(batch);
+"""
+
+
+def token_key(token: str) -> str:
+    """Bucket key for a bearer token (tokens themselves are never stored)"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:32]
+
+
+def default_node_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class ClusterCoordinator:
+    """Leases, rate buckets and the scene queue in one shared SQLite file"""
+
+    def __init__(self, db_path: str, node_id: Optional[str] = None,
+                 slots_per_account: int = SLOTS_PER_ACCOUNT,
+                 submits_per_minute: float = SUBMITS_PER_MINUTE,
+                 burst: float = BUCKET_BURST):
+        self.db_path = db_path
+        self.node_id = node_id or default_node_id()
+        self.slots_per_account = max(1, int(slots_per_account))
+        self.rate_per_sec = max(0.01, float(submits_per_minute)) / 60.0
+        self.burst = max(1.0, float(burst))
+        self._local = threading.local()
+        # executescript commits on its own, so it runs outside _tx()
+        self._conn().executescript(_SCHEMA)
+        try:
+            # Databases created before request classes existed
+            self._conn().execute("ALTER TABLE tasks ADD COLUMN priority INTEGER NOT NULL DEFAULT 1")
+        except sqlite3.OperationalError:
+            pass
+
+    # ------------------------------------------------------------------ db
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_MS / 1000.0,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            conn.execute("PRAGMA journal_mode=DELETE")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    class _Tx:
+        def __init__(self, conn):
+            self.conn = conn
+
+        def __enter__(self):
+            self.conn.execute("BEGIN IMMEDIATE")
+            return self.conn
+
+        def __exit__(self, exc_type, exc, tb):
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+            return False
+
+    def _tx(self) -> "_Tx":
+        return self._Tx(self._conn())
+
+    # ------------------------------------------------------------------ leases
+
+    def acquire_account(self, accounts: List[str], ttl: float = LEASE_TTL, wait: bool = True,
+                        stop: Optional[threading.Event] = None) -> Optional[Tuple[str, str]]:
+        """
+        Lease a submit slot on the least-busy account (cluster-wide).
+
+        Returns:
+            (account, lease_id), or None if ``wait`` is False and all slots are taken
+            (or ``stop`` was set while waiting)
+        """
+        if not accounts:
+            return None
+        while True:
+            now = time.time()
+            with self._tx() as db:
+                db.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+                busy = dict(db.execute(
+                    "SELECT account, COUNT(*) FROM leases GROUP BY account").fetchall())
+                free = [a for a in accounts if busy.get(a, 0) < self.slots_per_account]
+                if free:
+                    account = min(free, key=lambda a: (busy.get(a, 0), accounts.index(a)))
+                    lease_id = uuid.uuid4().hex
+                    db.execute("INSERT INTO leases (id, account, node, expires_at) "
+                               "VALUES (?, ?, ?, ?)", (lease_id, account, self.node_id, now + ttl))
+                    return account, lease_id
+            if not wait or (stop is not None and stop.is_set()):
+                return None
+            if stop is not None:
+                stop.wait(1.0)
+            else:
+                time.sleep(1.0)
+
+    def release(self, lease_id: str):
+        with self._tx() as db:
+            db.execute("DELETE FROM leases WHERE id = ?", (lease_id,))
+
+    def renew(self, lease_id: str, ttl: float = LEASE_TTL) -> bool:
+        """Push a held lease's expiry ``ttl`` seconds out; False if it already expired"""
+        with self._tx() as db:
+            cur = db.execute("UPDATE leases SET expires_at = ? WHERE id = ?",
+                             (time.time() + ttl, lease_id))
+            return cur.rowcount > 0
+
+    @contextmanager
+    def holding(self, lease_id: str, ttl: float = LEASE_TTL):
+        """
+        Keep ``lease_id`` alive while the block runs, then release it.
+
+        A submit can wait on its lane and park behind an open circuit for
+        longer than ``ttl``; the lease is renewed every ttl/3 so no other node
+        takes the slot meanwhile.
+        """
+        done = threading.Event()
+
+        def _keepalive():
+            while not done.wait(ttl / 3.0):
+                try:
+                    self.renew(lease_id, ttl)
+                except sqlite3.Error:
+                    pass  # Share briefly unreachable: retry on the next beat
+
+        beat = threading.Thread(target=_keepalive, name="LeaseKeepalive", daemon=True)
+        beat.start()
+        try:
+            yield
+        finally:
+            done.set()
+            beat.join()
+            self.release(lease_id)
+
+    # ------------------------------------------------------------------ buckets
+
+    def take(self, token: str) -> float:
+        """
+        Take one submit from ``token``'s bucket.
+
+        Returns:
+            0.0 if granted, otherwise seconds to wait before trying again
+        """
+        key = token_key(token)
+        now = time.time()
+        with self._tx() as db:
+            row = db.execute("SELECT level, updated_at FROM buckets WHERE token_key = ?",
+                             (key,)).fetchone()
+            level = self.burst if row is None else min(
+                self.burst, row["level"] + (now - row["updated_at"]) * self.rate_per_sec)
+            upsert = ("INSERT OR REPLACE INTO buckets (token_key, level, updated_at) "
+                      "VALUES (?, ?, ?)")
+            if level >= 1.0:
+                db.execute(upsert, (key, level - 1.0, now))
+                return 0.0
+            db.execute(upsert, (key, level, now))
+            return (1.0 - level) / self.rate_per_sec
+
+    def wait_for_token(self, token: str, stop: Optional[threading.Event] = None) -> bool:
+        """Block until ``token`` may submit; False if ``stop`` was set first"""
+        while True:
+            delay = self.take(token)
+            if delay <= 0:
+                return True
+            if stop is not None:
+                if stop.wait(min(delay, 5.0)):
+                    return False
+            else:
+                time.sleep(min(delay, 5.0))
+
+    # ------------------------------------------------------------------ tasks
+
+    def enqueue_batch(self, scenes: List[Any], options: Dict[str, Any],
+                      images: Optional[List[Optional[str]]] = None,
+                      batch_id: Optional[str] = None) -> str:
+        """
+        Queue one task per scene; ``options`` (out_dir, title, copies...) travel with each.
+        ``options["priority"]`` (class name or number) puts the batch ahead of older ones.
+        """
+        batch_id = batch_id or time.strftime("%Y%m%d_%H%M%S_") + uuid.uuid4().hex[:6]
+        images = list(images or [])
+        priority = priority_of(options.get("priority"))
+        priority = PRIORITY_BATCH if priority is None else priority
+        rows = [(batch_id, i, json.dumps({"prompt": p, "options": options,
+                                          "image": images[i - 1] if i <= len(images) else None},
+                                         ensure_ascii=False), priority)
+                for i, p in enumerate(scenes, start=1)]
+        with self._tx() as db:
+            db.executemany("INSERT INTO tasks (batch, scene, payload, priority) "
+                           "VALUES (?, ?, ?, ?)", rows)
+        return batch_id
+
+    def claim(self, limit: int = 4, ttl: float = TASK_TTL) -> List[Dict[str, Any]]:
+        """
+        Claim up to ``limit`` scenes of the most urgent, then oldest batch
+        (expired claims are reclaimed)
+        """
+        now = time.time()
+        with self._tx() as db:
+            rows = db.execute(
+                "SELECT id, batch, scene, payload, attempts FROM tasks "
+                "WHERE (state = 'queued' OR state = 'claimed') AND visible_at <= ? "
+                "ORDER BY priority DESC, id LIMIT ?", (now, limit)).fetchall()
+            batch = rows[0]["batch"] if rows else None
+            rows = [r for r in rows if r["batch"] == batch]
+            db.executemany(
+                "UPDATE tasks SET state = 'claimed', node = ?, visible_at = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                [(self.node_id, now + ttl, r["id"]) for r in rows])
+        out = []
+        for r in rows:
+            payload = json.loads(r["payload"])
+            out.append({"id": r["id"], "batch": r["batch"], "scene": r["scene"],
+                        "attempts": r["attempts"] + 1, **payload})
+        return out
+
+    def complete(self, task_id: int, result: Dict[str, Any], failed: bool = False):
+        with self._tx() as db:
+            db.execute("UPDATE tasks SET state = ?, result = ? WHERE id = ? AND node = ?",
+                       ("failed" if failed else "done",
+                        json.dumps(result, ensure_ascii=False, default=str), task_id, self.node_id))
+
+    def progress(self, batch_id: Optional[str] = None) -> Dict[str, int]:
+        """Task counts per state (one batch or all)"""
+        sql = "SELECT state, COUNT(*) FROM tasks"
+        args: Tuple = ()
+        if batch_id:
+            sql += " WHERE batch = ?"
+            args = (batch_id,)
+        rows = self._conn().execute(sql + " GROUP BY state", args).fetchall()
+        return {r[0]: r[1] for r in rows}
+
+    def nodes(self) -> Dict[str, int]:
+        """Active leases per node (who is submitting right now)"""
+        rows = self._conn().execute(
+            "SELECT node, COUNT(*) FROM leases WHERE expires_at >= ? GROUP BY node",
+            (time.time(),)).fetchall()
+        return {r[0]: r[1] for r in rows}
+
+
+def get_coordinator(config: Optional[Dict[str, Any]]) -> Optional[ClusterCoordinator]:
+    """Coordinator from the config 'cluster' section, or None when cluster mode is off"""
+    knobs = (config or {}).get("cluster", {}) or {}
+    db_path = knobs.get("db_path")
+    if not db_path:
+        return None
+    return ClusterCoordinator(
+        db_path,
+        node_id=knobs.get("node_id"),
+        slots_per_account=knobs.get("slots_per_account", SLOTS_PER_ACCOUNT),
+        submits_per_minute=knobs.get("submits_per_minute", SUBMITS_PER_MINUTE),
+        burst=knobs.get("burst", BUCKET_BURST),
+    )
+
+
+def run_worker(coordinator: ClusterCoordinator, engine_factory, batch_size: int = 4,
+               stop: Optional[threading.Event] = None, idle_sleep: float = 5.0,
+               on_event=None, once: bool = False) -> int:
+    """
+    Claim scenes from the shared queue and generate them until ``stop``.
+
+    Each claim is run through one BatchEngine call; results (card lists) are
+    written back per scene. Returns the number of scenes processed.
+    """
+    stop = stop or threading.Event()
+    done = 0
+    while not stop.is_set():
+        tasks = coordinator.claim(limit=batch_size)
+        if not tasks:
+            if once:
+                break
+            stop.wait(idle_sleep)
+            continue
+
+        opts = dict(tasks[0].get("options") or {})
+        out_dir = opts.pop("out_dir")
+        kwargs = {k: opts[k] for k in ("title", "model_key", "aspect_ratio", "copies",
+                                       "priority", "deadline") if opts.get(k)}
+        engine = engine_factory(on_event=on_event)
+        try:
+            cards = engine.run(
+                [t["prompt"] for t in tasks], out_dir,
+                images=[t.get("image") for t in tasks],
+                scene_numbers=[t["scene"] for t in tasks], **kwargs,
+            )
+        except Exception as e:
+            for t in tasks:
+                coordinator.complete(t["id"], {"error": str(e)}, failed=True)
+            continue
+
+        for t in tasks:
+            mine = [c for c in cards if c.get("scene") == t["scene"]]
+            ok = any(c.get("status") == "DOWNLOADED" for c in mine)
+            coordinator.complete(t["id"], {"cards": mine}, failed=not ok)
+        done += len(tasks)
+    return done
@@ -0,0 +1,476 @@
+# -*- coding: utf-8 -*-
+"""
+Engine IPC - long-lived generation process shared by every GUI instance
+
+One engine process owns the account lanes (Labs clients, per-account submit
+limits), the job store (JobQueue spool) and the workers. GUIs and scripts
+connect over a local socket and exchange newline-delimited JSON:
+
+    -> {"op": "submit", "scenes": [...], "out_dir": "...", "options": {...}}
+    <- {"ok": true, "job_id": "..."}
+
+    -> {"op": "subscribe", "job_id": "..."}      (job_id optional)
+    <- {"kind": "card", "job_id": "...", "card": {...}}   (streamed until disconnect)
+
+Other ops: ping, status, cancel, refresh_accounts, shutdown.
+
+A Unix domain socket is used where available; on Windows the server binds
+127.0.0.1 only. Every request carries a "token" field: a random secret the
+engine writes on start to a file only the user can read (engine.token_path,
+default ~/.veo_image2video_engine.token), so other local users cannot submit,
+cancel or shut down jobs over the TCP port.
+"""
+
+import hmac
+import json
+import os
+import queue
+import secrets
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from services.engine.job_queue import DEFAULT_SPOOL_DIR, JobQueue, QueueDaemon
+from services.engine.pipeline import SUBMITS_PER_ACCOUNT, BatchEngine, build_lanes
+
+DEFAULT_SOCKET_PATH = os.path.join(os.path.expanduser("~"), ".veo_image2video_engine.sock")
+DEFAULT_TCP_PORT = 47391
+DEFAULT_TOKEN_PATH = os.path.join(os.path.expanduser("~"), ".veo_image2video_engine.token")
+SUBSCRIBER_BUFFER = 5000  # Events buffered per subscriber before it is disconnected
+HEARTBEAT_SEC = 15.0
+
+Address = Union[str, Tuple[str, int]]
+
+
+class EngineUnavailable(Exception):
+    """No engine process is listening on the configured address"""
+
+
+def engine_address(config: Optional[Dict[str, Any]] = None) -> Address:
+    """Socket path (Unix) or (host, port) (Windows) from config 'engine' section"""
+    knobs = (config or {}).get("engine", {}) or {}
+    if hasattr(socket, "AF_UNIX") and os.name != "nt":
+        return knobs.get("socket_path") or DEFAULT_SOCKET_PATH
+    return ("127.0.0.1", int(knobs.get("port", DEFAULT_TCP_PORT)))
+
+
+def engine_token_path(config: Optional[Dict[str, Any]] = None) -> str:
+    """Token file from config 'engine' section"""
+    return ((config or {}).get("engine", {}) or {}).get("token_path") or DEFAULT_TOKEN_PATH
+
+
+def read_token(path: str) -> str:
+    """The engine's current token ("" if it has not written one)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def write_token(path: str) -> str:
+    """Write a fresh token readable by the current user only (0600) and return it"""
+    token = secrets.token_hex(32)
+    d = os.path.dirname(os.path.abspath(path))
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp_token_", dir=d)  # created 0600
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(token)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return token
+
+
+def _dumps(obj: Dict[str, Any]) -> bytes:
+    return (json.dumps(obj, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+# ---------------------------------------------------------------------- server
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        engine: "EngineServer" = self.server.engine
+        for line in self.rfile:
+            try:
+                req = json.loads(line.decode("utf-8"))
+            except ValueError:
+                self.wfile.write(_dumps({"ok": False, "error": "Invalid JSON"}))
+                continue
+            if not engine.authorized(req):
+                self.wfile.write(_dumps({"ok": False, "error": "Unauthorized"}))
+                return
+            if req.get("op") == "subscribe":
+                engine.stream(self.wfile, req.get("job_id"))
+                return
+            try:
+                resp = engine.dispatch(req)
+            except Exception as e:
+                resp = {"ok": False, "error": str(e)}
+            self.wfile.write(_dumps(resp))
+            self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class EngineServer:
+    """
+    The out-of-process engine.
+
+    All jobs share one set of account lanes, so concurrent projects are
+    throttled together instead of racing for the same tokens.
+    """
+
+    def __init__(self, address: Optional[Address] = None, spool_dir: str = DEFAULT_SPOOL_DIR,
+                 max_jobs: int = 4, config: Optional[Dict[str, Any]] = None,
+                 on_event: Optional[Callable[[dict], None]] = None,
+                 token_path: Optional[str] = None):
+        from utils import config as cfg
+        self.config = config if config is not None else cfg.load()
+        self.address = address or engine_address(self.config)
+        self.token_path = token_path or engine_token_path(self.config)
+        self._token = ""  # Set by serve_forever
+        self.queue = JobQueue(spool_dir)
+        self.on_event = on_event  # Local sink (console/log file), called for every event
+        self._subs: List[Tuple["queue.Queue", Optional[str], threading.Event]] = []
+        self._subs_lock = threading.Lock()
+        self._lanes_lock = threading.Lock()
+        self._lanes = None
+        self.daemon = QueueDaemon(self.queue, self._engine_factory, max_jobs=max_jobs,
+                                  on_event=self.broadcast)
+        self._server = None
+
+    # -------------------------------------------------------------- lanes
+
+    def refresh_accounts(self) -> int:
+        """Reload accounts/tokens from config and rebuild the shared lanes"""
+        from services.account_manager import AccountManager
+        from utils import config as cfg
+        self.config = cfg.load()
+        mgr = AccountManager.load_from_config(self.config)
+        knobs = self.config.get("engine", {}) or {}
+        per_account = int(knobs.get("submits_per_account", SUBMITS_PER_ACCOUNT))
+        lanes = build_lanes(mgr, self.config, on_event=self.broadcast, per_account=per_account,
+                            log=lambda m: self.broadcast({"kind": "log", "level": "INFO",
+                                                          "message": m}))
+        with self._lanes_lock:
+            self._lanes = lanes
+        return len(lanes)
+
+    def _engine_factory(self, on_event=None) -> BatchEngine:
+        with self._lanes_lock:
+            lanes = self._lanes
+        if lanes is None:
+            self.refresh_accounts()
+            with self._lanes_lock:
+                lanes = self._lanes
+        return BatchEngine(config=self.config, on_event=on_event, lanes=lanes)
+
+    # -------------------------------------------------------------- events
+
+    def broadcast(self, event: Dict[str, Any]):
+        """
+        Fan an event out to every matching subscriber (never blocks).
+
+        A subscriber whose buffer is full is disconnected rather than losing
+        an event silently; the client then re-reads the job status.
+        """
+        if self.on_event:
+            try:
+                self.on_event(event)
+            except Exception:
+                pass
+        job_id = event.get("job_id")
+        with self._subs_lock:
+            subs = list(self._subs)
+        for q, want, overflow in subs:
+            if want and job_id and want != job_id:
+                continue
+            try:
+                q.put_nowait(event)
+            except queue.Full:
+                overflow.set()
+
+    def stream(self, wfile, job_id: Optional[str] = None):
+        """Write events to one subscriber until it disconnects"""
+        q: "queue.Queue" = queue.Queue(maxsize=SUBSCRIBER_BUFFER)
+        overflow = threading.Event()
+        entry = (q, job_id, overflow)
+        with self._subs_lock:
+            self._subs.append(entry)
+        try:
+            wfile.write(_dumps({"ok": True, "subscribed": job_id}))
+            wfile.flush()
+            while not overflow.is_set():
+                try:
+                    ev = q.get(timeout=HEARTBEAT_SEC)
+                except queue.Empty:
+                    ev = {"kind": "heartbeat"}
+                wfile.write(_dumps(ev))
+                wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            pass
+        finally:
+            with self._subs_lock:
+                self._subs.remove(entry)
+
+    # -------------------------------------------------------------- requests
+
+    def authorized(self, req: Dict[str, Any]) -> bool:
+        token = req.get("token")
+        return bool(self._token) and isinstance(token, str) and hmac.compare_digest(
+            token.encode("utf-8"), self._token.encode("utf-8"))
+
+    def dispatch(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        op = req.get("op")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid(), "running": self.daemon.running_jobs()}
+        if op == "submit":
+            job_id = self.queue.submit(req.get("prompt_file"), req["out_dir"],
+                                       scenes=req.get("scenes"), **(req.get("options") or {}))
+            self.broadcast({"kind": "job_queued", "job_id": job_id})
+            return {"ok": True, "job_id": job_id}
+        if op == "cancel":
+            return {"ok": self.daemon.cancel(req.get("job_id", ""))}
+        if op == "status":
+            if req.get("job_id"):
+                info = self.queue.status(req["job_id"])
+                return {"ok": info is not None, "job": info}
+            return {"ok": True, "counts": self.queue.counts(),
+                    "running": self.daemon.running_jobs()}
+        if op == "refresh_accounts":
+            return {"ok": True, "lanes": self.refresh_accounts()}
+        if op == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown op: {op}"}
+
+    def serve_forever(self):
+        """Run the job workers and accept connections until shutdown()"""
+        if isinstance(self.address, str):
+            if os.path.exists(self.address):
+                # Stale socket from a crashed engine (a live one would answer)
+                if EngineClient(self.address, token_path=self.token_path).ping():
+                    raise RuntimeError(f"Engine already running on {self.address}")
+                os.remove(self.address)
+            self._server = _UnixServer(self.address, _Handler)
+            os.chmod(self.address, 0o600)
+        else:
+            self._server = _TCPServer(self.address, _Handler)
+        self._server.engine = self
+        # Only after binding: a second engine failing to bind must not replace the token
+        self._token = write_token(self.token_path)
+
+        worker = threading.Thread(target=self.daemon.serve_forever, name="EngineJobs", daemon=True)
+        worker.start()
+        try:
+            self._server.serve_forever()
+        finally:
+            self.daemon.stop()
+            self._server.server_close()
+            if isinstance(self.address, str) and os.path.exists(self.address):
+                os.remove(self.address)
+
+    def shutdown(self):
+        self.daemon.stop()
+        if self._server:
+            self._server.shutdown()
+
+
+# ---------------------------------------------------------------------- client
+
+class EngineClient:
+    """Connect to the engine process (one short connection per request)"""
+
+    def __init__(self, address: Optional[Address] = None, timeout: float = 5.0,
+                 token_path: Optional[str] = None):
+        if address is None or token_path is None:
+            from utils import config as cfg
+            config = cfg.load()
+            address = address or engine_address(config)
+            token_path = token_path or engine_token_path(config)
+        self.address = address
+        self.timeout = timeout
+        self.token_path = token_path
+
+    def _request_line(self, op: str, **kw) -> bytes:
+        # Read per request: a restarted engine writes a new token
+        return _dumps({"op": op, "token": read_token(self.token_path), **kw})
+
+    def _connect(self, timeout: Optional[float]) -> socket.socket:
+        family = socket.AF_UNIX if isinstance(self.address, str) else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(self.address)
+        except OSError as e:
+            sock.close()
+            raise EngineUnavailable(f"Engine not reachable at {self.address}: {e}")
+        return sock
+
+    def request(self, op: str, **kw) -> Dict[str, Any]:
+        with self._connect(self.timeout) as sock:
+            sock.sendall(self._request_line(op, **kw))
+            line = sock.makefile("rb").readline()
+        if not line:
+            raise EngineUnavailable("Engine closed the connection")
+        return json.loads(line.decode("utf-8"))
+
+    def ping(self) -> bool:
+        try:
+            return bool(self.request("ping").get("ok"))
+        except (EngineUnavailable, OSError, ValueError):
+            return False
+
+    def submit(self, scenes: Optional[List[Any]], out_dir: str,
+               prompt_file: Optional[str] = None, **options) -> str:
+        resp = self.request("submit", scenes=scenes, prompt_file=prompt_file, out_dir=out_dir,
+                            options=options)
+        if not resp.get("ok"):
+            raise RuntimeError(resp.get("error") or "Submit failed")
+        return resp["job_id"]
+
+    def cancel(self, job_id: str) -> bool:
+        return bool(self.request("cancel", job_id=job_id).get("ok"))
+
+    def status(self, job_id: Optional[str] = None) -> Dict[str, Any]:
+        return self.request("status", job_id=job_id)
+
+    def events(self, job_id: Optional[str] = None,
+               stop: Optional[threading.Event] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Subscribe to events (all jobs, or one job). The subscription is live
+        when this returns, so a submit() right after it misses nothing.
+        Iterate until ``stop`` is set or the engine goes away; heartbeats are
+        filtered out. EngineUnavailable is raised if the stream ends early
+        (engine gone, or this subscriber fell behind and was disconnected).
+        """
+        sock = self._connect(self.timeout)
+        try:
+            sock.sendall(self._request_line("subscribe", job_id=job_id))
+            reader = sock.makefile("rb")
+            ack = json.loads(reader.readline().decode("utf-8") or "{}")
+            if not ack.get("ok"):
+                raise EngineUnavailable(f"Subscribe refused: {ack.get('error', 'no reply')}")
+            # Heartbeats arrive every HEARTBEAT_SEC; give them some slack
+            sock.settimeout(HEARTBEAT_SEC * 2)
+        except (OSError, ValueError) as e:
+            sock.close()
+            raise EngineUnavailable(f"Subscribe failed: {e}")
+        except EngineUnavailable:
+            sock.close()
+            raise
+        return self._iter_events(sock, reader, stop)
+
+    def follow(self, job_id: str, events: Optional[Iterator[Dict[str, Any]]] = None,
+               stop: Optional[threading.Event] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Events of one job until its job_finished / job_failed event.
+
+        ``events`` is a subscription opened before submit() (a new one is
+        opened if omitted). If the stream ends early the client resubscribes
+        and re-reads the job; a job that ended meanwhile is replayed as its
+        result cards plus the terminal event, so that event is never lost.
+        Raises EngineUnavailable once the engine cannot be reached at all.
+        """
+        if events is None:
+            events = self.events(job_id, stop)
+        while True:
+            try:
+                for ev in events:
+                    if ev.get("job_id") != job_id:
+                        continue
+                    yield ev
+                    if ev.get("kind") in ("job_finished", "job_failed"):
+                        return
+                return  # stop was set
+            except EngineUnavailable:
+                pass
+            finally:
+                events.close()
+            # Subscribe before reading the status so nothing falls in between
+            events = self.events(job_id, stop)
+            info = self.status(job_id).get("job") or {}
+            state = info.get("state")
+            if state not in ("done", "failed"):
+                continue
+            events.close()
+            cards = (info.get("result") or {}).get("cards", [])
+            for card in cards:
+                yield {"kind": "card", "job_id": job_id, "card": card}
+            if state == "failed":
+                yield {"kind": "job_failed", "job_id": job_id,
+                       "error": info.get("error") or "Engine job failed"}
+            else:
+                videos = sum(1 for c in cards if c.get("status") == "DOWNLOADED")
+                yield {"kind": "job_finished", "job_id": job_id, "videos": videos}
+            return
+
+    @staticmethod
+    def _iter_events(sock, reader, stop) -> Iterator[Dict[str, Any]]:
+        try:
+            for line in reader:
+                if stop is not None and stop.is_set():
+                    break
+                ev = json.loads(line.decode("utf-8"))
+                if ev.get("kind") != "heartbeat":
+                    yield ev
+            else:
+                if stop is None or not stop.is_set():
+                    raise EngineUnavailable("Engine closed the event stream")
+        except socket.timeout:
+            raise EngineUnavailable("Engine stopped sending events")
+        finally:
+            sock.close()
+
+
+def serve_args(address: Address, token_path: str) -> List[str]:
+    """``serve`` command-line options that make the engine listen on ``address``"""
+    if isinstance(address, str):
+        args = ["--socket", address]
+    else:
+        host, port = address
+        args = ["--host", host, "--port", str(port)]
+    return args + ["--token-file", token_path]
+
+
+def ensure_engine(address: Optional[Address] = None, wait: float = 10.0,
+                  token_path: Optional[str] = None) -> EngineClient:
+    """
+    Return a client for a running engine, starting one in the background if needed.
+    The engine outlives the GUI that started it and listens on the client's address.
+    """
+    client = EngineClient(address, token_path=token_path)
+    if client.ping():
+        return client
+
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    kwargs: Dict[str, Any] = {"cwd": root, "stdin": subprocess.DEVNULL,
+                              "stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    subprocess.Popen([sys.executable, "-m", "services.engine", "serve"]
+                     + serve_args(client.address, client.token_path), **kwargs)
+
+    deadline = time.time() + wait
+    while time.time() < deadline:
+        if client.ping():
+            return client
+        time.sleep(0.2)
+    raise EngineUnavailable(f"Engine did not start within {wait:.0f}s")
@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+"""
+Local Job Queue - spool-directory queue and daemon for the batch engine
+
+A job is a small JSON ticket pointing at a prompt file (parse_prompt_file
+format) or carrying the scenes inline, plus generation options. Tickets move
+between sub-directories of the spool with atomic renames, so the CLI, the GUI
+and the daemon can share one queue without a server:
+
+    <spool>/incoming/<job_id>.json   waiting
+    <spool>/running/<job_id>.json    claimed by a daemon
+    <spool>/done/<job_id>.json       finished (ticket + result cards)
+    <spool>/failed/<job_id>.json     crashed (ticket + error)
+
+Waiting tickets are claimed by priority class (interactive > batch >
+background), then earliest deadline, then submission order. A claimed ticket
+records its owner (host, pid) and the owner touches it every HEARTBEAT_SEC;
+only tickets whose heartbeat is older than STALE_SEC are requeued, so a second
+daemon or a ``--once`` run never steals jobs a live daemon is still running.
+"""
+
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from services.engine.prompt_files import parse_prompt_file
+from services.project_scheduler import PRIORITY_BATCH, PRIORITY_INTERACTIVE, priority_of
+
+DEFAULT_SPOOL_DIR = os.path.join(os.path.expanduser("~"), ".veo_image2video_queue")
+STATES = ("incoming", "running", "done", "failed")
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp", ".bmp")
+INTERACTIVE_EXTRA_JOBS = 2  # Interactive jobs may run this many over max_jobs
+HEARTBEAT_SEC = 15.0  # How often a daemon touches the tickets it is running
+STALE_SEC = 90.0  # A running/ ticket untouched this long belongs to a dead daemon
+
+
+def _atomic_write_json(path: str, data: Dict[str, Any]):
+    d = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(prefix=".tmp_job_", dir=d)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def list_images(image_dir: Optional[str]) -> List[str]:
+    """Sorted start images in ``image_dir`` (empty list if not set)"""
+    if not image_dir or not os.path.isdir(image_dir):
+        return []
+    return sorted(
+        os.path.join(image_dir, f) for f in os.listdir(image_dir)
+        if f.lower().endswith(IMAGE_EXTS)
+    )
+
+
+class JobQueue:
+    """File-backed FIFO of generation jobs"""
+
+    def __init__(self, spool_dir: str = DEFAULT_SPOOL_DIR):
+        self.spool_dir = spool_dir
+        for state in STATES:
+            os.makedirs(os.path.join(spool_dir, state), exist_ok=True)
+
+    def _path(self, state: str, job_id: str) -> str:
+        return os.path.join(self.spool_dir, state, f"{job_id}.json")
+
+    def submit(self, prompt_file: Optional[str], out_dir: str,
+               scenes: Optional[List[Any]] = None, **options) -> str:
+        """
+        Queue a prompt file (or an inline scene list).
+
+        Args:
+            prompt_file: Scene prompt JSON (parse_prompt_file format); None if ``scenes`` given
+            out_dir: Where videos are written
+            scenes: Inline prompts, used instead of ``prompt_file``
+            **options: title, model_key, aspect_ratio, aspect_ratios (per scene), copies,
+                image_dir, images, scene_numbers,
+                priority (class name or number), deadline (absolute time.time())
+
+        Returns:
+            Job id
+        """
+        priority_of(options.get("priority"))  # reject unknown classes before queueing
+        job_id = datetime.now().strftime("%Y%m%d_%H%M%S_") + uuid.uuid4().hex[:8]
+        ticket = {
+            "id": job_id,
+            "prompt_file": os.path.abspath(prompt_file) if prompt_file else None,
+            "out_dir": os.path.abspath(out_dir),
+            "options": options,
+            "submitted_at": datetime.now().isoformat(),
+        }
+        if scenes is not None:
+            ticket["scenes"] = list(scenes)
+        _atomic_write_json(self._path("incoming", job_id), ticket)
+        return job_id
+
+    def cancel(self, job_id: str) -> bool:
+        """Drop a job that has not been claimed yet; False if it is running or unknown"""
+        path = self._path("incoming", job_id)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                ticket = json.load(f)
+            os.remove(path)
+        except (OSError, ValueError):
+            return False
+        _atomic_write_json(self._path("failed", job_id),
+                           dict(ticket, error="Cancelled", finished_at=datetime.now().isoformat()))
+        return True
+
+    def _waiting_order(self, incoming: str) -> List[tuple]:
+        """(priority, ticket file name) of waiting tickets, most urgent first"""
+        ranked = []
+        for name in os.listdir(incoming):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(incoming, name), "r", encoding="utf-8") as f:
+                    opts = json.load(f).get("options") or {}
+                priority = priority_of(opts.get("priority"))
+                deadline = opts.get("deadline")
+            except (OSError, ValueError):
+                # Claimed meanwhile, or unreadable: let rename decide
+                priority, deadline = None, None
+            priority = PRIORITY_BATCH if priority is None else priority
+            ranked.append((-priority, float("inf") if deadline is None else float(deadline), name))
+        return [(-neg, name) for neg, _, name in sorted(ranked)]
+
+    def claim(self, min_priority: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Move the most urgent waiting ticket to running/ and return it.
+
+        Args:
+            min_priority: Only claim tickets at least this urgent
+
+        Returns:
+            The ticket, or None if nothing (eligible) is waiting
+        """
+        incoming = os.path.join(self.spool_dir, "incoming")
+        for priority, name in self._waiting_order(incoming):
+            if min_priority is not None and priority < min_priority:
+                break
+            job_id = name[:-5]
+            src = os.path.join(incoming, name)
+            try:
+                # Fresh mtime first, so the ticket never looks stale in running/
+                os.utime(src, None)
+                # rename is atomic: only one daemon wins a ticket
+                os.rename(src, self._path("running", job_id))
+            except OSError:
+                continue
+            with open(self._path("running", job_id), "r", encoding="utf-8") as f:
+                ticket = json.load(f)
+            ticket["owner"] = {"host": socket.gethostname(), "pid": os.getpid(),
+                               "claimed_at": datetime.now().isoformat()}
+            _atomic_write_json(self._path("running", job_id), ticket)
+            return ticket
+        return None
+
+    def heartbeat(self, job_ids: List[str]):
+        """Mark running tickets as still owned by a live daemon"""
+        for job_id in job_ids:
+            try:
+                os.utime(self._path("running", job_id), None)
+            except OSError:
+                pass
+
+    def finish(self, ticket: Dict[str, Any], result: Optional[Dict[str, Any]] = None,
+               error: Optional[str] = None):
+        """Record a finished (or failed) job and release its running/ ticket"""
+        state = "failed" if error else "done"
+        data = dict(ticket, finished_at=datetime.now().isoformat())
+        if error:
+            data["error"] = error
+        if result is not None:
+            data["result"] = result
+        _atomic_write_json(self._path(state, ticket["id"]), data)
+        try:
+            os.remove(self._path("running", ticket["id"]))
+        except OSError:
+            pass
+
+    def requeue_running(self, stale_after: float = STALE_SEC) -> int:
+        """
+        Return tickets left in running/ by a crashed daemon to incoming/.
+
+        Only tickets whose heartbeat is older than ``stale_after`` seconds are
+        moved; tickets of live daemons (on any host) are left alone.
+        """
+        running = os.path.join(self.spool_dir, "running")
+        now = time.time()
+        n = 0
+        for name in os.listdir(running):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(running, name)
+            try:
+                if now - os.path.getmtime(path) < stale_after:
+                    continue
+                os.rename(path, os.path.join(self.spool_dir, "incoming", name))
+                n += 1
+            except OSError:
+                pass
+        return n
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Ticket with a 'state' field, or None if unknown"""
+        for state in STATES:
+            path = self._path(state, job_id)
+            if os.path.exists(path):
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except (OSError, ValueError):
+                    data = {"id": job_id}
+                data["state"] = state
+                return data
+        return None
+
+    def counts(self) -> Dict[str, int]:
+        """Number of tickets per state"""
+        return {
+            state: sum(1 for f in os.listdir(os.path.join(self.spool_dir, state))
+                       if f.endswith(".json"))
+            for state in STATES
+        }
+
+
+def run_ticket(ticket: Dict[str, Any], engine_factory: Callable[..., Any],
+               on_event: Optional[Callable[[dict], None]] = None) -> Dict[str, Any]:
+    """Run one queued job through a fresh engine; returns a result summary"""
+    opts = ticket.get("options", {}) or {}
+    prompt_file = ticket.get("prompt_file")
+    scenes = ticket.get("scenes") or (parse_prompt_file(prompt_file) if prompt_file else [])
+    if not scenes:
+        raise ValueError(f"No scenes in prompt file: {prompt_file}")
+    images = opts.get("images") or list_images(opts.get("image_dir"))
+
+    engine = engine_factory(on_event=on_event)
+    kwargs = {k: opts[k] for k in ("model_key", "aspect_ratio", "aspect_ratios", "copies",
+                                   "scene_numbers", "priority", "deadline") if opts.get(k)}
+    if prompt_file:
+        default_title = os.path.splitext(os.path.basename(prompt_file))[0]
+    else:
+        default_title = ticket["id"]
+    cards = engine.run(
+        scenes, ticket["out_dir"],
+        title=opts.get("title") or default_title,
+        images=images or None, **kwargs,
+    )
+    videos = [c["path"] for c in cards if c.get("status") == "DOWNLOADED"]
+    return {"scenes": len(scenes), "videos": videos, "cards": cards}
+
+
+class QueueDaemon:
+    """
+    Pulls tickets from a JobQueue and runs up to ``max_jobs`` of them at once.
+
+    Each job gets its own BatchEngine, so jobs share accounts through the
+    global AccountManager but never block each other's polling. Interactive
+    jobs do not wait for a busy slot: up to INTERACTIVE_EXTRA_JOBS of them run
+    on top of ``max_jobs`` and their submits jump the shared lanes' queues.
+    """
+
+    def __init__(self, queue: JobQueue, engine_factory: Callable[..., Any],
+                 max_jobs: int = 2, idle_sleep: float = 2.0,
+                 on_event: Optional[Callable[[dict], None]] = None):
+        self.queue = queue
+        self.engine_factory = engine_factory
+        self.max_jobs = max(1, int(max_jobs))
+        self.idle_sleep = idle_sleep
+        self.on_event = on_event
+        self._stop = threading.Event()
+        self._slots = threading.Semaphore(self.max_jobs)
+        self._engines: Dict[str, Any] = {}  # job_id -> running engine
+        self._engines_lock = threading.Lock()
+        self._claimed: set = set()  # job ids whose running/ ticket this daemon owns
+
+    def stop(self):
+        self._stop.set()
+
+    def running_jobs(self) -> List[str]:
+        with self._engines_lock:
+            return list(self._engines)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job"""
+        if self.queue.cancel(job_id):
+            self._emit("job_failed", job_id=job_id, error="Cancelled")
+            return True
+        with self._engines_lock:
+            engine = self._engines.get(job_id)
+        if engine is None:
+            return False
+        engine.cancel()
+        return True
+
+    def _emit(self, kind: str, **kw):
+        if self.on_event:
+            try:
+                self.on_event({"kind": kind, **kw})
+            except Exception:
+                pass
+
+    def _run(self, ticket: Dict[str, Any], has_slot: bool = True):
+        job_id = ticket["id"]
+
+        def forward(ev):
+            fields = {k: v for k, v in ev.items() if k != "kind"}
+            self._emit(ev.get("kind", ""), job_id=job_id, **fields)
+
+        def factory(**kw):
+            engine = self.engine_factory(**kw)
+            with self._engines_lock:
+                self._engines[job_id] = engine
+            return engine
+
+        try:
+            self._emit("job_started", job_id=job_id, prompt_file=ticket.get("prompt_file"))
+            result = run_ticket(ticket, factory, on_event=forward)
+            self.queue.finish(ticket, result=result)
+            self._emit("job_finished", job_id=job_id, videos=len(result["videos"]))
+        except Exception as e:
+            self.queue.finish(ticket, error=str(e))
+            self._emit("job_failed", job_id=job_id, error=str(e))
+        finally:
+            with self._engines_lock:
+                self._engines.pop(job_id, None)
+                self._claimed.discard(job_id)
+            if has_slot:
+                self._slots.release()
+
+    def _requeue_stale(self):
+        recovered = self.queue.requeue_running()
+        if recovered:
+            self._emit("log", level="INFO", message=f"Requeued {recovered} interrupted job(s)")
+
+    def _heartbeat_loop(self, done: threading.Event):
+        while not done.wait(HEARTBEAT_SEC):
+            with self._engines_lock:
+                owned = list(self._claimed)
+            self.queue.heartbeat(owned)
+
+    def serve_forever(self, once: bool = False):
+        """
+        Process tickets until stop() (or until the queue is empty if ``once``).
+        """
+        self._requeue_stale()
+        next_requeue = time.time() + STALE_SEC
+
+        beating = threading.Event()
+        heart = threading.Thread(target=self._heartbeat_loop, args=(beating,),
+                                 name="JobHeartbeat", daemon=True)
+        heart.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_jobs + INTERACTIVE_EXTRA_JOBS) as pool:
+                while not self._stop.is_set():
+                    if time.time() >= next_requeue:
+                        self._requeue_stale()
+                        next_requeue = time.time() + STALE_SEC
+                    # All slots busy: still look for interactive tickets every idle_sleep
+                    has_slot = self._slots.acquire(timeout=self.idle_sleep)
+                    ticket = self.queue.claim(None if has_slot else PRIORITY_INTERACTIVE)
+                    if ticket is None:
+                        if has_slot:
+                            self._slots.release()
+                            if once:
+                                break
+                            self._stop.wait(self.idle_sleep)
+                        continue
+                    with self._engines_lock:
+                        self._claimed.add(ticket["id"])
+                    pool.submit(self._run, ticket, has_slot)
+        finally:
+            beating.set()
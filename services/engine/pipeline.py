@@ -0,0 +1,560 @@
+# -*- coding: utf-8 -*-
+"""
+Batch Engine - Qt-free submit -> poll -> download -> post-process pipeline
+
+Same flow as ui/workers/video_worker.py, without QThread/signals:
+- Scenes are spread round-robin over healthy accounts ("lanes")
+- Submits run concurrently (bounded per account); when lanes are shared
+  between jobs, queued submits go out by request class and deadline
+- While a Labs endpoint's circuit is open, submits park and resume when a
+  probe succeeds instead of burning their retries
+- One batch status check per account per poll round
+- Finished videos are downloaded and thumbnailed on a worker pool while
+  polling continues for the rest
+- Every scene's queue/upload/submit/park/render/download/thumbnail time is
+  recorded as telemetry spans (services.telemetry) and exported per run
+- Downloads are indexed in the generation library; with reuse on, a scene
+  whose inputs match an earlier render is served from it without a submit
+
+Progress is reported through ``on_event(dict)`` callbacks using the same
+event shape as the Labs clients: {"kind": "...", ...}. Event kinds added here:
+- log: level, message
+- card: card (scene/copy status dict, same fields as the GUI job cards)
+- progress: done, total, message
+- finished: videos, cards
+"""
+
+import os
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from services.account_manager import AccountManager, get_account_manager
+from services.engine.cluster import ClusterCoordinator, get_coordinator
+from services.generation_library import (
+    generation_key,
+    get_generation_library,
+    rendered_model,
+    scene_keys,
+    seed_of,
+)
+from services.google.labs_flow_client import DEFAULT_PROJECT_ID, LabsFlowClient
+from services.project_scheduler import PRIORITY_BATCH, SubmitGate, priority_of
+from services.resilience import CircuitOpenError
+from services.telemetry import get_telemetry, record_render
+from services.utils.video_downloader import VideoDownloader
+from utils import config as cfg
+from utils.filename_sanitizer import sanitize_filename
+
+DEFAULT_MODEL = "veo_3_1_t2v_fast_ultra"
+DEFAULT_ASPECT = "VIDEO_ASPECT_RATIO_LANDSCAPE"
+SUBMITS_PER_ACCOUNT = 2  # Concurrent start_one calls per account
+DOWNLOAD_WORKERS = 4
+POLL_INTERVAL = 5.0
+MAX_POLL_ROUNDS = 120
+MAX_DOWNLOAD_RETRIES = 5
+MAX_PARK_SEC = 1800.0  # How long a submit waits for a down Labs endpoint before failing
+
+# Terminal card states; anything else is still in flight
+DONE_STATES = {"DOWNLOADED", "FAILED", "FAILED_START", "DOWNLOAD_FAILED", "DONE_NO_URL",
+               "TIMEOUT", "CANCELLED"}
+
+
+def failure_reason(error_message: str) -> str:
+    """Short, user-facing reason for a failed operation (same buckets as the GUI)"""
+    msg = (error_message or "").lower()
+    if "quota" in msg or "limit" in msg:
+        return "Vượt quota API"
+    if "policy" in msg or "content" in msg or "safety" in msg:
+        return "Nội dung không phù hợp"
+    if "timeout" in msg:
+        return "Timeout"
+    if error_message:
+        return error_message[:80]
+    return "Video generation failed"
+
+
+def make_thumbnail(video_path: str, out_dir: str, scene: int, copy: int) -> str:
+    """First-frame JPEG via ffmpeg; returns '' if ffmpeg is unavailable or fails"""
+    if not shutil.which("ffmpeg"):
+        return ""
+    os.makedirs(out_dir, exist_ok=True)
+    thumb = os.path.join(out_dir, f"thumb_c{scene}_v{copy}.jpg")
+    cmd = ["ffmpeg", "-y", "-ss", "00:00:00", "-i", video_path,
+           "-frames:v", "1", "-q:v", "3", thumb]
+    subprocess.run(cmd, check=True, capture_output=True)
+    return thumb
+
+
+class _Lane:
+    """One account: its client, project and a gate capping concurrent submits"""
+
+    def __init__(self, name: str, project_id: str, tokens: List[str], on_event, per_account: int):
+        self.name = name
+        self.project_id = project_id
+        self.tokens = tokens
+        self.client = LabsFlowClient(tokens, on_event=on_event)
+        self.slots = SubmitGate(per_account)
+
+
+def build_lanes(account_mgr: AccountManager, config: Dict[str, Any],
+                on_event: Optional[Callable[[dict], None]] = None,
+                per_account: int = SUBMITS_PER_ACCOUNT, log=None) -> List[_Lane]:
+    """Healthy accounts in multi-account mode, otherwise the legacy token list"""
+    if account_mgr.is_multi_account_enabled():
+        account_mgr.preflight_check(log=log)
+        return [
+            _Lane(a.name, a.project_id.strip(), a.live_tokens(), on_event, per_account)
+            for a in account_mgr.get_healthy_accounts()
+            if a.project_id and a.project_id.strip()
+        ]
+
+    tokens = (config or {}).get("tokens") or []
+    if not tokens:
+        return []
+    project_id = cfg.default_project_id(config or {})
+    if len(project_id) < 10:
+        project_id = DEFAULT_PROJECT_ID
+    return [_Lane("default", project_id, tokens, on_event, per_account)]
+
+
+class BatchEngine:
+    """
+    Headless video generation pipeline.
+
+    Usage:
+        engine = BatchEngine(on_event=print)
+        cards = engine.run(scenes, out_dir="/data/out", title="demo")
+
+    Pass ``lanes`` (from build_lanes) to share clients and per-account submit
+    limits between engines running in the same process. With a cluster
+    coordinator each submit leases the least-busy account cluster-wide and
+    waits for its token's rate bucket instead of using fixed round-robin.
+    """
+
+    def __init__(self, account_mgr: Optional[AccountManager] = None,
+                 config: Optional[Dict[str, Any]] = None,
+                 on_event: Optional[Callable[[dict], None]] = None,
+                 submits_per_account: Optional[int] = None,
+                 download_workers: Optional[int] = None,
+                 poll_interval: Optional[float] = None,
+                 max_poll_rounds: Optional[int] = None,
+                 make_thumbs: bool = True,
+                 lanes: Optional[List[_Lane]] = None,
+                 coordinator: Optional[ClusterCoordinator] = None,
+                 reuse: Optional[bool] = None):
+        self.config = config if config is not None else cfg.load()
+        self.account_mgr = account_mgr or get_account_manager()
+        self.on_event = on_event
+        knobs = (self.config or {}).get("engine", {}) or {}
+        self.submits_per_account = int(submits_per_account
+                                       or knobs.get("submits_per_account", SUBMITS_PER_ACCOUNT))
+        self.download_workers = int(download_workers
+                                    or knobs.get("download_workers", DOWNLOAD_WORKERS))
+        self.poll_interval = float(poll_interval if poll_interval is not None
+                                   else knobs.get("poll_interval", POLL_INTERVAL))
+        self.max_poll_rounds = int(max_poll_rounds or knobs.get("max_poll_rounds", MAX_POLL_ROUNDS))
+        self.max_park_sec = float(knobs.get("max_park_sec", MAX_PARK_SEC))
+        self.make_thumbs = make_thumbs
+        self.reuse = reuse  # None: config library.reuse
+        self.shared_lanes = lanes
+        # Cluster mode: account leases and token buckets shared with other machines
+        self.coordinator = coordinator if coordinator is not None else get_coordinator(self.config)
+        self._cancel = threading.Event()
+        self._title, self._priority, self._deadline = "batch", PRIORITY_BATCH, None
+        self._downloader = VideoDownloader(log_callback=lambda m: self._log("INFO", m))
+
+    # ------------------------------------------------------------------ events
+
+    def _emit(self, kind: str, **kw):
+        if self.on_event:
+            try:
+                self.on_event({"kind": kind, **kw})
+            except Exception:
+                pass
+
+    def _log(self, level: str, message: str):
+        self._emit("log", level=level, message=message)
+
+    def _card(self, card: Dict):
+        self._emit("card", card=dict(card))
+
+    def cancel(self):
+        """Stop submitting and polling; in-flight downloads finish"""
+        self._cancel.set()
+        self._log("INFO", "Video generation cancelled")
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    # ------------------------------------------------------------------ lanes
+
+    def _lanes(self) -> List[_Lane]:
+        if self.shared_lanes is not None:
+            return list(self.shared_lanes)
+        return build_lanes(self.account_mgr, self.config, self.on_event, self.submits_per_account,
+                           log=lambda m: self._log("INFO", m))
+
+    # ------------------------------------------------------------------ stages
+
+    def _submit(self, lane: _Lane, scene_num: int, prompt: str, image_path: Optional[str],
+                model_key: str, aspect_ratio: str, copies: int, out_dir: str) -> List[Dict]:
+        """Upload (I2V) + start_one for one scene; returns its cards"""
+        body = {
+            "prompt": prompt, "copies": copies, "model": model_key, "aspect_ratio": aspect_ratio,
+            "image_path": image_path, "bearer_token": lane.tokens[0],
+            "account_name": lane.name, "project_id": lane.project_id,
+        }
+
+        def _new_card(copy_idx, status, reason=""):
+            card = {"scene": scene_num, "copy": copy_idx, "status": status, "json": prompt,
+                    "url": "", "path": "", "thumb": "", "dir": out_dir, "account": lane.name}
+            if reason:
+                card["error_reason"] = reason
+            return card
+
+        reused = self._reuse(scene_num, prompt, image_path, model_key, aspect_ratio, copies,
+                             out_dir)
+        if reused is not None:
+            return reused
+        keys = self._keys(prompt, image_path, model_key, aspect_ratio, copies)
+
+        tel = get_telemetry()
+        with lane.slots.slot(self._title, lane.name, priority=self._priority,
+                             deadline=self._deadline, scene=scene_num):
+            if self.cancelled:
+                return [_new_card(c, "CANCELLED") for c in range(1, copies + 1)]
+            def start():
+                if image_path and not body.get("media_id"):
+                    with tel.span("upload", scene=scene_num, account=lane.name):
+                        body["media_id"] = lane.client.upload_image_file(image_path)
+                    if not body["media_id"]:
+                        raise RuntimeError("Upload returned no mediaId")
+                with tel.span("submit", scene=scene_num, account=lane.name, copies=copies):
+                    return lane.client.start_one(body, model_key, aspect_ratio, prompt,
+                                                 copies=copies, project_id=lane.project_id)
+
+            try:
+                rc = self._parked(start, scene_num)
+            except Exception as e:
+                self._log("ERR", f"Scene {scene_num}: start failed: {e}")
+                rc = 0
+                reason = str(e)[:80]
+            else:
+                reason = "Failed to start video generation"
+
+        if rc <= 0:
+            cards = [_new_card(c, "FAILED_START", reason) for c in range(1, copies + 1)]
+        else:
+            op_names = body.get("operation_names", [])
+            if len(op_names) < copies:
+                self._log("WARN", f"Scene {scene_num}: API returned {len(op_names)} operations "
+                                  f"but {copies} copies were requested")
+            cards = []
+            submitted_at = time.time()
+            for copy_idx, op_name in enumerate(op_names, start=1):
+                card = _new_card(copy_idx, "PROCESSING")
+                card["_submitted_at"] = card["_seen_pending_at"] = submitted_at
+                if copy_idx <= len(keys):
+                    used = rendered_model(body, op_name, model_key)
+                    key = keys[copy_idx - 1] if used == model_key else generation_key(
+                        prompt, used, aspect_ratio, seed_of(body, copies, copy_idx), image_path)
+                    card["_gen"] = {"key": key, "model_key": used, "aspect_ratio": aspect_ratio}
+                card["_op"] = op_name
+                card["_meta"] = body.get("operation_metadata", {}).get(op_name, {})
+                card["_bearer"] = body["bearer_token"]
+                card["_lane"] = lane
+                cards.append(card)
+        for card in cards:
+            self._card(_public(card))
+        return cards
+
+    def _keys(self, prompt: str, image_path: Optional[str], model_key: str,
+              aspect_ratio: str, copies: int) -> List[str]:
+        try:
+            if get_generation_library().enabled:
+                return scene_keys(prompt, model_key, aspect_ratio, copies, image_path)
+        except Exception as e:
+            self._log("WARN", f"Generation library unavailable: {e}")
+        return []
+
+    def _reuse(self, scene_num: int, prompt: str, image_path: Optional[str], model_key: str,
+               aspect_ratio: str, copies: int, out_dir: str) -> Optional[List[Dict]]:
+        """DOWNLOADED cards from identical earlier renders, or None to submit"""
+        lib = get_generation_library()
+        if not (lib.reuse_default if self.reuse is None else self.reuse):
+            return None
+        try:
+            hits = lib.reuse(self._keys(prompt, image_path, model_key, aspect_ratio, copies),
+                             lambda c: self._video_path(out_dir, scene_num, c), reuse=True)
+        except Exception as e:
+            self._log("WARN", f"Scene {scene_num}: library lookup failed: {e}")
+            return None
+        if not hits:
+            return None
+        self._log("INFO", f"Scene {scene_num}: reused {len(hits)} identical earlier render(s)")
+        cards = []
+        for hit in hits:
+            card = {"scene": scene_num, "copy": hit["copy"], "status": "DOWNLOADED", "json": prompt,
+                    "url": hit["url"], "path": hit["path"], "thumb": hit["thumb"], "dir": out_dir,
+                    "account": "library", "reused": True}
+            get_telemetry().count("videos_total", account="library", status="REUSED")
+            self._card(card)
+            cards.append(card)
+        return cards
+
+    def _video_path(self, out_dir: str, scene: int, copy_num: int) -> str:
+        name = f"{self._title}_scene{scene}_copy{copy_num}.mp4"
+        return os.path.join(out_dir, sanitize_filename(name))
+
+    def _parked(self, fn: Callable[[], Any], scene_num: int):
+        """Call fn; while the endpoint circuit is open, wait for its next probe, don't fail"""
+        parked_at = None
+        try:
+            while True:
+                try:
+                    return fn()
+                except CircuitOpenError as e:
+                    now = time.time()
+                    if parked_at is None:
+                        parked_at = now
+                        self._log("WARN", f"Scene {scene_num}: Labs endpoint down, "
+                                          "waiting for it to recover")
+                    if self.cancelled or now - parked_at >= self.max_park_sec:
+                        raise
+                    self._cancel.wait(max(1.0, e.retry_after))
+        finally:
+            if parked_at is not None:
+                get_telemetry().add_span("park", parked_at, time.time(), scene=scene_num)
+
+    def _submit_coordinated(self, lanes: List[_Lane], scene_num: int, *args) -> List[Dict]:
+        """_submit on whichever account the coordinator leases, within its token's rate"""
+        by_name = {lane.name: lane for lane in lanes}
+        got = self.coordinator.acquire_account(list(by_name), stop=self._cancel)
+        if got is None:
+            return self._submit(lanes[0], scene_num, *args)  # cancelled: yields CANCELLED cards
+        account, lease_id = got
+        lane = by_name[account]
+        # Renewed while held: the lane wait plus parking can outlast LEASE_TTL
+        with self.coordinator.holding(lease_id):
+            # Returns early on cancel; _submit then yields CANCELLED cards
+            self.coordinator.wait_for_token(lane.client.next_token(), stop=self._cancel)
+            return self._submit(lane, scene_num, *args)
+
+    def _download(self, card: Dict, title: str, out_dir: str) -> Dict:
+        """Download + thumbnail one finished video (runs on the download pool)"""
+        scene, copy_num = card["scene"], card["copy"]
+        fp = self._video_path(out_dir, scene, copy_num)
+        last_err = None
+        for attempt in range(1, MAX_DOWNLOAD_RETRIES + 1):
+            try:
+                self._downloader.download(card["url"], fp, bearer_token=card.get("_bearer"))
+                last_err = None
+                break
+            except Exception as e:
+                last_err = e
+                self._log("WARN", f"Scene {scene} Copy {copy_num}: download failed "
+                                  f"({attempt}/{MAX_DOWNLOAD_RETRIES}): {e}")
+                if attempt < MAX_DOWNLOAD_RETRIES:
+                    time.sleep(min(2 ** attempt, 30))
+        if last_err is not None:
+            card["status"] = "DOWNLOAD_FAILED"
+            card["error_reason"] = f"Download error: {str(last_err)[:50]}"
+        else:
+            card["status"] = "DOWNLOADED"
+            card["path"] = fp
+            if self.make_thumbs:
+                try:
+                    with get_telemetry().span("thumbnail", scene=scene, copy=copy_num):
+                        card["thumb"] = make_thumbnail(fp, os.path.join(out_dir, "thumbs"),
+                                                       scene, copy_num)
+                except Exception as e:
+                    self._log("WARN", f"Tạo thumbnail lỗi: {e}")
+            self._log("SUCCESS", f"✓ Downloaded: {os.path.basename(fp)}")
+            if card.get("_gen"):
+                try:
+                    get_generation_library().record(video_path=fp, thumb_path=card.get("thumb", ""),
+                                                    operation=card["_op"], url=card["url"],
+                                                    **card["_gen"])
+                except Exception as e:
+                    self._log("WARN", f"Generation library record failed: {e}")
+        get_telemetry().count("videos_total", account=card.get("account"), status=card["status"])
+        self._card(_public(card))
+        return card
+
+    def _rendered(self, card: Dict, now: float):
+        """Record the render span of a card whose terminal status was just seen"""
+        record_render(card["_submitted_at"], card["_seen_pending_at"], now, card["status"],
+                      account=card.get("account"), scene=card["scene"], copy=card["copy"])
+
+    def _export_telemetry(self, title: str):
+        tel = get_telemetry()
+        conf = (self.config or {}).get("telemetry") or {}
+        if not tel.enabled or not conf.get("export_on_run", True):
+            return
+        try:
+            paths = tel.export(name=title)
+            self._log("INFO", f"Telemetry: {paths['prometheus']}, {paths['trace']}")
+        except OSError as e:
+            self._log("WARN", f"Telemetry export failed: {e}")
+
+    def _check(self, lane: _Lane, cards: List[Dict]) -> Dict[str, Dict]:
+        names = [c["_op"] for c in cards]
+        metadata = {c["_op"]: c["_meta"] for c in cards if c.get("_meta")}
+        try:
+            return lane.client.batch_check_operations(names, metadata, project_id=lane.project_id)
+        except Exception as e:
+            self._log("WARN", f"Check error for {lane.name}: {e}")
+            return {}
+
+    # ------------------------------------------------------------------ run
+
+    def run(self, scenes: List[Any], out_dir: str, title: str = "batch",
+            model_key: str = DEFAULT_MODEL, aspect_ratio: str = DEFAULT_ASPECT,
+            copies: int = 1, images: Optional[List[Optional[str]]] = None,
+            scene_numbers: Optional[List[int]] = None,
+            priority: Any = PRIORITY_BATCH, deadline: Optional[float] = None,
+            aspect_ratios: Optional[List[Optional[str]]] = None) -> List[Dict]:
+        """
+        Generate videos for all scenes and block until every card is terminal.
+
+        Args:
+            scenes: Prompt strings or dicts (e.g. from parse_prompt_file)
+            out_dir: Directory for downloaded videos (thumbs/ is created inside)
+            title: Filename prefix
+            model_key: Video model key
+            aspect_ratio: VIDEO_ASPECT_RATIO_*
+            copies: Videos per scene
+            images: Optional start image per scene (I2V); None entries mean T2V
+            scene_numbers: Optional display number per scene (default 1..N)
+            priority: Request class ("interactive", "batch", "background") or number;
+                ahead of other jobs' queued submits on shared lanes
+            deadline: Absolute time.time() for earliest-deadline-first within a class
+            aspect_ratios: Optional aspect ratio per scene; None entries use aspect_ratio
+
+        Returns:
+            List of card dicts (scene, copy, status, path, url, error_reason, ...)
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        copies = max(1, int(copies))
+        images = list(images or [])
+        aspect_ratios = list(aspect_ratios or [])
+        total = len(scenes)
+        self._title, self._priority, self._deadline = title, priority_of(priority), deadline
+
+        lanes = self._lanes()
+        if not lanes:
+            self._log("ERROR", "No Google Labs tokens configured or all tokens are invalid")
+            cards = [{"scene": i, "copy": c, "status": "FAILED_START",
+                      "error_reason": "No valid tokens",
+                      "json": p if isinstance(p, str) else str(p),
+                      "url": "", "path": "", "thumb": "", "dir": out_dir}
+                     for i, p in enumerate(scenes, start=1) for c in range(1, copies + 1)]
+            self._emit("finished", videos=[], cards=cards)
+            return cards
+
+        self._log("INFO", f"Engine: {len(lanes)} account(s), {total} scene(s), {copies} copy/scene")
+
+        # 1) Submit everything concurrently, bounded per account
+        cards: List[Dict] = []
+        with ThreadPoolExecutor(max_workers=len(lanes) * self.submits_per_account) as pool:
+            futures = []
+            for idx, prompt in enumerate(scenes):
+                image = images[idx] if idx < len(images) else None
+                if scene_numbers and idx < len(scene_numbers):
+                    scene_num = scene_numbers[idx]
+                else:
+                    scene_num = idx + 1
+                aspect = (aspect_ratios[idx] if idx < len(aspect_ratios) else None) or aspect_ratio
+                args = (scene_num, prompt, image, model_key, aspect, copies, out_dir)
+                if self.coordinator is not None:
+                    futures.append(pool.submit(self._submit_coordinated, lanes, *args))
+                else:
+                    futures.append(pool.submit(self._submit, lanes[idx % len(lanes)], *args))
+            for fut in futures:
+                cards.extend(fut.result())
+
+        # 2) Poll per account; 3) hand finished videos to the download pool
+        downloads = []
+        pending = [c for c in cards if c["status"] == "PROCESSING"]
+        with ThreadPoolExecutor(max_workers=self.download_workers) as dl_pool:
+            rounds = 0
+            while pending and not self.cancelled and rounds < self.max_poll_rounds:
+                rounds += 1
+                by_lane: Dict[int, List[Dict]] = {}
+                for c in pending:
+                    by_lane.setdefault(id(c["_lane"]), []).append(c)
+
+                with ThreadPoolExecutor(max_workers=len(by_lane)) as check_pool:
+                    results = list(check_pool.map(
+                        lambda group: self._check(group[0]["_lane"], group), by_lane.values()))
+                rs: Dict[str, Dict] = {}
+                for r in results:
+                    rs.update(r)
+
+                still = []
+                now = time.time()
+                for card in pending:
+                    raw = (rs.get(card["_op"]) or {}).get("raw", {})
+                    status = raw.get("status", "")
+                    if status == "MEDIA_GENERATION_STATUS_SUCCESSFUL":
+                        metadata = raw.get("operation", {}).get("metadata", {})
+                        url = metadata.get("video", {}).get("fifeUrl", "")
+                        if url:
+                            card["status"] = "READY"
+                            card["url"] = url
+                            self._rendered(card, now)
+                            self._card(_public(card))
+                            downloads.append(dl_pool.submit(self._download, card, title, out_dir))
+                        else:
+                            card["status"] = "DONE_NO_URL"
+                            card["error_reason"] = "No video URL in response"
+                            self._rendered(card, now)
+                            self._card(_public(card))
+                    elif status == "MEDIA_GENERATION_STATUS_FAILED":
+                        message = raw.get("operation", {}).get("error", {}).get("message", "")
+                        card["status"] = "FAILED"
+                        card["error_reason"] = failure_reason(message)
+                        self._log("ERR", f"Scene {card['scene']} Copy {card['copy']} FAILED: "
+                                         f"{card['error_reason']}")
+                        self._rendered(card, now)
+                        self._card(_public(card))
+                    else:
+                        card["_seen_pending_at"] = now
+                        still.append(card)
+                pending = still
+
+                done = sum(1 for c in cards if c["status"] in DONE_STATES or c["status"] == "READY")
+                self._emit("progress", done=done, total=len(cards),
+                           message=f"Đang chờ {len(pending)} video "
+                                   f"(vòng {rounds}/{self.max_poll_rounds})")
+                if pending and not self.cancelled:
+                    self._cancel.wait(self.poll_interval)
+
+            for card in pending:
+                card["status"] = "CANCELLED" if self.cancelled else "TIMEOUT"
+                if self.cancelled:
+                    card["error_reason"] = "Cancelled"
+                else:
+                    card["error_reason"] = "Video generation timed out"
+                get_telemetry().count("videos_total", account=card.get("account"),
+                                      status=card["status"])
+                self._card(_public(card))
+            for fut in downloads:
+                fut.result()
+
+        out = [_public(c) for c in cards]
+        videos = [c["path"] for c in out if c["status"] == "DOWNLOADED"]
+        self._log("INFO", f"Video generation completed: {len(videos)} videos downloaded")
+        self._export_telemetry(title)
+        self._emit("finished", videos=videos, cards=out)
+        return out
+
+
+def _public(card: Dict) -> Dict:
+    """Card without engine-internal fields (operation handle, token, lane)"""
+    return {k: v for k, v in card.items() if not k.startswith("_")}
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Prompt file parsing (Qt-free)
+
+Reads the scene prompt JSON used by the Image2Video project panel: a list of
+scenes, {"scenes": [...]}, or a single {"prompt": ...}. Each scene becomes a
+prompt string (structured prompts are kept as JSON text).
+"""
+
+import json
+
+
+def parse_prompt_any(obj):
+    scenes=[]
+    def _to_text(p):
+        if isinstance(p, str):
+            return p
+        try:
+            return json.dumps(p, ensure_ascii=False)
+        except Exception:
+            return str(p)
+    if isinstance(obj, list):
+        for it in obj:
+            if isinstance(it, dict) and "prompt" in it:
+                scenes.append(_to_text(it["prompt"]))
+            else:
+                scenes.append(_to_text(it))
+    elif isinstance(obj, dict):
+        if "scenes" in obj and isinstance(obj["scenes"], list):
+            for it in obj["scenes"]:
+                if isinstance(it, dict) and "prompt" in it:
+                    scenes.append(_to_text(it["prompt"]))
+                else:
+                    scenes.append(_to_text(it))
+        elif "prompt" in obj:
+            scenes.append(_to_text(obj["prompt"]))
+        else:
+            scenes.append(_to_text(obj))
+    return scenes
+
+
+def parse_prompt_file(path):
+    try:
+        with open(path,"r",encoding="utf-8") as f:
+            obj=json.load(f)
+    except Exception:
+        return []
+    return parse_prompt_any(obj)
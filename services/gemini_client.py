@@ -2,7 +2,7 @@
 import requests, time, random
 from typing import List, Optional
 from services.core.key_manager import get_all_keys, refresh
-from services.core.api_config import GEMINI_TEXT_MODEL, gemini_text_endpoint
+from services.core.api_config import GEMINI_BASE, GEMINI_TEXT_MODEL, gemini_text_endpoint
 
 class MissingAPIKey(Exception): pass
 class GeminiClient:
@@ -17,7 +17,7 @@ class GeminiClient:
     def _endpoint(self, key): 
         if self.model == GEMINI_TEXT_MODEL:
             return gemini_text_endpoint(key)
-        return f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:generateContent?key={key}"
+        return f"{GEMINI_BASE}/models/{self.model}:generateContent?key={key}"
     def generate(self, system_text: str, user_text: str, timeout: int = 180)->str:
         last=None
         for i in range(5):
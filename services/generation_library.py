@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+Generation Library - content-addressed index of finished renders
+
+Every downloaded video is recorded under a hash of the inputs that produced
+it: the compiled API prompt (what start_one actually sends), seed, model key,
+aspect ratio and the start image's bytes. Re-running a project or retrying a
+scene with identical inputs can then reuse the earlier mp4/thumbnail instead
+of paying for a new Veo render.
+
+Reuse is opt-in (config library.reuse, or reuse=True per call); recording is
+on unless library.enabled is false. Files are referenced, not copied into
+the library; entries whose video was deleted or overwritten since (size or
+mtime changed) are dropped on lookup.
+
+    lib = get_generation_library()
+    keys = scene_keys(prompt, model_key, aspect_ratio, copies, image_path=img)
+    hits = lib.reuse(keys, lambda copy: out_path_for(copy))
+    ...
+    lib.record(keys[copy - 1], video_path, thumb_path, operation=op_name)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from services.google.labs_flow_client import _compile_api_prompt
+from services.utils.asset_staging import get_asset_stager, stage_file
+
+KEY_VERSION = "v1"  # Bump when the key inputs change
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS renders (
+    key TEXT PRIMARY KEY,
+    video_path TEXT NOT NULL,
+    video_stamp TEXT NOT NULL DEFAULT '',
+    thumb_path TEXT NOT NULL DEFAULT '',
+    model_key TEXT NOT NULL DEFAULT '',
+    aspect_ratio TEXT NOT NULL DEFAULT '',
+    seed INTEGER NOT NULL DEFAULT 0,
+    operation TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL DEFAULT '',
+    meta TEXT NOT NULL DEFAULT '{}',
+    created_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_image_hashes: Dict[Tuple[str, int, int], str] = {}
+_image_lock = threading.Lock()
+
+
+def image_digest(image_path: Optional[str]) -> str:
+    """sha256 of the start image's bytes ('' for T2V), cached by path + mtime + size"""
+    if not image_path:
+        return ""
+    try:
+        st = os.stat(image_path)
+    except OSError:
+        return ""
+    stamp = (image_path, st.st_mtime_ns, st.st_size)
+    with _image_lock:
+        cached = _image_hashes.get(stamp)
+    if cached is None:
+        h = hashlib.sha256()
+        with open(image_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        cached = h.hexdigest()
+        with _image_lock:
+            _image_hashes[stamp] = cached
+    return cached
+
+
+def _api_prompt(prompt: Any) -> str:
+    """Prompt text exactly as start_one compiles it"""
+    if isinstance(prompt, str):
+        try:
+            prompt = json.loads(prompt)
+        except ValueError:
+            pass
+    return _compile_api_prompt(prompt).text
+
+
+def seed_of(job: Dict, copies: int, copy_idx: int) -> int:
+    """Seed start_one sends for a copy (base seed + copy offset when batching)"""
+    seed = job.get("seed", 0)
+    base = int(seed) if str(seed).isdigit() else 0
+    return base + (copy_idx - 1) if copies > 1 else base
+
+
+def generation_key(prompt: Any, model_key: str, aspect_ratio: str, seed: int = 0,
+                   image_path: Optional[str] = None) -> str:
+    parts = [KEY_VERSION, _api_prompt(prompt), str(int(seed)), model_key or "", aspect_ratio or "",
+             image_digest(image_path)]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def rendered_model(job: Dict, op_name: str, requested: str = "") -> str:
+    """Model that produced an operation; start_one may have fallen back down the model ladder"""
+    meta = (job.get("operation_metadata") or {}).get(op_name) or {}
+    return meta.get("model") or requested or ""
+
+
+def scene_keys(prompt: Any, model_key: str, aspect_ratio: str, copies: int,
+               image_path: Optional[str] = None, job: Optional[Dict] = None) -> List[str]:
+    """One key per copy (copy 1 first) for a start_one call with these inputs"""
+    copies = max(1, int(copies))
+    return [generation_key(prompt, model_key, aspect_ratio, seed_of(job or {}, copies, c),
+                           image_path)
+            for c in range(1, copies + 1)]
+
+
+def _stamp(path: str) -> str:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return ""
+    return f"{st.st_mtime_ns}:{st.st_size}" if st.st_size else ""
+
+
+def place(src: str, dst: str) -> str:
+    """
+    Make ``src`` available at ``dst`` as an independent file (reflink when
+    possible, else copy). Never a hard link: a later fresh render of the same
+    scene is downloaded over ``dst`` and must not rewrite the library original.
+    """
+    stage_file(src, dst, "copy" if get_asset_stager().mode == "copy" else "reflink")
+    return dst
+
+
+class GenerationLibrary:
+    """SQLite index: generation key -> downloaded video, thumbnail and operation metadata"""
+
+    def __init__(self, db_path: str, enabled: bool = True, reuse_default: bool = False):
+        self.db_path = db_path
+        self.enabled = enabled
+        self.reuse_default = reuse_default
+        self._local = threading.local()
+        if enabled:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def record(self, key: str, video_path: str, thumb_path: str = "", model_key: str = "",
+               aspect_ratio: str = "", seed: int = 0, operation: str = "", url: str = "", **meta):
+        """Index a finished download (later records for the same key win)"""
+        if not self.enabled or not key or not video_path:
+            return
+        self._conn().execute(
+            "INSERT OR REPLACE INTO renders (key, video_path, video_stamp, thumb_path, model_key,"
+            " aspect_ratio, seed, operation, url, meta, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, os.path.abspath(video_path), _stamp(video_path), thumb_path or "",
+             model_key or "", aspect_ratio or "", int(seed), operation or "", url or "",
+             json.dumps(meta, ensure_ascii=False, default=str), time.time()))
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Entry for key if its video is still on disk, unchanged"""
+        if not self.enabled or not key:
+            return None
+        row = self._conn().execute("SELECT * FROM renders WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        stamp = _stamp(entry["video_path"])
+        if not stamp or stamp != entry["video_stamp"]:
+            self._conn().execute("DELETE FROM renders WHERE key = ?", (key,))
+            return None
+        if entry["thumb_path"] and not os.path.isfile(entry["thumb_path"]):
+            entry["thumb_path"] = ""
+        entry["meta"] = json.loads(entry["meta"] or "{}")
+        return entry
+
+    def reuse(self, keys: List[str], dest_of: Callable[[int], str],
+              reuse: Optional[bool] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Earlier renders for every copy of a scene, placed at dest_of(copy).
+
+        All-or-nothing: start_one seeds copies contiguously, so a scene is only
+        skipped when each of its copies has a match. Returns None on a miss or
+        when reuse is off; otherwise entries with "copy", "path", "thumb",
+        "url" and "operation".
+        """
+        if not (self.reuse_default if reuse is None else reuse) or not keys:
+            return None
+        entries = [self.lookup(k) for k in keys]
+        if not all(entries):
+            return None
+        out = []
+        for copy_idx, entry in enumerate(entries, start=1):
+            out.append({"copy": copy_idx, "path": place(entry["video_path"], dest_of(copy_idx)),
+                        "thumb": entry["thumb_path"], "url": entry["url"],
+                        "operation": entry["operation"]})
+        marks = ",".join("?" * len(keys))
+        self._conn().execute(f"UPDATE renders SET hits = hits + 1 WHERE key IN ({marks})",
+                             list(keys))
+        return out
+
+    def stats(self) -> Dict[str, int]:
+        if not self.enabled:
+            return {"renders": 0, "hits": 0}
+        row = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM renders").fetchone()
+        return {"renders": row[0], "hits": row[1]}
+
+
+def default_db_path() -> str:
+    """Per-user index, next to the video history (~/.veo_video_history.db)"""
+    return os.path.join(os.path.expanduser("~"), ".veo_generation_library.db")
+
+
+_library: Optional[GenerationLibrary] = None
+_library_lock = threading.Lock()
+
+
+def get_generation_library() -> GenerationLibrary:
+    """Process-wide library (config library.path / enabled / reuse)"""
+    global _library
+    with _library_lock:
+        if _library is None:
+            try:
+                from utils import config as cfg
+                conf = cfg.load().get("library") or {}
+            except Exception:
+                conf = {}
+            path = conf.get("path") or default_db_path()
+            try:
+                _library = GenerationLibrary(path, enabled=bool(conf.get("enabled", True)),
+                                             reuse_default=bool(conf.get("reuse", False)))
+            except (OSError, sqlite3.Error) as e:
+                print(f"[WARN] Generation library disabled ({path}): {e}")
+                _library = GenerationLibrary(path, enabled=False)
+        return _library
@@ -7,8 +7,14 @@ This module detects and rewrites prompts that may violate Google's policies abou
 creating content featuring minors (children/teenagers under 18).
 """
 
+import copy
+import hashlib
+import json
 import re
-from typing import Dict, List, Tuple, Any
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Tuple, Any
 
 # Keywords that indicate child/minor characters (Vietnamese + English)
 MINOR_KEYWORDS_VI = [
@@ -23,7 +29,7 @@ MINOR_KEYWORDS_VI = [
 
 MINOR_KEYWORDS_EN = [
     "little girl", "little boy", "child", "kid", "children",
-    "young girl", "young boy", "toddler", "infant", "baby",
+    "young girl", "young boy", "toddler", "infant", "baby", "babies",
     "minor", "underage", "teenager", "teen", "adolescent",
     "school child", "elementary", "middle school",
     "juvenile", "youth"
@@ -78,6 +84,7 @@ AGE_UP_REPLACEMENTS_EN = {
     "toddler": "young adult",
     "infant": "young adult",
     "baby": "young person",
+    "babies": "young people",
     "minor": "young adult",
     "underage": "young adult",
     "teenager": "young adult",
@@ -91,6 +98,95 @@ AGE_UP_REPLACEMENTS_EN = {
 }
 
 
+# ═══════════════════════════════════════════════════════════════
+# Compiled single-pass scanner
+# All keywords (longest first, so "cô bé" wins over "bé") and both age
+# patterns are folded into one regex; detection and age-up then share a
+# single pass over the text instead of one scan per keyword. Keywords may
+# carry an "s"/"es" plural suffix ("kids", "teens", "toddlers").
+# ═══════════════════════════════════════════════════════════════
+_KEYWORD_LANG = {**{kw: "vi" for kw in MINOR_KEYWORDS_VI}, **{kw: "en" for kw in MINOR_KEYWORDS_EN}}
+_AGE_UP_REPLACEMENTS = {**AGE_UP_REPLACEMENTS_VI, **AGE_UP_REPLACEMENTS_EN}
+_VI_AGE_UNITS = ("tuổi", "năm")
+
+_KEYWORD_ALTERNATION = "|".join(
+    re.escape(k) for k in sorted(_KEYWORD_LANG, key=len, reverse=True)
+)
+_SCAN_PATTERN = re.compile(
+    r'(?P<age>\b(?P<age_num>\d{1,2})'
+    r'(?P<age_unit>\s*(?:years?\s*old|year-old|yo|tuổi|năm))\b)'
+    r'|(?<!\w)(?P<kw>' + _KEYWORD_ALTERNATION + r')(?P<plural>e?s)?(?!\w)',
+    re.IGNORECASE
+)
+
+
+def _plural_replacement(replacement: str) -> str:
+    """Age-up text for a pluralized English keyword ("kids" -> "young people")"""
+    if replacement.endswith("person"):
+        return replacement[:-len("person")] + "people"
+    return replacement + "s"
+
+SCAN_CACHE_SIZE = 4096  # Distinct texts kept by scan_text
+PROMPT_CACHE_SIZE = 512  # Distinct prompts kept by sanitize_prompt_for_google_labs
+
+
+class PolicyMatch(NamedTuple):
+    """One minor reference found in a text"""
+    start: int
+    end: int
+    text: str  # Matched text as it appears in the prompt
+    lang: str  # "vi", "en", "vi_age" or "en_age"
+    replacement: str  # Age-up replacement for this span
+
+
+@lru_cache(maxsize=SCAN_CACHE_SIZE)
+def scan_text(text: str, min_age: int = 18) -> Tuple[PolicyMatch, ...]:
+    """
+    Find all minor references in one pass over ``text``.
+
+    Memoized per (text, min_age), so retries and multi-copy submits of the
+    same prompt never rescan it.
+
+    Returns:
+        Tuple of PolicyMatch spans in text order
+    """
+    found = []
+    for m in _SCAN_PATTERN.finditer(text):
+        if m.group("kw"):
+            keyword = m.group("kw").lower()
+            lang = _KEYWORD_LANG[keyword]
+            replacement = _AGE_UP_REPLACEMENTS[keyword]
+            if m.group("plural"):
+                if lang == "en":
+                    replacement = _plural_replacement(replacement)
+                else:
+                    replacement += m.group("plural")
+            found.append(PolicyMatch(m.start(), m.end(), m.group(0), lang, replacement))
+            continue
+        if int(m.group("age_num")) >= min_age:
+            continue
+        unit = m.group("age_unit")
+        if unit.strip().lower() in _VI_AGE_UNITS:
+            found.append(PolicyMatch(m.start(), m.end(), m.group(0), "vi_age", f"20 {unit.strip()}"))
+        else:
+            found.append(PolicyMatch(m.start(), m.end(), m.group(0), "en_age", f"20{unit}"))
+    return tuple(found)
+
+
+def apply_replacements(text: str, matches: Tuple[PolicyMatch, ...]) -> str:
+    """Rebuild ``text`` with every matched span replaced by its age-up text"""
+    if not matches:
+        return text
+    parts = []
+    pos = 0
+    for m in matches:
+        parts.append(text[pos:m.start])
+        parts.append(m.replacement)
+        pos = m.end
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
 class ContentPolicyViolation(Exception):
     """Raised when content cannot be sanitized to comply with policies"""
     pass
@@ -118,6 +214,15 @@ class ContentPolicyFilter:
         self.strict_mode = strict_mode
         self.violations_found = []
     
+    def scan(self, text: str) -> Tuple[PolicyMatch, ...]:
+        """
+        Find minor references with their spans (single compiled pass, memoized).
+        
+        Returns:
+            Tuple of PolicyMatch(start, end, text, lang, replacement)
+        """
+        return scan_text(text, self.min_age)
+    
     def detect_minor_references(self, text: str) -> List[Tuple[str, str]]:
         """
         Detect references to minors in text.
@@ -126,29 +231,11 @@ class ContentPolicyFilter:
             List of (keyword, language) tuples found in text
         """
         found = []
-        text_lower = text.lower()
-        
-        # Check Vietnamese keywords
-        for keyword in MINOR_KEYWORDS_VI:
-            if keyword in text_lower:
-                found.append((keyword, "vi"))
-        
-        # Check English keywords
-        for keyword in MINOR_KEYWORDS_EN:
-            if keyword in text_lower:
-                found.append((keyword, "en"))
-        
-        # Check age patterns
-        for match in AGE_PATTERN_VI.finditer(text):
-            age = int(match.group(1))
-            if age < self.min_age:
-                found.append((match.group(0), "vi_age"))
-        
-        for match in AGE_PATTERN_EN.finditer(text):
-            age = int(match.group(1))
-            if age < self.min_age:
-                found.append((match.group(0), "en_age"))
-        
+        for m in self.scan(text):
+            if m.lang in ("vi", "en"):
+                found.append((m.text.lower(), m.lang))
+            else:
+                found.append((m.text, m.lang))
         return found
     
     def age_up_text(self, text: str) -> str:
@@ -161,40 +248,7 @@ class ContentPolicyFilter:
         Returns:
             Text with minor references replaced with adult equivalents
         """
-        result = text
-        
-        # Replace Vietnamese keywords (case-insensitive, preserve case)
-        for keyword, replacement in AGE_UP_REPLACEMENTS_VI.items():
-            # Case-insensitive replacement preserving original case
-            pattern = re.compile(re.escape(keyword), re.IGNORECASE)
-            result = pattern.sub(replacement, result)
-        
-        # Replace English keywords (case-insensitive, preserve case)
-        for keyword, replacement in AGE_UP_REPLACEMENTS_EN.items():
-            pattern = re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE)
-            result = pattern.sub(replacement, result)
-        
-        # Age up specific ages (e.g., "12 tuổi" -> "20 tuổi")
-        def age_replacer_vi(match):
-            age = int(match.group(1))
-            if age < self.min_age:
-                # Age up to 20 (safe minimum adult age)
-                return f"20 {match.group(0).split()[-1]}"
-            return match.group(0)
-        
-        result = AGE_PATTERN_VI.sub(age_replacer_vi, result)
-        
-        def age_replacer_en(match):
-            age = int(match.group(1))
-            if age < self.min_age:
-                # Age up to 20 (safe minimum adult age)
-                suffix = match.group(0).split(str(age))[-1]
-                return f"20{suffix}"
-            return match.group(0)
-        
-        result = AGE_PATTERN_EN.sub(age_replacer_en, result)
-        
-        return result
+        return apply_replacements(text, self.scan(text))
     
     def sanitize_prompt_dict(self, prompt_data: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
         """
@@ -208,6 +262,12 @@ class ContentPolicyFilter:
         """
         warnings = []
         sanitized = prompt_data.copy()
+        if isinstance(sanitized.get("localization"), dict):
+            # Copy nested entries so aging up never mutates the caller's dict
+            sanitized["localization"] = {
+                lang: dict(lang_data) if isinstance(lang_data, dict) else lang_data
+                for lang, lang_data in sanitized["localization"].items()
+            }
         
         # Fields to check and sanitize
         fields_to_check = [
@@ -348,14 +408,51 @@ def sanitize_prompt_for_google_labs(prompt_data: Any, enable_age_up: bool = True
     Returns:
         Tuple of (sanitized_prompt, list_of_warnings)
     """
+    if not isinstance(prompt_data, (str, dict)):
+        return prompt_data, []
+    
+    # Memoize by prompt hash: retries, model-ladder fallbacks and multi-copy
+    # submits of the same scene reuse the first result
+    key = _prompt_key(prompt_data, enable_age_up)
+    with _prompt_cache_lock:
+        hit = _prompt_cache.get(key)
+        if hit is not None:
+            _prompt_cache.move_to_end(key)
+    if hit is not None:
+        return copy.deepcopy(hit[0]), list(hit[1])
+    
     filter = ContentPolicyFilter(enable_age_up=enable_age_up)
     
     if isinstance(prompt_data, str):
-        return filter.sanitize_prompt_text(prompt_data)
-    elif isinstance(prompt_data, dict):
-        return filter.sanitize_prompt_dict(prompt_data)
+        result = filter.sanitize_prompt_text(prompt_data)
     else:
-        return prompt_data, []
+        result = filter.sanitize_prompt_dict(prompt_data)
+    
+    with _prompt_cache_lock:
+        _prompt_cache[key] = (copy.deepcopy(result[0]), list(result[1]))
+        while len(_prompt_cache) > PROMPT_CACHE_SIZE:
+            _prompt_cache.popitem(last=False)
+    return result
+
+
+_prompt_cache: "OrderedDict[str, Tuple[Any, List[str]]]" = OrderedDict()
+_prompt_cache_lock = threading.Lock()
+
+
+def _prompt_key(prompt_data: Any, enable_age_up: bool) -> str:
+    """Stable hash of a prompt (canonical JSON for dicts)"""
+    if isinstance(prompt_data, str):
+        raw = "s:" + prompt_data
+    else:
+        raw = "d:" + json.dumps(prompt_data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(f"{int(enable_age_up)}|{raw}".encode("utf-8")).hexdigest()
+
+
+def clear_scan_cache():
+    """Drop memoized scan and prompt results"""
+    scan_text.cache_clear()
+    with _prompt_cache_lock:
+        _prompt_cache.clear()
 
 
 # Example usage and testing
@@ -8,6 +8,10 @@ from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import requests
 
+from services.resilience import CircuitOpenError, get_breaker, get_retry_budget, is_transient
+from services.telemetry import endpoint_label, get_telemetry
+from services.utils.job_records import OpResult, trim_raw
+
 # Import content policy filter for prompt sanitization
 try:
     from services.google.content_policy_filter import sanitize_prompt_for_google_labs
@@ -19,18 +23,10 @@ except ImportError:
         def sanitize_prompt_for_google_labs(prompt, enable_age_up=True):
             return prompt, []
 
-# Optional default_project_id from user config (non-breaking)
 try:
-    from utils import config as _cfg_mod  # type: ignore
-    _cfg = getattr(_cfg_mod, "load", lambda: {})() if hasattr(_cfg_mod, "load") else {}
-    _cfg_pid = None
-    if isinstance(_cfg, dict):
-        _cfg_pid = _cfg.get("default_project_id") or (_cfg.get("labs") or {}).get("default_project_id")
-    if _cfg_pid:
-        DEFAULT_PROJECT_ID = _cfg_pid  # override safely if present
-except Exception:
-    pass
-
+    from services.prompt_compiler import CompiledPrompt, compile_prompt
+except ImportError:  # pragma: no cover
+    from prompt_compiler import CompiledPrompt, compile_prompt
 
 # Support both package and flat layouts
 try:
@@ -38,6 +34,9 @@ try:
 except Exception:  # pragma: no cover
     from endpoints import BATCH_CHECK_URL, I2V_URL, T2V_URL, UPLOAD_IMAGE_URL
 
+# Callers prefer utils.config.default_project_id() (top-level or labs.*) and
+# fall back to this; nothing is read from disk at import time (the panels
+# import this module lazily).
 DEFAULT_PROJECT_ID = "87b19267-13d6-49cd-a7ed-db19a90c9339"
 
 # Prompt length limits for video generation API
@@ -520,6 +519,16 @@ def _build_complete_prompt_text(prompt_data: Any) -> str:
 
     return complete_prompt
 
+
+def _compile_api_prompt(prompt_data: Any) -> CompiledPrompt:
+    """Policy-sanitized, built and truncated API text for a scene (memoized)"""
+    return compile_prompt(
+        prompt_data, _build_complete_prompt_text,
+        max_length=MAX_PROMPT_LENGTH, truncate=_truncate_prompt_smart,
+        sanitize=sanitize_prompt_for_google_labs,
+    )
+
+
 class LabsFlowClient:
     """
     Google Labs Flow Client with multi-token rotation support
@@ -543,11 +552,27 @@ class LabsFlowClient:
         """Get next token using round-robin rotation for load balancing"""
         t=self.tokens[self._idx % len(self.tokens)]; self._idx+=1; return t
 
+    def next_token(self)->str:
+        """Token the next request will use (without advancing the rotation)"""
+        return self.tokens[self._idx % len(self.tokens)]
+
     def _emit(self, kind: str, **kw):
         if self.on_event:
             try: self.on_event({"kind":kind, **kw})
             except Exception: pass
 
+    def _before_retry(self, url: str, err: Exception):
+        """Raise instead of sleeping once the circuit is open or the retry budget is spent"""
+        get_telemetry().count("labs_retries_total", endpoint=endpoint_label(url))
+        breaker = get_breaker(url)
+        if is_transient(err) and breaker.record_failure():
+            wait = breaker.retry_after()
+            self._emit("circuit_open", endpoint=url, retry_after=wait)
+            raise CircuitOpenError(url, wait) from err
+        if not get_retry_budget("labs").try_spend():
+            self._emit("retry_budget_exhausted", endpoint=url)
+            raise err
+
     def _post(self, url: str, payload: dict, suppress_error_logging: bool = False) -> dict:
         last=None
         # Calculate available tokens and max attempts
@@ -566,6 +591,10 @@ class LabsFlowClient:
             self._emit("http_other_err", code=401, detail=error_msg)
             raise requests.HTTPError(error_msg)
 
+        # Shared across clients: fail fast while the endpoint is down
+        get_breaker(url).check()
+        get_retry_budget("labs").deposit()
+
         max_attempts = min(3 * len(tokens_to_try), self.MAX_RETRY_ATTEMPTS)
         attempts_made = 0
         skip_count = 0  # Prevent infinite loop when all tokens are invalid
@@ -591,13 +620,21 @@ class LabsFlowClient:
                 if content_type.startswith("text/plain"):
                     # Content-Type is text/plain → stringify payload
                     # This matches Google Labs Flow API requirements
-                    data_to_send = json.dumps(payload, ensure_ascii=False)
-                    r = requests.post(url, headers=headers, data=data_to_send, timeout=self.timeout)
+                    body = {"data": json.dumps(payload, ensure_ascii=False)}
                 else:
                     # Content-Type is application/json → use json= parameter
                     # (backward compatibility)
-                    r = requests.post(url, headers=headers, json=payload, timeout=self.timeout)
-
+                    body = {"json": payload}
+                t0 = time.monotonic()
+                try:
+                    r = requests.post(url, headers=headers, timeout=self.timeout, **body)
+                except Exception:
+                    get_telemetry().record_http(url, "error", time.monotonic() - t0)
+                    raise
+                get_telemetry().record_http(url, r.status_code, time.monotonic() - t0)
+
+                if r.status_code < 500:
+                    get_breaker(url).record_success()  # Endpoint answered; 4xx is about the request
                 if r.status_code==200:
                     self._emit("http_ok", code=200)
                     try: return r.json()
@@ -659,9 +696,13 @@ class LabsFlowClient:
                     # Don't sleep, try next token immediately
                     last=e
                     continue
-                last=e; time.sleep(self.RETRY_SLEEP_MULTIPLIER*(attempts_made))
+                last=e
+                self._before_retry(url, e)
+                time.sleep(self.RETRY_SLEEP_MULTIPLIER*(attempts_made))
             except Exception as e:
-                last=e; time.sleep(self.RETRY_SLEEP_MULTIPLIER*(attempts_made))
+                last=e
+                self._before_retry(url, e)
+                time.sleep(self.RETRY_SLEEP_MULTIPLIER*(attempts_made))
 
         if last is None:
             last = Exception("All tokens are invalid or max attempts reached")
@@ -743,46 +784,22 @@ class LabsFlowClient:
         # This prevents HTTP 400 errors caused by content policy violations
         # (especially regarding minors/children)
         # ═══════════════════════════════════════════════════════════════
-        sanitized_prompt_data, policy_warnings = sanitize_prompt_for_google_labs(
-            original_prompt_data, 
-            enable_age_up=True
-        )
-        
+        # Sanitize -> build -> truncate once per distinct scene JSON; ladder
+        # retries, re-submits and regenerations reuse the compiled text
+        compiled = _compile_api_prompt(original_prompt_data)
+
         # Emit warnings if any content was sanitized
-        if policy_warnings:
-            for warning in policy_warnings:
-                self._emit("content_policy_warning", warning=warning)
-        
-        # Convert sanitized data to optimized text format for API
-        # Use _build_complete_prompt_text to convert structured JSON to text
-        if isinstance(sanitized_prompt_data, dict):
-            # Convert dict to complete text prompt using the builder function
-            prompt = _build_complete_prompt_text(sanitized_prompt_data)
-        elif isinstance(sanitized_prompt_data, str):
-            # Already a string - check if it's JSON that needs conversion
-            try:
-                # Try to parse as JSON to validate
-                parsed = json.loads(sanitized_prompt_data)
-                # If successful, it's JSON - convert to text format
-                prompt = _build_complete_prompt_text(parsed)
-            except:
-                # Not JSON - it's plain text, use as-is
-                # (This maintains backward compatibility for simple text prompts)
-                prompt = sanitized_prompt_data
-        else:
-            prompt = str(sanitized_prompt_data)
-        
+        for warning in compiled.warnings:
+            self._emit("content_policy_warning", warning=warning)
+
         # ═══════════════════════════════════════════════════════════════
         # PROMPT LENGTH VALIDATION: Ensure prompt fits within API limits
         # This prevents HTTP 400 "Request contains an invalid argument" errors
         # ═══════════════════════════════════════════════════════════════
-        original_length = len(prompt)
-        prompt = _truncate_prompt_smart(prompt, max_length=MAX_PROMPT_LENGTH)
-        
-        # Emit warning if prompt was truncated
-        if len(prompt) < original_length:
+        prompt = compiled.text
+        if compiled.truncated:
             self._emit("prompt_truncated", 
-                      original_length=original_length, 
+                      original_length=compiled.original_length,
                       truncated_length=len(prompt),
                       max_allowed=MAX_PROMPT_LENGTH)
         
@@ -889,6 +906,9 @@ class LabsFlowClient:
             if _is_auth_error(last_err):
                 # Just raise the auth error - user needs to fix their tokens
                 raise last_err
+            # Endpoint down: per-copy calls would only fail the same way
+            if isinstance(last_err, CircuitOpenError):
+                raise last_err
             
             for k in range(copies):
                 for idx, mkey in enumerate(models):
@@ -906,11 +926,14 @@ class LabsFlowClient:
                                 # Always store metadata with at least the default status for Google API compatibility
                                 scene_id = ops[0].get("sceneId", "")
                                 status = ops[0].get("status", "MEDIA_GENERATION_STATUS_PENDING")
-                                job["operation_metadata"][nm] = {"sceneId": scene_id, "status": status}
+                                job["operation_metadata"][nm] = {
+                                    "sceneId": scene_id, "status": status,
+                                    # Model the ladder landed on; the library keys renders on it
+                                    "model": mkey}
                                 break
                     except Exception as e:
-                        # If it's an auth error, stop trying and raise immediately
-                        if _is_auth_error(e):
+                        # Auth error or endpoint down: stop trying and raise immediately
+                        if _is_auth_error(e) or isinstance(e, CircuitOpenError):
                             raise
                         # Otherwise, continue trying other models/copies
                         continue
@@ -927,7 +950,9 @@ class LabsFlowClient:
                 # Always store metadata with at least the default status for Google API compatibility
                 scene_id = op.get("sceneId", "")
                 status = op.get("status", "MEDIA_GENERATION_STATUS_PENDING")
-                job["operation_metadata"][nm] = {"sceneId": scene_id, "status": status}
+                # The ladders above break on success, so mkey is the model that took the batch
+                job["operation_metadata"][nm] = {
+                    "sceneId": scene_id, "status": status, "model": mkey}
         if job.get("operation_names"): job["status"]="PENDING"
         return len(job.get("operation_names",[]))
 
@@ -971,7 +996,9 @@ class LabsFlowClient:
         
         return payload
 
-    def batch_check_operations(self, op_names: List[str], metadata: Optional[Dict[str, Dict]] = None, project_id: Optional[str] = None)->Dict[str,Dict]:
+    def batch_check_operations(self, op_names: List[str],
+                               metadata: Optional[Dict[str, Dict]] = None,
+                               project_id: Optional[str] = None) -> Dict[str, OpResult]:
         """
         Check status of video generation operations.
         
@@ -999,8 +1026,10 @@ class LabsFlowClient:
             st=_normalize_status(item)
             urls=_collect_urls_any(item.get("response",{})) or _collect_urls_any(item)
             vurls=[u for u in urls if "/video/" in u]; iurls=[u for u in urls if "/image/" in u]
-            out[key or "unknown"]={"status": ("COMPLETED" if st=="DONE" and vurls else ("DONE_NO_URL" if st=="DONE" else st)),
-                                   "video_urls": _dedup(vurls), "image_urls": _dedup(iurls), "raw": item}
+            # Slot record with raw trimmed to status / fifeUrl / error (not the whole API item)
+            status = ("COMPLETED" if st == "DONE" and vurls
+                      else ("DONE_NO_URL" if st == "DONE" else st))
+            out[key or "unknown"] = OpResult(status, _dedup(vurls), _dedup(iurls), trim_raw(item))
         return out
 
     def generate_videos_batch(self, prompt: str, num_videos: int = 1, model_key: str = "veo_3_1_t2v_fast_ultra",
@@ -1023,25 +1052,12 @@ class LabsFlowClient:
         if num_videos > 4:
             num_videos = 4
 
-        # Prepare prompt in correct format - convert structured JSON to text
-        if isinstance(prompt, dict):
-            # Convert dict to complete text prompt using the builder function
-            prompt_text = _build_complete_prompt_text(prompt)
-        elif isinstance(prompt, str):
-            # Check if it's JSON that needs conversion
-            try:
-                parsed = json.loads(prompt)
-                # If successful, it's JSON - convert to text format
-                prompt_text = _build_complete_prompt_text(parsed)
-            except:
-                # Not JSON - it's plain text, use as-is
-                prompt_text = prompt
-        else:
-            prompt_text = str(prompt)
-        
-        # Validate and truncate prompt to fit within API limits
-        # This prevents HTTP 400 "Request contains an invalid argument" errors
-        prompt_text = _truncate_prompt_smart(prompt_text, max_length=MAX_PROMPT_LENGTH)
+        # Convert structured JSON to text and truncate to API limits
+        # (cached; same text as start_one builds for this scene minus policy filter)
+        prompt_text = compile_prompt(
+            prompt, _build_complete_prompt_text,
+            max_length=MAX_PROMPT_LENGTH, truncate=_truncate_prompt_smart,
+        ).text
         
         # Build Google Labs API format request
         requests_list = []
@@ -3,12 +3,22 @@
 History Service - Track video creation history for Text2Video and VideoBanHang
 Author: chamnv-dev
 Date: 2025-01-09
+
+Entries live in SQLite (~/.veo_video_history.db) with an FTS5 index over
+idea, style, genre and folder, so search and paging stay fast however long
+the history gets. Queries no word-prefix match finds fall back to substring
+LIKE search. The legacy JSON file (~/.veo_video_history.json) is
+imported once, the first time the database is opened; the JSON file itself
+is left in place.
 """
 
 import json
 import os
+import re
+import sqlite3
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, List, Optional, Tuple
 
 
 class HistoryEntry:
@@ -31,6 +41,7 @@ class HistoryEntry:
         self.video_count = video_count
         self.folder_path = folder_path
         self.panel_type = panel_type
+        self.entry_id: Optional[int] = None  # Row id once stored
     
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization"""
@@ -58,15 +69,64 @@ class HistoryEntry:
         )
 
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    idea TEXT NOT NULL DEFAULT '',
+    style TEXT NOT NULL DEFAULT '',
+    genre TEXT,
+    video_count INTEGER NOT NULL DEFAULT 0,
+    folder_path TEXT NOT NULL DEFAULT '',
+    panel_type TEXT NOT NULL DEFAULT 'text2video'
+);
+CREATE INDEX IF NOT EXISTS idx_entries_panel ON entries (panel_type, id);
+CREATE INDEX IF NOT EXISTS idx_entries_timestamp ON entries (timestamp);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# External-content FTS5 table kept in sync by triggers; remove_diacritics lets
+# "ca phe" match "cà phê"
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    idea, style, genre, folder_path,
+    content='entries', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts (rowid, idea, style, genre, folder_path)
+    VALUES (new.id, new.idea, new.style, new.genre, new.folder_path);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, idea, style, genre, folder_path)
+    VALUES ('delete', old.id, old.idea, old.style, old.genre, old.folder_path);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, idea, style, genre, folder_path)
+    VALUES ('delete', old.id, old.idea, old.style, old.genre, old.folder_path);
+    INSERT INTO entries_fts (rowid, idea, style, genre, folder_path)
+    VALUES (new.id, new.idea, new.style, new.genre, new.folder_path);
+END;
+"""
+
+_COLUMNS = "id, timestamp, idea, style, genre, video_count, folder_path, panel_type"
+
+
+def _fts_query(text: str) -> str:
+    """User text -> FTS5 query: every word must match as a prefix"""
+    words = re.findall(r"\w+", text, flags=re.UNICODE)
+    return " ".join(f'"{w}"*' for w in words)
+
+
 class HistoryService:
     """Service for managing video creation history"""
-    
-    def __init__(self, history_file: Optional[str] = None):
+
+    def __init__(self, history_file: Optional[str] = None, db_path: Optional[str] = None):
         """
         Initialize history service
-        
+
         Args:
-            history_file: Path to history file. If None, uses default location.
+            history_file: Legacy JSON history to import. If None, uses default location.
+            db_path: SQLite database. If None, history_file with a .db extension.
         """
         if history_file is None:
             history_file = os.path.join(
@@ -74,33 +134,71 @@ class HistoryService:
                 ".veo_video_history.json"
             )
         self.history_file = history_file
-        self._ensure_history_file()
-    
-    def _ensure_history_file(self):
-        """Ensure history file exists"""
-        if not os.path.exists(self.history_file):
-            self._save_history([])
-    
-    def _load_history(self) -> List[HistoryEntry]:
-        """Load history from file"""
+        self.db_path = db_path or os.path.splitext(history_file)[0] + ".db"
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        try:
+            conn.executescript(_FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError as e:  # SQLite built without FTS5
+            print(f"⚠️ History search falls back to LIKE: {e}")
+            self.fts = False
+        self._migrate_json()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            folder = os.path.dirname(os.path.abspath(self.db_path))
+            os.makedirs(folder, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def _migrate_json(self):
+        """Import the legacy JSON history once"""
+        conn = self._conn()
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+            return
+        entries = []
         try:
             if os.path.exists(self.history_file):
                 with open(self.history_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    return [HistoryEntry.from_dict(item) for item in data]
+                    entries = [HistoryEntry.from_dict(item) for item in json.load(f)]
         except Exception as e:
             print(f"⚠️ Error loading history: {e}")
-        return []
-    
-    def _save_history(self, entries: List[HistoryEntry]):
-        """Save history to file"""
+        conn.execute("BEGIN IMMEDIATE")
         try:
-            data = [entry.to_dict() for entry in entries]
-            with open(self.history_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"⚠️ Error saving history: {e}")
-    
+            # Another instance may have imported it while we read the file
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+                conn.execute("COMMIT")
+                return
+            # JSON is newest-first; insert oldest first so ids follow time
+            conn.executemany(
+                "INSERT INTO entries (timestamp, idea, style, genre, video_count, folder_path, panel_type)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [self._row(e) for e in reversed(entries)])
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)",
+                         (str(len(entries)),))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if entries:
+            print(f"✓ Migrated {len(entries)} history entries to {self.db_path}")
+
+    @staticmethod
+    def _row(entry: "HistoryEntry") -> Tuple[Any, ...]:
+        return (entry.timestamp, entry.idea or "", entry.style or "", entry.genre,
+                int(entry.video_count or 0), entry.folder_path or "", entry.panel_type or "text2video")
+
+    @staticmethod
+    def _entry(row) -> "HistoryEntry":
+        entry = HistoryEntry(timestamp=row[1], idea=row[2], style=row[3], genre=row[4],
+                             video_count=row[5], folder_path=row[6], panel_type=row[7])
+        entry.entry_id = row[0]
+        return entry
+
     def add_entry(
         self,
         idea: str,
@@ -112,7 +210,7 @@ class HistoryService:
     ) -> HistoryEntry:
         """
         Add a new history entry
-        
+
         Args:
             idea: Video idea/concept
             style: Video style
@@ -120,7 +218,7 @@ class HistoryService:
             video_count: Number of videos created
             folder_path: Path to folder containing videos
             panel_type: Type of panel ("text2video" or "videobanhang")
-        
+
         Returns:
             The created history entry
         """
@@ -134,83 +232,125 @@ class HistoryService:
             folder_path=folder_path,
             panel_type=panel_type
         )
-        
-        entries = self._load_history()
-        entries.insert(0, entry)  # Add to beginning for newest-first order
-        
-        # Keep only last 1000 entries to prevent file from growing too large
-        if len(entries) > 1000:
-            entries = entries[:1000]
-        
-        self._save_history(entries)
+        cur = self._conn().execute(
+            "INSERT INTO entries (timestamp, idea, style, genre, video_count, folder_path, panel_type)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)", self._row(entry))
+        entry.entry_id = cur.lastrowid
         return entry
-    
+
+    def _where(self, panel_type: Optional[str], query: str) -> Tuple[str, List[Any]]:
+        clauses, args = [], []
+        if panel_type:
+            clauses.append("panel_type = ?")
+            args.append(panel_type)
+        query = (query or "").strip()
+        if query:
+            match = _fts_query(query) if self.fts else ""
+            fts = "id IN (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?)"
+            # Word-prefix first; substring ("video" in "myvideo") only when that finds nothing
+            if match and self._exists(clauses + [fts], args + [match]):
+                clauses.append(fts)
+                args.append(match)
+            else:
+                like = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                clauses.append("(" + " OR ".join(f"{c} LIKE ? ESCAPE '\\'" for c in
+                                                  ("idea", "style", "genre", "folder_path")) + ")")
+                args.extend([like] * 4)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def _exists(self, clauses: List[str], args: List[Any]) -> bool:
+        sql = "SELECT 1 FROM entries WHERE " + " AND ".join(clauses) + " LIMIT 1"
+        return self._conn().execute(sql, args).fetchone() is not None
+
+    def search(
+        self,
+        query: str = "",
+        panel_type: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[HistoryEntry]:
+        """
+        Newest-first entries matching query (all words, prefix match, accents ignored;
+        plain substring match when no entry matches that way)
+
+        Args:
+            query: Search text ("" for everything)
+            panel_type: Filter by panel type (None for all)
+            limit: Page size (None for all)
+            offset: Entries to skip (page * limit)
+        """
+        where, args = self._where(panel_type, query)
+        sql = f"SELECT {_COLUMNS} FROM entries{where} ORDER BY id DESC"
+        if limit:
+            sql += " LIMIT ? OFFSET ?"
+            args += [int(limit), max(0, int(offset))]
+        return [self._entry(r) for r in self._conn().execute(sql, args)]
+
+    def count(self, panel_type: Optional[str] = None, query: str = "") -> int:
+        where, args = self._where(panel_type, query)
+        return self._conn().execute(f"SELECT COUNT(*) FROM entries{where}", args).fetchone()[0]
+
     def get_history(
         self,
         panel_type: Optional[str] = None,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        offset: int = 0
     ) -> List[HistoryEntry]:
         """
         Get history entries
-        
+
         Args:
             panel_type: Filter by panel type (None for all)
             limit: Maximum number of entries to return (None for all)
-        
+            offset: Entries to skip
+
         Returns:
-            List of history entries
+            List of history entries, newest first
         """
-        entries = self._load_history()
-        
-        if panel_type:
-            entries = [e for e in entries if e.panel_type == panel_type]
-        
-        if limit:
-            entries = entries[:limit]
-        
-        return entries
-    
+        return self.search("", panel_type=panel_type, limit=limit, offset=offset)
+
     def clear_history(self, panel_type: Optional[str] = None):
         """
         Clear history
-        
+
         Args:
             panel_type: Clear only for specific panel type (None for all)
         """
         if panel_type is None:
-            self._save_history([])
+            self._conn().execute("DELETE FROM entries")
         else:
-            entries = self._load_history()
-            entries = [e for e in entries if e.panel_type != panel_type]
-            self._save_history(entries)
-    
+            self._conn().execute("DELETE FROM entries WHERE panel_type = ?", (panel_type,))
+
     def delete_entry(self, timestamp: str) -> bool:
         """
         Delete a specific entry by timestamp
-        
+
         Args:
             timestamp: Timestamp of entry to delete
-        
+
         Returns:
             True if entry was deleted, False otherwise
         """
-        entries = self._load_history()
-        original_len = len(entries)
-        entries = [e for e in entries if e.timestamp != timestamp]
-        
-        if len(entries) < original_len:
-            self._save_history(entries)
-            return True
-        return False
+        cur = self._conn().execute("DELETE FROM entries WHERE timestamp = ?", (timestamp,))
+        return cur.rowcount > 0
+
+    def delete_entry_id(self, entry_id: int) -> bool:
+        """Delete one entry by its id (entries can share a timestamp)"""
+        cur = self._conn().execute("DELETE FROM entries WHERE id = ?", (int(entry_id),))
+        return cur.rowcount > 0
 
 
 # Singleton instance
 _history_service_instance = None
 
 
+_history_service_lock = threading.Lock()
+
+
 def get_history_service() -> HistoryService:
     """Get singleton history service instance"""
     global _history_service_instance
-    if _history_service_instance is None:
-        _history_service_instance = HistoryService()
-    return _history_service_instance
+    with _history_service_lock:
+        if _history_service_instance is None:
+            _history_service_instance = HistoryService()
+        return _history_service_instance
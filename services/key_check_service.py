@@ -1,9 +1,22 @@
 # -*- coding: utf-8 -*-
-import requests, datetime
-from typing import Tuple
+import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Optional, Tuple
+
+import requests
 
 # Constants
 MIN_JWT_TOKEN_LENGTH = 50  # Minimum expected length for JWT session tokens
+DEFAULT_TIMEOUT = (10, 20)  # (connect, read) for interactive single-key checks
+PREFLIGHT_TIMEOUT = (5, 8)  # Short timeout for the pre-batch health pass
+PREFLIGHT_CACHE_TTL = 300.0  # Seconds a pre-flight result stays valid
+PREFLIGHT_MAX_WORKERS = 16
+
+# (kind, key) -> (checked_at, ok, message)
+_cache: Dict[Tuple[str, str], Tuple[float, bool, str]] = {}
+_cache_lock = threading.Lock()
 
 def _ts(): return datetime.datetime.now().strftime("%Y/%m/%d %H:%M:%S")
 
@@ -17,28 +30,31 @@ def _fmt_err(prefix, r):
     except Exception:
         return f"{prefix} ({r.status_code}) — {r.text[:200]} @ {_ts()}"
 
-def check(kind: str, key: str) -> Tuple[bool, str]:
+def check(kind: str, key: str, timeout: Tuple[int, int] = DEFAULT_TIMEOUT) -> Tuple[bool, str]:
     kind=(kind or '').lower(); k=(key or '').strip()
     try:
         if kind in ('labs','google_labs','google labs'):
             url='https://aisandbox-pa.googleapis.com/v1/video:batchCheck'
             h={'authorization': f'Bearer {k}', 'content-type':'application/json'}
-            r=requests.post(url, json={}, headers=h, timeout=(10,20))
+            r=requests.post(url, json={}, headers=h, timeout=timeout)
             if r.status_code in (200,400): return True, f'OK @ {_ts()}'
             if r.status_code in (401,403): return False, _fmt_err('Unauthorized', r)
             return False, _fmt_err('HTTP', r)
         if kind in ('google','gemini','google_api'):
-            r=requests.get('https://generativelanguage.googleapis.com/v1/models', params={'key':k}, timeout=(10,20))
+            r=requests.get('https://generativelanguage.googleapis.com/v1/models', params={'key':k},
+                           timeout=timeout)
             if r.status_code==200: return True, f'OK @ {_ts()}'
             if r.status_code in (401,403): return False, _fmt_err('Unauthorized', r)
             return False, _fmt_err('HTTP', r)
         if kind in ('eleven','elevenlabs'):
-            r=requests.get('https://api.elevenlabs.io/v1/user', headers={'xi-api-key':k}, timeout=(10,20))
+            r=requests.get('https://api.elevenlabs.io/v1/user', headers={'xi-api-key':k},
+                           timeout=timeout)
             if r.status_code==200: return True, f'OK @ {_ts()}'
             if r.status_code in (401,403): return False, _fmt_err('Unauthorized', r)
             return False, _fmt_err('HTTP', r)
         if kind in ('openai',):
-            r=requests.get('https://api.openai.com/v1/models', headers={'authorization': f'Bearer {k}'}, timeout=(10,20))
+            r=requests.get('https://api.openai.com/v1/models',
+                           headers={'authorization': f'Bearer {k}'}, timeout=timeout)
             if r.status_code==200: return True, f'OK @ {_ts()}'
             if r.status_code in (401,403): return False, _fmt_err('Unauthorized', r)
             return False, _fmt_err('HTTP', r)
@@ -51,3 +67,85 @@ def check(kind: str, key: str) -> Tuple[bool, str]:
     except Exception as e:
         return False, f'ERR {e} @ {_ts()}'
     return False, 'Unknown kind'
+
+
+def _knob(name: str, default):
+    try:
+        from utils import config as cfg
+        c = cfg.load() if hasattr(cfg, 'load') else {}
+        return (c.get('resilience', {}) or {}).get(name, default)
+    except Exception:
+        return default
+
+def _is_transient(msg: str) -> bool:
+    """Network errors and 5xx/429 say nothing about the key itself."""
+    return msg.startswith('ERR ') or any(f'({c})' in msg for c in (429, 500, 502, 503, 504))
+
+def cached_result(kind: str, key: str, ttl: Optional[float] = None) -> Optional[Tuple[bool, str]]:
+    """Return a cached check result younger than ``ttl`` seconds, or None."""
+    ttl = float(_knob('preflight_ttl_sec', PREFLIGHT_CACHE_TTL)) if ttl is None else ttl
+    ck = ((kind or '').lower(), (key or '').strip())
+    with _cache_lock:
+        hit = _cache.get(ck)
+    if hit and time.time() - hit[0] < ttl:
+        return hit[1], hit[2]
+    return None
+
+def invalidate(kind: Optional[str] = None, key: Optional[str] = None):
+    """Drop cached results (all, or those matching kind/key)."""
+    with _cache_lock:
+        for ck in list(_cache):
+            if (kind is None or ck[0] == kind.lower()) and (key is None or ck[1] == key.strip()):
+                del _cache[ck]
+
+def check_many(items: Iterable[Tuple[str, str]], ttl: Optional[float] = None,
+               timeout: Optional[Tuple[int, int]] = None,
+               max_workers: int = PREFLIGHT_MAX_WORKERS) -> Dict[Tuple[str, str], Tuple[bool, str]]:
+    """
+    Validate many (kind, key) pairs concurrently.
+
+    All uncached keys are checked at once on a thread pool with a short timeout,
+    so the pass costs roughly one round-trip instead of one per key. Results are
+    cached for ``ttl`` seconds (config ``resilience.preflight_ttl_sec``).
+    Transient failures (timeouts, 429/5xx) are reported but not cached, and are
+    returned as OK so a flaky network never disables a working account.
+
+    Returns:
+        Dict mapping (kind, key) to (ok, message)
+    """
+    timeout = timeout or tuple(_knob('preflight_timeout', PREFLIGHT_TIMEOUT))
+    out: Dict[Tuple[str, str], Tuple[bool, str]] = {}
+    todo = []
+    for kind, key in items:
+        ck = ((kind or '').lower(), (key or '').strip())
+        if not ck[1] or ck in out or ck in todo:
+            continue
+        hit = cached_result(ck[0], ck[1], ttl)
+        if hit is not None:
+            out[ck] = hit
+        else:
+            todo.append(ck)
+    if not todo:
+        return out
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(todo))),
+                              thread_name_prefix='KeyCheck')
+    try:
+        futs = {pool.submit(check, kind, key, timeout): (kind, key) for kind, key in todo}
+        # Hard deadline in case a server trickles bytes past the read timeout
+        wait(futs, timeout=sum(timeout) + 2)
+        now = time.time()
+        for fut, ck in futs.items():
+            if fut.done():
+                ok, msg = fut.result()
+            else:
+                ok, msg = False, f'ERR timeout @ {_ts()}'
+            if not ok and _is_transient(msg):
+                out[ck] = (True, f'Unverified ({msg})')
+                continue
+            out[ck] = (ok, msg)
+            with _cache_lock:
+                _cache[ck] = (now, ok, msg)
+    finally:
+        pool.shutdown(wait=False)
+    return out
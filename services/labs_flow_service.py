@@ -9,18 +9,9 @@ from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import requests
 
-# Optional default_project_id from user config (non-breaking)
-try:
-    from utils import config as _cfg_mod  # type: ignore
-    _cfg = getattr(_cfg_mod, "load", lambda: {})() if hasattr(_cfg_mod, "load") else {}
-    _cfg_pid = None
-    if isinstance(_cfg, dict):
-        _cfg_pid = _cfg.get("default_project_id") or (_cfg.get("labs") or {}).get("default_project_id")
-    if _cfg_pid:
-        DEFAULT_PROJECT_ID = _cfg_pid  # override safely if present
-except Exception:
-    pass
-
+from services.resilience import CircuitOpenError, get_breaker, get_retry_budget, is_transient
+from services.telemetry import endpoint_label, get_telemetry
+from services.utils.job_records import OpResult, trim_raw
 
 # Support both package and flat layouts
 try:
@@ -28,6 +19,14 @@ try:
 except Exception:  # pragma: no cover
     from endpoints import BATCH_CHECK_URL, I2V_URL, T2V_URL, UPLOAD_IMAGE_URL
 
+try:
+    from services.prompt_compiler import CompiledPrompt, compile_prompt
+except ImportError:  # pragma: no cover
+    from prompt_compiler import CompiledPrompt, compile_prompt
+
+# Callers prefer utils.config.default_project_id() (top-level or labs.*) and
+# fall back to this; nothing is read from disk at import time (the panels
+# import this module lazily).
 DEFAULT_PROJECT_ID = "87b19267-13d6-49cd-a7ed-db19a90c9339"
 
 # Prompt length limits for video generation API
@@ -885,6 +884,16 @@ def _build_complete_prompt_text(prompt_data: Any) -> str:
 
     return complete_prompt
 
+
+def _compile_api_prompt(prompt_data: Any) -> CompiledPrompt:
+    """Built and truncated API text for a scene (memoized)"""
+    return compile_prompt(
+        prompt_data, _build_complete_prompt_text,
+        max_length=MAX_PROMPT_LENGTH, truncate=_truncate_prompt_smart,
+        parse_json=False,
+    )
+
+
 def _save_prompt_to_disk(prompt_data: Any, project_dir: Optional[str] = None, 
                         scene_num: Optional[int] = None, model_key: str = "",
                         aspect_ratio: str = "") -> Optional[str]:
@@ -927,7 +936,8 @@ def _save_prompt_to_disk(prompt_data: Any, project_dir: Optional[str] = None,
         filepath = os.path.join(prompts_dir, filename)
         
         # Build complete prompt text for saving
-        complete_prompt = _build_complete_prompt_text(prompt_data)
+        complete_prompt = compile_prompt(prompt_data, _build_complete_prompt_text,
+                                         parse_json=False).text
         
         # Prepare metadata
         metadata = {
@@ -975,6 +985,18 @@ class LabsClient:
             try: self.on_event({"kind":kind, **kw})
             except Exception: pass
 
+    def _before_retry(self, url: str, err: Exception):
+        """Raise instead of sleeping once the circuit is open or the retry budget is spent"""
+        get_telemetry().count("labs_retries_total", endpoint=endpoint_label(url))
+        breaker = get_breaker(url)
+        if is_transient(err) and breaker.record_failure():
+            wait = breaker.retry_after()
+            self._emit("circuit_open", endpoint=url, retry_after=wait)
+            raise CircuitOpenError(url, wait) from err
+        if not get_retry_budget("labs").try_spend():
+            self._emit("retry_budget_exhausted", endpoint=url)
+            raise err
+
     def _post(self, url: str, payload: dict) -> dict:
         last=None
         # Calculate available tokens and max attempts
@@ -993,6 +1015,10 @@ class LabsClient:
             self._emit("http_other_err", code=401, detail=error_msg)
             raise requests.HTTPError(error_msg)
 
+        # Shared across clients: fail fast while the endpoint is down
+        get_breaker(url).check()
+        get_retry_budget("labs").deposit()
+
         max_attempts = min(3 * len(tokens_to_try), self.MAX_RETRY_ATTEMPTS)
         attempts_made = 0
         skip_count = 0  # Prevent infinite loop when all tokens are invalid
@@ -1011,7 +1037,15 @@ class LabsClient:
                 attempts_made += 1
                 skip_count = 0  # Reset skip count when we make an actual attempt
 
-                r=requests.post(url, headers=_headers(current_token), json=payload, timeout=self.timeout)
+                t0=time.monotonic()
+                try:
+                    r=requests.post(url, headers=_headers(current_token), json=payload, timeout=self.timeout)
+                except Exception:
+                    get_telemetry().record_http(url, "error", time.monotonic()-t0)
+                    raise
+                get_telemetry().record_http(url, r.status_code, time.monotonic()-t0)
+                if r.status_code < 500:
+                    get_breaker(url).record_success()  # Endpoint answered; 4xx is about the request
                 if r.status_code==200:
                     self._emit("http_ok", code=200)
                     try: return r.json()
@@ -1068,9 +1102,13 @@ class LabsClient:
                     # Don't sleep, try next token immediately
                     last=e
                     continue
-                last=e; time.sleep(self.RETRY_SLEEP_MULTIPLIER*(attempts_made))
+                last=e
+                self._before_retry(url, e)
+                time.sleep(self.RETRY_SLEEP_MULTIPLIER*(attempts_made))
             except Exception as e:
-                last=e; time.sleep(self.RETRY_SLEEP_MULTIPLIER*(attempts_made))
+                last=e
+                self._before_retry(url, e)
+                time.sleep(self.RETRY_SLEEP_MULTIPLIER*(attempts_made))
 
         if last is None:
             last = Exception("All tokens are invalid or max attempts reached")
@@ -1148,12 +1186,10 @@ class LabsClient:
         # start with the user's chosen model, then ladder through same-family models for the aspect
         models=[model_key]+[m for m in fallbacks.get(aspect_ratio, []) if m!=model_key]
 
-        # compose prompt text (build complete prompt with all fields)
-        prompt=_build_complete_prompt_text(prompt_text)
-        
-        # Validate and truncate prompt to fit within API limits
-        # This prevents HTTP 400 "Request contains an invalid argument" errors
-        prompt = _truncate_prompt_smart(prompt, max_length=MAX_PROMPT_LENGTH)
+        # compose prompt text (build complete prompt with all fields), truncated
+        # to API limits to prevent HTTP 400 "Request contains an invalid argument";
+        # memoized so model-ladder retries and regenerations reuse it
+        prompt = _compile_api_prompt(prompt_text).text
         
         # Extract negative prompt from prompt data
         negative_prompt = _extract_negative_prompt(prompt_text) if isinstance(prompt_text, dict) else "text, words, letters, subtitles, captions, titles, credits, on-screen text, watermarks, logos, brands, camera shake, fisheye"
@@ -1259,6 +1295,9 @@ class LabsClient:
             if _is_auth_error(last_err):
                 # Just raise the auth error - user needs to fix their tokens
                 raise last_err
+            # Endpoint down: per-copy calls would only fail the same way
+            if isinstance(last_err, CircuitOpenError):
+                raise last_err
             
             for k in range(copies):
                 for mkey in models:
@@ -1274,11 +1313,14 @@ class LabsClient:
                                 # Always store metadata with at least the default status for Google API compatibility
                                 scene_id = ops[0].get("sceneId", "")
                                 status = ops[0].get("status", "MEDIA_GENERATION_STATUS_PENDING")
-                                job["operation_metadata"][nm] = {"sceneId": scene_id, "status": status}
+                                job["operation_metadata"][nm] = {
+                                    "sceneId": scene_id, "status": status,
+                                    # Model the ladder landed on; the library keys renders on it
+                                    "model": mkey}
                                 break
                     except Exception as e:
-                        # If it's an auth error, stop trying and raise immediately
-                        if _is_auth_error(e):
+                        # Auth error or endpoint down: stop trying and raise immediately
+                        if _is_auth_error(e) or isinstance(e, CircuitOpenError):
                             raise
                         # Otherwise, continue trying other models/copies
                         continue
@@ -1297,7 +1339,9 @@ class LabsClient:
                 # Always store metadata with at least the default status for Google API compatibility
                 scene_id = op.get("sceneId", "")
                 status = op.get("status", "MEDIA_GENERATION_STATUS_PENDING")
-                job["operation_metadata"][nm] = {"sceneId": scene_id, "status": status}
+                # The ladders above break on success, so mkey is the model that took the batch
+                job["operation_metadata"][nm] = {
+                    "sceneId": scene_id, "status": status, "model": mkey}
         if job.get("operation_names"): job["status"]="PENDING"
 
         final_count = len(job.get("operation_names",[]))
@@ -1344,7 +1388,9 @@ class LabsClient:
         
         return payload
 
-    def batch_check_operations(self, op_names: List[str], metadata: Optional[Dict[str, Dict]] = None, project_id: Optional[str] = None)->Dict[str,Dict]:
+    def batch_check_operations(self, op_names: List[str],
+                               metadata: Optional[Dict[str, Dict]] = None,
+                               project_id: Optional[str] = None) -> Dict[str, OpResult]:
         """
         Check status of video generation operations.
         
@@ -1393,8 +1439,10 @@ class LabsClient:
             st=_normalize_status(item)
             urls=_collect_urls_any(item.get("response",{})) or _collect_urls_any(item)
             vurls=[u for u in urls if "/video/" in u]; iurls=[u for u in urls if "/image/" in u]
-            out[key or "unknown"]={"status": ("COMPLETED" if st=="DONE" and vurls else ("DONE_NO_URL" if st=="DONE" else st)),
-                                   "video_urls": _dedup(vurls), "image_urls": _dedup(iurls), "raw": item}
+            # Slot record with raw trimmed to status / fifeUrl / error (not the whole API item)
+            status = ("COMPLETED" if st == "DONE" and vurls
+                      else ("DONE_NO_URL" if st == "DONE" else st))
+            out[key or "unknown"] = OpResult(status, _dedup(vurls), _dedup(iurls), trim_raw(item))
         
         # Issue #2 FIX: Enhanced diagnostic logging
         num_returned = len(out)
@@ -1427,12 +1475,8 @@ class LabsClient:
         if num_videos > 4:
             num_videos = 4
 
-        # Build complete prompt with all fields
-        prompt_text = _build_complete_prompt_text(prompt)
-        
-        # Validate and truncate prompt to fit within API limits
-        # This prevents HTTP 400 "Request contains an invalid argument" errors
-        prompt_text = _truncate_prompt_smart(prompt_text, max_length=MAX_PROMPT_LENGTH)
+        # Build complete prompt with all fields, truncated to API limits
+        prompt_text = _compile_api_prompt(prompt).text
         
         # Build Google Labs API format request
         requests_list = []
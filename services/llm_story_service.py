@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 import json, requests
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from services.core.key_manager import get_key
+from services.scene_similarity import SceneTextIndex, build_index, jaccard, tokenize
 
 # Constants for validation
 IDEA_RELEVANCE_THRESHOLD = 0.15  # Minimum word overlap ratio (15%)
@@ -715,10 +716,11 @@ def _call_gemini(prompt, api_key, model="gemini-2.5-flash"):
     2. If 503 error, try up to 2 additional keys from config
     3. Add exponential backoff (1s, 2s, 4s)
     """
-    from services.core.api_config import gemini_text_endpoint
-    from services.core.key_manager import get_all_keys
     import time
 
+    from services.core.api_config import GEMINI_BASE, gemini_text_endpoint
+    from services.core.key_manager import get_all_keys
+
     # Build key rotation list
     keys = [api_key]
     all_keys = get_all_keys('google')
@@ -730,7 +732,7 @@ def _call_gemini(prompt, api_key, model="gemini-2.5-flash"):
         try:
             # Build endpoint
             url = gemini_text_endpoint(key) if model == "gemini-2.5-flash" else \
-                  f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={key}"
+                  f"{GEMINI_BASE}/models/{model}:generateContent?key={key}"
 
             headers = {"Content-Type": "application/json"}
             data = {
@@ -796,58 +798,26 @@ def _calculate_text_similarity(text1, text2):
     Returns:
         float: Similarity score between 0.0 and 1.0
     """
-    if not text1 or not text2:
-        return 0.0
-
-    # Normalize: lowercase and split into words
-    words1 = set(text1.lower().split())
-    words2 = set(text2.lower().split())
-
-    if not words1 or not words2:
-        return 0.0
-
-    # Jaccard similarity: intersection / union
-    intersection = len(words1 & words2)
-    union = len(words1 | words2)
-
-    return intersection / union if union > 0 else 0.0
+    return jaccard(tokenize(text1), tokenize(text2))
 
-def _validate_scene_uniqueness(scenes, similarity_threshold=0.8):
+def _validate_scene_uniqueness(scenes, similarity_threshold=0.8,
+                               index: Optional[SceneTextIndex] = None):
     """
     Validate that scenes are unique (not duplicates).
     Checks both prompt_vi and prompt_tgt for similarity.
     
+    Scene texts are tokenized once into a SceneTextIndex and compared with a
+    prefix-filtered similarity join instead of scanning every pair.
+    
     Args:
         scenes: List of scene dicts with prompt_vi/prompt_tgt
         similarity_threshold: Maximum allowed similarity (default 0.8 = 80%)
+        index: Optional prebuilt SceneTextIndex for these scenes
     
     Returns:
         List of duplicate pairs found: [(scene1_idx, scene2_idx, similarity), ...]
     """
-    duplicates = []
-
-    for i in range(len(scenes)):
-        for j in range(i + 1, len(scenes)):
-            scene1 = scenes[i]
-            scene2 = scenes[j]
-
-            # Check both Vietnamese and target prompts
-            prompt1_vi = scene1.get("prompt_vi", "")
-            prompt2_vi = scene2.get("prompt_vi", "")
-            prompt1_tgt = scene1.get("prompt_tgt", "")
-            prompt2_tgt = scene2.get("prompt_tgt", "")
-
-            # Calculate similarity for both language versions
-            sim_vi = _calculate_text_similarity(prompt1_vi, prompt2_vi)
-            sim_tgt = _calculate_text_similarity(prompt1_tgt, prompt2_tgt)
-
-            # Use the higher similarity score
-            max_sim = max(sim_vi, sim_tgt)
-
-            if max_sim >= similarity_threshold:
-                duplicates.append((i + 1, j + 1, max_sim))  # 1-based indexing for display
-
-    return duplicates
+    return build_index(scenes, index).near_duplicates(similarity_threshold)
 
 def _enforce_character_consistency(scenes, character_bible):
     """
@@ -925,7 +895,8 @@ def _validate_idea_relevance(idea, generated_content, threshold=0.15):
     return True, similarity, None
 
 
-def _validate_scene_continuity(scenes: List[Dict[str, Any]]) -> List[str]:
+def _validate_scene_continuity(scenes: List[Dict[str, Any]],
+                               index: Optional[SceneTextIndex] = None) -> List[str]:
     """
     Validate scene continuity to ensure scenes can be assembled into a complete video.
     Checks for:
@@ -935,6 +906,7 @@ def _validate_scene_continuity(scenes: List[Dict[str, Any]]) -> List[str]:
     
     Args:
         scenes: List of scene dicts
+        index: Optional prebuilt SceneTextIndex for these scenes
         
     Returns:
         List of continuity issue warnings
@@ -943,15 +915,19 @@ def _validate_scene_continuity(scenes: List[Dict[str, Any]]) -> List[str]:
         return []
     
     issues = []
+    index = build_index(scenes, index)
+    locations = index.lowered("location")
+    times = index.lowered("time_of_day")
+    transitions = index.lowered("transition_from_previous")
     
     for i in range(1, len(scenes)):
         prev_scene = scenes[i-1]
         curr_scene = scenes[i]
         
         # Check location continuity
-        prev_loc = prev_scene.get("location", "").lower()
-        curr_loc = curr_scene.get("location", "").lower()
-        transition = curr_scene.get("transition_from_previous", "").lower()
+        prev_loc = locations[i-1]
+        curr_loc = locations[i]
+        transition = transitions[i]
         
         # If location changes dramatically without transition explanation
         if prev_loc and curr_loc and prev_loc != curr_loc:
@@ -962,8 +938,8 @@ def _validate_scene_continuity(scenes: List[Dict[str, Any]]) -> List[str]:
                 )
         
         # Check time continuity
-        prev_time = prev_scene.get("time_of_day", "").lower()
-        curr_time = curr_scene.get("time_of_day", "").lower()
+        prev_time = times[i-1]
+        curr_time = times[i]
         
         # Detect illogical time jumps (e.g., night -> day in same location without explanation)
         if prev_time and curr_time and prev_loc == curr_loc:
@@ -1122,7 +1098,9 @@ def generate_script(idea, style, duration_seconds, provider='Gemini 2.5', api_ke
 
     # ISSUE #1 FIX: Validate scene uniqueness
     scenes = res.get("scenes", [])
-    duplicates = _validate_scene_uniqueness(scenes, similarity_threshold=0.8)
+    # Tokenize scene texts once; shared by the uniqueness and continuity checks
+    scene_index = SceneTextIndex(scenes)
+    duplicates = _validate_scene_uniqueness(scenes, similarity_threshold=0.8, index=scene_index)
     if duplicates:
         dup_msg = ", ".join([f"Scene {i} & {j} ({sim*100:.0f}% similar)" for i, j, sim in duplicates])
         print(f"[WARN] Duplicate scenes detected: {dup_msg}")
@@ -1161,7 +1139,7 @@ def generate_script(idea, style, duration_seconds, provider='Gemini 2.5', api_ke
     report_progress("Đang kiểm tra tính liên tục của các cảnh...", 85)
     scenes = res.get("scenes", [])
     if scenes:
-        continuity_issues = _validate_scene_continuity(scenes)
+        continuity_issues = _validate_scene_continuity(scenes, index=scene_index)
         if continuity_issues:
             print(f"[WARN] Scene continuity issues detected: {continuity_issues}")
             res["scene_continuity_warnings"] = continuity_issues
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Project Scheduler - run several projects at once over the shared account pool
+
+Two pieces, both Qt-free:
+- ProjectScheduler decides which projects run: up to ``max_concurrent`` at a
+  time (default: one per healthy account), higher priority first, then in
+  list order.
+- SubmitGate decides whose scene is submitted next on each account: at most
+  ``slots_per_account`` concurrent submits per account, strict priority
+  between projects, and weighted fair share (fewest submits per weight) among
+  projects of the same priority. Workers wrap start_one in gate.slot().
+
+A single request can override its project's priority with a request class
+(interactive / batch / background) and an optional deadline, so a one-scene
+retry clicked in the UI takes the next free slot on its account ahead of
+every scene still waiting in a large batch. Submits already in flight are
+never interrupted.
+"""
+
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.telemetry import get_telemetry
+
+PRIORITY_LOW = 0
+PRIORITY_NORMAL = 1
+PRIORITY_HIGH = 2
+PRIORITY_LABELS = {PRIORITY_HIGH: "Cao", PRIORITY_NORMAL: "Bình thường", PRIORITY_LOW: "Thấp"}
+
+# Request classes: interactive beats every project priority, background yields to all
+PRIORITY_INTERACTIVE = 10
+PRIORITY_BATCH = PRIORITY_NORMAL
+PRIORITY_BACKGROUND = -1
+PRIORITY_CLASSES = {
+    "interactive": PRIORITY_INTERACTIVE,
+    "batch": PRIORITY_BATCH,
+    "background": PRIORITY_BACKGROUND,
+}
+
+SLOTS_PER_ACCOUNT = 1  # Matches the one-thread-per-account workers
+
+
+class SubmitGate:
+    """Per-account submit slots shared by every running project"""
+
+    def __init__(self, slots_per_account: int = SLOTS_PER_ACCOUNT):
+        self.slots_per_account = max(1, int(slots_per_account))
+        self._cond = threading.Condition()
+        self._projects: Dict[str, Tuple[int, float]] = {}  # name -> (priority, weight)
+        self._served: Dict[str, int] = {}
+        self._active: Dict[str, int] = {}
+        # account -> [(seq, project, priority, deadline)]
+        self._waiting: Dict[str, List[tuple]] = {}
+        self._seq = itertools.count()
+
+    def register(self, project: str, priority: int = PRIORITY_NORMAL, weight: float = 1.0):
+        with self._cond:
+            self._projects[project] = (int(priority), max(0.01, float(weight)))
+            self._served.setdefault(project, 0)
+            self._cond.notify_all()
+
+    def unregister(self, project: str):
+        with self._cond:
+            self._projects.pop(project, None)
+            self._served.pop(project, None)
+            self._cond.notify_all()
+
+    def _rank(self, entry: tuple):
+        seq, project, priority, deadline = entry
+        default_priority, weight = self._projects.get(project, (PRIORITY_NORMAL, 1.0))
+        if priority is None:
+            priority = default_priority
+        # Earliest deadline first within a class; no deadline sorts last
+        return (-priority, deadline if deadline is not None else float("inf"),
+                self._served.get(project, 0) / weight, seq)
+
+    @contextmanager
+    def slot(self, project: str, account: str = "default",
+             priority: Optional[int] = None, deadline: Optional[float] = None,
+             scene: Optional[int] = None):
+        """
+        Hold one submit slot on ``account`` for ``project``. The wait is
+        recorded as a telemetry "queue" span.
+
+        Args:
+            priority: Request class overriding the project's priority (see priority_of)
+            deadline: Absolute time.time() by which the submit should start
+            scene: Scene number, only used to label the queue span
+        """
+        queued_at = time.time()
+        entry = (next(self._seq), project, priority_of(priority), deadline)
+        with self._cond:
+            queue = self._waiting.setdefault(account, [])
+            queue.append(entry)
+            while (self._active.get(account, 0) >= self.slots_per_account
+                   or min(queue, key=self._rank) is not entry):
+                self._cond.wait(1.0)
+            queue.remove(entry)
+            self._active[account] = self._active.get(account, 0) + 1
+            self._served[project] = self._served.get(project, 0) + 1
+        get_telemetry().add_span("queue", queued_at, time.time(), scene=scene,
+                                 account=account, project=project)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active[account] -= 1
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, int]:
+        """Submits granted per project"""
+        with self._cond:
+            return dict(self._served)
+
+
+def priority_of(value) -> Optional[int]:
+    """Priority from a class name ("interactive", "batch", "background") or a number"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str) and not value.lstrip("-").isdigit():
+        try:
+            return PRIORITY_CLASSES[value.lower()]
+        except KeyError:
+            raise ValueError(f"Unknown priority class: {value}")
+    return int(value)
+
+
+def deadline_in(seconds: Optional[float]) -> Optional[float]:
+    """Absolute deadline ``seconds`` from now (None stays None)"""
+    return time.time() + float(seconds) if seconds is not None else None
+
+
+class ProjectScheduler:
+    """Which projects of a multi-project run start next"""
+
+    def __init__(self, max_concurrent: int = 1):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self._queued: List[Tuple[int, int, str]] = []  # (-priority, order, name)
+        self.running: List[str] = []
+        self.finished: List[str] = []
+        self._order = itertools.count()
+
+    def add(self, name: str, priority: int = PRIORITY_NORMAL):
+        self._queued.append((-int(priority), next(self._order), name))
+        self._queued.sort()
+
+    def extend(self, names: Iterable[str], priorities: Optional[Dict[str, int]] = None):
+        for name in names:
+            self.add(name, (priorities or {}).get(name, PRIORITY_NORMAL))
+
+    @property
+    def queued(self) -> List[str]:
+        return [name for _, _, name in self._queued]
+
+    def next_ready(self) -> Optional[str]:
+        """Pop the next project to start, or None if none is queued or all slots are busy"""
+        if not self._queued or len(self.running) >= self.max_concurrent:
+            return None
+        _, _, name = self._queued.pop(0)
+        self.running.append(name)
+        return name
+
+    def finish(self, name: str):
+        if name in self.running:
+            self.running.remove(name)
+            self.finished.append(name)
+
+    def cancel(self):
+        self._queued.clear()
+
+    def is_done(self) -> bool:
+        return not self._queued and not self.running
+
+    @property
+    def total(self) -> int:
+        return len(self._queued) + len(self.running) + len(self.finished)
+
+
+def aggregate_progress(counts: Iterable[Tuple[int, int]]) -> Tuple[int, int]:
+    """Sum (done, total) pairs from every project"""
+    done = total = 0
+    for d, t in counts:
+        done += d
+        total += t
+    return done, total
+
+
+def default_max_concurrent(config: Optional[dict] = None) -> int:
+    """One running project per healthy account unless config multi_project.max_concurrent is set"""
+    knob = ((config or {}).get("multi_project") or {}).get("max_concurrent")
+    if knob:
+        return max(1, int(knob))
+    try:
+        from services.account_manager import get_account_manager
+        mgr = get_account_manager()
+        if mgr.is_multi_account_enabled():
+            return max(1, len(mgr.get_healthy_accounts()))
+    except Exception:
+        pass
+    return 1
+
+
+_gate: Optional[SubmitGate] = None
+_gate_lock = threading.Lock()
+
+
+def get_submit_gate() -> SubmitGate:
+    """Process-wide gate shared by every project's workers"""
+    global _gate
+    with _gate_lock:
+        if _gate is None:
+            try:
+                from utils import config as cfg
+                conf = cfg.load().get("multi_project") or {}
+                slots = conf.get("slots_per_account", SLOTS_PER_ACCOUNT)
+            except Exception:
+                slots = SLOTS_PER_ACCOUNT
+            _gate = SubmitGate(slots)
+        return _gate
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Prompt Compiler Cache - memoized scene JSON -> final API prompt text
+
+Every submit path (batch, model ladder, re-upload retry, per-copy fallback,
+regenerations) and the UI (PromptViewer, .txt sidecars) turns the same scene
+JSON into the same API text. This module compiles it once:
+
+    scene JSON -> [policy sanitize] -> build text -> [smart truncate]
+
+and caches the result keyed by a hash of the canonical JSON, the builder,
+the sanitizer and the length limit. Shared by services/labs_flow_service.py
+and services/google/labs_flow_client.py.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class CompiledPrompt(NamedTuple):
+    """Result of compiling one scene prompt"""
+    text: str  # Final text sent to the API
+    warnings: Tuple[str, ...]  # Content policy warnings from sanitization
+    original_length: int  # Length before truncation
+
+    @property
+    def truncated(self) -> bool:
+        return len(self.text) < self.original_length
+
+
+def _parse(prompt_data: Any) -> Any:
+    """Parse JSON strings into dicts; leave plain text and dicts untouched"""
+    if isinstance(prompt_data, str):
+        try:
+            return json.loads(prompt_data)
+        except (ValueError, TypeError):
+            return prompt_data
+    return prompt_data
+
+
+def _fn_id(fn: Optional[Callable]) -> str:
+    if fn is None:
+        return "-"
+    return f"{getattr(fn, '__module__', '')}.{getattr(fn, '__qualname__', repr(fn))}"
+
+
+def canonical_key(prompt_data: Any, *parts: Any) -> str:
+    """SHA1 of the canonical JSON form of ``prompt_data`` plus extra key parts"""
+    if isinstance(prompt_data, str):
+        raw = "s:" + prompt_data
+    else:
+        raw = "d:" + json.dumps(prompt_data, sort_keys=True, ensure_ascii=False, default=str)
+    head = "|".join(str(p) for p in parts)
+    return hashlib.sha1(f"{head}|{raw}".encode("utf-8")).hexdigest()
+
+
+class PromptCompileCache:
+    """
+    Thread-safe LRU of compiled prompts with hit/miss counters.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CompiledPrompt]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def compile(self, prompt_data: Any, builder: Callable[[Any], str],
+                max_length: Optional[int] = None,
+                truncate: Optional[Callable[..., str]] = None,
+                sanitize: Optional[Callable[[Any], Tuple[Any, List[str]]]] = None,
+                parse_json: bool = True) -> CompiledPrompt:
+        """
+        Compile ``prompt_data`` to API text, or return the cached result.
+
+        Args:
+            prompt_data: Scene prompt (dict, JSON string or plain text)
+            builder: Function turning the (sanitized) prompt into text
+            max_length: Truncate to this length with ``truncate`` (None = no limit)
+            truncate: Function(text, max_length=...) used when max_length is set
+            sanitize: Optional policy filter returning (data, warnings)
+            parse_json: Parse JSON strings before sanitizing/building
+
+        Returns:
+            CompiledPrompt(text, warnings, original_length)
+        """
+        data = _parse(prompt_data) if parse_json else prompt_data
+        key = canonical_key(data, _fn_id(builder), _fn_id(sanitize), _fn_id(truncate), max_length)
+
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return hit
+            self.misses += 1
+
+        warnings: List[str] = []
+        if sanitize is not None:
+            data, warnings = sanitize(data)
+        if isinstance(data, str) and parse_json:
+            # Sanitizer may hand back JSON text; build from the parsed form
+            data = _parse(data)
+        text = builder(data)
+        original_length = len(text)
+        if max_length is not None and truncate is not None:
+            text = truncate(text, max_length=max_length)
+
+        compiled = CompiledPrompt(text, tuple(warnings or ()), original_length)
+        with self._lock:
+            self._entries[key] = compiled
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+    def clear(self):
+        """Drop all cached prompts and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Global cache shared by both Labs clients and the UI
+_cache = PromptCompileCache()
+
+
+def get_prompt_cache() -> PromptCompileCache:
+    """Get the process-wide compiled prompt cache"""
+    return _cache
+
+
+def compile_prompt(prompt_data: Any, builder: Callable[[Any], str], **kwargs) -> CompiledPrompt:
+    """Compile through the global cache (see PromptCompileCache.compile)"""
+    return _cache.compile(prompt_data, builder, **kwargs)
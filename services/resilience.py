@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import threading
+import time
 from contextlib import contextmanager
 
 def _cfg():
@@ -31,3 +32,171 @@ def acquire(provider:str):
         yield
     finally:
         sem.release()
+
+
+# ---------------------------------------------------------------- circuit breaker
+# Shared by every client in the process: when an endpoint keeps failing
+# (5xx, timeouts, connection errors) callers fail fast instead of each
+# sleeping through its own retry loop; after recovery_sec one probe request
+# is let through (half-open) and its result closes or re-opens the circuit.
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+try:
+    import requests
+    _TRANSIENT_EXC = (requests.ConnectionError, requests.Timeout,
+                      requests.exceptions.ChunkedEncodingError)
+except ImportError:  # pragma: no cover
+    _TRANSIENT_EXC = (ConnectionError, TimeoutError)
+
+
+class CircuitOpenError(RuntimeError):
+    """Endpoint circuit is open; retry_after is seconds until the next probe"""
+
+    def __init__(self, endpoint:str, retry_after:float):
+        super().__init__(
+            f"Endpoint unavailable (circuit open), retry in {retry_after:.0f}s: {endpoint}")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(self, name:str, failure_threshold:int=5, recovery_sec:float=30.0,
+                 max_recovery_sec:float=300.0):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.base_recovery_sec = float(recovery_sec)
+        self.max_recovery_sec = float(max_recovery_sec)
+        self.recovery_sec = self.base_recovery_sec
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_at = 0.0
+        self._lock = threading.Lock()
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self.state == CLOSED:
+                return 0.0
+            return max(0.0, self._opened_at + self.recovery_sec - time.monotonic())
+
+    def allow(self) -> bool:
+        """True if a request may go out now (in half-open: only the single probe)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.recovery_sec:
+                self.state = HALF_OPEN
+                self._probing = False
+            now = time.monotonic()
+            # A probe that never reported back (crashed caller) is replaced after recovery_sec
+            probe_due = not self._probing or now - self._probe_at >= self.recovery_sec
+            if self.state == HALF_OPEN and probe_due:
+                self._probing = True
+                self._probe_at = now
+                return True
+            return False
+
+    def check(self):
+        """Raise CircuitOpenError unless allow()"""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self._failures = 0
+            self._probing = False
+            self.recovery_sec = self.base_recovery_sec
+
+    def record_failure(self) -> bool:
+        """Count a transient failure; True if the circuit is (now) open"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                # Probe failed: back off longer before the next one
+                self.recovery_sec = min(self.recovery_sec * 2, self.max_recovery_sec)
+                self._trip()
+            elif self.state == CLOSED:
+                self._failures += 1
+                if self._failures >= self.failure_threshold:
+                    self._trip()
+            return self.state != CLOSED
+
+    def _trip(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of first attempts across all clients, so an
+    outage cannot multiply traffic (ratio=0.2: at most ~1 retry per 5 calls,
+    plus min_per_sec so a quiet process can still retry).
+    """
+
+    def __init__(self, ratio:float=0.2, min_per_sec:float=0.5, max_tokens:float=20.0):
+        self.ratio = float(ratio)
+        self.min_per_sec = float(min_per_sec)
+        self.max_tokens = float(max_tokens)
+        self._tokens = self.max_tokens
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._last) * self.min_per_sec)
+        self._last = now
+
+    def deposit(self):
+        """Call once per logical request (first attempt)"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take one retry; False when the budget is exhausted"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
+_BREAKERS = {}
+_BUDGETS = {}
+_REG_LOCK = threading.Lock()
+
+
+def get_breaker(endpoint:str) -> CircuitBreaker:
+    with _REG_LOCK:
+        br = _BREAKERS.get(endpoint)
+        if br is None:
+            c = _cfg().get('resilience', {}).get('circuit_breaker', {})
+            br = CircuitBreaker(endpoint, c.get('failure_threshold', 5),
+                                c.get('recovery_sec', 30.0), c.get('max_recovery_sec', 300.0))
+            _BREAKERS[endpoint] = br
+        return br
+
+
+def get_retry_budget(provider:str='labs') -> RetryBudget:
+    with _REG_LOCK:
+        b = _BUDGETS.get(provider)
+        if b is None:
+            c = _cfg().get('resilience', {}).get('retry_budget', {})
+            b = RetryBudget(c.get('ratio', 0.2), c.get('min_retries_per_sec', 0.5),
+                            c.get('max_tokens', 20.0))
+            _BUDGETS[provider] = b
+        return b
+
+
+def is_transient(exc:BaseException=None, status:int=0) -> bool:
+    """Failures that say something about endpoint health (not the request itself)"""
+    if status:
+        return status >= 500
+    resp = getattr(exc, 'response', None)
+    if resp is not None and getattr(resp, 'status_code', None):
+        return resp.status_code >= 500
+    return isinstance(exc, _TRANSIENT_EXC)
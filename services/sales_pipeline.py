@@ -19,7 +19,7 @@ def start_pipeline(project_name:str, ratio_str:str, scenes:List[Dict[str,Any]],
                    model_imgs:List[str], product_imgs:List[str], copies:int=1)->Dict[str,Any]:
     st = cfg.load() or {}
     tokens = st.get("tokens") or []
-    proj_id = st.get("default_project_id") or DEFAULT_PROJECT_ID
+    proj_id = cfg.default_project_id(st) or DEFAULT_PROJECT_ID
 
     # Log language configuration for debugging
     import sys
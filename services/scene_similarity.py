@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Scene Similarity Index - tokenize scene texts once, find near-duplicates fast
+
+Replaces the all-pairs Jaccard loop used by the script validators:
+- Each scene field is lowercased and split into a word set exactly once
+- Near-duplicate pairs are found with an exact prefix-filtered similarity join
+  (inverted index over rare words + size filter), then verified with the same
+  Jaccard formula as before, so the result is identical to the O(n²) scan
+- The same index serves the other per-scene validators (continuity)
+"""
+
+import math
+from collections import Counter, defaultdict
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+DEFAULT_FIELDS = ("prompt_vi", "prompt_tgt")
+
+
+def tokenize(text: Any) -> FrozenSet[str]:
+    """Lowercased whitespace word set (same normalization the validators use)"""
+    if not text:
+        return frozenset()
+    return frozenset(str(text).lower().split())
+
+
+def jaccard(words1: FrozenSet[str], words2: FrozenSet[str]) -> float:
+    """Jaccard similarity of two word sets; 0.0 if either is empty"""
+    if not words1 or not words2:
+        return 0.0
+    intersection = len(words1 & words2)
+    union = len(words1 | words2)
+    return intersection / union if union > 0 else 0.0
+
+
+def _prefix_len(size: int, threshold: float) -> int:
+    # Two sets with Jaccard >= t overlap in at least ceil(t*|x|) words, so their
+    # prefixes of length |x| - ceil(t*|x|) + 1 (in global word order) must meet.
+    # The epsilon keeps float noise from shortening the prefix.
+    need = max(1, math.ceil(threshold * size - 1e-9))
+    return max(1, min(size, size - need + 1))
+
+
+def similarity_join(sets: List[FrozenSet[str]], threshold: float) -> Dict[Tuple[int, int], float]:
+    """
+    All pairs (i < j) whose Jaccard similarity is >= threshold.
+
+    Uses prefix filtering: words are ordered by ascending document frequency,
+    only each set's short prefix of rare words is indexed, and candidates must
+    also pass the size filter |y| >= t*|x|. Every candidate is then verified
+    exactly, so the output equals a brute-force scan.
+
+    Returns:
+        Dict mapping (i, j) to similarity
+    """
+    n = len(sets)
+    if threshold <= 0:
+        # Every pair qualifies; nothing to prune
+        return {(i, j): jaccard(sets[i], sets[j]) for i in range(n) for j in range(i + 1, n)}
+
+    freq = Counter(w for s in sets for w in s)
+    # Process sets by size so the size filter only has to look one way
+    order = sorted((i for i in range(n) if sets[i]), key=lambda i: len(sets[i]))
+    ranked = {i: sorted(sets[i], key=lambda w: (freq[w], w)) for i in order}
+
+    index: Dict[str, List[int]] = defaultdict(list)
+    out: Dict[Tuple[int, int], float] = {}
+    for x in order:
+        words = ranked[x]
+        size_x = len(words)
+        min_size = threshold * size_x - 1e-9
+        seen = set()
+        for w in words[:_prefix_len(size_x, threshold)]:
+            for y in index[w]:
+                if y in seen or len(sets[y]) < min_size:
+                    continue
+                seen.add(y)
+                sim = jaccard(sets[x], sets[y])
+                if sim >= threshold:
+                    out[(min(x, y), max(x, y))] = sim
+            index[w].append(x)
+    return out
+
+
+class SceneTextIndex:
+    """
+    Per-script cache of tokenized and normalized scene fields.
+
+    Build once per validation pass and hand it to every validator so no
+    scene text is lowercased or split more than once.
+    """
+
+    def __init__(self, scenes: List[Dict[str, Any]], fields: Iterable[str] = DEFAULT_FIELDS):
+        self.scenes = scenes or []
+        self._tokens: Dict[str, List[FrozenSet[str]]] = {}
+        self._lowered: Dict[str, List[str]] = {}
+        for field in fields:
+            self.tokens(field)
+
+    def __len__(self):
+        return len(self.scenes)
+
+    def tokens(self, field: str) -> List[FrozenSet[str]]:
+        """Word sets for ``field`` of every scene (computed on first use)"""
+        if field not in self._tokens:
+            self._tokens[field] = [tokenize(s.get(field, "")) for s in self.scenes]
+        return self._tokens[field]
+
+    def lowered(self, field: str) -> List[str]:
+        """Lowercased string value of ``field`` for every scene"""
+        if field not in self._lowered:
+            self._lowered[field] = [str(s.get(field, "") or "").lower() for s in self.scenes]
+        return self._lowered[field]
+
+    def near_duplicates(self, threshold: float = 0.8,
+                        fields: Iterable[str] = DEFAULT_FIELDS) -> List[Tuple[int, int, float]]:
+        """
+        Scene pairs whose similarity in any of ``fields`` is >= threshold.
+
+        The reported score is the max over fields, matching the old validator.
+
+        Returns:
+            [(scene1_idx, scene2_idx, similarity), ...] with 1-based indices,
+            ordered by (scene1_idx, scene2_idx)
+        """
+        fields = tuple(fields)
+        pairs = set()
+        for field in fields:
+            pairs.update(similarity_join(self.tokens(field), threshold))
+
+        result = []
+        for i, j in sorted(pairs):
+            best = max(jaccard(self.tokens(f)[i], self.tokens(f)[j]) for f in fields)
+            result.append((i + 1, j + 1, best))
+        return result
+
+
+def find_near_duplicates(texts: List[str], threshold: float = 0.8) -> List[Tuple[int, int, float]]:
+    """Near-duplicate pairs in a flat list of texts (0-based indices), e.g. a prompt library"""
+    sets = [tokenize(t) for t in texts]
+    return [(i, j, sim) for (i, j), sim in sorted(similarity_join(sets, threshold).items())]
+
+
+def build_index(scenes: List[Dict[str, Any]],
+                index: Optional[SceneTextIndex] = None) -> SceneTextIndex:
+    """Return ``index`` if it already covers ``scenes``, otherwise build one"""
+    if index is not None and index.scenes is scenes:
+        return index
+    return SceneTextIndex(scenes)
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""
+Telemetry - spans, counters and latency histograms for the video pipeline
+
+Qt-free and process-wide (get_telemetry()). What gets recorded:
+- Spans per scene and stage: queue (waiting for a submit slot), upload,
+  submit, park (Labs endpoint circuit open), render (submit -> terminal
+  status seen), download, thumbnail (ffmpeg)
+- HTTP latency histograms and status counters per Labs endpoint
+- Retry counters per endpoint; finished videos per account and status
+- poll_lag: upper bound on how late a finished video was noticed
+
+The engine records these itself; in-process workers use RenderClock for the
+render/poll_lag/videos_total part, and SubmitGate records every queue span.
+
+Exports:
+- Prometheus text format (write_prometheus) for node_exporter's textfile
+  collector or a quick look with any Prometheus tooling
+- Chrome trace JSON (write_chrome_trace), open in chrome://tracing or
+  https://ui.perfetto.dev to see where a batch spent its time
+- summary() for the in-app dashboard
+
+Disabled with config telemetry.enabled = false; exports go to
+telemetry.dir (default logs/telemetry).
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+# Seconds; covers fast status checks up to hour-long renders
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+MAX_SPANS = 100000  # Completed spans kept for the trace export
+
+STAGES = ("queue", "upload", "submit", "park", "render", "download", "thumbnail")
+
+
+def endpoint_label(url: str) -> str:
+    """Short, low-cardinality endpoint name: .../video:batchCheckAsync... -> batchCheckAsync..."""
+    path = urlparse(url or "").path.rstrip("/")
+    last = path.rsplit("/", 1)[-1]
+    return last.rsplit(":", 1)[-1] or "unknown"
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus style) keeping recent samples for percentiles"""
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS, keep: int = 2000):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.total = 0.0
+        self.n = 0
+        self.recent = deque(maxlen=keep)
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.n += 1
+        self.recent.append(value)
+
+    def percentile(self, q: float) -> float:
+        if not self.recent:
+            return 0.0
+        data = sorted(self.recent)
+        return data[min(len(data) - 1, int(q * len(data)))]
+
+
+def _labels_key(labels: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(key: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in items) + "}"
+
+
+class Telemetry:
+    """Thread-safe metrics and span store"""
+
+    def __init__(self, enabled: bool = True, max_spans: int = MAX_SPANS):
+        self.enabled = enabled
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, tuple], float] = {}
+        self._hists: Dict[Tuple[str, tuple], Histogram] = {}
+        self._spans = deque(maxlen=max_spans)
+        self._pid = os.getpid()
+
+    # ---- recording ----
+    def count(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        if not self.enabled:
+            return
+        key = (name, _labels_key(labels))
+        with self._lock:
+            hist = self._hists.get(key)
+            if hist is None:
+                hist = self._hists[key] = Histogram()
+            hist.observe(max(0.0, seconds))
+
+    def add_span(self, stage: str, start: float, end: float, **attrs):
+        """Record a finished span (time.time() seconds) and its stage histogram"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._spans.append((stage, start, max(start, end), threading.get_ident(), attrs))
+        self.observe("stage_seconds", end - start, stage=stage)
+
+    @contextmanager
+    def span(self, stage: str, **attrs):
+        """Time a block as one span; an exception is recorded in the span's args"""
+        start = time.time()
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs["error"] = type(e).__name__
+            raise
+        finally:
+            self.add_span(stage, start, time.time(), **attrs)
+
+    def record_http(self, url: str, status: Any, seconds: float):
+        endpoint = endpoint_label(url)
+        self.observe("http_request_seconds", seconds, endpoint=endpoint)
+        self.count("http_requests_total", endpoint=endpoint, code=status)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._hists.clear()
+            self._spans.clear()
+            self.started_at = time.time()
+
+    # ---- reading ----
+    def _snapshot(self):
+        with self._lock:
+            counters = dict(self._counters)
+            hists = {k: (h.buckets, list(h.counts), h.total, h.n,
+                         h.percentile(0.5), h.percentile(0.95))
+                     for k, h in self._hists.items()}
+            spans = list(self._spans)
+        return counters, hists, spans
+
+    def summary(self) -> Dict[str, Any]:
+        """Dashboard data: stages, endpoints, retries and per-account throughput"""
+        counters, hists, _ = self._snapshot()
+        elapsed_h = max(1e-9, (time.time() - self.started_at) / 3600.0)
+
+        def rows(metric, label):
+            out = []
+            for (name, key), (_, _, total, n, p50, p95) in hists.items():
+                if name != metric or not n:
+                    continue
+                out.append({label: dict(key).get(label, ""), "count": n, "total": total,
+                            "mean": total / n, "p50": p50, "p95": p95})
+            return sorted(out, key=lambda r: -r["total"])
+
+        retries: Dict[str, float] = {}
+        errors: Dict[str, float] = {}
+        accounts: Dict[str, Dict[str, float]] = {}
+        for (name, key), value in counters.items():
+            labels = dict(key)
+            endpoint = labels.get("endpoint", "")
+            if name == "labs_retries_total":
+                retries[endpoint] = retries.get(endpoint, 0) + value
+            elif name == "http_requests_total" and not str(labels.get("code", "")).startswith("2"):
+                errors[endpoint] = errors.get(endpoint, 0) + value
+            elif name == "videos_total":
+                acc = accounts.setdefault(labels.get("account", "-"), {})
+                acc[labels.get("status", "")] = acc.get(labels.get("status", ""), 0) + value
+        for acc in accounts.values():
+            acc["per_hour"] = acc.get("DOWNLOADED", 0) / elapsed_h
+        return {
+            "since": self.started_at,
+            "stages": rows("stage_seconds", "stage"),
+            "endpoints": rows("http_request_seconds", "endpoint"),
+            "poll_lag": rows("poll_lag_seconds", "account"),
+            "retries": retries,
+            "http_errors": errors,
+            "accounts": accounts,
+        }
+
+    # ---- export ----
+    def prometheus_text(self) -> str:
+        counters, hists, _ = self._snapshot()
+        lines: List[str] = []
+        seen = set()
+        for (name, key), value in sorted(counters.items()):
+            metric = f"veo_{name}"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} counter")
+                seen.add(metric)
+            lines.append(f"{metric}{_fmt_labels(key)} {value:g}")
+        for (name, key), (buckets, counts, total, n, _, _) in sorted(hists.items()):
+            metric = f"veo_{name}"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} histogram")
+                seen.add(metric)
+            cumulative = 0
+            for bound, c in zip(buckets, counts):
+                cumulative += c
+                le = _fmt_labels(key, ("le", f"{bound:g}"))
+                lines.append(f"{metric}_bucket{le} {cumulative}")
+            lines.append(f"{metric}_bucket{_fmt_labels(key, ('le', '+Inf'))} {n}")
+            lines.append(f"{metric}_sum{_fmt_labels(key)} {total:.6f}")
+            lines.append(f"{metric}_count{_fmt_labels(key)} {n}")
+        return "\n".join(lines) + "\n"
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        _, _, spans = self._snapshot()
+        events = []
+        for stage, start, end, tid, attrs in spans:
+            scene = attrs.get("scene")
+            events.append({
+                "name": f"{stage} #{scene}" if scene is not None else stage,
+                "cat": stage, "ph": "X", "pid": self._pid, "tid": tid,
+                "ts": int(start * 1e6), "dur": int((end - start) * 1e6),
+                "args": {k: str(v) for k, v in attrs.items()},
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_prometheus(self, path: str) -> str:
+        return _atomic_write(path, self.prometheus_text())
+
+    def write_chrome_trace(self, path: str) -> str:
+        return _atomic_write(path, json.dumps(self.chrome_trace()))
+
+    def export(self, out_dir: Optional[str] = None, name: str = "run") -> Dict[str, str]:
+        """metrics.prom (overwritten) + trace_<name>_<time>.json in out_dir"""
+        out_dir = out_dir or default_export_dir()
+        os.makedirs(out_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        safe = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in name)[:60] or "run"
+        return {
+            "prometheus": self.write_prometheus(os.path.join(out_dir, "metrics.prom")),
+            "trace": self.write_chrome_trace(os.path.join(out_dir, f"trace_{safe}_{stamp}.json")),
+        }
+
+
+def record_render(submitted_at: float, seen_pending_at: float, now: float, status: str,
+                  account: Optional[str] = None, telemetry: Optional[Telemetry] = None, **attrs):
+    """Render span and poll lag of one copy whose terminal status was just seen"""
+    tel = telemetry or get_telemetry()
+    tel.add_span("render", submitted_at, now, account=account, status=status, **attrs)
+    # It finished somewhere between the previous poll and this one
+    tel.observe("poll_lag_seconds", now - seen_pending_at, account=account)
+    if status != "READY":
+        tel.count("videos_total", account=account, status=status)
+
+
+class RenderClock:
+    """
+    Per-copy render timestamps for poll loops that only keep UI cards.
+
+    The engine stores these on its cards; the in-process workers key them by
+    (scene, copy) here so their runs fill the same render/poll_lag spans and
+    videos_total counters the dashboard reads.
+    """
+
+    def __init__(self, telemetry: Optional[Telemetry] = None):
+        self._tel = telemetry
+        self._lock = threading.Lock()
+        # (scene, copy) -> [submitted, seen_pending, account, rendered]
+        self._copies: Dict[Tuple[Any, int], List[Any]] = {}
+
+    @property
+    def tel(self) -> Telemetry:
+        return self._tel or get_telemetry()
+
+    def submitted(self, scene, copies: int, account: Optional[str] = None):
+        now = time.time()
+        with self._lock:
+            for copy in range(1, copies + 1):
+                self._copies[(scene, copy)] = [now, now, account, False]
+
+    def pending(self, scene, copy: int):
+        with self._lock:
+            entry = self._copies.get((scene, copy))
+            if entry:
+                entry[1] = time.time()
+
+    def rendered(self, scene, copy: int, status: str):
+        """Terminal generation status seen (READY, FAILED, DONE_NO_URL); later polls are ignored"""
+        with self._lock:
+            entry = self._copies.get((scene, copy))
+            if not entry or entry[3]:
+                return
+            entry[3] = True
+        record_render(entry[0], entry[1], time.time(), status, account=entry[2],
+                      telemetry=self.tel, scene=scene, copy=copy)
+
+    def finished(self, scene, copy: int, status: str):
+        """Final outcome after rendering (DOWNLOADED, DOWNLOAD_FAILED, TIMEOUT, CANCELLED)"""
+        with self._lock:
+            entry = self._copies.pop((scene, copy), None)
+        self.tel.count("videos_total", account=entry[2] if entry else None, status=status)
+
+
+def _atomic_write(path: str, text: str) -> str:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+    return path
+
+
+def _config() -> Dict[str, Any]:
+    try:
+        from utils import config as cfg
+        return cfg.load().get("telemetry") or {}
+    except Exception:
+        return {}
+
+
+def default_export_dir() -> str:
+    root = os.path.dirname(os.path.dirname(__file__))
+    return _config().get("dir") or os.path.join(root, "logs", "telemetry")
+
+
+_telemetry: Optional[Telemetry] = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry() -> Telemetry:
+    """Process-wide telemetry (config telemetry.enabled, default on)"""
+    global _telemetry
+    with _telemetry_lock:
+        if _telemetry is None:
+            _telemetry = Telemetry(enabled=bool(_config().get("enabled", True)))
+        return _telemetry
@@ -8,6 +8,7 @@ from typing import List, Tuple, Dict, Any, Optional
 from pathlib import Path
 import logging
 
+from services.core.api_config import TTS_BASE
 from services.core.config import load as load_config
 from services.core.key_manager import refresh, rotated_list
 
@@ -73,7 +74,7 @@ def synthesize_speech_google(text: str, voice_id: str, language_code: str = "vi-
         api_key = keys[0]
 
     # Build request
-    url = f"https://texttospeech.googleapis.com/v1/text:synthesize?key={api_key}"
+    url = f"{TTS_BASE}/v1/text:synthesize?key={api_key}"
 
     # Determine input type
     if ssml_markup:
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Artifact Writer - background, batched, atomic writes of small text artifacts
+
+Per-scene prompt files (scene_NN.json / scene_NN.txt) used to be built and
+written on the GUI thread, one open() per file. The writer takes them off
+that thread:
+
+- submit(produce): produce() runs on the writer thread and returns
+  {path: text}, so building the content (prompt JSON, compiled text) is
+  off the caller's thread too; write(path, text) for ready-made text
+- bursts are drained together; a path queued twice in a batch is written once
+- unchanged content (sha1 vs. the last write, or the file on disk) is skipped
+- each file is written to <path>.tmp and renamed into place
+
+    writer = get_artifact_writer()
+    writer.submit(lambda: {json_path: dumps(j), txt_path: compile(j)}, on_error=log)
+    writer.flush()  # only when a caller must read the files back
+"""
+
+import hashlib
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+LINGER_SEC = 0.05  # Coalesce bursts (one per scene) into one batch
+
+Producer = Callable[[], Dict[str, str]]
+ErrorCallback = Callable[[Exception], None]
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+class ArtifactWriter:
+    def __init__(self, linger: float = LINGER_SEC):
+        self.linger = linger
+        self._queue: "queue.Queue[Tuple[Producer, Optional[ErrorCallback]]]" = queue.Queue()
+        self._hashes: Dict[str, str] = {}
+        self._idle = threading.Condition()
+        self._outstanding = 0
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.stats = {"written": 0, "unchanged": 0, "failed": 0, "batches": 0}
+
+    def submit(self, produce: Producer, on_error: Optional[ErrorCallback] = None):
+        """Queue produce() -> {path: text}; on_error(exc) runs on the writer thread"""
+        with self._idle:
+            self._outstanding += 1
+        self._ensure_thread()
+        self._queue.put((produce, on_error))
+
+    def write(self, path: str, text: str, on_error: Optional[ErrorCallback] = None):
+        self.submit(lambda: {path: text}, on_error)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far is on disk; False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._outstanding:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def _ensure_thread(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="artifact-writer",
+                                                daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            if self.linger:
+                time.sleep(self.linger)
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            finally:
+                with self._idle:
+                    self._outstanding -= len(batch)
+                    self._idle.notify_all()
+
+    def _write_batch(self, batch: List[Tuple[Producer, Optional[ErrorCallback]]]):
+        files: Dict[str, Tuple[bytes, Optional[ErrorCallback]]] = {}
+        for produce, on_error in batch:
+            try:
+                for path, text in (produce() or {}).items():
+                    files[path] = (text.encode("utf-8"), on_error)  # Later submits win
+            except Exception as e:
+                self._failed(e, on_error)
+        self.stats["batches"] += 1
+        made = set()
+        for path, (data, on_error) in files.items():
+            try:
+                digest = _digest(data)
+                if digest == self._hashes.get(path) or self._same_on_disk(path, data, digest):
+                    self.stats["unchanged"] += 1
+                    continue
+                folder = os.path.dirname(path)
+                if folder and folder not in made:
+                    os.makedirs(folder, exist_ok=True)
+                    made.add(folder)
+                tmp = f"{path}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+                self._hashes[path] = digest
+                self.stats["written"] += 1
+            except OSError as e:
+                self._failed(e, on_error)
+
+    def _same_on_disk(self, path: str, data: bytes, digest: str) -> bool:
+        try:
+            if os.path.getsize(path) != len(data):
+                return False
+            with open(path, "rb") as f:
+                same = _digest(f.read()) == digest
+        except OSError:
+            return False
+        if same:
+            self._hashes[path] = digest
+        return same
+
+    def _failed(self, error: Exception, on_error: Optional[ErrorCallback]):
+        self.stats["failed"] += 1
+        if on_error:
+            try:
+                on_error(error)
+            except Exception:
+                pass
+        else:
+            print(f"[WARN] Artifact write failed: {error}")
+
+
+_writer: Optional[ArtifactWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_artifact_writer() -> ArtifactWriter:
+    """Process-wide writer (one background thread, started on first use)"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ArtifactWriter()
+        return _writer
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Asset Staging - place files into project folders without copying bytes
+
+Projects keep their own copy of every reference image and finished video.
+Copying those byte-for-byte duplicates gigabytes on image-heavy projects, so
+stage_file() tries, in order:
+
+- reflink (copy-on-write clone: Btrfs, XFS, APFS-style; Linux FICLONE)
+- hardlink (same filesystem; both names share one inode) - only when the
+  caller passes link=True for an input nobody rewrites (reference images).
+  Videos and other outputs are later overwritten in place by downloads, and
+  through a hard link that would rewrite the source as well.
+- copy (sendfile / chunked, to a .part file then renamed)
+
+config staging.mode narrows this: "auto" (all three, default), "reflink"
+(never hardlink) or "copy".
+
+AssetStager runs staging on a small thread pool so the GUI thread and job
+submission don't wait for it:
+
+    stager = get_asset_stager()
+    stager.stage(src, dst, on_done=lambda path, method, err: job.__setitem__("image_path", path))
+"""
+
+import errno
+import os
+import shutil
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from services.telemetry import get_telemetry
+
+FICLONE = 0x40049409  # linux/fs.h _IOW(0x94, 9, int)
+MODES = ("auto", "reflink", "copy")
+
+
+_no_reflink = set()  # st_dev of filesystems that refused FICLONE
+
+
+def _reflink(src: str, dst: str) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+
+    try:
+        dev = os.stat(os.path.dirname(dst) or ".").st_dev
+    except OSError:
+        return False
+    if dev in _no_reflink:
+        return False
+    tmp = f"{dst}.part"
+    try:
+        with open(src, "rb") as fs, open(tmp, "wb") as fd:
+            fcntl.ioctl(fd.fileno(), FICLONE, fs.fileno())
+        shutil.copystat(src, tmp)
+        os.replace(tmp, dst)
+        return True
+    except OSError as e:
+        if e.errno in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.ENOSYS):
+            _no_reflink.add(dev)
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return False
+
+
+def _hardlink(src: str, dst: str) -> bool:
+    try:
+        if os.stat(src).st_dev != os.stat(os.path.dirname(dst) or ".").st_dev:
+            return False
+        tmp = f"{dst}.part"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        os.link(src, tmp)
+        os.replace(tmp, dst)
+        return True
+    except OSError:
+        return False
+
+
+def _copy(src: str, dst: str):
+    tmp = f"{dst}.part"
+    shutil.copyfile(src, tmp)  # sendfile where available, chunked otherwise
+    shutil.copystat(src, tmp)
+    os.replace(tmp, dst)
+
+
+def _already_staged(src: str, dst: str, linked_ok: bool = True) -> bool:
+    try:
+        a, b = os.stat(src), os.stat(dst)
+    except OSError:
+        return False
+    if os.path.samestat(a, b):
+        return linked_ok  # an old hard link must be replaced when links aren't allowed
+    return a.st_size == b.st_size and int(a.st_mtime) == int(b.st_mtime)
+
+
+def stage_file(src: str, dst: str, mode: str = "auto", link: bool = False) -> str:
+    """
+    Make ``src`` available at ``dst``; returns the method used
+    ("same", "existing", "reflink", "hardlink" or "copy"). Raises OSError
+    when even the copy fails.
+
+    Args:
+        link: Allow a hard link (mode "auto" only); for read-only inputs
+    """
+    link = link and mode == "auto"
+    if os.path.abspath(src) == os.path.abspath(dst):
+        return "same"
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    if _already_staged(src, dst, linked_ok=link):
+        return "existing"
+    if mode != "copy" and _reflink(src, dst):
+        return "reflink"
+    if link and _hardlink(src, dst):
+        return "hardlink"
+    _copy(src, dst)
+    return "copy"
+
+
+class AssetStager:
+    """Background stage_file() with per-destination futures"""
+
+    def __init__(self, mode: str = "auto", workers: int = 4):
+        self.mode = mode if mode in MODES else "auto"
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="stage")
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {}
+
+    def stage(self, src: str, dst: str,
+              on_done: Optional[Callable[[str, str, Optional[Exception]], None]] = None,
+              link: bool = False) -> "Future[str]":
+        """
+        Queue src -> dst. The future resolves to the path to use: dst, or src
+        if staging failed. on_done(path, method, error) runs on the pool thread.
+        link=True allows a hard link (see stage_file).
+        """
+        key = os.path.abspath(dst)
+        with self._lock:
+            # Same destination queued twice: the later one runs after the earlier
+            fut = self._pool.submit(self._run, src, dst, on_done, self._pending.get(key), link)
+            self._pending[key] = fut
+        fut.add_done_callback(lambda f, k=key: self._forget(k, f))
+        return fut
+
+    def _run(self, src: str, dst: str, on_done, previous: Optional[Future], link: bool) -> str:
+        if previous is not None:
+            try:
+                previous.result()
+            except Exception:
+                pass
+        error: Optional[Exception] = None
+        try:
+            method = stage_file(src, dst, self.mode, link=link)
+            path = dst
+        except OSError as e:
+            method, path, error = "failed", src, e
+        with self._lock:
+            self.stats[method] = self.stats.get(method, 0) + 1
+        get_telemetry().count("staged_files_total", method=method)
+        if on_done:
+            on_done(path, method, error)
+        return path
+
+    def _forget(self, key: str, fut: Future):
+        with self._lock:
+            if self._pending.get(key) is fut:
+                del self._pending[key]
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def wait(self, dst: Optional[str] = None, timeout: Optional[float] = None):
+        """Block until dst (or everything queued so far) is staged"""
+        with self._lock:
+            if dst:
+                futs = [self._pending.get(os.path.abspath(dst))]
+            else:
+                futs = list(self._pending.values())
+        for fut in futs:
+            if fut is not None:
+                fut.result(timeout)
+
+
+def _config() -> Tuple[str, int]:
+    try:
+        from utils import config as cfg
+        conf = cfg.load().get("staging") or {}
+    except Exception:
+        conf = {}
+    return str(conf.get("mode", "auto")), int(conf.get("workers", 4))
+
+
+_stager: Optional[AssetStager] = None
+_stager_lock = threading.Lock()
+
+
+def get_asset_stager() -> AssetStager:
+    """Process-wide stager (config staging.mode / staging.workers)"""
+    global _stager
+    with _stager_lock:
+        if _stager is None:
+            mode, workers = _config()
+            _stager = AssetStager(mode=mode, workers=workers)
+        return _stager
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+Job Records - compact, slot-based scene jobs and operation results
+
+Scene jobs used to be free-form dicts carrying the full prompt JSON, per-copy
+lists and maps, and every batch check kept the whole API item per operation.
+For multi-thousand-scene projects that is a lot of per-object dict overhead,
+and Qt ``dict`` signals deep-copied it on every row update.
+
+- PromptTable: prompts are stored once, keyed by hash; jobs keep the key
+- SceneJob: ``__slots__`` record with the dict interface the Labs clients and
+  panels already use (get / [] / setdefault / in), so start_one can fill it
+  in place; rarely used keys go to a small ``extra`` dict
+- OpResult: ``__slots__`` batch-check result; ``raw`` is trimmed to the
+  fields callers read (status, video fifeUrl, error message, sceneId)
+- to_dict() / from_dict(): explicit, JSON-safe serialization
+"""
+
+import hashlib
+import sys
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_MISSING = object()
+
+
+class PromptTable:
+    """Process-wide prompt store: identical prompts share one string"""
+
+    def __init__(self):
+        self._texts: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_of(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+    def intern(self, text: Any) -> str:
+        text = text if isinstance(text, str) else str(text or "")
+        key = self.key_of(text)
+        with self._lock:
+            self._texts.setdefault(key, text)
+        return key
+
+    def text(self, key: Optional[str]) -> str:
+        return self._texts.get(key, "") if key else ""
+
+    def __len__(self):
+        return len(self._texts)
+
+
+prompts = PromptTable()
+
+
+def trim_raw(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Batch-check item reduced to the fields callers read, in the same shape"""
+    src_op = item.get("operation") or {}
+    op: Dict[str, Any] = {}
+    if src_op.get("name"):
+        op["name"] = src_op["name"]
+    url = ((src_op.get("metadata") or {}).get("video") or {}).get("fifeUrl")
+    if url:
+        op["metadata"] = {"video": {"fifeUrl": url}}
+    message = (src_op.get("error") or {}).get("message")
+    if message:
+        op["error"] = {"message": message}
+    out: Dict[str, Any] = {"operation": op}
+    if item.get("status"):
+        out["status"] = sys.intern(item["status"])
+    if item.get("sceneId"):
+        out["sceneId"] = item["sceneId"]
+    return out
+
+
+class _SlotMapping:
+    """dict-style access over __slots__ (plus ``extra`` for unknown keys)"""
+
+    __slots__ = ()
+    _FIELDS: Tuple[str, ...] = ()
+
+    def _get(self, key: str) -> Any:
+        if key in self._FIELDS:
+            return getattr(self, key, _MISSING)
+        extra = getattr(self, "extra", None)
+        return extra.get(key, _MISSING) if extra else _MISSING
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._get(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._get(key)
+        return default if value is _MISSING else value
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self._FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return self._get(key) is not _MISSING
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        value = self._get(key)
+        if value is _MISSING:
+            self[key] = value = default
+        return value
+
+    def pop(self, key: str, default: Any = _MISSING) -> Any:
+        value = self._get(key)
+        if value is _MISSING:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        if key in self._FIELDS:
+            setattr(self, key, None)
+        else:
+            del self.extra[key]
+        return value
+
+    def keys(self) -> Iterator[str]:
+        for name in self._FIELDS:
+            if hasattr(self, name):
+                yield name
+        yield from (getattr(self, "extra", None) or {})
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for key in self.keys():
+            yield key, self[key]
+
+
+class SceneJob(_SlotMapping):
+    """
+    One scene of a project run. Reads like the old job dict:
+
+        job = SceneJob(scene_id="3", prompt=text, copies=2, image_path=img)
+        client.start_one(job, model, aspect, job["prompt"], copies=2)
+        job["video_by_idx"][0], job.get("account_name")
+    """
+
+    __slots__ = (
+        "scene_id", "prompt_key", "image_path", "image_name", "media_id", "status", "completed_at",
+        "operation_names", "operation_metadata", "op_index_map", "video_by_idx", "thumb_by_idx",
+        "downloaded_idx", "local_paths", "thumb_icons", "account_name", "bearer_token",
+        "_check_sig", "extra",
+    )
+    _FIELDS = __slots__[:-1]
+    # Not serialized: UI caches and change signatures
+    _TRANSIENT = ("thumb_icons", "_check_sig")
+
+    def __init__(self, scene_id: Any = "", prompt: Any = "", copies: int = 1,
+                 image_path: Optional[str] = None, image_name: str = "", status: str = "NEW"):
+        self.scene_id = str(scene_id)
+        self.prompt_key = prompts.intern(prompt)
+        self.image_path = image_path
+        self.image_name = image_name
+        self.media_id = None
+        self.status = status
+        self.completed_at = ""
+        self.operation_names: List[str] = []
+        self.operation_metadata: Dict[str, Dict] = {}
+        self.op_index_map: Dict[str, int] = {}
+        self.video_by_idx: List[Optional[str]] = [None] * copies
+        self.thumb_by_idx: List[Optional[str]] = [None] * copies
+        self.downloaded_idx = set()
+        self.local_paths: List[str] = []
+        self.thumb_icons: Dict[int, Any] = {}
+        self.account_name = None
+        self.bearer_token = None
+        self._check_sig = None
+        self.extra: Optional[Dict[str, Any]] = None
+
+    # "prompt" is stored as a PromptTable key
+    def _get(self, key: str) -> Any:
+        if key == "prompt":
+            return prompts.text(self.prompt_key)
+        return super()._get(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key == "prompt":
+            self.prompt_key = prompts.intern(value)
+        else:
+            super().__setitem__(key, value)
+
+    @property
+    def prompt(self) -> str:
+        return prompts.text(self.prompt_key)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe snapshot (prompt text included, UI caches dropped)"""
+        out = {name: getattr(self, name) for name in self._FIELDS
+               if name not in self._TRANSIENT and name != "prompt_key"}
+        out["prompt"] = self.prompt
+        out["downloaded_idx"] = sorted(self.downloaded_idx)
+        out["operation_names"] = list(self.operation_names)
+        if self.extra:
+            out.update(self.extra)
+        return out
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SceneJob":
+        job = cls(scene_id=data.get("scene_id", ""), prompt=data.get("prompt", ""),
+                  copies=len(data.get("video_by_idx") or [None]))
+        for key, value in data.items():
+            if key in ("scene_id", "prompt"):
+                continue
+            job[key] = set(value) if key == "downloaded_idx" else value
+        return job
+
+
+class OpResult(_SlotMapping):
+    """One operation from batch_check_operations; reads like the old result dict"""
+
+    __slots__ = ("status", "video_urls", "image_urls", "raw")
+    _FIELDS = __slots__
+    extra = None
+
+    def __init__(self, status: str, video_urls: List[str], image_urls: List[str],
+                 raw: Dict[str, Any]):
+        self.status = sys.intern(status or "")
+        self.video_urls = video_urls
+        self.image_urls = image_urls
+        self.raw = raw
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self._FIELDS:
+            raise KeyError(f"OpResult has no field {key!r}")
+        setattr(self, key, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"status": self.status, "video_urls": list(self.video_urls),
+                "image_urls": list(self.image_urls), "raw": self.raw}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OpResult":
+        return cls(data.get("status", ""), list(data.get("video_urls") or []),
+                   list(data.get("image_urls") or []), data.get("raw") or {})
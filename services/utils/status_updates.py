@@ -0,0 +1,86 @@
+"""Change-only, coalesced status updates for workers that report per-operation state"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List
+
+# Card fields the UI actually renders; anything else changing is not a transition
+CARD_FIELDS = ("status", "url", "path", "thumb", "error_reason", "completed_at")
+UI_REFRESH_SEC = 0.25  # At most ~4 batched UI updates per second per worker
+
+
+def card_key(card: Dict[str, Any]) -> tuple:
+    return (card.get("scene"), card.get("copy"))
+
+
+class TransitionFilter:
+    """Remembers the last state passed per key; changed() is True only on a real transition"""
+
+    def __init__(self, fields: Iterable[str] = CARD_FIELDS):
+        self.fields = tuple(fields)
+        self._last: Dict[Hashable, tuple] = {}
+        self._lock = threading.Lock()
+
+    def changed(self, key: Hashable, state: Dict[str, Any]) -> bool:
+        sig = tuple(state.get(f) for f in self.fields)
+        with self._lock:
+            if self._last.get(key) == sig:
+                return False
+            self._last[key] = sig
+            return True
+
+    def reset(self):
+        with self._lock:
+            self._last.clear()
+
+
+class Coalescer:
+    """
+    Keeps the latest update per key and hands them to ``flush_fn`` as one list,
+    at most every ``interval`` seconds (call flush() at the end of a round).
+    """
+
+    def __init__(self, flush_fn: Callable[[List[Any]], None], interval: float = UI_REFRESH_SEC):
+        self.flush_fn = flush_fn
+        self.interval = interval
+        self._pending: Dict[Hashable, Any] = {}  # insertion-ordered: first arrival keeps its place
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._pending[key] = value
+            due = time.monotonic() - self._last_flush >= self.interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            batch = list(self._pending.values())
+            self._pending.clear()
+            self._last_flush = time.monotonic()
+        if batch:
+            self.flush_fn(batch)
+
+
+class CardUpdates:
+    """
+    TransitionFilter + Coalescer for job cards; emit_batch receives lists of card copies.
+
+    Batches are the only output, so a consumer never sees a transition twice.
+    """
+
+    def __init__(self, emit_batch: Callable[[List[Dict[str, Any]]], None],
+                 interval: float = UI_REFRESH_SEC):
+        self.filter = TransitionFilter()
+        self.coalescer = Coalescer(emit_batch, interval)
+
+    def put(self, card: Dict[str, Any]) -> bool:
+        """Queue a card if it changed; returns False for a repeat of the last state"""
+        key = card_key(card)
+        if not self.filter.changed(key, card):
+            return False
+        self.coalescer.put(key, dict(card))  # The worker keeps mutating its card dicts
+        return True
+
+    def flush(self):
+        self.coalescer.flush()
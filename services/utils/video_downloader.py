@@ -1,6 +1,8 @@
 """Shared video download logic"""
 import os, requests
 
+from services.telemetry import get_telemetry
+
 class VideoDownloader:
     def __init__(self, log_callback=None):
         self.log = log_callback or print
@@ -29,19 +31,29 @@ class VideoDownloader:
                 "user-agent": "Mozilla/5.0"
             }
 
-        with requests.get(
+        span_ctx = get_telemetry().span("download", file=os.path.basename(output_path))
+        with span_ctx as span, requests.get(
             url, stream=True, timeout=timeout,
             allow_redirects=True, headers=headers
         ) as r:
             r.raise_for_status()
             total = int(r.headers.get('content-length', 0))
             downloaded = 0
-            with open(output_path, 'wb') as f:
-                for chunk in r.iter_content(8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-        if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
-            raise Exception("Download failed")
+            # Written beside the target and renamed over it: a file staged as a
+            # hard link or reflink gets a new inode instead of being rewritten
+            tmp_path = f"{output_path}.part"
+            try:
+                with open(tmp_path, 'wb') as f:
+                    for chunk in r.iter_content(8192):
+                        if chunk:
+                            f.write(chunk)
+                            downloaded += len(chunk)
+                if downloaded == 0:
+                    raise Exception("Download failed")
+                os.replace(tmp_path, output_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            span["bytes"] = downloaded
         self.log("[Download] ✓ Complete")
         return output_path
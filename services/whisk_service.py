@@ -7,13 +7,37 @@ Features:
 - Automatic retry logic with exponential backoff for transient 5xx errors
 - Detailed error parsing and logging from API responses
 - Configurable retry parameters (max_retries, retry_delay)
+- Per-workflow cache of uploaded media IDs and captions
+- Pooled HTTP session so many recipes can run concurrently
 """
 import base64
+import hashlib
+import threading
 import time
 import uuid
-from typing import Callable, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+
+WHISK_RECIPE_URL = "https://aisandbox-pa.googleapis.com/v1/whisk:runImageRecipe"
+MAX_CONCURRENT_RECIPES = 4
+CACHE_TTL = 3600.0  # Uploaded media IDs and workflows are dropped after this many seconds
+
+_session = None
+_session_lock = threading.Lock()
+
+# (workflow_id, image digest) -> uploadMediaGenerationId
+_media_cache: Dict[Tuple[str, str], str] = {}
+# image digest -> caption
+_caption_cache: Dict[str, str] = {}
+# tuple of image digests -> (workflow_id, session_id)
+_workflow_cache: Dict[Tuple[str, ...], Tuple[str, str]] = {}
+_cache_lock = threading.Lock()
+# When the caches were last cleared, and for which session credentials
+_cache_born = time.time()
+_cache_owner: Optional[str] = None
 
 
 class WhiskError(Exception):
@@ -116,6 +140,71 @@ def get_bearer_token() -> str:
     )
 
 
+def _http() -> requests.Session:
+    """Shared keep-alive session sized for concurrent recipe runs"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONCURRENT_RECIPES * 4)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def _file_digest(image_path: str) -> str:
+    """Content hash of an image file (cache key for uploads and captions)"""
+    h = hashlib.sha1()
+    with open(image_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def get_workflow(image_paths: List[str]) -> Tuple[str, str]:
+    """
+    Get (workflow_id, session_id) for a set of reference images.
+
+    The same images always map to the same workflow, so their uploads are
+    reused by upload_image_whisk instead of being sent again on every call.
+    """
+    try:
+        key = tuple(_file_digest(p) for p in image_paths if p)
+    except OSError:
+        key = tuple(image_paths)
+    _expire_caches()
+    with _cache_lock:
+        wf = _workflow_cache.get(key)
+        if wf is None:
+            wf = (str(uuid.uuid4()), f";{int(time.time() * 1000)}")
+            _workflow_cache[key] = wf
+        return wf
+
+
+def clear_media_cache():
+    """Forget cached uploads, captions and workflows (e.g. after a token change)"""
+    global _cache_born
+    with _cache_lock:
+        _media_cache.clear()
+        _caption_cache.clear()
+        _workflow_cache.clear()
+        _cache_born = time.time()
+
+
+def _expire_caches():
+    """Clear the caches once they outlive CACHE_TTL or the session token changes"""
+    global _cache_owner
+    try:
+        owner = hashlib.sha1(get_session_cookies().encode()).hexdigest()
+    except WhiskError:
+        owner = None
+    with _cache_lock:
+        stale = owner != _cache_owner or time.time() - _cache_born > CACHE_TTL
+        _cache_owner = owner
+    if stale:
+        clear_media_cache()
+
+
 def caption_image(image_path: str, log_callback: Optional[Callable] = None) -> Optional[str]:
     """
     Step 1: Caption image using backbone.captionImage
@@ -132,6 +221,13 @@ def caption_image(image_path: str, log_callback: Optional[Callable] = None) -> O
             log_callback(msg)
 
     try:
+        digest = _file_digest(image_path)
+        with _cache_lock:
+            cached = _caption_cache.get(digest)
+        if cached:
+            log(f"[INFO] Whisk: Using cached caption ({len(cached)} chars)")
+            return cached
+
         # Read and encode image
         with open(image_path, 'rb') as f:
             image_data = f.read()
@@ -175,7 +271,7 @@ def caption_image(image_path: str, log_callback: Optional[Callable] = None) -> O
 
         log("[INFO] Whisk: Captioning image...")
 
-        response = requests.post(url, json=payload, headers=headers, timeout=60)
+        response = _http().post(url, json=payload, headers=headers, timeout=60)
 
         if response.status_code != 200:
             log(f"[ERROR] Caption failed with status {response.status_code}")
@@ -189,6 +285,9 @@ def caption_image(image_path: str, log_callback: Optional[Callable] = None) -> O
             if 'candidates' in result and result['candidates']:
                 caption = result['candidates'][0].get('caption', '')
                 log(f"[INFO] Whisk: Got caption ({len(caption)} chars)")
+                if caption:
+                    with _cache_lock:
+                        _caption_cache[digest] = caption
                 return caption
         except (KeyError, TypeError, IndexError):
             log("[ERROR] Could not parse caption from response")
@@ -223,6 +322,13 @@ def upload_image_whisk(image_path: str, workflow_id: str, session_id: str, log_c
             log_callback(msg)
 
     try:
+        cache_key = (workflow_id, _file_digest(image_path))
+        with _cache_lock:
+            cached = _media_cache.get(cache_key)
+        if cached:
+            log(f"[INFO] Whisk: Reusing uploaded mediaGenerationId: {cached[:30]}...")
+            return cached
+
         # Read and encode image
         with open(image_path, 'rb') as f:
             image_data = f.read()
@@ -259,7 +365,7 @@ def upload_image_whisk(image_path: str, workflow_id: str, session_id: str, log_c
 
         log(f"[INFO] Whisk: Uploading {image_path.split('/')[-1]}...")
 
-        response = requests.post(url, json=payload, headers=headers, timeout=60)
+        response = _http().post(url, json=payload, headers=headers, timeout=60)
         log(f"[INFO] Whisk: Upload response status {response.status_code}")
 
         if response.status_code != 200:
@@ -273,6 +379,8 @@ def upload_image_whisk(image_path: str, workflow_id: str, session_id: str, log_c
         try:
             media_id = data['result']['data']['json']['result']['uploadMediaGenerationId']
             log(f"[INFO] Whisk: Got mediaGenerationId: {media_id[:30]}...")
+            with _cache_lock:
+                _media_cache[cache_key] = media_id
             return media_id
         except (KeyError, TypeError):
             log("[ERROR] No mediaGenerationId in upload response")
@@ -291,6 +399,54 @@ def upload_image_whisk(image_path: str, workflow_id: str, session_id: str, log_c
         return None
 
 
+def _extract_image(data: dict, log: Callable) -> Tuple[Optional[bytes], Optional[str]]:
+    """
+    Pull image bytes out of a runImageRecipe response.
+
+    Returns:
+        (image_bytes, None) when the image is ready,
+        (None, generation_id) when the generation is still pending,
+        (None, None) when the response has neither
+    """
+    result = data.get('imageRecipeResult') or data.get('image') or data
+    if not isinstance(result, dict):
+        return None, None
+
+    # imagePanels[].generatedImages[] layout used by the Whisk web client
+    for panel in result.get('imagePanels') or []:
+        for generated in (panel or {}).get('generatedImages') or []:
+            if isinstance(generated, dict) and generated.get('encodedImage'):
+                result = {'generatedImage': generated}
+                break
+        else:
+            continue
+        break
+
+    img_data = result.get('generatedImage') or result.get('image') or {}
+    if not isinstance(img_data, dict):
+        img_data = {}
+    b64_data = (img_data.get('rawBytes') or img_data.get('encodedImage')
+                or result.get('encodedImage'))
+    if b64_data:
+        if b64_data.startswith('data:'):
+            # Extract base64 part from data URI
+            b64_data = b64_data.split(',', 1)[1]
+        return base64.b64decode(b64_data), None
+
+    download_url = (img_data.get('signedUrl') or img_data.get('downloadUrl')
+                    or img_data.get('fifeUrl'))
+    if download_url:
+        log("[INFO] Whisk: Downloading image from URL...")
+        img_response = _http().get(download_url, timeout=60)
+        if img_response.status_code == 200:
+            return img_response.content, None
+
+    gen_id = result.get('generationId') or result.get('mediaGenerationId')
+    if isinstance(gen_id, dict):
+        gen_id = gen_id.get('mediaGenerationId')
+    return None, gen_id
+
+
 def run_image_recipe(
     prompt: str,
     recipe_media_inputs: list,
@@ -325,7 +481,7 @@ def run_image_recipe(
         # Get bearer token for API authentication - this may raise WhiskError if not configured
         bearer_token = get_bearer_token()
 
-        url = "https://aisandbox-pa.googleapis.com/v1/whisk:runImageRecipe"
+        url = WHISK_RECIPE_URL
 
         headers = {
             "authorization": f"Bearer {bearer_token}",
@@ -366,7 +522,7 @@ def run_image_recipe(
                     log(f"[RETRY] Attempt {attempt + 1}/{max_retries} after {delay}s delay...")
                     time.sleep(delay)
 
-                response = requests.post(url, json=payload, headers=headers, timeout=120)
+                response = _http().post(url, json=payload, headers=headers, timeout=120)
 
                 if response.status_code != 200:
                     # Try to parse error response as JSON
@@ -402,49 +558,26 @@ def run_image_recipe(
                 # Success - parse response
                 data = response.json()
 
-                # Parse the response to get generation ID or result
-                # Response structure may vary, typical patterns:
-                # 1. Immediate result with image data
-                # 2. Generation ID for polling
-
+                # Response is either the finished image (inline bytes or a
+                # download URL) or a generation ID for an async generation
                 try:
-                    # Try to extract image data if available immediately
-                    if 'imageRecipeResult' in data:
-                        result = data['imageRecipeResult']
-
-                        # Check for direct image data
-                        if 'generatedImage' in result:
-                            img_data = result['generatedImage']
-                            if 'rawBytes' in img_data:
-                                # Base64 encoded image
-                                b64_data = img_data['rawBytes']
-                                if b64_data.startswith('data:'):
-                                    # Extract base64 part from data URI
-                                    b64_data = b64_data.split(',', 1)[1]
-                                return base64.b64decode(b64_data)
-                            elif 'signedUrl' in img_data or 'downloadUrl' in img_data:
-                                # Download from URL
-                                download_url = img_data.get('signedUrl') or img_data.get('downloadUrl')
-                                log("[INFO] Whisk: Downloading image from URL...")
-                                img_response = requests.get(download_url, timeout=60)
-                                if img_response.status_code == 200:
-                                    return img_response.content
-
-                        # Check for generation ID for polling
-                        if 'generationId' in result or 'mediaGenerationId' in result:
-                            gen_id = result.get('generationId') or result.get('mediaGenerationId')
-                            log(f"[INFO] Whisk: Got generation ID: {gen_id[:30]}...")
-                            # NOTE: Async generation polling not yet implemented
-                            # Whisk API returns generation ID for async requests that need to be polled
-                            # This is a known limitation - immediate results only
-                            log("[LIMITATION] Whisk: Async polling not implemented - only immediate results supported")
-                            return None
+                    image, gen_id = _extract_image(data, log)
+                    if image:
+                        return image
+                    if gen_id:
+                        log(f"[INFO] Whisk: Got generation ID: {gen_id[:30]}...")
+                        # NOTE: Async generation polling not yet implemented
+                        # Whisk API returns generation ID for async requests that need to be polled
+                        # This is a known limitation - immediate results only
+                        log("[LIMITATION] Whisk: Async polling not implemented"
+                            " - only immediate results supported")
+                        return None
 
                     log("[ERROR] Whisk: Unexpected response structure")
                     log(f"[DEBUG] Response keys: {list(data.keys())}")
                     return None
 
-                except (KeyError, TypeError, IndexError) as e:
+                except (KeyError, TypeError, IndexError, ValueError) as e:
                     log(f"[ERROR] Whisk: Failed to parse response - {str(e)}")
                     log(f"[DEBUG] Response: {str(data)[:300]}")
                     return None
@@ -516,10 +649,6 @@ def generate_image(prompt: str, model_image: Optional[str] = None, product_image
             log("[INFO] See README.md for instructions on obtaining these credentials")
             return None
 
-        # Generate IDs
-        workflow_id = str(uuid.uuid4())
-        session_id = f";{int(time.time() * 1000)}"
-
         # Prepare reference images
         images_to_process = []
         if model_image:
@@ -530,34 +659,12 @@ def generate_image(prompt: str, model_image: Optional[str] = None, product_image
         if not images_to_process:
             raise WhiskError("No reference images provided")
 
-        log(f"[INFO] Whisk: Processing {len(images_to_process)} reference images...")
-
-        # Step 1 & 2: Caption and upload each image
-        recipe_media_inputs = []
-
-        for idx, img_path in enumerate(images_to_process, 1):
-            log(f"[INFO] Whisk: Processing image {idx}/{len(images_to_process)}...")
-
-            # Caption
-            caption = caption_image(img_path, log)
-            if not caption:
-                log(f"[WARN] No caption for image {idx}, using default")
-                caption = "Reference image"
+        # Same reference images -> same workflow, so uploads are reused
+        workflow_id, session_id = get_workflow(images_to_process)
 
-            # Upload
-            media_id = upload_image_whisk(img_path, workflow_id, session_id, log)
-
-            if media_id:
-                recipe_media_inputs.append({
-                    "caption": caption,
-                    "mediaInput": {
-                        "mediaCategory": "MEDIA_CATEGORY_SUBJECT",
-                        "mediaGenerationId": media_id
-                    }
-                })
-            else:
-                log(f"[ERROR] Failed to upload image {idx}")
+        log(f"[INFO] Whisk: Processing {len(images_to_process)} reference images...")
 
+        recipe_media_inputs = prepare_media_inputs(images_to_process, workflow_id, session_id, log)
         if not recipe_media_inputs:
             log("[ERROR] Whisk: No images uploaded successfully")
             raise WhiskError("No images uploaded")
@@ -589,3 +696,111 @@ def generate_image(prompt: str, model_image: Optional[str] = None, product_image
     except Exception as e:
         log(f"[ERROR] Whisk: Unexpected error - {str(e)[:100]}")
         return None
+
+
+def prepare_media_inputs(image_paths: List[str], workflow_id: str, session_id: str,
+                         log_callback: Optional[Callable] = None) -> List[dict]:
+    """
+    Steps 1 & 2: caption and upload reference images (cached per workflow)
+
+    Returns:
+        recipeMediaInputs list for run_image_recipe
+    """
+    def log(msg):
+        if log_callback:
+            log_callback(msg)
+
+    recipe_media_inputs = []
+    for idx, img_path in enumerate(image_paths, 1):
+        log(f"[INFO] Whisk: Processing image {idx}/{len(image_paths)}...")
+
+        # Caption
+        caption = caption_image(img_path, log)
+        if not caption:
+            log(f"[WARN] No caption for image {idx}, using default")
+            caption = "Reference image"
+
+        # Upload
+        media_id = upload_image_whisk(img_path, workflow_id, session_id, log)
+
+        if media_id:
+            recipe_media_inputs.append({
+                "caption": caption,
+                "mediaInput": {
+                    "mediaCategory": "MEDIA_CATEGORY_SUBJECT",
+                    "mediaGenerationId": media_id
+                }
+            })
+        else:
+            log(f"[ERROR] Failed to upload image {idx}")
+
+    return recipe_media_inputs
+
+
+def generate_images(prompts: List[str], model_image: Optional[str] = None,
+                    product_image: Optional[str] = None,
+                    aspect_ratio: str = "IMAGE_ASPECT_RATIO_PORTRAIT",
+                    debug_callback: Optional[Callable] = None,
+                    max_workers: int = MAX_CONCURRENT_RECIPES,
+                    should_stop: Optional[Callable[[], bool]] = None) -> List[Optional[bytes]]:
+    """
+    Generate one image per prompt with the same reference images.
+
+    Reference images are captioned and uploaded once; the recipes then run
+    concurrently on the pooled session. When ``should_stop`` returns True,
+    recipes that have not started yet are cancelled and left as None.
+
+    Returns:
+        List of image bytes (None for failed prompts), in prompt order
+    """
+    def log(msg):
+        if debug_callback:
+            debug_callback(msg)
+
+    images_to_process = [p for p in (model_image, product_image) if p]
+    if not prompts:
+        return []
+    if not images_to_process:
+        log("[ERROR] Whisk: No reference images provided")
+        return [None] * len(prompts)
+
+    try:
+        get_session_cookies()
+        get_bearer_token()
+    except WhiskError as config_error:
+        log(f"[ERROR] Whisk configuration missing: {str(config_error)}")
+        return [None] * len(prompts)
+
+    workflow_id, session_id = get_workflow(images_to_process)
+    media_inputs = prepare_media_inputs(images_to_process, workflow_id, session_id, log)
+    if not media_inputs:
+        log("[ERROR] Whisk: No images uploaded successfully")
+        return [None] * len(prompts)
+
+    log(f"[INFO] Whisk: Running {len(prompts)} recipes ({max_workers} concurrent)...")
+
+    def _one(prompt):
+        try:
+            return run_image_recipe(prompt=prompt, recipe_media_inputs=media_inputs,
+                                    workflow_id=workflow_id, session_id=session_id,
+                                    aspect_ratio=aspect_ratio, log_callback=log)
+        except Exception as e:
+            log(f"[ERROR] Whisk: Recipe failed - {str(e)[:100]}")
+            return None
+
+    results: List[Optional[bytes]] = [None] * len(prompts)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers),
+                            thread_name_prefix="WhiskRecipe") as pool:
+        futs = {pool.submit(_one, p): i for i, p in enumerate(prompts)}
+        pending = set(futs)
+        while pending:
+            done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            for fut in done:
+                if not fut.cancelled():
+                    results[futs[fut]] = fut.result()
+            if pending and should_stop and should_stop():
+                for fut in pending:
+                    fut.cancel()
+                log("[INFO] Whisk: Stopped, pending recipes cancelled")
+                break
+    return results
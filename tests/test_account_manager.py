@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+from services import key_check_service as kcs
+from services.account_manager import AccountManager, LabsAccount
+from services.core import key_manager
+
+
+def _fake_checks(monkeypatch, bad, keys):
+    calls = []
+
+    def check_many(items, ttl=None):
+        items = list(items)
+        calls.append(items)
+        return {(kind, key): (key not in bad, "") for kind, key in items}
+
+    monkeypatch.setattr(kcs, "check_many", check_many)
+    monkeypatch.setattr(key_manager, "get_all_keys", lambda kind: list(keys.get(kind, [])))
+    return calls
+
+
+def test_preflight_checks_tokens_and_api_keys_in_one_pass(monkeypatch):
+    calls = _fake_checks(monkeypatch, bad={"t2", "g-bad"},
+                         keys={"google": ["g-ok", "g-bad"], "elevenlabs": ["e1"]})
+    mgr = AccountManager([LabsAccount("a", "p1", ["t1", "t2"]),
+                          LabsAccount("b", "p2", ["t2"]),
+                          LabsAccount("off", "p3", ["t3"], enabled=False)])
+    messages = []
+
+    assert mgr.preflight_check(log=messages.append) == {"a": 1, "b": 0}
+    assert len(calls) == 1
+    assert set(calls[0]) == {("labs", "t1"), ("labs", "t2"), ("google", "g-ok"),
+                             ("google", "g-bad"), ("elevenlabs", "e1")}
+    assert mgr.accounts[0].live_tokens() == ["t1"]
+    assert [a.name for a in mgr.get_healthy_accounts()] == ["a"]
+    assert mgr.dead_api_keys == {"google": {"g-bad"}, "elevenlabs": set(), "openai": set()}
+    assert "no valid tokens for: b" in messages[0]
+    assert "invalid API keys: 1 google" in messages[0]
+
+
+def test_preflight_can_skip_api_keys(monkeypatch):
+    calls = _fake_checks(monkeypatch, bad=set(), keys={"google": ["g"]})
+    mgr = AccountManager([LabsAccount("a", "p1", ["t1"])])
+    mgr.preflight_check(api_keys=False)
+    assert calls == [[("labs", "t1")]]
+    assert mgr.dead_api_keys == {}
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+from utils import config as cfg
+
+
+def test_default_project_id_prefers_top_level_key():
+    conf = {"default_project_id": " top ", "labs": {"default_project_id": "nested"}}
+    assert cfg.default_project_id(conf) == "top"
+
+
+def test_default_project_id_falls_back_to_nested_labs_key():
+    conf = {"default_project_id": "", "labs": {"default_project_id": "nested"}}
+    assert cfg.default_project_id(conf) == "nested"
+    assert cfg.default_project_id({"labs": None}) == ""
+    assert cfg.default_project_id({}) == ""
+
+
+def test_default_project_id_loads_config_when_omitted(monkeypatch, tmp_path):
+    path = tmp_path / "cfg.json"
+    path.write_text('{"labs": {"default_project_id": "from-disk"}}', encoding="utf-8")
+    monkeypatch.setattr(cfg, "CFG_PATH", str(path))
+    assert cfg.default_project_id() == "from-disk"
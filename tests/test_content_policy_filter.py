@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from services.google.content_policy_filter import apply_replacements, scan_text
+
+
+def _age_up(text):
+    return apply_replacements(text, scan_text(text))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("two kids play", "two young people play"),
+    ("a group of teens", "a group of young adults"),
+    ("toddlers laughing", "young adults laughing"),
+    ("babies sleeping", "young people sleeping"),
+    ("the children sing", "the young people sing"),
+    ("a Kid runs", "a young person runs"),
+])
+def test_english_keywords_and_plurals(text, expected):
+    assert _age_up(text) == expected
+
+
+@pytest.mark.parametrize("text", ["kidnap scene", "a childish joke", "minority report", "teensy"])
+def test_keywords_inside_words_do_not_match(text):
+    assert scan_text(text) == ()
+
+
+def test_longest_keyword_wins():
+    matches = scan_text("một cô bé và em bé")
+    assert [(m.text, m.lang) for m in matches] == [("cô bé", "vi"), ("em bé", "vi")]
+    assert _age_up("một cô bé và em bé") == "một cô gái trẻ và người trẻ"
+
+
+def test_vietnamese_match_is_case_insensitive():
+    matches = scan_text("Cô Bé quàng khăn đỏ")
+    assert len(matches) == 1
+    assert matches[0].text == "Cô Bé"
+    assert matches[0].replacement == "cô gái trẻ"
+
+
+@pytest.mark.parametrize("text", ["chiếc bè trôi", "bế con", "bẻ cành", "bể bơi"])
+def test_diacritics_are_significant(text):
+    assert scan_text(text) == ()
+
+
+def test_ages_under_min_age_are_raised():
+    matches = scan_text("a 12 year-old and an 8 tuổi")
+    assert [m.lang for m in matches] == ["en_age", "vi_age"]
+    assert _age_up("a 12 year-old and an 8 tuổi") == "a 20 year-old and an 20 tuổi"
+    assert _age_up("she is 16 years old") == "she is 20 years old"
+
+
+def test_adult_ages_and_min_age():
+    assert scan_text("a 25 years old man") == ()
+    assert scan_text("a 17 years old man", min_age=16) == ()
+    assert scan_text("a 15 years old man", min_age=16) != ()
+
+
+def test_spans_point_into_text():
+    text = "Once a little girl met two kids."
+    for m in scan_text(text):
+        assert text[m.start:m.end] == m.text
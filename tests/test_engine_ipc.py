@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+
+import pytest
+
+from services.engine.ipc import EngineClient, EngineServer, read_token, serve_args
+from services.engine.job_queue import JobQueue, run_ticket
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="Unix socket transport")
+
+
+@pytest.fixture
+def server():
+    # Short directory: Unix socket paths are limited to ~100 bytes
+    root = tempfile.mkdtemp(prefix="veo_ipc_")
+    server = EngineServer(os.path.join(root, "engine.sock"), spool_dir=os.path.join(root, "spool"),
+                          config={}, token_path=os.path.join(root, "engine.token"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    deadline = time.time() + 5
+    while not EngineClient(server.address, token_path=server.token_path).ping():
+        assert time.time() < deadline, "engine did not start"
+        time.sleep(0.05)
+    yield server
+    server.shutdown()
+    thread.join(5)
+    shutil.rmtree(root, ignore_errors=True)
+
+
+def test_token_file_is_private(server):
+    assert read_token(server.token_path)
+    assert stat.S_IMODE(os.stat(server.token_path).st_mode) == 0o600
+
+
+def test_requests_without_the_token_are_refused(server, tmp_path):
+    wrong = tmp_path / "other.token"
+    wrong.write_text("not-the-token")
+    intruder = EngineClient(server.address, token_path=str(wrong))
+    assert not intruder.ping()
+    assert intruder.request("shutdown") == {"ok": False, "error": "Unauthorized"}
+    assert intruder.request("submit", scenes=["x"], out_dir=str(tmp_path))["ok"] is False
+    assert server.queue.counts()["incoming"] == 0
+
+    missing = EngineClient(server.address, token_path=str(tmp_path / "missing"))
+    assert not missing.ping()
+    assert EngineClient(server.address, token_path=server.token_path).ping()
+
+
+def test_serve_args_reach_the_same_address():
+    assert serve_args("/tmp/e.sock", "/tmp/t") == ["--socket", "/tmp/e.sock",
+                                                   "--token-file", "/tmp/t"]
+    assert serve_args(("127.0.0.1", 5000), "/tmp/t") == ["--host", "127.0.0.1", "--port", "5000",
+                                                          "--token-file", "/tmp/t"]
+
+
+def test_per_scene_aspect_ratios_reach_the_engine(tmp_path):
+    runs = []
+
+    class Engine:
+        def run(self, scenes, out_dir, **kw):
+            runs.append(kw)
+            return []
+
+    queue = JobQueue(str(tmp_path / "spool"))
+    queue.submit(None, str(tmp_path), scenes=["a", "b"], aspect_ratio="16:9",
+                 aspect_ratios=["16:9", "9:16"])
+    run_ticket(queue.claim(), lambda **kw: Engine())
+    assert runs[0]["aspect_ratios"] == ["16:9", "9:16"]
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+import json
+import sqlite3
+
+import pytest
+
+from services.history_service import HistoryService
+
+
+@pytest.fixture
+def service(tmp_path):
+    return HistoryService(history_file=str(tmp_path / "history.json"))
+
+
+def test_json_history_is_migrated_once(tmp_path):
+    legacy = tmp_path / "history.json"
+    # Legacy file is newest first
+    legacy.write_text(json.dumps([
+        {"timestamp": "2025-01-02 10:00:00", "idea": "newer", "style": "anime"},
+        {"timestamp": "2025-01-01 10:00:00", "idea": "older", "style": "film",
+         "panel_type": "videobanhang", "video_count": 3},
+    ]), encoding="utf-8")
+
+    service = HistoryService(history_file=str(legacy))
+    assert service.db_path == str(tmp_path / "history.db")
+    entries = service.get_history()
+    assert [e.idea for e in entries] == ["newer", "older"]
+    assert entries[1].to_dict()["video_count"] == 3
+    assert legacy.exists()
+
+    service.clear_history()
+    reopened = HistoryService(history_file=str(legacy))
+    assert reopened.count() == 0
+
+
+def test_unreadable_json_is_skipped(tmp_path):
+    legacy = tmp_path / "history.json"
+    legacy.write_text("{not json", encoding="utf-8")
+    service = HistoryService(history_file=str(legacy))
+    assert service.count() == 0
+    service.add_entry("idea", "style")
+    assert service.count() == 1
+
+
+def test_search_ignores_accents_and_matches_prefixes(service):
+    if not service.fts:
+        pytest.skip("SQLite built without FTS5")
+    service.add_entry("Cà phê sữa đá buổi sáng", "cinematic", genre="đời sống")
+    service.add_entry("Trà chanh", "anime", folder_path="/videos/tra_chanh")
+
+    assert [e.idea for e in service.search("ca phe")] == ["Cà phê sữa đá buổi sáng"]
+    assert [e.idea for e in service.search("sa")] == ["Cà phê sữa đá buổi sáng"]
+    # Tones are folded; "đ" is a letter of its own, not an accented "d"
+    assert [e.idea for e in service.search("đoi song")] == ["Cà phê sữa đá buổi sáng"]
+    assert service.search("doi song") == []
+    assert [e.idea for e in service.search("anime tra")] == ["Trà chanh"]
+    assert service.search("ca phe anime") == []
+    assert service.count(query="cinematic") == 1
+
+
+def test_search_with_punctuation_only_falls_back_to_like(service):
+    service.add_entry("50% off", "promo")
+    service.add_entry("plain", "promo")
+    assert [e.idea for e in service.search("%")] == ["50% off"]
+
+
+def test_paging_and_panel_filter(service):
+    for n in range(25):
+        service.add_entry(f"idea {n}", "style",
+                          panel_type="videobanhang" if n % 5 == 0 else "text2video")
+
+    first = service.get_history(limit=10)
+    assert [e.idea for e in first] == [f"idea {n}" for n in range(24, 14, -1)]
+    last = service.get_history(limit=10, offset=20)
+    assert [e.idea for e in last] == [f"idea {n}" for n in range(4, -1, -1)]
+
+    assert service.count() == 25
+    assert service.count(panel_type="videobanhang") == 5
+    shop = service.search("idea", panel_type="videobanhang", limit=2, offset=1)
+    assert [e.idea for e in shop] == ["idea 15", "idea 10"]
+
+
+def test_delete_entry_id_and_clear_by_panel(service):
+    a = service.add_entry("a", "s")
+    service.add_entry("b", "s", panel_type="videobanhang")
+    assert service.delete_entry_id(a.entry_id)
+    assert not service.delete_entry_id(a.entry_id)
+    if service.fts:
+        assert service.search("a") == []
+
+    service.add_entry("c", "s")
+    service.clear_history("videobanhang")
+    assert [e.idea for e in service.get_history()] == ["c"]
+
+
+def test_search_falls_back_to_substring_without_prefix_hits(service):
+    service.add_entry("myvideo intro", "promo")
+    service.add_entry("unrelated", "promo")
+    assert [e.idea for e in service.search("video")] == ["myvideo intro"]
+    assert service.count(query="video") == 1
+    # A word-prefix hit wins; substrings are not mixed in
+    service.add_entry("video outro", "promo")
+    if service.fts:
+        assert [e.idea for e in service.search("video")] == ["video outro"]
+
+
+def test_concurrent_migration_imports_once(tmp_path, monkeypatch):
+    legacy = tmp_path / "history.json"
+    legacy.write_text(json.dumps([{"timestamp": "2025-01-01 10:00:00", "idea": "only"}]),
+                      encoding="utf-8")
+    first = HistoryService(history_file=str(legacy))
+
+    # A second instance that checked the marker before the first one committed
+    raced = _SkipFirstMarkerCheck(sqlite3.connect(first.db_path, isolation_level=None))
+    monkeypatch.setattr(HistoryService, "_conn", lambda self: raced)
+    HistoryService(history_file=str(legacy))
+    monkeypatch.undo()
+    assert first.count() == 1
+
+class _SkipFirstMarkerCheck:
+    """Connection whose first json_migrated lookup misses, as in a race"""
+
+    def __init__(self, conn):
+        self.conn, self.raced = conn, False
+
+    def execute(self, sql, *args):
+        if "json_migrated" in sql and sql.startswith("SELECT") and not self.raced:
+            self.raced = True
+            return self.conn.execute("SELECT 1 WHERE 0")
+        return self.conn.execute(sql, *args)
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+
+import pytest
+
+from services.engine.job_queue import STALE_SEC, JobQueue
+from services.project_scheduler import PRIORITY_INTERACTIVE
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "spool"))
+
+
+def _age(queue, job_id, seconds):
+    path = queue._path("running", job_id)
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def test_claim_moves_ticket_to_running(queue, tmp_path):
+    a = queue.submit(None, str(tmp_path / "out"), scenes=["a"])
+    b = queue.submit(None, str(tmp_path / "out"), scenes=["b"])
+    claimed = {queue.claim()["id"], queue.claim()["id"]}
+    assert claimed == {a, b}
+    assert queue.claim() is None
+    assert queue.counts() == {"incoming": 0, "running": 2, "done": 0, "failed": 0}
+
+
+def test_claim_records_owner(queue, tmp_path):
+    job_id = queue.submit(None, str(tmp_path), scenes=["a"])
+    ticket = queue.claim()
+    assert ticket["id"] == job_id
+    status = queue.status(job_id)
+    assert status["state"] == "running"
+    assert status["owner"]["pid"] == os.getpid()
+
+
+def test_requeue_only_stale_tickets(queue, tmp_path):
+    queue.submit(None, str(tmp_path), scenes=["a"])
+    queue.submit(None, str(tmp_path), scenes=["b"])
+    live = queue.claim()["id"]
+    dead = queue.claim()["id"]
+    assert queue.requeue_running() == 0
+
+    _age(queue, dead, STALE_SEC + 10)
+    assert queue.requeue_running() == 1
+    assert queue.status(dead)["state"] == "incoming"
+    assert queue.status(live)["state"] == "running"
+
+    # A requeued ticket is claimable again and starts with a fresh heartbeat
+    assert queue.claim()["id"] == dead
+    assert queue.requeue_running() == 0
+
+
+def test_heartbeat_keeps_ticket_owned(queue, tmp_path):
+    job_id = queue.submit(None, str(tmp_path), scenes=["a"])
+    queue.claim()
+    _age(queue, job_id, STALE_SEC + 10)
+    queue.heartbeat([job_id, "missing"])
+    assert queue.requeue_running() == 0
+
+
+def test_finish_and_cancel(queue, tmp_path):
+    queue.submit(None, str(tmp_path), scenes=["a"])
+    queue.submit(None, str(tmp_path), scenes=["b"])
+    ok, bad = queue.claim(), queue.claim()
+    waiting = queue.submit(None, str(tmp_path), scenes=["c"])
+    queue.finish(ok, result={"videos": 1})
+    queue.finish(bad, error="boom")
+
+    assert queue.status(ok["id"])["result"] == {"videos": 1}
+    assert queue.status(bad["id"])["error"] == "boom"
+    assert queue.cancel(waiting)
+    assert not queue.cancel(waiting)
+    assert queue.status(waiting)["state"] == "failed"
+    assert queue.counts() == {"incoming": 0, "running": 0, "done": 1, "failed": 2}
+    assert queue.status("nope") is None
+
+
+def test_claim_order_priority_then_deadline(queue, tmp_path):
+    out = str(tmp_path / "out")
+    batch = queue.submit(None, out, scenes=["a"])
+    background = queue.submit(None, out, scenes=["b"], priority="background")
+    interactive = queue.submit(None, out, scenes=["c"], priority="interactive")
+    urgent_batch = queue.submit(None, out, scenes=["d"], deadline=time.time() + 60)
+
+    claimed = []
+    while True:
+        ticket = queue.claim()
+        if ticket is None:
+            break
+        claimed.append(ticket["id"])
+    assert claimed == [interactive, urgent_batch, batch, background]
+
+
+def test_claim_min_priority(queue, tmp_path):
+    queue.submit(None, str(tmp_path), scenes=["a"])
+    assert queue.claim(min_priority=PRIORITY_INTERACTIVE) is None
+    assert queue.claim() is not None
+
+
+def test_submit_rejects_unknown_priority(queue, tmp_path):
+    with pytest.raises(ValueError):
+        queue.submit(None, str(tmp_path), scenes=["a"], priority="urgent")
+    assert queue.counts()["incoming"] == 0
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from services.utils.job_records import OpResult, SceneJob, prompts, trim_raw
+
+
+def _roundtrip(obj):
+    return type(obj).from_dict(json.loads(json.dumps(obj.to_dict())))
+
+
+def test_scene_job_roundtrip():
+    job = SceneJob(scene_id=3, prompt="a cat on a mat", copies=2, image_path="/tmp/x.png")
+    job["operation_names"].append("op-1")
+    job["op_index_map"]["op-1"] = 0
+    job["video_by_idx"][0] = "https://example/v.mp4"
+    job["downloaded_idx"].add(0)
+    job["account_name"] = "acc1"
+    job["thumb_icons"][0] = object()  # UI cache: not serialized
+    job["custom_note"] = "kept in extra"
+
+    data = job.to_dict()
+    assert "thumb_icons" not in data and "_check_sig" not in data
+    assert data["prompt"] == "a cat on a mat"
+    assert data["downloaded_idx"] == [0]
+
+    copy = _roundtrip(job)
+    assert copy.to_dict() == data
+    assert copy["downloaded_idx"] == {0}
+    assert copy["video_by_idx"] == ["https://example/v.mp4", None]
+    assert copy.get("custom_note") == "kept in extra"
+    assert copy.prompt_key == job.prompt_key
+
+
+def test_scene_job_dict_interface():
+    job = SceneJob(scene_id="1", prompt="x")
+    assert job["scene_id"] == "1"
+    assert "missing" not in job
+    assert job.get("missing", 5) == 5
+    with pytest.raises(KeyError):
+        job["missing"]
+    assert job.setdefault("missing", []) == []
+    assert "missing" in job
+    assert job.pop("missing") == []
+    assert job.pop("missing", None) is None
+
+    job["prompt"] = "y"
+    assert job.prompt == "y"
+    assert dict(job.items())["scene_id"] == "1"
+
+
+def test_prompts_are_interned():
+    a = SceneJob(prompt="same text")
+    b = SceneJob(prompt="same text")
+    assert a.prompt_key == b.prompt_key
+    assert prompts.text(a.prompt_key) == "same text"
+
+
+def test_op_result_roundtrip():
+    raw = trim_raw({
+        "status": "MEDIA_GENERATION_STATUS_SUCCESSFUL",
+        "sceneId": "s1",
+        "operation": {
+            "name": "op-1",
+            "metadata": {"video": {"fifeUrl": "https://example/v.mp4", "seed": 7}},
+            "unused": "x" * 100,
+        },
+    })
+    assert raw == {
+        "status": "MEDIA_GENERATION_STATUS_SUCCESSFUL",
+        "sceneId": "s1",
+        "operation": {"name": "op-1", "metadata": {"video": {"fifeUrl": "https://example/v.mp4"}}},
+    }
+    result = OpResult(raw["status"], ["https://example/v.mp4"], [], raw)
+    copy = _roundtrip(result)
+    assert copy.to_dict() == result.to_dict()
+    assert copy["status"] == "MEDIA_GENERATION_STATUS_SUCCESSFUL"
+    assert copy.get("extra") is None
+
+
+def test_op_result_rejects_unknown_fields():
+    result = OpResult("", [], [], {})
+    result["status"] = "FAILED"
+    assert result["status"] == "FAILED"
+    with pytest.raises(KeyError):
+        result["other"] = 1
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from services.account_manager import AccountManager
+from services.engine import pipeline
+from services.engine.pipeline import MAX_DOWNLOAD_RETRIES, BatchEngine, _Lane
+from services.generation_library import GenerationLibrary, generation_key
+
+
+class FailingDownloader:
+    def __init__(self):
+        self.calls = 0
+
+    def download(self, url, path, bearer_token=None):
+        self.calls += 1
+        raise OSError("connection reset")
+
+
+class FallbackClient:
+    """start_one that lands on the second model of the ladder"""
+
+    def start_one(self, job, model_key, aspect_ratio, prompt, copies=1, project_id=None):
+        job["operation_names"] = ["op-1"]
+        job["operation_metadata"] = {"op-1": {"sceneId": "s", "status": "PENDING",
+                                              "model": "veo_fallback"}}
+        return 1
+
+
+@pytest.fixture
+def engine():
+    engine = BatchEngine(account_mgr=AccountManager(),
+                         config={"telemetry": {"export_on_run": False}}, make_thumbs=False)
+    engine._downloader = FailingDownloader()
+    return engine
+
+
+def test_failed_download_does_not_sleep_after_last_attempt(engine, monkeypatch, tmp_path):
+    sleeps = []
+    monkeypatch.setattr(pipeline.time, "sleep", sleeps.append)
+    card = {"scene": 1, "copy": 1, "url": "https://example/v.mp4", "account": "a"}
+
+    card = engine._download(card, "demo", str(tmp_path))
+    assert card["status"] == "DOWNLOAD_FAILED"
+    assert engine._downloader.calls == MAX_DOWNLOAD_RETRIES
+    assert sleeps == [min(2 ** n, 30) for n in range(1, MAX_DOWNLOAD_RETRIES)]
+
+
+def test_run_submits_each_scene_with_its_aspect_ratio(engine, monkeypatch, tmp_path):
+    submitted = []
+    monkeypatch.setattr(engine, "_lanes", lambda: ["lane"])
+    monkeypatch.setattr(engine, "_submit", lambda lane, *args: submitted.append(args) or [])
+
+    engine.run(["a", "b", "c"], str(tmp_path), aspect_ratio="16:9",
+               aspect_ratios=["9:16", None])
+    assert [args[4] for args in submitted] == ["9:16", "16:9", "16:9"]
+
+
+def test_submit_keys_render_on_the_model_that_produced_it(engine, monkeypatch, tmp_path):
+    lib = GenerationLibrary(str(tmp_path / "library.db"))
+    monkeypatch.setattr(pipeline, "get_generation_library", lambda: lib)
+    lane = _Lane("acc", "proj", ["tok"], None, 1)
+    lane.client = FallbackClient()
+
+    cards = engine._submit(lane, 1, "a cat", None, "veo_requested", "16:9", 1, str(tmp_path))
+    assert cards[0]["_gen"] == {
+        "key": generation_key("a cat", "veo_fallback", "16:9", 0),
+        "model_key": "veo_fallback", "aspect_ratio": "16:9",
+    }
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from services import resilience
+from services.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", fake)
+    return fake
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker("api", failure_threshold=3, recovery_sec=10)
+    assert breaker.record_failure() is False
+    assert breaker.record_failure() is False
+    assert breaker.record_failure() is True
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    with pytest.raises(CircuitOpenError) as err:
+        breaker.check()
+    assert err.value.retry_after == pytest.approx(10)
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker("api", failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    assert breaker.record_failure() is False
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_single_probe(clock):
+    breaker = CircuitBreaker("api", failure_threshold=1, recovery_sec=10)
+    breaker.record_failure()
+    clock.advance(9)
+    assert not breaker.allow()
+    assert breaker.retry_after() == pytest.approx(1)
+    clock.advance(1)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+    assert breaker.retry_after() == 0.0
+
+
+def test_lost_probe_is_replaced_after_recovery(clock):
+    breaker = CircuitBreaker("api", failure_threshold=1, recovery_sec=10)
+    breaker.record_failure()
+    clock.advance(10)
+    assert breaker.allow()
+    clock.advance(5)
+    assert not breaker.allow()
+    clock.advance(5)
+    assert breaker.allow()
+
+
+def test_failed_probe_doubles_recovery_up_to_max(clock):
+    breaker = CircuitBreaker("api", failure_threshold=1, recovery_sec=10, max_recovery_sec=25)
+    breaker.record_failure()
+    for expected in (20, 25, 25):
+        clock.advance(breaker.recovery_sec)
+        assert breaker.allow()
+        assert breaker.record_failure() is True
+        assert breaker.state == OPEN
+        assert breaker.recovery_sec == expected
+
+    clock.advance(25)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.recovery_sec == 10
+
+
+def test_retry_budget_exhausts_and_refills_from_deposits(clock):
+    budget = RetryBudget(ratio=0.5, min_per_sec=0.0, max_tokens=2)
+    assert budget.try_spend()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+    budget.deposit()
+    assert not budget.try_spend()
+    budget.deposit()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+
+def test_retry_budget_refills_over_time_and_caps(clock):
+    budget = RetryBudget(ratio=0.0, min_per_sec=1.0, max_tokens=3)
+    for _ in range(3):
+        assert budget.try_spend()
+    assert not budget.try_spend()
+
+    clock.advance(1)
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+    clock.advance(100)
+    for _ in range(3):
+        assert budget.try_spend()
+    assert not budget.try_spend()
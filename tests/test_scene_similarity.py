@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from services.scene_similarity import (
+    SceneTextIndex,
+    build_index,
+    find_near_duplicates,
+    jaccard,
+    similarity_join,
+    tokenize,
+)
+
+
+def _brute_force(sets, threshold):
+    out = {}
+    for i in range(len(sets)):
+        for j in range(i + 1, len(sets)):
+            sim = jaccard(sets[i], sets[j])
+            if sim >= threshold:
+                out[(i, j)] = sim
+    return out
+
+
+def _random_sets(seed, n=120, vocab=30):
+    rng = random.Random(seed)
+    words = [f"w{k}" for k in range(vocab)]
+    base = [frozenset(rng.sample(words, rng.randint(0, 12))) for _ in range(n // 2)]
+    # Mutated copies so high thresholds have matches too
+    sets = list(base)
+    for s in base:
+        s = set(s)
+        if s and rng.random() < 0.5:
+            s.discard(rng.choice(sorted(s)))
+        s.add(rng.choice(words))
+        sets.append(frozenset(s))
+    rng.shuffle(sets)
+    return sets
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("threshold", [0.0, 0.3, 0.5, 0.8, 0.9, 1.0])
+def test_similarity_join_matches_brute_force(seed, threshold):
+    sets = _random_sets(seed)
+    assert similarity_join(sets, threshold) == _brute_force(sets, threshold)
+
+
+def test_empty_sets_never_match():
+    sets = [frozenset(), frozenset(), tokenize("a b")]
+    assert similarity_join(sets, 0.5) == {}
+    assert jaccard(frozenset(), frozenset()) == 0.0
+
+
+def test_tokenize_lowercases_and_splits_on_whitespace():
+    assert tokenize("Cô gái  đi\tDạo") == frozenset({"cô", "gái", "đi", "dạo"})
+    assert tokenize(None) == frozenset()
+
+
+def test_near_duplicates_reports_max_over_fields_with_1_based_indices():
+    walk = "một cô gái đi dạo trong công viên"
+    scenes = [
+        {"prompt_vi": walk, "prompt_tgt": "a girl walks in the park"},
+        {"prompt_vi": walk, "prompt_tgt": "a woman strolls outside"},
+        {"prompt_vi": "con mèo ngủ trên ghế", "prompt_tgt": "a cat sleeps on a chair"},
+    ]
+    index = SceneTextIndex(scenes)
+    assert index.near_duplicates(0.8) == [(1, 2, 1.0)]
+    assert index.near_duplicates(0.8, fields=("prompt_tgt",)) == []
+
+
+def test_find_near_duplicates_uses_0_based_indices():
+    texts = ["red car on road", "blue sky", "red car on the road"]
+    assert find_near_duplicates(texts, 0.8) == [(0, 2, pytest.approx(0.8))]
+
+
+def test_build_index_reuses_matching_index():
+    scenes = [{"prompt_vi": "a"}]
+    index = build_index(scenes)
+    assert build_index(scenes, index) is index
+    assert build_index(list(scenes), index) is not index
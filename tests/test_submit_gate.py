@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+import pytest
+
+from services.project_scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    SubmitGate,
+    priority_of,
+)
+
+
+def _grant_order(gate, requests, account="acc"):
+    """
+    Queue ``requests`` [(project, slot kwargs)] behind a held slot, one at a
+    time so their arrival order is fixed, then release and return the
+    projects in the order the gate let them through.
+    """
+    order = []
+    held = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with gate.slot("holder", account):
+            held.set()
+            release.wait(10)
+
+    def wait_for(project, kwargs):
+        with gate.slot(project, account, **kwargs):
+            order.append(project)
+
+    threads = [threading.Thread(target=hold, daemon=True)]
+    threads[0].start()
+    assert held.wait(5)
+
+    for n, (project, kwargs) in enumerate(requests, 1):
+        t = threading.Thread(target=wait_for, args=(project, kwargs), daemon=True)
+        t.start()
+        threads.append(t)
+        deadline = time.time() + 5
+        while len(gate._waiting.get(account, [])) < n:
+            assert time.time() < deadline, "waiter never queued"
+            time.sleep(0.005)
+
+    release.set()
+    for t in threads:
+        t.join(10)
+    return order
+
+
+def test_higher_priority_project_goes_first():
+    gate = SubmitGate()
+    gate.register("low", priority=PRIORITY_LOW)
+    gate.register("high", priority=PRIORITY_HIGH)
+    order = _grant_order(gate, [("low", {}), ("low", {}), ("high", {})])
+    assert order == ["high", "low", "low"]
+
+
+def test_equal_priority_projects_share_fairly():
+    gate = SubmitGate()
+    gate.register("a")
+    gate.register("b")
+    order = _grant_order(gate, [("a", {}), ("a", {}), ("a", {}), ("b", {}), ("b", {})])
+    assert order == ["a", "b", "a", "b", "a"]
+    assert gate.stats() == {"holder": 1, "a": 3, "b": 2}
+
+
+def test_weight_scales_fair_share():
+    gate = SubmitGate()
+    gate.register("a", weight=2.0)
+    gate.register("b", weight=1.0)
+    order = _grant_order(gate, [("b", {})] * 2 + [("a", {})] * 4)
+    assert order == ["b", "a", "a", "b", "a", "a"]
+
+
+def test_accounts_do_not_block_each_other():
+    gate = SubmitGate()
+    with gate.slot("a", "acc1"):
+        done = threading.Event()
+
+        def other():
+            with gate.slot("b", "acc2"):
+                done.set()
+
+        threading.Thread(target=other, daemon=True).start()
+        assert done.wait(5)
+
+
+def test_request_priority_overrides_project_priority():
+    gate = SubmitGate()
+    gate.register("a")
+    gate.register("b")
+    order = _grant_order(gate, [("a", {"priority": "background"}), ("b", {}),
+                                ("a", {"priority": "interactive"})])
+    assert order == ["a", "b", "a"]
+
+
+def test_earliest_deadline_first_within_class():
+    gate = SubmitGate()
+    gate.register("a")
+    gate.register("b")
+    now = time.time()
+    order = _grant_order(gate, [("a", {}), ("a", {"deadline": now + 60}),
+                                ("b", {"deadline": now + 30})])
+    assert order == ["b", "a", "a"]
+
+
+def test_priority_of():
+    assert priority_of(None) is None
+    assert priority_of("") is None
+    assert priority_of("Background") == PRIORITY_BACKGROUND
+    assert priority_of("-1") == -1
+    assert priority_of(5) == 5
+    with pytest.raises(ValueError):
+        priority_of("urgent")
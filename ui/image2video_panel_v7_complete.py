@@ -13,9 +13,10 @@ from PyQt5.QtWidgets import (
     QListWidget, QPushButton, QLabel, QInputDialog,
     QMessageBox, QListWidgetItem, QStackedWidget
 )
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 
+from ui.multi_project_runner import MultiProjectRunMixin
 from ui.project_panel import ProjectPanel
 from utils.config import load as load_cfg, save as save_cfg
 
@@ -98,7 +99,7 @@ LIST_STYLE = """
     }
 """
 
-class Image2VideoPanelV7(QWidget):
+class Image2VideoPanelV7(MultiProjectRunMixin, QWidget):
     """Image2Video V7 - Improved layout"""
 
     def __init__(self, parent=None):
@@ -107,8 +108,6 @@ class Image2VideoPanelV7(QWidget):
         self.config = load_cfg()
         self.base_dir = self.config.get('download_root', 'D:/Tiktok/projects')
         self.project_panels = {}
-        self.run_all_queue = []
-        self.is_running_all = False
 
         self._build_ui()
         self._load_initial_projects()
@@ -177,10 +176,11 @@ class Image2VideoPanelV7(QWidget):
         self.project_list = QListWidget()
         self.project_list.setStyleSheet(LIST_STYLE)
         self.project_list.currentItemChanged.connect(self._on_project_selected)
+        self._enable_priority_menu()
         left_layout.addWidget(self.project_list)
 
         # Compact run all button
-        self.btn_run_all = QPushButton("🔥 CHẠY TẤT CẢ\n(TUẦN TỰ)")
+        self.btn_run_all = QPushButton("🔥 CHẠY TẤT CẢ\n(SONG SONG)")
         self.btn_run_all.setMinimumHeight(50)
         self.btn_run_all.setCursor(Qt.PointingHandCursor)
         self.btn_run_all.setStyleSheet(BUTTON_WARNING)
@@ -257,7 +257,7 @@ class Image2VideoPanelV7(QWidget):
 
     def _add_project_to_list(self, name):
         """Add project to list"""
-        item = QListWidgetItem(f"📋 {name}")
+        item = QListWidgetItem(self._project_item_text(name))
         item.setData(Qt.UserRole, name)
         self.project_list.addItem(item)
 
@@ -298,28 +298,30 @@ class Image2VideoPanelV7(QWidget):
             self.stacked.setCurrentIndex(0)
             return
 
-        name = current.data(Qt.UserRole)
+        self.stacked.setCurrentWidget(self._ensure_panel(current.data(Qt.UserRole)))
 
+    def _ensure_panel(self, name):
+        """Get or create the ProjectPanel for a project"""
         if name in self.project_panels:
-            panel = self.project_panels[name]
-        else:
-            panel = ProjectPanel(
-                project_name=name,
-                base_dir=self.base_dir,
-                settings_provider=lambda: load_cfg(),
-                parent=self
-            )
+            return self.project_panels[name]
 
-            # Apply enhanced styling to ProjectPanel labels
-            self._enhance_project_panel_styling(panel)
+        panel = ProjectPanel(
+            project_name=name,
+            base_dir=self.base_dir,
+            settings_provider=lambda: load_cfg(),
+            parent=self
+        )
 
-            panel.project_completed.connect(self._on_project_completed)
-            panel.run_all_requested.connect(self._run_all_projects)
+        # Apply enhanced styling to ProjectPanel labels
+        self._enhance_project_panel_styling(panel)
 
-            self.stacked.addWidget(panel)
-            self.project_panels[name] = panel
+        panel.project_completed.connect(self._on_project_completed)
+        panel.project_finished.connect(self._on_project_finished)
+        panel.run_all_requested.connect(self._run_all_projects)
 
-        self.stacked.setCurrentWidget(panel)
+        self.stacked.addWidget(panel)
+        self.project_panels[name] = panel
+        return panel
 
     def _enhance_project_panel_styling(self, panel):
         """Enhance ProjectPanel with larger, bold labels"""
@@ -338,67 +340,39 @@ class Image2VideoPanelV7(QWidget):
                 label.setStyleSheet("font-weight: 700;")
 
     def _run_all_projects(self):
-        """Run all projects"""
+        """Run all projects concurrently (by priority, sharing accounts)"""
         count = self.project_list.count()
         if count == 0:
             QMessageBox.warning(self, "Không có dự án", "Chưa có dự án!")
             return
+        if self.scheduler:
+            return
 
         reply = QMessageBox.question(
             self, "Xác nhận",
-            f"Chạy {count} dự án?\n⚠️ Có thể mất nhiều thời gian.",
+            f"Chạy song song {count} dự án?\n⚠️ Có thể mất nhiều thời gian.",
             QMessageBox.Yes | QMessageBox.No, QMessageBox.No
         )
         if reply != QMessageBox.Yes:
             return
 
-        self.run_all_queue = [
+        self._start_concurrent_run([
             self.project_list.item(i).data(Qt.UserRole)
             for i in range(count)
-        ]
-
-        self.is_running_all = True
-        self.btn_run_all.setEnabled(False)
-        self.btn_add.setEnabled(False)
-        self.btn_delete.setEnabled(False)
-
-        self._update_info(f"Đang chạy: 0/{count}")
-        self._run_next()
-
-    def _run_next(self):
-        """Run next project"""
-        if not self.run_all_queue:
-            self._all_done()
-            return
-
-        name = self.run_all_queue.pop(0)
-        total = self.project_list.count()
-        current = total - len(self.run_all_queue)
-
-        self._update_info(f"Đang chạy: {name} ({current}/{total})")
-
-        for i in range(self.project_list.count()):
-            if self.project_list.item(i).data(Qt.UserRole) == name:
-                self.project_list.setCurrentRow(i)
-                if name in self.project_panels:
-                    QTimer.singleShot(500, self.project_panels[name]._run_seq)
-                break
+        ])
 
     def _on_project_completed(self, name):
         """Handle completion"""
         print(f"✅ Project '{name}' completed!")
-        if self.is_running_all:
-            QTimer.singleShot(2000, self._run_next)
 
-    def _all_done(self):
+    def _on_run_all_finished(self):
         """All done"""
-        self.is_running_all = False
-        self.btn_run_all.setEnabled(True)
-        self.btn_add.setEnabled(True)
-        self.btn_delete.setEnabled(True)
         self._update_info()
         QMessageBox.information(self, "Hoàn tất", "✅ Xong tất cả!")
 
+    def _show_run_info(self, text):
+        self._update_info(text)
+
     def _save_projects(self):
         """Save projects"""
         projects = [
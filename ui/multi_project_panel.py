@@ -12,13 +12,14 @@ from PyQt5.QtWidgets import (
     QListWidget, QPushButton, QLabel, QInputDialog,
     QMessageBox, QListWidgetItem, QStackedWidget
 )
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 
+from ui.multi_project_runner import MultiProjectRunMixin
 from ui.project_panel import ProjectPanel
 from utils.config import load as load_cfg, save as save_cfg
 
-class MultiProjectPanel(QWidget):
+class MultiProjectPanel(MultiProjectRunMixin, QWidget):
     """Multi-project manager with V5 styling"""
 
     def __init__(self, parent=None):
@@ -28,8 +29,6 @@ class MultiProjectPanel(QWidget):
         self.config = load_cfg()
         self.base_dir = self.config.get('download_root', 'D:/Tiktok/projects')
         self.project_panels = {}  # name -> ProjectPanel
-        self.run_all_queue = []
-        self.is_running_all = False
 
         self._build_ui()
         self._load_initial_projects()
@@ -123,10 +122,11 @@ class MultiProjectPanel(QWidget):
             }
         """)
         self.project_list.currentItemChanged.connect(self._on_project_selected)
+        self._enable_priority_menu()
         left_layout.addWidget(self.project_list)
 
         # Run all button - V5 Big Rounded Button
-        self.btn_run_all = QPushButton("🔥 CHẠY TOÀN BỘ CÁC DỰ ÁN\n(THEO THỨ TỰ)")
+        self.btn_run_all = QPushButton("🔥 CHẠY TOÀN BỘ CÁC DỰ ÁN\n(SONG SONG)")
         self.btn_run_all.setMinimumHeight(60)
         self.btn_run_all.setCursor(Qt.PointingHandCursor)
         self.btn_run_all.setStyleSheet("""
@@ -226,7 +226,7 @@ class MultiProjectPanel(QWidget):
 
         # Check duplicate
         for i in range(self.project_list.count()):
-            if self.project_list.item(i).text() == name:
+            if self.project_list.item(i).data(Qt.UserRole) == name:
                 QMessageBox.warning(self, "Trùng tên", f"Dự án '{name}' đã tồn tại!")
                 return
 
@@ -242,7 +242,7 @@ class MultiProjectPanel(QWidget):
 
     def _add_project_to_list(self, name):
         """Add project to list widget"""
-        item = QListWidgetItem(f"📋 {name}")
+        item = QListWidgetItem(self._project_item_text(name))
         item.setData(Qt.UserRole, name)  # Store actual name
         self.project_list.addItem(item)
 
@@ -293,44 +293,46 @@ class MultiProjectPanel(QWidget):
             self.stacked_widget.setCurrentIndex(0)
             return
 
-        project_name = current.data(Qt.UserRole)
+        # Show panel
+        self.stacked_widget.setCurrentWidget(self._ensure_panel(current.data(Qt.UserRole)))
 
-        # Check if panel already exists
+    def _ensure_panel(self, project_name):
+        """Get or create the ProjectPanel for a project"""
         if project_name in self.project_panels:
-            panel = self.project_panels[project_name]
-        else:
-            # Create new ProjectPanel
-            panel = ProjectPanel(
-                project_name=project_name,
-                base_dir=self.base_dir,
-                settings_provider=lambda: load_cfg(),
-                parent=self
-            )
-
-            # Connect signals
-            panel.project_completed.connect(self._on_project_completed)
-            panel.run_all_requested.connect(self._run_all_projects)
-
-            # Add to stack
-            self.stacked_widget.addWidget(panel)
-            self.project_panels[project_name] = panel
+            return self.project_panels[project_name]
 
-        # Show panel
-        self.stacked_widget.setCurrentWidget(panel)
+        panel = ProjectPanel(
+            project_name=project_name,
+            base_dir=self.base_dir,
+            settings_provider=lambda: load_cfg(),
+            parent=self
+        )
+
+        # Connect signals
+        panel.project_completed.connect(self._on_project_completed)
+        panel.project_finished.connect(self._on_project_finished)
+        panel.run_all_requested.connect(self._run_all_projects)
+
+        # Add to stack
+        self.stacked_widget.addWidget(panel)
+        self.project_panels[project_name] = panel
+        return panel
 
     def _run_all_projects(self):
-        """Run all projects sequentially"""
+        """Run all projects concurrently, highest priority first"""
         count = self.project_list.count()
 
         if count == 0:
             QMessageBox.warning(self, "Không có dự án", "Chưa có dự án nào để chạy!")
             return
+        if self.scheduler:
+            return
 
         # Confirm
         reply = QMessageBox.question(
             self,
             "Xác nhận chạy tất cả",
-            f"Bạn có chắc muốn chạy {count} dự án theo thứ tự?\n\n"
+            f"Bạn có chắc muốn chạy song song {count} dự án?\n\n"
             "⚠️ Quá trình này có thể mất nhiều thời gian.",
             QMessageBox.Yes | QMessageBox.No,
             QMessageBox.No
@@ -339,69 +341,17 @@ class MultiProjectPanel(QWidget):
         if reply != QMessageBox.Yes:
             return
 
-        # Build queue
-        self.run_all_queue = []
-        for i in range(count):
-            item = self.project_list.item(i)
-            project_name = item.data(Qt.UserRole)
-            self.run_all_queue.append(project_name)
-
-        # Start
-        self.is_running_all = True
-        self.btn_run_all.setEnabled(False)
-        self.btn_add.setEnabled(False)
-        self.btn_delete.setEnabled(False)
-
-        self._update_info_label(f"Đang chạy tuần tự: 0/{count}")
-
-        # Run first project
-        self._run_next_in_queue()
-
-    def _run_next_in_queue(self):
-        """Run next project in queue"""
-        if not self.run_all_queue:
-            # Done
-            self._on_all_projects_completed()
-            return
-
-        # Get next project
-        project_name = self.run_all_queue.pop(0)
-        remaining = len(self.run_all_queue)
-        total = self.project_list.count()
-        current_index = total - remaining - 1
-
-        self._update_info_label(f"Đang chạy: {project_name} ({current_index + 1}/{total})")
-
-        # Select and run
-        for i in range(self.project_list.count()):
-            item = self.project_list.item(i)
-            if item.data(Qt.UserRole) == project_name:
-                self.project_list.setCurrentRow(i)
-
-                # Get or create panel
-                if project_name in self.project_panels:
-                    panel = self.project_panels[project_name]
-
-                    # Trigger run
-                    QTimer.singleShot(500, panel._run_seq)
-
-                break
+        self._start_concurrent_run([
+            self.project_list.item(i).data(Qt.UserRole)
+            for i in range(count)
+        ])
 
     def _on_project_completed(self, project_name):
         """Handle single project completion"""
         print(f"✅ Project '{project_name}' completed!")
 
-        # If running all, continue to next
-        if self.is_running_all:
-            QTimer.singleShot(2000, self._run_next_in_queue)
-
-    def _on_all_projects_completed(self):
+    def _on_run_all_finished(self):
         """Handle all projects completion"""
-        self.is_running_all = False
-        self.btn_run_all.setEnabled(True)
-        self.btn_add.setEnabled(True)
-        self.btn_delete.setEnabled(True)
-
         self._update_info_label()
 
         QMessageBox.information(
@@ -410,6 +360,9 @@ class MultiProjectPanel(QWidget):
             "✅ Đã chạy xong tất cả các dự án!"
         )
 
+    def _show_run_info(self, text):
+        self._update_info_label(text)
+
     def _save_projects(self):
         """Save project list to config"""
         projects = []
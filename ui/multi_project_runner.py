@@ -0,0 +1,157 @@
+# ui/multi_project_runner.py
+"""
+Shared "run all projects" logic for the multi-project panels.
+
+Projects run concurrently (up to one per healthy account by default) through
+services.project_scheduler; their workers share per-account submit slots via
+the process-wide SubmitGate, so a high-priority project gets the next slot and
+same-priority projects split submits fairly.
+
+Host panels provide: project_list, project_panels, btn_run_all, btn_add,
+btn_delete, _ensure_panel(name) -> ProjectPanel and _show_run_info(text), and
+connect each panel's project_finished signal to _on_project_finished. A slot
+is freed when a project's run ends, even if some scenes failed.
+"""
+
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import QMenu
+
+from services.project_scheduler import (
+    PRIORITY_HIGH,
+    PRIORITY_LABELS,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    ProjectScheduler,
+    aggregate_progress,
+    default_max_concurrent,
+    get_submit_gate,
+)
+from utils.config import load as load_cfg
+from utils.config import save as save_cfg
+
+PRIORITY_MARKS = {PRIORITY_HIGH: "🔺 ", PRIORITY_NORMAL: "", PRIORITY_LOW: "🔻 "}
+
+
+class MultiProjectRunMixin:
+    """Concurrent run-all with per-project priority"""
+
+    scheduler = None
+
+    # ---- priority ----
+    def _project_priority(self, name):
+        return int((load_cfg().get('project_priority') or {}).get(name, PRIORITY_NORMAL))
+
+    def _project_item_text(self, name):
+        return f"{PRIORITY_MARKS.get(self._project_priority(name), '')}📋 {name}"
+
+    def _set_project_priority(self, item, priority):
+        name = item.data(Qt.UserRole)
+        config = load_cfg()
+        prios = dict(config.get('project_priority') or {})
+        if priority == PRIORITY_NORMAL:
+            prios.pop(name, None)
+        else:
+            prios[name] = priority
+        config['project_priority'] = prios
+        save_cfg(config)
+        item.setText(self._project_item_text(name))
+        # Takes effect immediately for a project that is already submitting
+        if self.scheduler and name in self.scheduler.running:
+            get_submit_gate().register(name, priority)
+
+    def _enable_priority_menu(self):
+        self.project_list.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.project_list.customContextMenuRequested.connect(self._show_priority_menu)
+
+    def _show_priority_menu(self, pos):
+        item = self.project_list.itemAt(pos)
+        if not item:
+            return
+        current = self._project_priority(item.data(Qt.UserRole))
+        menu = QMenu(self)
+        for prio in (PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW):
+            act = menu.addAction(f"Ưu tiên: {PRIORITY_LABELS[prio]}")
+            act.setCheckable(True)
+            act.setChecked(prio == current)
+            act.triggered.connect(lambda _=False, p=prio: self._set_project_priority(item, p))
+        menu.exec_(self.project_list.mapToGlobal(pos))
+
+    # ---- run all ----
+    def _start_concurrent_run(self, names):
+        """Queue every project and start as many as the account pool allows"""
+        config = load_cfg()
+        saved = config.get('project_priority') or {}
+        prios = {n: int(saved.get(n, PRIORITY_NORMAL)) for n in names}
+        self.scheduler = ProjectScheduler(default_max_concurrent(config))
+        self.scheduler.extend(names, prios)
+        self._run_priorities = prios
+
+        self.btn_run_all.setEnabled(False)
+        self.btn_add.setEnabled(False)
+        self.btn_delete.setEnabled(False)
+
+        self._run_timer = QTimer(self)
+        self._run_timer.timeout.connect(self._update_run_progress)
+        self._run_timer.start(2000)
+        self._pump_projects()
+
+    def _pump_projects(self):
+        """Start queued projects while there are free slots"""
+        sched = self.scheduler
+        if sched is None:
+            return
+        gate = get_submit_gate()
+        while True:
+            name = sched.next_ready()
+            if name is None:
+                break
+            panel = self._ensure_panel(name)
+            panel.priority = self._run_priorities.get(name, PRIORITY_NORMAL)
+            gate.register(name, panel.priority)
+            if not panel._run_seq():
+                # Nothing to run (no prompts / already running / no client)
+                print(f"⚠️ Project '{name}' skipped")
+                gate.unregister(name)
+                sched.finish(name)
+        self._update_run_progress()
+        if sched.is_done():
+            self._finish_concurrent_run()
+
+    def _on_project_finished(self, name):
+        """A project's run ended (all scenes terminal, not necessarily successful): free its slot"""
+        self._on_scheduled_project_completed(name)
+
+    def _on_scheduled_project_completed(self, name):
+        """Return True if the completion belonged to the running batch"""
+        if not self.scheduler or name not in self.scheduler.running:
+            return False
+        print(f"🏁 Project '{name}' finished")
+        get_submit_gate().unregister(name)
+        self.scheduler.finish(name)
+        QTimer.singleShot(500, self._pump_projects)
+        return True
+
+    def _update_run_progress(self):
+        sched = self.scheduler
+        if sched is None:
+            return
+        counts = [self.project_panels[n].progress_counts() for n in sched.running + sched.finished
+                  if n in self.project_panels]
+        done, total = aggregate_progress(counts)
+        pct = int(done * 100 / total) if total else 0
+        self._show_run_info(
+            f"Đang chạy: {', '.join(sched.running) or '-'}\n"
+            f"Dự án: {len(sched.finished)}/{sched.total} xong, {len(sched.queued)} chờ\n"
+            f"Video: {done}/{total} ({pct}%)"
+        )
+
+    def _finish_concurrent_run(self):
+        if getattr(self, "_run_timer", None):
+            self._run_timer.stop()
+            self._run_timer = None
+        self.scheduler = None
+        self.btn_run_all.setEnabled(True)
+        self.btn_add.setEnabled(True)
+        self.btn_delete.setEnabled(True)
+        self._show_run_info("")
+        self._on_run_all_finished()
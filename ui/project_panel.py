@@ -3,12 +3,12 @@ import glob
 import json
 import os
 import re
-import shutil
+import threading
 import time
 import webbrowser
 
-from PyQt5.QtCore import QByteArray, QObject, Qt, QThread, QTimer, pyqtSignal
-from PyQt5.QtGui import QFont, QIcon, QPixmap
+from PyQt5.QtCore import QObject, Qt, QThread, pyqtSignal
+from PyQt5.QtGui import QFont, QIcon
 from PyQt5.QtWidgets import (
     QAbstractItemView,
     QApplication,
@@ -32,9 +32,11 @@ from PyQt5.QtWidgets import (
 
 # Support both package and flat layouts
 try:
+    from utils.config import default_project_id
     from utils.config import load as load_cfg
     from utils.logger import Console
 except Exception:  # pragma: no cover
+    from config import default_project_id
     from config import load as load_cfg
     from logger import Console
 
@@ -45,6 +47,17 @@ except Exception:  # pragma: no cover
     from google.labs_flow_client import DEFAULT_PROJECT_ID, LabsFlowClient
     from utils.video_downloader import VideoDownloader
 
+# Prompt file parsing is Qt-free so the headless engine reads the same format
+from services.engine.prompt_files import parse_prompt_any, parse_prompt_file  # noqa: F401
+from services.project_scheduler import PRIORITY_NORMAL, get_submit_gate
+from services.telemetry import RenderClock, get_telemetry
+from services.utils.asset_staging import get_asset_stager
+from services.utils.job_records import SceneJob
+from utils.thumbnails import get_thumbnail_service
+
+CHECK_INTERVAL_SEC = 10
+TERMINAL_OP_STATUSES = ("COMPLETED", "FAILED", "DONE_NO_URL")
+
 def safe_name(s: str)->str:
     s = s or ""
     s = s.lower().strip()
@@ -84,50 +97,18 @@ def short_text(s, n=90):
     s=(s or "").replace("\n"," ").strip()
     return s if len(s)<=n else s[:n-1]+"…"
 
-def parse_prompt_any(obj):
-    scenes=[]
-    def _to_text(p):
-        if isinstance(p, str):
-            return p
-        try:
-            return json.dumps(p, ensure_ascii=False)
-        except Exception:
-            return str(p)
-    if isinstance(obj, list):
-        for it in obj:
-            if isinstance(it, dict) and "prompt" in it:
-                scenes.append(_to_text(it["prompt"]))
-            else:
-                scenes.append(_to_text(it))
-    elif isinstance(obj, dict):
-        if "scenes" in obj and isinstance(obj["scenes"], list):
-            for it in obj["scenes"]:
-                if isinstance(it, dict) and "prompt" in it:
-                    scenes.append(_to_text(it["prompt"]))
-                else:
-                    scenes.append(_to_text(it))
-        elif "prompt" in obj:
-            scenes.append(_to_text(obj["prompt"]))
-        else:
-            scenes.append(_to_text(obj))
-    return scenes
-
-def parse_prompt_file(path):
-    try:
-        with open(path,"r",encoding="utf-8") as f:
-            obj=json.load(f)
-    except Exception:
-        return []
-    return parse_prompt_any(obj)
-
 class SeqWorker(QObject):
     log = pyqtSignal(str,str)
     progress = pyqtSignal(int, str)
-    row_update = pyqtSignal(int, dict)
+    row_update = pyqtSignal(int, object)
     started = pyqtSignal()
     finished = pyqtSignal(int)
-    def __init__(self, client, jobs, model, aspect, copies, project_id):
+    def __init__(self, client, jobs, model, aspect, copies, project_id, project_name=None,
+                 clock=None):
         super().__init__(); self.client=client; self.jobs=jobs; self.model=model; self.aspect=aspect; self.copies=copies; self.project_id=project_id
+        self.project_name = project_name or "default"
+        self.gate = get_submit_gate()
+        self.clock = clock or RenderClock()
     def run(self):
         self.started.emit()
         total=max(1,len(self.jobs)); done=0
@@ -137,7 +118,8 @@ class SeqWorker(QObject):
                 self.progress.emit(int(done*100/total), f"Cảnh {i+1}/{len(self.jobs)}: upload…")
                 if not j.get("media_id"):
                     try:
-                        mid=self.client.upload_image_file(j["image_path"]); j["media_id"]=mid
+                        with get_telemetry().span("upload", scene=j.get("scene_id")):
+                            mid=self.client.upload_image_file(j["image_path"]); j["media_id"]=mid
                         self.log.emit("HTTP", f"UPLOAD OK mediaId={mid}")
                     except Exception as e:
                         self.log.emit("ERR", f"Upload lỗi: {e}")
@@ -145,7 +127,10 @@ class SeqWorker(QObject):
             self.log.emit("INFO", f"[{i+1}/{len(self.jobs)}] Start generate…")
             try:
                 self.progress.emit(int(done*100/total), f"Cảnh {i+1}/{len(self.jobs)}: start…")
-                rc=self.client.start_one(j, self.model, self.aspect, j.get("prompt",""), copies=self.copies, project_id=self.project_id)
+                with self.gate.slot(self.project_name, scene=j.get("scene_id")), \
+                        get_telemetry().span("submit", scene=j.get("scene_id"), account="default"):
+                    rc=self.client.start_one(j, self.model, self.aspect, j.get("prompt",""), copies=self.copies, project_id=self.project_id)
+                self.clock.submitted(j.get("scene_id"), len(j.get("operation_names",[])), "default")
                 self.log.emit("HTTP", f"START OK -> {rc} ref(s).")
             except Exception as e:
                 self.log.emit("ERR", f"Start thất bại: {e}")
@@ -154,112 +139,115 @@ class SeqWorker(QObject):
         self.progress.emit(100, "Hoàn tất gửi tuần tự"); self.finished.emit(1)
 
 class CheckWorker(QObject):
-    log = pyqtSignal(str,str); progress = pyqtSignal(int, str); row_update = pyqtSignal(int, dict); finished = pyqtSignal()
-    def __init__(self, client, jobs, account_mgr=None):
+    """
+    Long-lived status monitor for one project.
+
+    Started once after submitting; keeps one LabsFlowClient per account for its
+    whole life (token health and HTTP sessions survive between rounds), polls
+    only operations that are not terminal yet every ``interval`` seconds and
+    stops by itself when every operation is terminal (or on stop()).
+    """
+    log = pyqtSignal(str, str)
+    progress = pyqtSignal(int, str)
+    row_update = pyqtSignal(int, object)
+    finished = pyqtSignal()
+    rows_update = pyqtSignal(list)  # [(idx, job)] rows whose status/urls changed since last check
+    round_done = pyqtSignal(int)    # operations still pending after a round
+    def __init__(self, client, jobs, account_mgr=None, interval=CHECK_INTERVAL_SEC, clock=None):
         super().__init__()
         self.client=client
+        self.clock=clock or RenderClock()  # render spans / poll lag, shared with the submit worker
         self.jobs=jobs
         self.account_mgr=account_mgr
+        self.interval=interval
+        self._clients={}      # account name -> LabsFlowClient, reused across rounds
+        self._op_status={}    # operation name -> last status seen
+        self._stop=threading.Event()
+
+    def stop(self): self._stop.set()
+
+    def _pending_names(self):
+        return [n for j in self.jobs for n in j.get("operation_names",[])
+                if self._op_status.get(n) not in TERMINAL_OP_STATUSES]
+
+    def _account_client(self, acc_name):
+        """(client, project_id) for an account, created on first use"""
+        if acc_name not in self._clients:
+            account = next((a for a in self.account_mgr.get_all_accounts() if a.name == acc_name),
+                           None)
+            if not account:
+                return None, None
+            from services.google.labs_flow_client import LabsFlowClient
+            tokens = account.live_tokens() or account.tokens
+            self._clients[acc_name] = (LabsFlowClient(tokens, on_event=None), account.project_id)
+        return self._clients[acc_name]
+
     def run(self):
-        names=[n for j in self.jobs for n in j.get("operation_names",[])]
-        if not names: self.log.emit("INFO","[Check] chưa có operation."); self.finished.emit(); return
-        
-        # Collect metadata from jobs for batch check
-        metadata = {}
-        for j in self.jobs:
-            op_meta = j.get("operation_metadata", {})
-            if op_meta:
-                metadata.update(op_meta)
-        
-        self.progress.emit(0, "Đang check…")
-        
+        try:
+            if not any(j.get("operation_names") for j in self.jobs):
+                self.log.emit("INFO", "[Check] chưa có operation.")
+                return
+            while not self._stop.is_set():
+                pending = self._pending_names()
+                if not pending:
+                    self.log.emit("INFO", "[Check] Mọi operation đã kết thúc, dừng kiểm tra.")
+                    break
+                self._check_round(set(pending))
+                self.round_done.emit(len(self._pending_names()))
+                if self._stop.wait(self.interval):
+                    break
+        finally:
+            self.finished.emit()
+
+    def _clock_op(self, j, nm, status):
+        copy=j.get("op_index_map",{}).get(nm,0)+1
+        if status in TERMINAL_OP_STATUSES:
+            self.clock.rendered(j.get("scene_id"), copy, "READY" if status=="COMPLETED" else status)
+        else:
+            self.clock.pending(j.get("scene_id"), copy)
+
+    def _check_round(self, pending):
         # CRITICAL FIX: Handle multi-account checking
         # Each operation must be checked with the same account that created it
         # Otherwise Google API returns 401 Unauthorized
         rs = {}
-        try:
-            # Check if jobs have account tracking (from parallel mode)
-            has_account_tracking = any(j.get("account_name") for j in self.jobs)
-            
-            if has_account_tracking and self.account_mgr:
-                # Multi-account mode: Group operations by account and check separately
-                from services.google.labs_flow_client import LabsFlowClient
-                
-                # Group jobs by account (and handle jobs without account_name)
-                jobs_by_account = {}
-                jobs_without_account = []
-                
-                for j in self.jobs:
-                    acc_name = j.get("account_name")
-                    if acc_name:
-                        if acc_name not in jobs_by_account:
-                            jobs_by_account[acc_name] = []
-                        jobs_by_account[acc_name].append(j)
-                    else:
-                        jobs_without_account.append(j)
-                
-                # Check each account's operations with its own client
-                for acc_name, account_jobs in jobs_by_account.items():
-                    # Find the account
-                    account = None
-                    for acc in self.account_mgr.get_all_accounts():
-                        if acc.name == acc_name:
-                            account = acc
-                            break
-                    
-                    if not account:
-                        self.log.emit("WARN", f"Account {acc_name} not found, skipping")
+        has_account_tracking = (bool(self.account_mgr)
+                                and any(j.get("account_name") for j in self.jobs))
+        groups = {}  # account name (None = default client) -> (names, metadata)
+        for j in self.jobs:
+            names = [n for n in j.get("operation_names", []) if n in pending]
+            if not names:
+                continue
+            acc = j.get("account_name") if has_account_tracking else None
+            g_names, g_meta = groups.setdefault(acc, ([], {}))
+            g_names.extend(names)
+            g_meta.update(j.get("operation_metadata") or {})
+
+        for acc_name, (names, metadata) in groups.items():
+            try:
+                if acc_name is None:
+                    if not self.client:
                         continue
-                    
-                    # Create client for this account
-                    account_client = LabsFlowClient(account.tokens, on_event=None)
-                    
-                    # Collect operations and metadata for this account
-                    account_names = [n for j in account_jobs for n in j.get("operation_names", [])]
-                    account_metadata = {}
-                    for j in account_jobs:
-                        op_meta = j.get("operation_metadata", {})
-                        if op_meta:
-                            account_metadata.update(op_meta)
-                    
-                    # Check this account's operations
-                    # Issue #2 FIX: Pass project_id for multi-account support
-                    if account_names:
-                        try:
-                            self.log.emit("INFO", f"Checking {len(account_names)} operations for {acc_name} (project: {account.project_id[:8]}...)")
-                            account_rs = account_client.batch_check_operations(account_names, account_metadata, project_id=account.project_id)
-                            self.log.emit("INFO", f"Got {len(account_rs)} results from {acc_name}")
-                            rs.update(account_rs)
-                        except Exception as e:
-                            self.log.emit("ERR", f"Check lỗi cho {acc_name}: {e.__class__.__name__}: {e}")
-                
-                # Check jobs without account_name using default client (fallback)
-                if jobs_without_account and self.client:
-                    fallback_names = [n for j in jobs_without_account for n in j.get("operation_names", [])]
-                    fallback_metadata = {}
-                    for j in jobs_without_account:
-                        op_meta = j.get("operation_metadata", {})
-                        if op_meta:
-                            fallback_metadata.update(op_meta)
-                    
-                    if fallback_names:
-                        try:
-                            fallback_rs = self.client.batch_check_operations(fallback_names, fallback_metadata)
-                            rs.update(fallback_rs)
-                        except Exception as e:
-                            self.log.emit("ERR", f"Check lỗi cho jobs không có account: {e.__class__.__name__}: {e}")
-            else:
-                # Single-account mode (backward compatibility)
-                rs=self.client.batch_check_operations(names, metadata)
-        except Exception as e:
-            self.log.emit("ERR", f"Check lỗi: {e.__class__.__name__}: {e}"); self.finished.emit(); return
-        
-        total=max(1,len(self.jobs)); done=0
+                    rs.update(self.client.batch_check_operations(names, metadata))
+                    continue
+                client, project_id = self._account_client(acc_name)
+                if not client:
+                    self.log.emit("WARN", f"Account {acc_name} not found, skipping")
+                    continue
+                # Issue #2 FIX: Pass project_id for multi-account support
+                rs.update(client.batch_check_operations(names, metadata, project_id=project_id))
+            except Exception as e:
+                self.log.emit("ERR", f"Check lỗi cho {acc_name or 'default'}: "
+                                     f"{e.__class__.__name__}: {e}")
+
+        changed=[]
         for idx,j in enumerate(self.jobs):
             found=False
             for nm in j.get("operation_names",[]):
                 if nm in rs:
                     v=rs[nm]; found=True
+                    self._op_status[nm]=v.get("status","PROCESSING")
+                    self._clock_op(j, nm, self._op_status[nm])
                     if v.get("video_urls"):
                         vids=v["video_urls"]; ci=j.get("op_index_map",{}).get(nm,0)
                         while len(j["video_by_idx"]) <= ci: j["video_by_idx"].append(None); j["thumb_by_idx"].append(None)
@@ -267,30 +255,132 @@ class CheckWorker(QObject):
                         if v.get("image_urls"): j["thumb_by_idx"][ci]=v["image_urls"][0]
                     j["status"]=v.get("status","PROCESSING")
             if not found and j.get("status")=="PENDING": j["status"]="PROCESSING"
-            self.row_update.emit(idx,j); done+=1; self.progress.emit(int(done*100/total), f"Đã check {done}/{len(self.jobs)} cảnh")
-        self.log.emit("HTTP","Check xong."); self.finished.emit()
+            # Only rows that actually transitioned are redrawn, all in one batch
+            sig = (j.get("status"), tuple(j.get("video_by_idx") or ()),
+                   tuple(j.get("thumb_by_idx") or ()))
+            if j.get("_check_sig") != sig:
+                j["_check_sig"] = sig
+                changed.append((idx, j))
+        if changed:
+            self.rows_update.emit(changed)
+        total=sum(len(j.get("operation_names",[])) for j in self.jobs)
+        done=sum(1 for st in self._op_status.values() if st in TERMINAL_OP_STATUSES)
+        self.progress.emit(int(done * 100 / max(1, total)),
+                           f"Đã check: {done}/{total} video xong ({len(changed)} thay đổi)")
+        self.log.emit("HTTP",f"Check xong ({len(pending)} operation).")
+
+class EngineJobWorker(QObject):
+    """
+    Runs one project in the shared engine process (config engine.out_of_process).
+
+    All scenes (with their start images) go to the engine as one job; its cards
+    are mapped back onto the project rows. finished(-1) means no engine could
+    be reached and the caller should run in-process instead.
+    """
+    log = pyqtSignal(str, str)
+    progress = pyqtSignal(int, str)
+    rows_update = pyqtSignal(list)
+    finished = pyqtSignal(int)
+
+    def __init__(self, jobs, outdir, model, aspect, copies, project_name, priority=PRIORITY_NORMAL):
+        super().__init__()
+        self.jobs = jobs
+        self.outdir = outdir
+        self.model = model
+        self.aspect = aspect
+        self.copies = copies
+        self.project_name = project_name
+        self.priority = priority
+        self._client = None
+        self._job_id = None
+
+    def stop(self):
+        if self._client and self._job_id:
+            try:
+                self._client.cancel(self._job_id)
+            except Exception:
+                pass
 
-class ThumbWorker(QObject):
-    done = pyqtSignal(int, int, object)
-    def __init__(self, row, idx, url): super().__init__(); self.row=row; self.idx=idx; self.url=url
     def run(self):
-        import requests
+        ok = 0
         try:
-            r=requests.get(self.url, timeout=15); r.raise_for_status(); data=r.content
-        except Exception:
-            self.done.emit(self.row,self.idx,None); return
-        pix=QPixmap(); pix.loadFromData(QByteArray(data))
-        if not pix.isNull():
-            pix=pix.scaled(64, 64, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            self.done.emit(self.row,self.idx, QIcon(pix))
-        else:
-            self.done.emit(self.row,self.idx,None)
+            from services.engine.ipc import EngineUnavailable, ensure_engine
+            try:
+                client = ensure_engine()
+                events = client.events()  # subscribe before submit
+            except Exception as e:
+                self.log.emit("WARN", f"Engine không khả dụng ({e}) - chạy trong tiến trình này")
+                ok = -1
+                return
+            self._client = client
+            self._job_id = client.submit(
+                [j.get("prompt", "") for j in self.jobs], self.outdir,
+                title=safe_name(self.project_name),
+                model_key=self.model, aspect_ratio=self.aspect, copies=self.copies,
+                images=[j.get("image_path") for j in self.jobs],
+                scene_numbers=list(range(1, len(self.jobs) + 1)),
+                priority=self.priority)
+            self.log.emit("INFO", f"Đã gửi {len(self.jobs)} cảnh tới engine: job {self._job_id}")
+            try:
+                for ev in client.follow(self._job_id, events):
+                    kind = ev.get("kind")
+                    if kind == "card":
+                        ok += self._apply(ev["card"])
+                    elif kind == "log":
+                        self.log.emit(ev.get("level", "INFO"), ev.get("message", ""))
+                    elif kind == "progress":
+                        total = max(1, ev.get("total", 0) or 1)
+                        self.progress.emit(int(ev.get("done", 0) * 100 / total),
+                                           ev.get("message", ""))
+                    elif kind == "job_failed":
+                        self.log.emit("ERR", f"Engine job lỗi: {ev.get('error', '')}")
+            except EngineUnavailable as e:
+                self.log.emit("ERR", f"Mất kết nối engine: {e} (job {self._job_id} vẫn chạy ở đó)")
+        except Exception as e:
+            self.log.emit("ERR", f"Engine lỗi: {e}")
+        finally:
+            self.finished.emit(ok)
+
+    def _apply(self, card):
+        """Map one engine card onto its row; returns 1 if it completed a download"""
+        idx = int(card.get("scene", 0)) - 1
+        if not 0 <= idx < len(self.jobs):
+            return 0
+        j = self.jobs[idx]
+        ci = int(card.get("copy", 1)) - 1
+        st = card.get("status", "")
+        vids = j.setdefault("video_by_idx", [])
+        thumbs = j.setdefault("thumb_by_idx", [])
+        while len(vids) <= ci:
+            vids.append(None)
+            thumbs.append(None)
+        if card.get("url"):
+            vids[ci] = card["url"]
+        done = 0
+        if st == "DOWNLOADED":
+            downloaded = j.setdefault("downloaded_idx", set())
+            if ci + 1 not in downloaded:
+                downloaded.add(ci + 1)
+                j.setdefault("local_paths", []).append(card.get("path", ""))
+                done = 1
+            if card.get("thumb"):
+                thumbs[ci] = card["thumb"]
+            if len(downloaded) >= self.copies:
+                j["completed_at"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        j["status"] = st
+        self.rows_update.emit([(idx, j)])
+        return done
 
 class DownloadWorker(QObject):
-    log = pyqtSignal(str,str); progress = pyqtSignal(int, str); row_update = pyqtSignal(int, dict); finished = pyqtSignal(int,int, bool)
-    def __init__(self, jobs, outdir, only_missing=True, expected_copies=1, project_name="project", video_downloader=None):
+    log = pyqtSignal(str, str)
+    progress = pyqtSignal(int, str)
+    row_update = pyqtSignal(int, object)
+    finished = pyqtSignal(int, int, bool)
+    def __init__(self, jobs, outdir, only_missing=True, expected_copies=1, project_name="project",
+                 video_downloader=None, clock=None):
         super().__init__(); self.jobs=jobs; self.outdir=outdir; self.only_missing=only_missing; self.expected_copies=expected_copies; self.project_name=project_name
         self.video_downloader = video_downloader
+        self.clock = clock or RenderClock()
     def run(self):
         os.makedirs(self.outdir, exist_ok=True)
         total=max(1,len(self.jobs)); done=0; ok=0; attempts=0
@@ -320,8 +410,12 @@ class DownloadWorker(QObject):
                                 "user-agent": "Mozilla/5.0"
                             }
                         with requests.get(u, stream=True, timeout=300, allow_redirects=True, headers=headers) as r:
-                            r.raise_for_status(); open(dest,"wb").write(r.content)
+                            r.raise_for_status()
+                            with open(dest + ".part", "wb") as fh:
+                                fh.write(r.content)
+                            os.replace(dest + ".part", dest)
                     j["downloaded_idx"].add(i); j.setdefault("local_paths",[]).append(dest); j["status"]="DOWNLOADED"; ok+=1
+                    self.clock.finished(j.get("scene_id"), i, "DOWNLOADED")
                     # nếu đủ số lượng video mong đợi -> set thời gian hoàn thành
                     if len(j["downloaded_idx"]) >= min(self.expected_copies, len(vids)):
                         j["completed_at"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -334,6 +428,7 @@ class DownloadWorker(QObject):
 
 class ProjectPanel(QWidget):
     project_completed = pyqtSignal(str)  # emit project_name when all videos downloaded
+    project_finished = pyqtSignal(str)   # run ended: every scene terminal, successful or not
     run_all_requested = pyqtSignal()
     def __init__(self, project_name:str, base_dir:str, settings_provider=None, parent=None):
         super().__init__(parent)
@@ -342,10 +437,15 @@ class ProjectPanel(QWidget):
         self.settings_provider = settings_provider or (lambda: load_cfg())
         self.tokens=[]; self.client=None; self.jobs=[]; self.max_videos=4
         self.scenes=[]; self.image_files=[]; self._seq_running=False
+        self._thumb_loading=set()  # (row, copy) thumbnails currently being fetched
+        self.priority=PRIORITY_NORMAL  # set by the multi-project scheduler
         self._build_ui()
         self.video_downloader = VideoDownloader(log_callback=self.console.info)
         self.console.info(f"Dự án '{project_name}' đã sẵn sàng.")
-        self._timer=None
+        self._monitor = None
+        self._downloading = False
+        self._run_active = False
+        self._clock = RenderClock()  # per-copy render timing across submit/check/download workers
 
     def _build_ui(self):
         root=QVBoxLayout(self); root.setContentsMargins(6,6,6,6); root.setSpacing(4)
@@ -571,7 +671,8 @@ class ProjectPanel(QWidget):
         copies=int(self.sp_copies.value())
 
         paths = self._project_paths()
-        # Lưu prompt + copy ảnh vào thư mục dự án, đặt tên chuẩn
+        stager = get_asset_stager()
+        # Lưu prompt + ảnh vào thư mục dự án, đặt tên chuẩn
         for i in range(n):
             scene_id = i+1
             # prompt file
@@ -584,35 +685,52 @@ class ProjectPanel(QWidget):
             except Exception:
                 open(os.path.join(paths["prompts"], prompt_filename.replace(".json",".txt")), "w", encoding="utf-8").write(prompt_text)
 
-            # image copy
+            # image: staged into the project in the background (reflink/hardlink/copy);
+            # the job uploads from the source until its project copy is ready
+            src = dst = None
             if not is_t2v:
                 src = imgs[i]
                 ext = os.path.splitext(src)[1].lower() or ".jpg"
                 img_filename = f"{safe_name(self.project_name)}_canh_{scene_id}_anh{ext}"
                 dst = os.path.join(paths["images"], img_filename)
-                try:
-                    if os.path.abspath(src) != os.path.abspath(dst):
-                        shutil.copy2(src, dst)
-                except Exception as e:
-                    self.console.err(f"Không thể copy ảnh: {e}")
-                    dst = src
-            else:
-                dst = None
 
             row=self.table.rowCount(); self.table.insertRow(row)
-            job={"scene_id":f"{scene_id}","prompt":prompt_text,"image_path":dst,"image_name":os.path.basename(dst) if dst else "",
-                 "media_id":None,"operation_names":[],"status":"NEW","video_by_idx":[None]*copies,"thumb_by_idx":[None]*copies,"op_index_map":{},
-                 "downloaded_idx":set(),"thumb_icons":{},"completed_at":""}
+            job=SceneJob(scene_id=scene_id, prompt=prompt_text, copies=copies, image_path=src,
+                         image_name=os.path.basename(dst) if dst else "")
             self.jobs.append(job); self._refresh_row(row, job)
+            if src:
+                # Reference images are only read, so a hard link is safe here
+                stager.stage(src, dst, link=True,
+                             on_done=lambda path, method, err, j=job: self._on_staged(j, path, err))
         if n==0: self.console.warn("Không có cặp (prompt, ảnh) nào.")
         return n
 
+    def _on_staged(self, job, path, err):
+        # Pool thread: swapping the path is a single slot store, safe under upload
+        job["image_path"]=path
+        if err:
+            self.console.err(f"Không thể copy ảnh: {err}")
+
     def _set_cell(self, row, col, text, tooltip=None, icon=None):
-        it=self.table.item(row,col)
-        if it is None: it=QTableWidgetItem(text); self.table.setItem(row,col,it)
-        else: it.setText(text)
-        if tooltip is not None: it.setToolTip(tooltip)
-        if icon is not None: it.setIcon(icon)
+        it = self.table.item(row, col)
+        if it is None:
+            it = QTableWidgetItem(text)
+            self.table.setItem(row, col, it)
+        elif it.text() != text:
+            it.setText(text)
+        if tooltip is not None and it.toolTip() != tooltip:
+            it.setToolTip(tooltip)
+        if icon is not None:
+            it.setIcon(icon)
+
+    def _refresh_rows(self, updates):
+        """Redraw a batch of (idx, job) rows with a single repaint"""
+        self.table.setUpdatesEnabled(False)
+        try:
+            for idx, job in updates:
+                self._refresh_row(idx, job)
+        finally:
+            self.table.setUpdatesEnabled(True)
 
     def _refresh_row(self, idx, job):
         col = 0
@@ -634,10 +752,16 @@ class ProjectPanel(QWidget):
         self._set_cell(idx,col, job.get("completed_at",""))
 
     def _load_thumb_async(self, row, idx, url):
-        th=QThread(self); w=ThumbWorker(row, idx, url); w.moveToThread(th)
-        th.started.connect(w.run); w.done.connect(self._on_thumb); w.done.connect(th.quit); w.done.connect(w.deleteLater); th.finished.connect(th.deleteLater); th.start()
+        if (row, idx) in self._thumb_loading:
+            return
+        self._thumb_loading.add((row, idx))
+        pix = get_thumbnail_service().load(
+            url, 64, 64, lambda p, r=row, i=idx: self._on_thumb(r, i, QIcon(p) if p else None))
+        if pix:
+            self._on_thumb(row, idx, QIcon(pix))
 
     def _on_thumb(self, row, idx, icon):
+        self._thumb_loading.discard((row, idx))
         if 0 <= row < len(self.jobs) and icon:
             self.jobs[row]["thumb_icons"][idx]=icon; self._refresh_row(row, self.jobs[row])
 
@@ -653,6 +777,7 @@ class ProjectPanel(QWidget):
         return True
 
     def _run_seq(self):
+        """Prepare jobs and start submitting; returns True if a worker was started"""
         try:
             # PR#5: Refresh tokens only when generation starts (not on tab show)
             self.refresh_tokens()
@@ -664,10 +789,16 @@ class ProjectPanel(QWidget):
                 except Exception:
                     pass
             n=self._prepare_jobs()
-            if n<=0: return
+            if n <= 0:
+                return False
             cfg = self._settings()
-            model=self.cb_model.currentText(); aspect=self.cb_aspect.currentText(); copies=int(self.sp_copies.value()); pid=cfg.get("default_project_id") or DEFAULT_PROJECT_ID
-            if self._seq_running: self.console.warn("Đang chạy tuần tự, vui lòng chờ…"); return
+            model = self.cb_model.currentText()
+            aspect = self.cb_aspect.currentText()
+            copies = int(self.sp_copies.value())
+            pid = default_project_id(cfg) or DEFAULT_PROJECT_ID
+            if self._seq_running:
+                self.console.warn("Đang chạy tuần tự, vui lòng chờ…")
+                return False
             self._seq_running=True
 
             # Get account manager to check for multi-account support
@@ -680,51 +811,112 @@ class ProjectPanel(QWidget):
             QApplication.setOverrideCursor(Qt.WaitCursor)
             self.pb.setValue(0); self.pb_text.setText(f"Bắt đầu: {n} cảnh, {copies} video/cảnh")
 
-            # Use parallel worker if multi-account is enabled
-            if account_mgr.is_multi_account_enabled():
-                from ui.workers.parallel_worker import ParallelSeqWorker
-                num_accounts = len(account_mgr.get_enabled_accounts())
-                self.console.info(f"🚀 Parallel mode: {num_accounts} threads, {n} cảnh; copies={copies}.")
-                self._t=QThread(self)
-                self._w=ParallelSeqWorker(account_mgr,self.jobs,model,aspect,copies,pid)
-                self._w.moveToThread(self._t)
+            if (cfg.get("engine") or {}).get("out_of_process"):
+                self._run_active=self._start_engine_job(model, aspect, copies, pid, account_mgr)
             else:
-                # Fallback to sequential worker with single account
-                if not self._ensure_client(): return
-                self.console.info(f"Bắt đầu gửi tuần tự {n} cảnh; copies={copies}.")
-                self._t=QThread(self)
-                self._w=SeqWorker(self.client,self.jobs,model,aspect,copies,pid)
-                self._w.moveToThread(self._t)
-
-            self._t.started.connect(self._w.run)
-            self._w.progress.connect(self._on_prog); self._w.row_update.connect(self._refresh_row)
-            self._w.log.connect(lambda lv,msg: getattr(self.console, lv.lower())(msg) if hasattr(self.console, lv.lower()) else self.console.info(msg))
-            def on_finish(_):
-                mode = "song song" if account_mgr.is_multi_account_enabled() else "tuần tự"
-                self.console.info(f"Đã gửi xong theo {mode}.")
-                # PR#4: Disable stop button when done
-                self.btn_run.setEnabled(True); self.btn_run.setText("BẮT ĐẦU TẠO VIDEO")
-                self.btn_stop.setEnabled(False)
-                QApplication.restoreOverrideCursor()
-                self.pb_text.setText("Hoàn tất gửi.")
-                self._seq_running=False
-                # start auto-check (hidden) mỗi 10s
-                if not self._timer:
-                    self._timer=QTimer(self); self._timer.setInterval(10000); self._timer.timeout.connect(self._check)
-                self._timer.start()
-            # FIXED: Add missing .start()
-            self._w.finished.connect(on_finish)
-            self._w.finished.connect(self._t.quit)
-            self._w.finished.connect(self._w.deleteLater)
-            self._t.finished.connect(self._t.deleteLater)
-            self._t.start()
+                self._run_active=self._start_submit_worker(model, aspect, copies, pid, account_mgr)
+            return self._run_active
         except Exception as e:
             self.console.err(f"Lỗi khởi chạy: {e}")
             try: QApplication.restoreOverrideCursor(); self.btn_run.setEnabled(True); self.btn_run.setText("BẮT ĐẦU TẠO VIDEO"); self._seq_running=False
             except Exception: pass
+            return False
+
+    def _start_submit_worker(self, model, aspect, copies, pid, account_mgr):
+        """Submit in this process (parallel per account, or sequential); False if not started"""
+        n=len(self.jobs)
+        # Use parallel worker if multi-account is enabled
+        if account_mgr.is_multi_account_enabled():
+            from ui.workers.parallel_worker import ParallelSeqWorker
+            num_accounts = len(account_mgr.get_enabled_accounts())
+            self.console.info(f"🚀 Parallel mode: {num_accounts} threads, {n} cảnh; copies={copies}.")
+            self._t=QThread(self)
+            self._w=ParallelSeqWorker(account_mgr,self.jobs,model,aspect,copies,pid,project_name=self.project_name,clock=self._clock)
+            self._w.moveToThread(self._t)
+        else:
+            # Fallback to sequential worker with single account
+            if not self._ensure_client():
+                self._seq_running = False
+                QApplication.restoreOverrideCursor()
+                self.btn_run.setEnabled(True)
+                self.btn_run.setText("BẮT ĐẦU TẠO VIDEO")
+                self.btn_stop.setEnabled(False)
+                return False
+            self.console.info(f"Bắt đầu gửi tuần tự {n} cảnh; copies={copies}.")
+            self._t=QThread(self)
+            self._w=SeqWorker(self.client,self.jobs,model,aspect,copies,pid,project_name=self.project_name,clock=self._clock)
+            self._w.moveToThread(self._t)
+
+        self._t.started.connect(self._w.run)
+        self._w.progress.connect(self._on_prog)
+        self._w.row_update.connect(self._refresh_row)
+        self._w.log.connect(self._worker_log)
+        def on_finish(_):
+            mode = "song song" if account_mgr.is_multi_account_enabled() else "tuần tự"
+            self.console.info(f"Đã gửi xong theo {mode}.")
+            # PR#4: Disable stop button when done
+            self.btn_run.setEnabled(True)
+            self.btn_run.setText("BẮT ĐẦU TẠO VIDEO")
+            self.btn_stop.setEnabled(False)
+            QApplication.restoreOverrideCursor()
+            self.pb_text.setText("Hoàn tất gửi.")
+            self._seq_running=False
+            # start auto-check (hidden) mỗi 10s
+            self._start_monitor()
+            if not self._monitor:
+                self._end_run()  # nothing to poll: the run is over
+        # FIXED: Add missing .start()
+        self._w.finished.connect(on_finish)
+        self._w.finished.connect(self._t.quit)
+        self._w.finished.connect(self._w.deleteLater)
+        self._t.finished.connect(self._t.deleteLater)
+        self._t.start()
+        return True
+
+    def _worker_log(self, level, msg):
+        getattr(self.console, level.lower(), self.console.info)(msg)
+
+    def _start_engine_job(self, model, aspect, copies, pid, account_mgr):
+        """Hand the project to the shared engine process; falls back to in-process if unreachable"""
+        self.console.info(f"Gửi {len(self.jobs)} cảnh tới engine dùng chung; copies={copies}.")
+        self._t=QThread(self)
+        self._w=EngineJobWorker(self.jobs, self._project_paths()["videos"], model, aspect, copies,
+                                self.project_name, priority=self.priority)
+        self._w.moveToThread(self._t)
+        self._t.started.connect(self._w.run)
+        self._w.progress.connect(self._on_prog)
+        self._w.rows_update.connect(self._refresh_rows)
+        self._w.log.connect(self._worker_log)
+        def on_finish(ok):
+            if ok < 0:
+                if not self._start_submit_worker(model, aspect, copies, pid, account_mgr):
+                    self._end_run()
+                return
+            self.btn_run.setEnabled(True)
+            self.btn_run.setText("BẮT ĐẦU TẠO VIDEO")
+            self.btn_stop.setEnabled(False)
+            QApplication.restoreOverrideCursor()
+            self._seq_running=False
+            self.pb_text.setText(f"Engine: đã tải {ok} video.")
+            if self._all_downloaded():
+                self.console.info("Đã tải xong toàn bộ video.")
+                self.project_completed.emit(self.project_name)
+            self._end_run()
+        self._w.finished.connect(on_finish)
+        self._w.finished.connect(self._t.quit)
+        self._w.finished.connect(self._w.deleteLater)
+        self._t.finished.connect(self._t.deleteLater)
+        self._t.start()
+        return True
 
     def _on_prog(self, v, t): self.pb.setValue(v); self.pb_text.setText(t)
 
+    def progress_counts(self):
+        """(downloaded videos, expected videos) for aggregate multi-project progress"""
+        exp = int(self.sp_copies.value())
+        done = sum(min(exp, len(j.get("downloaded_idx", set()))) for j in self.jobs)
+        return done, exp*len(self.jobs)
+
     def _all_downloaded(self):
         # true nếu mọi cảnh đều đã có đủ số video & được download
         exp = int(self.sp_copies.value())
@@ -735,34 +927,69 @@ class ProjectPanel(QWidget):
         return True
 
     def _check(self):
-        if not getattr(self,"client",None) or not self.jobs: return
+        """Start the status monitor, or reuse the one already polling this project"""
+        self._start_monitor()
+
+    def _start_monitor(self):
+        if self._monitor or not self.jobs:
+            return
+        if not getattr(self, "client", None) and not any(j.get("account_name") for j in self.jobs):
+            return
         from services.account_manager import get_account_manager
         account_mgr = get_account_manager()
-        self._t2=QThread(self); self._w2=CheckWorker(self.client,self.jobs,account_mgr); self._w2.moveToThread(self._t2)
-        self._t2.started.connect(self._w2.run); self._w2.progress.connect(self._on_prog); self._w2.row_update.connect(self._refresh_row)
-        self._w2.log.connect(lambda lv,msg: getattr(self.console, lv.lower())(msg) if hasattr(self.console, lv.lower()) else self.console.info(msg))
-        def on_finished():
+        self._t2 = QThread(self)
+        self._monitor = CheckWorker(self.client, self.jobs, account_mgr, clock=self._clock)
+        self._monitor.moveToThread(self._t2)
+        self._t2.started.connect(self._monitor.run)
+        self._monitor.progress.connect(self._on_prog)
+        self._monitor.rows_update.connect(self._refresh_rows)
+        self._monitor.log.connect(self._worker_log)
+        def on_round(_pending):
             # auto-download về thư mục dự án/<Video>
-            out = self._project_paths()["videos"]
-            self._download(True, out)
-        self._w2.finished.connect(on_finished)
-        self._w2.finished.connect(self._t2.quit)
-        self._w2.finished.connect(self._w2.deleteLater)
+            if not self._downloading:
+                self._download(True, self._project_paths()["videos"])
+        def on_finished():
+            # Every operation is terminal (or checking was stopped): one last download,
+            # whose completion ends the run even if some scenes failed
+            self._monitor = None
+            if not self._downloading:
+                self._download(True, self._project_paths()["videos"])
+        self._monitor.round_done.connect(on_round)
+        self._monitor.finished.connect(on_finished)
+        self._monitor.finished.connect(self._t2.quit)
+        self._monitor.finished.connect(self._monitor.deleteLater)
         self._t2.finished.connect(self._t2.deleteLater)
         self._t2.start()
 
+    def _stop_monitor(self):
+        if self._monitor:
+            self._monitor.stop()
+
+    def _end_run(self):
+        """Signal once per run that every scene reached a terminal state"""
+        if self._run_active:
+            self._run_active=False
+            self.project_finished.emit(self.project_name)
+
     def _download(self, only_missing, outdir):
         self._t3=QThread(self)
-        self._w3=DownloadWorker(self.jobs,outdir,only_missing=only_missing, expected_copies=int(self.sp_copies.value()), project_name=self.project_name, video_downloader=self.video_downloader)
+        self._downloading=True
+        self._w3 = DownloadWorker(self.jobs, outdir, only_missing=only_missing,
+                                  expected_copies=int(self.sp_copies.value()),
+                                  project_name=self.project_name,
+                                  video_downloader=self.video_downloader, clock=self._clock)
         self._w3.moveToThread(self._t3)
         self._t3.started.connect(self._w3.run); self._w3.progress.connect(self._on_prog); self._w3.row_update.connect(self._refresh_row)
         self._w3.log.connect(lambda lv,msg: getattr(self.console, lv.lower())(msg) if hasattr(self.console, lv.lower()) else self.console.info(msg))
         def on_done(ok, attempts, all_success):
+            self._downloading=False
             if all_success and self._all_downloaded():
                 # stop checking + phát tín hiệu hoàn tất dự án
-                if self._timer: self._timer.stop()
+                self._stop_monitor()
                 self.console.info("Đã tải xong toàn bộ video. Dừng kiểm tra.")
                 self.project_completed.emit(self.project_name)
+            if self._monitor is None and not self._seq_running:
+                self._end_run()
         self._w3.finished.connect(on_done)
         self._w3.finished.connect(self._t3.quit)
         self._w3.finished.connect(self._w3.deleteLater)
@@ -839,6 +1066,6 @@ class ProjectPanel(QWidget):
 
     def closeEvent(self, e):
         try:
-            if self._timer: self._timer.stop()
+            self._stop_monitor()
         finally:
             e.accept()
@@ -11,7 +11,11 @@ from PyQt5.QtGui import QFont
 
 # Import the prompt builder function to show actual API prompt
 try:
-    from services.google.labs_flow_client import _build_complete_prompt_text
+    from services.google.labs_flow_client import _compile_api_prompt
+
+    def _build_complete_prompt_text(prompt_data):
+        """Exact text start_one sends (shared compiled prompt cache)"""
+        return _compile_api_prompt(prompt_data).text
 except ImportError:
     # Fallback if import fails
     def _build_complete_prompt_text(prompt_data):
@@ -16,6 +16,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtWidgets import QWidget as _QW
 
+from services import key_check_service as kcs
 from ui.widgets.key_list import KeyList
 from utils import config as cfg
 from utils.version import get_version
@@ -249,6 +250,8 @@ class SettingsPanel(QWidget):
             'prompts_sheet_url': self.ed_sheets_url.text().strip(),
         }
         cfg.save(st)
+        # Tokens may have been edited or replaced: drop cached pre-flight results
+        kcs.invalidate()
         self.lb_saved.setText('Đã lưu: ' + _ts())
 
     def _update_system_prompts(self):
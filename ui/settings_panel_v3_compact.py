@@ -784,6 +784,9 @@ class SettingsPanelV3Compact(QWidget):
         account_mgr.save_to_config(st)
 
         cfg.save(st)
+        # Tokens may have been edited or replaced: drop cached pre-flight results
+        from services import key_check_service as kcs
+        kcs.invalidate()
         self.lb_saved.setText(f'✓ Saved at {_ts()}')
 
         QTimer.singleShot(5000, lambda: self.lb_saved.setText(''))
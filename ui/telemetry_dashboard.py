@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Telemetry Dashboard - where the pipeline spends its time
+
+Reads services.telemetry.get_telemetry().summary() every few seconds while
+the tab is visible: per-stage timings, Labs endpoint latency, retries and
+HTTP errors, poll lag and per-account throughput. Exports the same data as
+Prometheus text and a Chrome trace (chrome://tracing / ui.perfetto.dev).
+"""
+
+import os
+import time
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import (
+    QAbstractItemView,
+    QFileDialog,
+    QGridLayout,
+    QGroupBox,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from services.telemetry import default_export_dir, get_telemetry
+
+REFRESH_MS = 2000
+
+
+def _secs(value: float) -> str:
+    if value >= 60:
+        return f"{value / 60:.1f}m"
+    if value >= 1:
+        return f"{value:.2f}s"
+    return f"{value * 1000:.0f}ms"
+
+
+def _table(headers):
+    t = QTableWidget(0, len(headers))
+    t.setHorizontalHeaderLabels(headers)
+    t.verticalHeader().setVisible(False)
+    t.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    t.setSelectionMode(QAbstractItemView.NoSelection)
+    t.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    return t
+
+
+def _fill(table: QTableWidget, rows):
+    table.setRowCount(len(rows))
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            item = table.item(r, c)
+            text = str(value)
+            if item is None:
+                table.setItem(r, c, QTableWidgetItem(text))
+            elif item.text() != text:
+                item.setText(text)
+
+
+class TelemetryDashboard(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.telemetry = get_telemetry()
+
+        root = QVBoxLayout(self)
+        top = QHBoxLayout()
+        self.lbl_since = QLabel()
+        top.addWidget(self.lbl_since, 1)
+        self.btn_prom = QPushButton("Xuất Prometheus")
+        self.btn_trace = QPushButton("Xuất Chrome trace")
+        self.btn_reset = QPushButton("Đặt lại")
+        for b in (self.btn_prom, self.btn_trace, self.btn_reset):
+            top.addWidget(b)
+        root.addLayout(top)
+
+        grid = QGridLayout()
+        self.tbl_stages = _table(["Giai đoạn", "Số lần", "Tổng", "TB", "p50", "p95"])
+        self.tbl_endpoints = _table(["Endpoint", "Requests", "TB", "p50", "p95", "Retry",
+                                     "Lỗi HTTP"])
+        self.tbl_accounts = _table(["Tài khoản", "Đã tải", "Lỗi", "Video/giờ", "Poll lag p95"])
+        for i, (title, table) in enumerate((("Thời gian theo giai đoạn", self.tbl_stages),
+                                            ("Labs API", self.tbl_endpoints),
+                                            ("Tài khoản", self.tbl_accounts))):
+            box = QGroupBox(title)
+            QVBoxLayout(box).addWidget(table)
+            grid.addWidget(box, i // 2, i % 2, 1, 2 if i == 2 else 1)
+        root.addLayout(grid, 1)
+
+        if not self.telemetry.enabled:
+            self.lbl_since.setText("Telemetry đang tắt (config telemetry.enabled = false)")
+
+        self.btn_prom.clicked.connect(self._export_prometheus)
+        self.btn_trace.clicked.connect(self._export_trace)
+        self.btn_reset.clicked.connect(self._reset)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        if not self.telemetry.enabled:
+            return
+        s = self.telemetry.summary()
+        self.lbl_since.setText(f"Từ {time.strftime('%H:%M:%S', time.localtime(s['since']))}")
+
+        _fill(self.tbl_stages, [
+            (r["stage"], r["count"], _secs(r["total"]), _secs(r["mean"]), _secs(r["p50"]),
+             _secs(r["p95"]))
+            for r in s["stages"]
+        ])
+
+        endpoints = {r["endpoint"]: r for r in s["endpoints"]}
+        names = sorted(set(endpoints) | set(s["retries"]) | set(s["http_errors"]),
+                       key=lambda n: -(endpoints.get(n) or {}).get("total", 0))
+        rows = []
+        for name in names:
+            r = endpoints.get(name) or {"count": 0, "mean": 0, "p50": 0, "p95": 0}
+            rows.append((name, r["count"], _secs(r["mean"]), _secs(r["p50"]), _secs(r["p95"]),
+                         int(s["retries"].get(name, 0)), int(s["http_errors"].get(name, 0))))
+        _fill(self.tbl_endpoints, rows)
+
+        lag = {r["account"]: r for r in s["poll_lag"]}
+        rows = []
+        for name, acc in sorted(s["accounts"].items()):
+            failed = sum(v for k, v in acc.items() if k not in ("DOWNLOADED", "per_hour"))
+            p95 = lag.get(name, {}).get("p95")
+            rows.append((name, int(acc.get("DOWNLOADED", 0)), int(failed), f"{acc['per_hour']:.1f}",
+                         _secs(p95) if p95 is not None else "-"))
+        _fill(self.tbl_accounts, rows)
+
+    def _save_path(self, title, filename, pattern):
+        os.makedirs(default_export_dir(), exist_ok=True)
+        path, _ = QFileDialog.getSaveFileName(self, title,
+                                              os.path.join(default_export_dir(), filename), pattern)
+        return path
+
+    def _export_prometheus(self):
+        path = self._save_path("Xuất Prometheus", "metrics.prom", "Prometheus (*.prom *.txt)")
+        if path:
+            self.telemetry.write_prometheus(path)
+            self.lbl_since.setText(f"Đã lưu: {path}")
+
+    def _export_trace(self):
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        path = self._save_path("Xuất Chrome trace", f"trace_{stamp}.json", "Chrome trace (*.json)")
+        if path:
+            self.telemetry.write_chrome_trace(path)
+            self.lbl_since.setText(f"Đã lưu: {path}")
+
+    def _reset(self):
+        self.telemetry.reset()
+        for t in (self.tbl_stages, self.tbl_endpoints, self.tbl_accounts):
+            t.setRowCount(0)
+        self.refresh()
@@ -6,6 +6,7 @@ import shutil
 import subprocess
 import datetime
 import time
+from contextlib import contextmanager
 from xml.sax.saxutils import escape as xml_escape
 
 from PyQt5.QtCore import QObject, pyqtSignal
@@ -13,6 +14,10 @@ from PyQt5.QtCore import QObject, pyqtSignal
 from services.google.labs_flow_client import DEFAULT_PROJECT_ID, LabsFlowClient
 from services.utils.video_downloader import VideoDownloader
 from services.account_manager import get_account_manager
+from services.project_scheduler import get_submit_gate
+from services.utils.status_updates import CardUpdates
+from services.resilience import CircuitOpenError
+from services.telemetry import RenderClock, get_telemetry
 from utils import config as cfg
 from utils.filename_sanitizer import sanitize_project_name, sanitize_filename
 
@@ -752,7 +757,7 @@ def build_prompt_json(scene_index:int, desc_vi:str, desc_tgt:str, lang_code:str,
 class _Worker(QObject):
     log = pyqtSignal(str)
     story_done = pyqtSignal(dict, dict)   # data, context (paths)
-    job_card = pyqtSignal(dict)
+    job_cards = pyqtSignal(list)  # card status transitions, coalesced to at most ~4 batches/second
     job_finished = pyqtSignal()
     progress_update = pyqtSignal(str, int)  # NEW signal: (message, percent)
 
@@ -761,8 +766,22 @@ class _Worker(QObject):
         self.task = task
         self.payload = payload
         self.should_stop = False  # PR#4: Add stop flag
+        # Unchanged cards are dropped; transitions reach the UI in batches
+        self._cards = CardUpdates(self.job_cards.emit)
+        # Render spans, poll lag and videos_total for the telemetry dashboard
+        self._clock = RenderClock()
         self.video_downloader = VideoDownloader(log_callback=lambda msg: self.log.emit(msg))
 
+    @contextmanager
+    def _submit_slot(self, account_name="default", scene=None):
+        """Per-account submit slot; retries run as "interactive" and skip queued batch scenes"""
+        p = self.payload
+        with get_submit_gate().slot(p.get("title") or "default", account_name,
+                                    priority=p.get("priority"), deadline=p.get("deadline"),
+                                    scene=scene):
+            with get_telemetry().span("submit", scene=scene, account=account_name):
+                yield
+
     def _handle_labs_event(self, event, log_func):
         """
         Handle diagnostic events from LabsClient.
@@ -816,6 +835,11 @@ class _Worker(QObject):
             warning = event.get("warning", "")
             log_func(f"[CONTENT POLICY] ⚠️  {warning}")
             log_func(f"[INFO] Prompt automatically sanitized to comply with Google's content policies")
+        elif kind == "circuit_open":
+            wait = event.get("retry_after", 0)
+            log_func(f"[WARN] Labs endpoint tạm ngừng, thử lại sau {wait:.0f}s")
+        elif kind == "retry_budget_exhausted":
+            log_func("[WARN] Hết ngân sách retry - dừng thử lại để tránh quá tải Labs")
 
 
 
@@ -832,6 +856,7 @@ class _Worker(QObject):
             self.log.emit(f"[ERR] Worker error: {e}")
             self.log.emit(f"[DEBUG] {error_details}")
         finally:
+            self._cards.flush()
             # BUG FIX: Emit finished signal for both script and video tasks
             # This ensures UI buttons are re-enabled and thread is cleaned up
             self.job_finished.emit()
@@ -979,7 +1004,8 @@ class _Worker(QObject):
             thumb = os.path.join(out_dir, f"thumb_c{scene}_v{copy}.jpg")
             if shutil.which("ffmpeg"):
                 cmd=["ffmpeg","-y","-ss","00:00:00","-i",video_path,"-frames:v","1","-q:v","3",thumb]
-                subprocess.run(cmd, check=True)
+                with get_telemetry().span("thumbnail", scene=scene, copy=copy):
+                    subprocess.run(cmd, check=True)
                 return thumb
         except Exception as e:
             self.log.emit(f"[WARN] Tạo thumbnail lỗi: {e}")
@@ -1002,7 +1028,7 @@ class _Worker(QObject):
             # Fallback to single account mode
             self.log.emit(f"[INFO] Single-account mode: Using SEQUENTIAL processing")
             tokens = st.get("tokens") or []
-            project_id = st.get("default_project_id") or DEFAULT_PROJECT_ID
+            project_id = cfg.default_project_id(st) or DEFAULT_PROJECT_ID
 
         copies = p["copies"]
         title = p["title"]
@@ -1041,12 +1067,19 @@ class _Worker(QObject):
                 body["bearer_token"] = tokens[0]
             
             self.log.emit(f"[INFO] Start scene {actual_scene_num} with {copies} copies in one batch…")
-            rc = client.start_one(body, model_key, ratio, scene["prompt"], copies=copies, project_id=project_id)
+            try:
+                with self._submit_slot(scene=actual_scene_num):
+                    rc = client.start_one(body, model_key, ratio, scene["prompt"], copies=copies, project_id=project_id)
+            except CircuitOpenError as e:
+                # Labs is down: fail this scene fast instead of retrying for minutes
+                self.log.emit(f"[WARN] Scene {actual_scene_num}: {e}")
+                rc = 0
 
             if rc > 0:
                 # Only create cards for operations that actually exist in the API response
                 # The body dict is updated by client.start_one() with operation_names list
                 actual_count = len(body.get("operation_names", []))
+                self._clock.submitted(actual_scene_num, actual_count, "default")
 
                 if actual_count < copies:
                     self.log.emit(f"[WARN] Scene {actual_scene_num}: API returned {actual_count} operations but {copies} copies were requested")
@@ -1054,7 +1087,7 @@ class _Worker(QObject):
                 # Create cards only for videos that actually exist
                 for copy_idx in range(1, actual_count + 1):
                     card={"scene":actual_scene_num,"copy":copy_idx,"status":"PROCESSING","json":scene["prompt"],"url":"","path":"","thumb":"","dir":dir_videos}
-                    self.job_card.emit(card)
+                    self._cards.put(card)
 
                     # Store card data with copy index for operation name mapping
                     # copy_idx is 1-based, so we'll use copy_idx-1 to index into operation_names (0-based)
@@ -1069,7 +1102,7 @@ class _Worker(QObject):
                 # All copies failed to start
                 for copy_idx in range(1, copies+1):
                     card={"scene":actual_scene_num,"copy":copy_idx,"status":"FAILED_START","error_reason":"Failed to start video generation","json":scene["prompt"],"url":"","path":"","thumb":"","dir":dir_videos}
-                    self.job_card.emit(card)
+                    self._cards.put(card)
 
         # polling with improved error handling
         retry_count = {}  # Track retry attempts per operation
@@ -1104,6 +1137,7 @@ class _Worker(QObject):
             except Exception as e:
                 self.log.emit(f"[WARN] Lỗi kiểm tra trạng thái (vòng {poll_round + 1}): {e}")
                 import time
+                self._cards.flush()
                 time.sleep(10)  # Wait longer on error before retry
                 continue
 
@@ -1140,7 +1174,7 @@ class _Worker(QObject):
                     self.log.emit(f"[ERR] Cảnh {sc} video {cp}: operation index {op_index} out of bounds (only {len(op_names)} operations)")
                     card["status"] = "FAILED"
                     card["error_reason"] = "Operation index out of bounds"
-                    self.job_card.emit(card)
+                    self._cards.put(card)
                     continue
 
                 op_name = op_names[op_index]
@@ -1162,6 +1196,7 @@ class _Worker(QObject):
                     if video_url:
                         card["status"] = "READY"
                         card["url"] = video_url
+                        self._clock.rendered(scene, copy_num, "READY")
 
                         self.log.emit(f"[SUCCESS] Scene {scene} Copy {copy_num}: Video ready!")
 
@@ -1180,6 +1215,7 @@ class _Worker(QObject):
                             if self._download(video_url, fp, bearer_token=bearer_token):
                                 card["status"] = "DOWNLOADED"
                                 card["path"] = fp
+                                self._clock.finished(scene, copy_num, "DOWNLOADED")
 
                                 thumb = self._make_thumb(fp, thumbs_dir, scene, copy_num)
                                 card["thumb"] = thumb
@@ -1194,7 +1230,7 @@ class _Worker(QObject):
                                     self.log.emit(f"[WARN] Download failed, will retry ({retries + 1}/{max_download_retries})")
                                     card["status"] = "DOWNLOAD_FAILED"
                                     card["url"] = video_url
-                                    self.job_card.emit(card)
+                                    self._cards.put(card)
                                     new_jobs.append(job_info)
                                     continue
                                 else:
@@ -1202,7 +1238,8 @@ class _Worker(QObject):
                                     card["status"] = "DOWNLOAD_FAILED"
                                     card["url"] = video_url
                                     card["error_reason"] = "Download failed after retries"
-                                    self.job_card.emit(card)
+                                    self._clock.finished(scene, copy_num, "DOWNLOAD_FAILED")
+                                    self._cards.put(card)
                         except Exception as e:
                             # Track download retries for exceptions
                             download_key = f"{scene}_{copy_num}"
@@ -1212,7 +1249,7 @@ class _Worker(QObject):
                                 self.log.emit(f"[ERR] Download error: {e} - will retry ({retries + 1}/{max_download_retries})")
                                 card["status"] = "DOWNLOAD_FAILED"
                                 card["url"] = video_url
-                                self.job_card.emit(card)
+                                self._cards.put(card)
                                 new_jobs.append(job_info)
                                 continue
                             else:
@@ -1220,15 +1257,17 @@ class _Worker(QObject):
                                 card["status"] = "DOWNLOAD_FAILED"
                                 card["url"] = video_url
                                 card["error_reason"] = f"Download error: {str(e)[:50]}"
-                                self.job_card.emit(card)
+                                self._clock.finished(scene, copy_num, "DOWNLOAD_FAILED")
+                                self._cards.put(card)
 
-                        self.job_card.emit(card)
+                        self._cards.put(card)
                     else:
                         # Video marked successful but no URL - this is an error state
                         self.log.emit(f"[ERR] Scene {scene} Copy {copy_num}: No video URL in response")
                         card["status"] = "DONE_NO_URL"
                         card["error_reason"] = "No video URL in response"
-                        self.job_card.emit(card)
+                        self._clock.rendered(scene, copy_num, "DONE_NO_URL")
+                        self._cards.put(card)
 
                 elif status == 'MEDIA_GENERATION_STATUS_FAILED':
                     # Try to extract error details from API response
@@ -1249,13 +1288,15 @@ class _Worker(QObject):
 
                     card["status"] = "FAILED"
                     card["error_reason"] = error_reason
+                    self._clock.rendered(scene, copy_num, "FAILED")
                     self.log.emit(f"[ERR] Scene {scene} Copy {copy_num} FAILED: {error_reason}")
-                    self.job_card.emit(card)
+                    self._cards.put(card)
 
                 else:
                     # Still processing (PENDING, ACTIVE, or other states)
                     card["status"] = "PROCESSING"
-                    self.job_card.emit(card)
+                    self._cards.put(card)
+                    self._clock.pending(scene, copy_num)
                     new_jobs.append(job_info)
 
             jobs=new_jobs
@@ -1269,6 +1310,7 @@ class _Worker(QObject):
                     self.log.emit(f"[INFO] Đang chờ {len(jobs)} video ({poll_info})...")
                 try:
                     import time
+                    self._cards.flush()
                     time.sleep(5)
                 except Exception:
                     pass
@@ -1281,7 +1323,8 @@ class _Worker(QObject):
                 if card.get("status") == "PROCESSING":
                     card["status"] = "TIMEOUT"
                     card["error_reason"] = "Quá thời gian chờ (timeout)"
-                    self.job_card.emit(card)
+                    self._clock.finished(card["scene"], card["copy"], "TIMEOUT")
+                    self._cards.put(card)
 
         # 4K upscale
 
@@ -1300,7 +1343,7 @@ class _Worker(QObject):
                             subprocess.run(cmd, check=True)
                             card["path"]=dst
                             card["status"]="UPSCALED_4K"
-                            self.job_card.emit(card)
+                            self._cards.put(card)
                         except Exception as e:
                             self.log.emit(f"[ERR] 4K upscale fail: {e}")
 
@@ -1382,7 +1425,7 @@ class _Worker(QObject):
                         )
                 elif msg_type == "card":
                     # Emit card update
-                    self.job_card.emit(data)
+                    self._cards.put(data)
                 elif msg_type == "log":
                     self.log.emit(data)
 
@@ -1466,10 +1509,12 @@ class _Worker(QObject):
                     
                     results_queue.put(("log", f"{thread_name}: Starting scene {actual_scene_num} ({copies} copies)"))
 
-                    rc = client.start_one(body, model_key, ratio, scene["prompt"], copies=copies, project_id=account.project_id)
+                    with self._submit_slot(account.name, actual_scene_num):
+                        rc = client.start_one(body, model_key, ratio, scene["prompt"], copies=copies, project_id=account.project_id)
 
                     if rc > 0:
                         actual_count = len(body.get("operation_names", []))
+                        self._clock.submitted(actual_scene_num, actual_count, account.name)
 
                         if actual_count < copies:
                             results_queue.put(("log", f"{thread_name}: Scene {actual_scene_num} returned {actual_count}/{copies} operations"))
@@ -1619,6 +1664,7 @@ class _Worker(QObject):
                     rs = client.batch_check_operations(names, metadata, project_id=project_id)
                 except Exception as e:
                     self.log.emit(f"[WARN] Poll error (round {poll_round + 1}): {e}")
+                    self._cards.flush()
                     time.sleep(10)
                     continue
 
@@ -1646,7 +1692,7 @@ class _Worker(QObject):
                         self.log.emit(f"[ERR] Scene {card['scene']} copy {card['copy']}: operation index out of bounds")
                         card["status"] = "FAILED"
                         card["error_reason"] = "Operation index out of bounds"
-                        self.job_card.emit(card)
+                        self._cards.put(card)
                         continue
 
                     op_name = op_names[op_index]
@@ -1665,6 +1711,7 @@ class _Worker(QObject):
                         if video_url:
                             card["status"] = "READY"
                             card["url"] = video_url
+                            self._clock.rendered(scene, copy_num, "READY")
                             self.log.emit(f"[SUCCESS] Scene {scene} Copy {copy_num}: Video ready!")
 
                             # Download if enabled
@@ -1678,6 +1725,7 @@ class _Worker(QObject):
                                 if self._download(video_url, dst_path, bearer_token=bearer_token):
                                     card["path"] = dst_path
                                     card["status"] = "DOWNLOADED"
+                                    self._clock.finished(scene, copy_num, "DOWNLOADED")
 
                                     # Thumbnail
                                     thumb = self._make_thumb(dst_path, thumbs_dir, scene, copy_num)
@@ -1688,14 +1736,16 @@ class _Worker(QObject):
                                 else:
                                     card["status"] = "DOWNLOAD_FAILED"
                                     card["error_reason"] = "Tải video thất bại"
+                                    self._clock.finished(scene, copy_num, "DOWNLOAD_FAILED")
 
-                            self.job_card.emit(card)
+                            self._cards.put(card)
                         else:
                             # Video marked successful but no URL - error state
                             self.log.emit(f"[ERR] Scene {scene} Copy {copy_num}: Không có URL video trong phản hồi")
                             card["status"] = "DONE_NO_URL"
                             card["error_reason"] = "Không có URL video"
-                            self.job_card.emit(card)
+                            self._clock.rendered(scene, copy_num, "DONE_NO_URL")
+                            self._cards.put(card)
 
                     elif status in ['MEDIA_GENERATION_STATUS_FAILED', 'MEDIA_GENERATION_STATUS_BLOCKED']:
                         # Extract detailed error information from API response
@@ -1718,13 +1768,15 @@ class _Worker(QObject):
 
                         card["status"] = "FAILED"
                         card["error_reason"] = error_reason
+                        self._clock.rendered(scene, copy_num, "FAILED")
                         self.log.emit(f"[FAILED] Scene {scene} Copy {copy_num}: {error_reason}")
-                        self.job_card.emit(card)
+                        self._cards.put(card)
 
                     else:
                         # Still processing
                         card["status"] = "PROCESSING"
-                        self.job_card.emit(card)
+                        self._cards.put(card)
+                        self._clock.pending(scene, copy_num)
                         new_jobs.append(job_info)
 
                 client_jobs[client] = new_jobs
@@ -1738,6 +1790,7 @@ class _Worker(QObject):
                     self.log.emit(f"[WARN] Waiting for {len(jobs)} videos (round {poll_round + 1}/120) - approaching timeout!")
                 else:
                     self.log.emit(f"[INFO] Waiting for {len(jobs)} videos (round {poll_round + 1}/120)...")
+                self._cards.flush()
                 time.sleep(5)
 
         # If we exit the loop with remaining jobs, they timed out
@@ -1748,7 +1801,8 @@ class _Worker(QObject):
                 if card.get("status") == "PROCESSING":
                     card["status"] = "TIMEOUT"
                     card["error_reason"] = "Polling timeout (quá thời gian chờ)"
-                    self.job_card.emit(card)
+                    self._clock.finished(card["scene"], card["copy"], "TIMEOUT")
+                    self._cards.put(card)
 
         # 4K upscale if requested
         if up4k and shutil.which("ffmpeg"):
@@ -1763,7 +1817,7 @@ class _Worker(QObject):
                         subprocess.run(cmd, check=True)
                         card["path"] = dst
                         card["status"] = "UPSCALED_4K"
-                        self.job_card.emit(card)
+                        self._cards.put(card)
                         self.log.emit(f"[4K] Scene {card['scene']} Copy {card['copy']}: Upscaled")
                     except Exception as e:
                         self.log.emit(f"[ERR] 4K upscale failed: {e}")
@@ -15,14 +15,13 @@ import json
 import os
 import re
 
-from PyQt5.QtCore import QLocale, QSize, Qt, QThread, QUrl, pyqtSignal  # THÊM pyqtSignal
-from PyQt5.QtGui import (  # THÊM QPixmap
+from PyQt5.QtCore import QLocale, QSize, Qt, QThread, QTimer, QUrl
+from PyQt5.QtGui import (
     QColor,
     QDesktopServices,
     QFont,
     QIcon,
     QKeySequence,
-    QPixmap,
 )
 from PyQt5.QtWidgets import (
     QApplication,
@@ -30,7 +29,6 @@ from PyQt5.QtWidgets import (
     QComboBox,
     QFileDialog,
     QFrame,
-    QGridLayout,
     QGroupBox,
     QHBoxLayout,
     QLabel,
@@ -42,7 +40,6 @@ from PyQt5.QtWidgets import (
     QPushButton,
     QScrollArea,
     QShortcut,
-    QSizePolicy,  # Added QProgressBar
     QSlider,
     QSpinBox,
     QStackedWidget,
@@ -54,6 +51,11 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
+from services.utils.artifact_writer import get_artifact_writer
+from ui.widgets.storyboard_view import StoryboardView
+from utils.log_sink import LogSink
+from utils.thumbnails import get_thumbnail_service
+
 # Original imports
 try:
     from services.domain_prompts import get_all_domains, get_topics_for_domain
@@ -75,6 +77,7 @@ try:
     )
     from ui.widgets.scene_result_card import SceneResultCard
     from ui.workers.video_worker import VideoGenerationWorker  # PR#7: Background video worker
+    from ui.workers.llm_task_worker import LLMTaskWorker
     from ui.widgets.history_widget import HistoryWidget  # History tab widget
     from utils import config as cfg
     from utils.filename_sanitizer import sanitize_project_name
@@ -86,12 +89,15 @@ except ImportError as e:
     _ASPECT_MAP = {"16:9": "VIDEO_ASPECT_RATIO_LANDSCAPE"}
     SceneResultCard = None
     VideoGenerationWorker = None  # PR#7: Fallback for missing worker
+    LLMTaskWorker = None
     HistoryWidget = None  # Fallback for missing history widget
 
 # V5 STYLING
 FONT_H2 = QFont("Segoe UI", 15, QFont.Bold)  # +2px, bold
 FONT_BODY = QFont("Segoe UI", 13)
 
+SCENE_CARD_BATCH = 20  # SceneResultCards created per event-loop turn
+
 # Warning dialog separator
 WARNING_SEPARATOR = "\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
 
@@ -126,267 +132,6 @@ class CollapsibleGroupBox(QGroupBox):
         if checked and self._accordion_group:
             self._accordion_group.setChecked(False)
 
-class StoryboardView(QWidget):
-    """Grid view for scenes - Responsive layout adapts to screen size"""
-
-    scene_clicked = pyqtSignal(int)
-
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        # BUG FIX #1: Store reference to main panel for retry button
-        self.main_panel = parent
-
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setFrameShape(QFrame.NoFrame)
-        scroll.setStyleSheet("QScrollArea { background: white; border: none; }")  # Enhanced: Ensure white bg
-
-        self.container = QWidget()
-        self.container.setStyleSheet("QWidget { background: white; }")  # Enhanced: White background
-        self.grid_layout = QGridLayout(self.container)
-        self.grid_layout.setSpacing(12)
-        self.grid_layout.setContentsMargins(12, 12, 12, 12)
-        self.grid_layout.setAlignment(Qt.AlignTop | Qt.AlignLeft)  # NEW: Align left to prevent centering gaps
-
-        scroll.setWidget(self.container)
-
-        main_layout = QVBoxLayout(self)
-        main_layout.setContentsMargins(0, 0, 0, 0)
-        main_layout.addWidget(scroll)
-
-        self.scene_cards = {}
-        self.num_columns = 3  # Default columns, will be recalculated
-
-    def _calculate_columns(self):
-        """Calculate optimal number of columns based on container width"""
-        container_width = self.container.width()
-        if container_width <= 0:
-            return 3  # Default
-
-        # Each card needs about 280px width + 12px spacing
-        card_width = 280 + 12
-        optimal_columns = max(1, container_width // card_width)
-
-        # Limit to reasonable range (2-5 columns)
-        return min(5, max(2, optimal_columns))
-
-    def resizeEvent(self, event):
-        """Handle resize to adjust column count"""
-        super().resizeEvent(event)
-        new_columns = self._calculate_columns()
-        if new_columns != self.num_columns:
-            self.num_columns = new_columns
-            self._relayout_cards()
-
-    def _relayout_cards(self):
-        """Reorganize cards based on new column count"""
-        if not self.scene_cards:
-            return
-
-        # Remove all widgets from layout
-        for i in reversed(range(self.grid_layout.count())):
-            item = self.grid_layout.itemAt(i)
-            if item and item.widget():
-                self.grid_layout.removeWidget(item.widget())
-
-        # Re-add cards with new layout
-        for scene_num in sorted(self.scene_cards.keys()):
-            idx = scene_num - 1
-            row = idx // self.num_columns
-            col = idx % self.num_columns
-            self.grid_layout.addWidget(self.scene_cards[scene_num], row, col)
-
-    def add_scene(self, scene_num, thumbnail_path, prompt_text, state_dict):
-        # NEW: Calculate position based on current column count
-        idx = scene_num - 1
-        row = idx // self.num_columns
-        col = idx % self.num_columns
-
-        card = QFrame()
-        card.setMinimumSize(240, 220)
-        # Set flexible size policy for responsive scaling (no maximum size constraint)
-        card.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
-        card.setCursor(Qt.PointingHandCursor)
-        card.setStyleSheet("""
-            QFrame {
-                background: white;
-                border: 2px solid #E0E0E0;
-                border-radius: 8px;
-            }
-            QFrame:hover {
-                border: 2px solid #1E88E5;
-                background: #F8FCFF;
-            }
-        """)
-
-        card_layout = QVBoxLayout(card)
-        card_layout.setSpacing(8)
-        card_layout.setContentsMargins(8, 8, 8, 8)
-
-        thumb_label = QLabel()
-        thumb_label.setFixedSize(242, 136)
-        thumb_label.setAlignment(Qt.AlignCenter)
-        thumb_label.setCursor(Qt.PointingHandCursor)  # Enhanced: Clickable cursor
-        thumb_label.setStyleSheet("""
-            QLabel {
-                background: #F5F5F5; 
-                border: 1px solid #E0E0E0;
-                border-radius: 6px;
-                color: #9E9E9E;
-                font-size: 11px;
-            }
-            QLabel:hover {
-                border: 2px solid #1E88E5;
-                background: #E3F2FD;
-            }
-        """)
-
-        if thumbnail_path and os.path.exists(thumbnail_path):
-            pixmap = QPixmap(thumbnail_path).scaled(242, 136, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            thumb_label.setPixmap(pixmap)
-
-            # Enhanced: Make thumbnail clickable to play video
-            vids = state_dict.get('videos', {})
-            if vids:
-                first_video = list(vids.values())[0]
-                video_path = first_video.get('path', '')
-                if video_path and os.path.exists(video_path):
-                    # BUG FIX: Use main_panel reference instead of parent() to avoid AttributeError
-                    thumb_label.mousePressEvent = lambda e, path=video_path: self.main_panel._play_video(path)
-        else:
-            thumb_label.setText("🖼️\nChưa tạo ảnh")
-
-        card_layout.addWidget(thumb_label)
-
-        title_label = QLabel(f"<b style='color:#1E88E5; font-size:14px;'>🎬 Cảnh {scene_num}</b>")
-        title_label.setAlignment(Qt.AlignCenter)
-        card_layout.addWidget(title_label)
-
-        preview_text = prompt_text[:50] + "..." if len(prompt_text) > 50 else prompt_text
-        desc_label = QLabel(preview_text)
-        desc_label.setWordWrap(True)
-        desc_label.setAlignment(Qt.AlignCenter)
-        desc_label.setFont(QFont("Segoe UI", 10))  # Enhanced: Size 10
-        desc_label.setStyleSheet("color: #757575;")
-        desc_label.setMaximumHeight(40)
-        card_layout.addWidget(desc_label)
-
-        vids = state_dict.get('videos', {})
-        if vids:
-            completed = sum(1 for v in vids.values() if v.get('status') in ('DOWNLOADED', 'COMPLETED', 'UPSCALED_4K'))
-            failed = sum(1 for v in vids.values() if v.get('status') in ('FAILED', 'ERROR', 'FAILED_START', 'DONE_NO_URL', 'DOWNLOAD_FAILED'))
-            total = len(vids)
-
-            # Status label with color coding
-            if failed > 0:
-                status_label = QLabel(f"❌ {failed} failed, {completed}/{total} OK")
-                status_label.setStyleSheet("color: #E53935; font-weight: bold;")
-            else:
-                status_label = QLabel(f"🎥 {completed}/{total} videos")
-                status_label.setStyleSheet("color: #4CAF50; font-weight: bold;")
-
-            status_label.setAlignment(Qt.AlignCenter)
-            status_label.setFont(QFont("Segoe UI", 10, QFont.Bold))
-            card_layout.addWidget(status_label)
-
-            # BUG FIX #3: Add retry button for failed videos
-            if failed > 0:
-                retry_btn = QPushButton(f"🔄 Retry ({failed})")
-                retry_btn.setMinimumHeight(28)
-                retry_btn.setStyleSheet("""
-                    QPushButton {
-                        background: #FF9800;
-                        color: white;
-                        border: none;
-                        border-radius: 4px;
-                        font-weight: bold;
-                        font-size: 11px;
-                        padding: 4px 8px;
-                    }
-                    QPushButton:hover { background: #F57C00; }
-                """)
-
-                # FIX: Add logging and proper connection with error handling
-                def on_retry_click():
-                    print(f"[DEBUG] Retry button clicked for scene {scene_num}")
-                    if hasattr(self.main_panel, '_retry_failed_scene'):
-                        self.main_panel._append_log(f"[INFO] 🔄 Retry button clicked for scene {scene_num}")
-                        self.main_panel._retry_failed_scene(scene_num)
-                    else:
-                        print("[ERROR] main_panel does not have _retry_failed_scene method!")
-
-                retry_btn.clicked.connect(on_retry_click)
-                card_layout.addWidget(retry_btn)
-            
-            # Issue #3: Add regenerate button to Storyboard (always visible, not just for failed)
-            regen_btn = QPushButton("🔁 Tạo lại video")
-            regen_btn.setMinimumHeight(28)
-            regen_btn.setStyleSheet("""
-                QPushButton {
-                    background: #2196F3;
-                    color: white;
-                    border: none;
-                    border-radius: 4px;
-                    font-weight: bold;
-                    font-size: 11px;
-                    padding: 4px 8px;
-                }
-                QPushButton:hover { background: #1976D2; }
-            """)
-
-            # Connect to regenerate method
-            def on_regenerate_click():
-                print(f"[DEBUG] Regenerate button clicked for scene {scene_num}")
-                if hasattr(self.main_panel, '_regenerate_scene_video'):
-                    self.main_panel._append_log(f"[INFO] 🔁 Regenerate button clicked for scene {scene_num}")
-                    self.main_panel._regenerate_scene_video(scene_num)
-                else:
-                    print("[ERROR] main_panel does not have _regenerate_scene_video method!")
-
-            regen_btn.clicked.connect(on_regenerate_click)
-            card_layout.addWidget(regen_btn)
-        else:
-            # No videos yet - show a "Generate Video" button
-            gen_btn = QPushButton("🎬 Tạo Video")
-            gen_btn.setMinimumHeight(28)
-            gen_btn.setStyleSheet("""
-                QPushButton {
-                    background: #4CAF50;
-                    color: white;
-                    border: none;
-                    border-radius: 4px;
-                    font-weight: bold;
-                    font-size: 11px;
-                    padding: 4px 8px;
-                }
-                QPushButton:hover { background: #388E3C; }
-            """)
-
-            # Connect to regenerate method (same as generate)
-            def on_generate_click():
-                print(f"[DEBUG] Generate button clicked for scene {scene_num}")
-                if hasattr(self.main_panel, '_regenerate_scene_video'):
-                    self.main_panel._append_log(f"[INFO] 🎬 Generate button clicked for scene {scene_num}")
-                    self.main_panel._regenerate_scene_video(scene_num)
-                else:
-                    print("[ERROR] main_panel does not have _regenerate_scene_video method!")
-
-            gen_btn.clicked.connect(on_generate_click)
-            card_layout.addWidget(gen_btn)
-
-        card.scene_num = scene_num
-        card.mousePressEvent = lambda e: self.scene_clicked.emit(scene_num)
-
-        self.grid_layout.addWidget(card, row, col)
-        self.scene_cards[scene_num] = card
-
-    def clear(self):
-        while self.grid_layout.count():
-            item = self.grid_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        self.scene_cards.clear()
-
 class Text2VideoPanelV5(QWidget):
     """Text2Video V5 - Complete with full original logic"""
 
@@ -399,6 +144,8 @@ class Text2VideoPanelV5(QWidget):
         self._title = "Project"
         self._character_bible = None
         self._script_data = None
+        self._enrich_workers = set()  # Social/thumbnail LLM calls still running
+        self._enrich_gen = 0
         self.worker = None
         self.thread = None
 
@@ -848,6 +595,7 @@ class Text2VideoPanelV5(QWidget):
 
         self.console = QTextEdit()
         self.console.setReadOnly(True)
+        self._log_sink = LogSink(self.console)
         self.console.setMinimumHeight(120)
         self.console.setMaximumHeight(150)
         self.console.setFont(QFont("Courier New", 11))
@@ -1161,11 +909,11 @@ class Text2VideoPanelV5(QWidget):
         self.setStyleSheet(groupbox_style)
 
     def _append_log(self, msg):
-        self.console.append(msg)
+        self._log_sink.write(msg)
 
     # === CONTINUE IN NEXT PART (methods from original) ===
     # Methods: stop_processing, _on_auto_generate, _run_in_thread,
-    # _on_story_ready, _on_job_card, _open_project_dir, etc.
+    # _on_story_ready, _on_job_cards, _open_project_dir, etc.
     # ui/text2video_panel_v5_complete.py - PART 2: METHODS
 # Tiếp tục từ Part 1...
 
@@ -1246,7 +994,7 @@ class Text2VideoPanelV5(QWidget):
             self.worker.story_done.connect(self._on_story_ready)
             self.worker.progress_update.connect(self._on_progress_update)  # NEW: Connect progress signal
         else:
-            self.worker.job_card.connect(self._on_job_card)
+            self.worker.job_cards.connect(self._on_job_cards)
 
         # BUG FIX: Single cleanup slot to avoid race conditions
         self.worker.job_finished.connect(self._on_worker_finished_cleanup)
@@ -1365,28 +1113,6 @@ class Text2VideoPanelV5(QWidget):
                 'vi': vi, 'tgt': tgt, 'thumb': '', 'videos': {}
             }
 
-            # Create SceneResultCard if available
-            if SceneResultCard:
-                # Prepare scene data for SceneResultCard
-                scene_data = {
-                    'description': vi or tgt,
-                    'desc': vi or tgt,
-                    'speech': '',  # Will be populated when TTS is generated
-                    'voice_over': '',
-                    'prompt_image': vi or tgt,
-                    'prompt_video': tgt or vi
-                }
-                card = SceneResultCard(i, scene_data, alternating_color=(i % 2 == 1))
-                
-                # Connect scene card signals (Requirement #1)
-                card.prompt_requested.connect(self._on_scene_prompt_requested)
-                card.recreate_requested.connect(self._on_scene_recreate_requested)
-                card.generate_video_requested.connect(self._on_scene_generate_video_requested)
-                card.regenerate_video_requested.connect(self._on_scene_regenerate_video_requested)
-                
-                self.cards_layout.insertWidget(i - 1, card)
-                self.scene_cards.append(card)
-
             # Also maintain old QListWidget for backward compatibility
             it = QListWidgetItem(self._render_card_text(i))
             it.setData(Qt.UserRole, ('scene', i))
@@ -1401,10 +1127,41 @@ class Text2VideoPanelV5(QWidget):
 
             self.cards.addItem(it)
 
+        # SceneResultCards are built a batch per event-loop turn so a large script stays responsive
+        self._scene_card_gen = getattr(self, '_scene_card_gen', 0) + 1
+        if SceneResultCard:
+            self._build_scene_cards(self._scene_card_gen)
+
         # Fill table & save prompts
         self.table.setRowCount(0)
         prdir = ctx.get("dir_prompts", "")
 
+        # Prompt files are built and written by the background artifact writer;
+        # widget values are read once here, on the GUI thread
+        prompt_args = None
+        if build_prompt_json and prdir:
+            prompt_args = dict(
+                lang_code=self.cb_out_lang.currentData(),
+                ratio_str=self.cb_ratio.currentText(),
+                style=self.cb_style.currentData() or "anime_2d",  # Use data key
+                character_bible=data.get("character_bible", []),
+                voice_settings=self.get_voice_settings(),
+                tts_provider=self.cb_tts_provider.currentData(),
+                voice_id=self.ed_custom_voice.text().strip() or self.cb_voice.currentData(),
+                voice_name=self.cb_voice.currentText() if not self.ed_custom_voice.text().strip() else "",
+                domain=self.cb_domain.currentData() or None,
+                topic=self.cb_topic.currentData() or None,
+                quality=self.cb_quality.currentText() if self.cb_quality.isVisible() else None,
+                # Issue #33: base_seed for character consistency
+                # PR #8: style_seed for visual style consistency
+                base_seed=ctx.get("base_seed") or data.get("base_seed"),
+                style_seed=ctx.get("style_seed") or data.get("style_seed"),
+            )
+        writer = get_artifact_writer()
+
+        def prompt_error(e):
+            self._append_log(f"[WARN] Could not save prompt: {e}")
+
         for i, sc in enumerate(data.get("scenes", []), 1):
             r = self.table.rowCount()
             self.table.insertRow(r)
@@ -1418,67 +1175,12 @@ class Text2VideoPanelV5(QWidget):
             btn.clicked.connect(lambda _, row=r: self._open_prompt_view(row))
             self.table.setCellWidget(r, 5, btn)
 
-            # Save prompt JSON per scene
-            if build_prompt_json and prdir:
-                try:
-                    lang_code = self.cb_out_lang.currentData()
-                    character_bible_basic = data.get("character_bible", [])
-                    voice_settings = self.get_voice_settings()
-                    location_ctx = extract_location_context(sc) if extract_location_context else None
-
-                    # Get additional parameters for enhanced prompt JSON
-                    tts_provider = self.cb_tts_provider.currentData()
-                    voice_id = self.ed_custom_voice.text().strip() or self.cb_voice.currentData()
-                    voice_name = self.cb_voice.currentText() if not self.ed_custom_voice.text().strip() else ""
-                    domain = self.cb_domain.currentData() or None
-                    topic = self.cb_topic.currentData() or None
-                    quality = self.cb_quality.currentText() if self.cb_quality.isVisible() else None
-
-                    # Part G: Extract dialogues from scene data for voiceover
-                    dialogues = sc.get("dialogues", [])
-                    
-                    # Issue #33: Get base_seed from context for character consistency
-                    # PR #8: Get style_seed from context for visual style consistency
-                    base_seed = ctx.get("base_seed") or data.get("base_seed")
-                    style_seed = ctx.get("style_seed") or data.get("style_seed")
-
-                    j = build_prompt_json(
-                        i, sc.get("prompt_vi", ""), sc.get("prompt_tgt", ""),
-                        lang_code, self.cb_ratio.currentText(),
-                        self.cb_style.currentData() or "anime_2d",  # Use data key
-                        character_bible=character_bible_basic,
-                        voice_settings=voice_settings,
-                        location_context=location_ctx,
-                        tts_provider=tts_provider,
-                        voice_id=voice_id,
-                        voice_name=voice_name,
-                        domain=domain,
-                        topic=topic,
-                        quality=quality,
-                        dialogues=dialogues,
-                        base_seed=base_seed,  # Issue #33: Pass base_seed for character consistency
-                        style_seed=style_seed  # PR #8: Pass style_seed for visual style consistency
-                    )
-
-                    with open(
-                        os.path.join(prdir, f"scene_{i:02d}.json"),
-                        "w", encoding="utf-8"
-                    ) as f:
-                        json.dump(j, f, ensure_ascii=False, indent=2)
-                    
-                    # Auto-save formatted prompt as .txt file (Requirement #2)
-                    try:
-                        from services.labs_flow_service import _build_complete_prompt_text
-                        formatted_prompt = _build_complete_prompt_text(j)
-                        with open(
-                            os.path.join(prdir, f"scene_{i:02d}.txt"),
-                            "w", encoding="utf-8"
-                        ) as f:
-                            f.write(formatted_prompt)
-                    except Exception as txt_err:
-                        self._append_log(f"[WARN] Could not save .txt prompt: {txt_err}")
-                except Exception as e:
-                    self._append_log(f"[WARN] Could not save prompt: {e}")
+            # Save prompt JSON (+ formatted .txt) per scene
+            if prompt_args:
+                writer.submit(
+                    lambda i=i, sc=sc: self._scene_prompt_files(prdir, i, sc, prompt_args, prompt_error),
+                    on_error=prompt_error,
+                )
 
         self._append_log("[INFO] Kịch bản đã hiển thị & lưu file.")
 
@@ -1508,6 +1210,31 @@ class Text2VideoPanelV5(QWidget):
         else:
             self.btn_auto.setEnabled(True)
 
+    @staticmethod
+    def _scene_prompt_files(prdir, scene_num, sc, prompt_args, on_error=None):
+        """{path: text} for scene_NN.json and scene_NN.txt (runs on the artifact writer thread)"""
+        location_ctx = extract_location_context(sc) if extract_location_context else None
+        j = build_prompt_json(
+            scene_num, sc.get("prompt_vi", ""), sc.get("prompt_tgt", ""),
+            location_context=location_ctx,
+            dialogues=sc.get("dialogues", []),  # Part G: dialogues for voiceover
+            **prompt_args
+        )
+        files = {os.path.join(prdir, f"scene_{scene_num:02d}.json"): json.dumps(j, ensure_ascii=False, indent=2)}
+        # Auto-save formatted prompt as .txt file (Requirement #2); a compile
+        # error only costs the .txt, the scene still gets its JSON
+        try:
+            from services.labs_flow_service import _build_complete_prompt_text
+            from services.prompt_compiler import compile_prompt
+            # Same cache entry _save_prompt_to_disk reuses at submit time
+            files[os.path.join(prdir, f"scene_{scene_num:02d}.txt")] = compile_prompt(
+                j, _build_complete_prompt_text, parse_json=False
+            ).text
+        except Exception as e:
+            if on_error:
+                on_error(e)
+        return files
+
     def _on_create_video_clicked(self):
         """Create videos from script - PR#7: Using background worker to prevent UI freeze"""
         if self.table.rowCount() <= 0:
@@ -1732,7 +1459,7 @@ class Text2VideoPanelV5(QWidget):
         self.video_worker.scene_completed.connect(self._on_video_scene_complete)
         self.video_worker.all_completed.connect(self._on_video_all_complete)
         self.video_worker.error_occurred.connect(self._on_video_error)
-        self.video_worker.job_card.connect(self._on_job_card)
+        self.video_worker.job_cards.connect(self._on_job_cards)
         self.video_worker.log.connect(self._append_log)
 
         # Start worker
@@ -1749,7 +1476,7 @@ class Text2VideoPanelV5(QWidget):
     def _on_video_scene_complete(self, scene_idx, video_path):
         """PR#7: Handle individual scene completion"""
         self._append_log(f"[SUCCESS] ✓ Scene {scene_idx} completed: {os.path.basename(video_path)}")
-        # UI is updated incrementally via job_card signals
+        # UI is updated incrementally via job_cards signals
 
     def _on_video_all_complete(self, video_paths):
         """PR#7: Handle all scenes completion"""
@@ -1847,17 +1574,75 @@ class Text2VideoPanelV5(QWidget):
 
         return '\n'.join(lines)
 
-    def _on_job_card(self, data: dict):
-        """Update job card with video status"""
+    def _build_scene_cards(self, gen):
+        """Create the next SCENE_CARD_BATCH SceneResultCards, then yield to the event loop"""
+        if gen != self._scene_card_gen:
+            return  # A newer script replaced these scenes
+        start = len(self.scene_cards) + 1
+        end = min(len(self._cards_state), start + SCENE_CARD_BATCH - 1)
+        for i in range(start, end + 1):
+            st = self._cards_state[i]
+            vi, tgt = st.get('vi', ''), st.get('tgt', '')
+            # Prepare scene data for SceneResultCard
+            scene_data = {
+                'description': vi or tgt,
+                'desc': vi or tgt,
+                'speech': '',  # Will be populated when TTS is generated
+                'voice_over': '',
+                'prompt_image': vi or tgt,
+                'prompt_video': tgt or vi
+            }
+            card = SceneResultCard(i, scene_data, alternating_color=(i % 2 == 1))
+
+            # Connect scene card signals (Requirement #1)
+            card.prompt_requested.connect(self._on_scene_prompt_requested)
+            card.recreate_requested.connect(self._on_scene_recreate_requested)
+            card.generate_video_requested.connect(self._on_scene_generate_video_requested)
+            card.regenerate_video_requested.connect(self._on_scene_regenerate_video_requested)
+
+            # Thumbnail may have arrived before the card existed
+            if st.get('thumb'):
+                card.set_image_path(st['thumb'])
+
+            self.cards_layout.insertWidget(i - 1, card)
+            self.scene_cards.append(card)
+        if end < len(self._cards_state):
+            QTimer.singleShot(0, lambda: self._build_scene_cards(gen))
+
+    def _on_job_cards(self, cards: list):
+        """Batched job cards: update state for all, then redraw each touched scene once"""
+        scenes = []
+        for data in cards:
+            scene = self._apply_job_card(data)
+            if scene and scene not in scenes:
+                scenes.append(scene)
+        if not scenes:
+            return
+        items = {}
+        for i in range(self.cards.count()):
+            it = self.cards.item(i)
+            role = it.data(Qt.UserRole)
+            if isinstance(role, tuple) and role[0] == 'scene':
+                items[role[1]] = it
+        self.cards.setUpdatesEnabled(False)
+        try:
+            for scene in scenes:
+                self._refresh_scene_card(scene, items.get(scene))
+        finally:
+            self.cards.setUpdatesEnabled(True)
+
+    def _apply_job_card(self, data: dict):
+        """Merge one card into _cards_state; returns its scene (0 if invalid)"""
         scene = int(data.get('scene', 0) or 0)
         copy = int(data.get('copy', 0) or 0)
         if scene <= 0 or copy <= 0:
-            return
+            return 0
 
         st = self._cards_state.setdefault(scene, {
             'vi': '', 'tgt': '', 'thumb': '', 'videos': {}
         })
         v = st['videos'].setdefault(copy, {})
+        st['last_copy'] = copy
 
         # Track download completion
         was_downloaded = v.get('status') == 'DOWNLOADED'
@@ -1870,32 +1655,57 @@ class Text2VideoPanelV5(QWidget):
         if not was_downloaded and v.get('status') == 'DOWNLOADED' and v.get('path'):
             self._append_log(f"✓ Video cảnh {scene} đã tải về: {v['path']}")
 
-        if data.get('thumb') and os.path.isfile(data['thumb']):
+        if data.get('thumb') and data['thumb'] != st['thumb'] and os.path.isfile(data['thumb']):
             st['thumb'] = data['thumb']
+        return scene
+
+    def _refresh_scene_card(self, scene: int, item=None):
+        """Redraw one scene's list item (text, thumbnail, status color)"""
+        st = self._cards_state.get(scene, {})
+        v = st.get('videos', {}).get(st.get('last_copy'), {})
+        # Thumbnails are decoded only when the path actually changes
+        new_thumb = st.get('thumb') if st.get('thumb') != st.get('icon_thumb') else None
 
         # Update SceneResultCard if available
-        if SceneResultCard and scene <= len(self.scene_cards):
-            card = self.scene_cards[scene - 1]
-            if st.get('thumb') and os.path.isfile(st['thumb']):
-                card.set_image_path(st['thumb'])
+        if new_thumb and SceneResultCard and scene <= len(self.scene_cards):
+            self.scene_cards[scene - 1].set_image_path(new_thumb)
+
+        if item is None:
+            for i in range(self.cards.count()):
+                it = self.cards.item(i)
+                role = it.data(Qt.UserRole)
+                if isinstance(role, tuple) and role == ('scene', scene):
+                    item = it
+                    break
+        if item is None:
+            return
+
+        text = self._render_card_text(scene)
+        if item.text() != text:
+            item.setText(text)
+
+        if new_thumb:
+            st['icon_thumb'] = new_thumb
+            size = self.cards.iconSize()
+            pix = get_thumbnail_service().load(
+                new_thumb, size.width(), size.height(),
+                lambda p, s=scene, t=new_thumb: self._set_scene_icon(s, t, p)
+            )
+            if pix:
+                item.setIcon(QIcon(pix))
 
+        col = self._t2v_status_color(v.get('status'))
+        if col:
+            item.setBackground(col)
+
+    def _set_scene_icon(self, scene: int, thumb: str, pix):
+        """Thumbnail finished loading; the list may have been rebuilt meanwhile"""
+        if not pix or self._cards_state.get(scene, {}).get('icon_thumb') != thumb:
+            return
         for i in range(self.cards.count()):
             it = self.cards.item(i)
-            role = it.data(Qt.UserRole)
-            if isinstance(role, tuple) and role == ('scene', scene):
-                it.setText(self._render_card_text(scene))
-
-                if st.get('thumb') and os.path.isfile(st['thumb']):
-                    pix = QPixmap(st['thumb']).scaled(
-                        self.cards.iconSize(),
-                        Qt.KeepAspectRatio,
-                        Qt.SmoothTransformation
-                    )
-                    it.setIcon(QIcon(pix))
-
-                col = self._t2v_status_color(v.get('status'))
-                if col:
-                    it.setBackground(col)
+            if it.data(Qt.UserRole) == ('scene', scene):
+                it.setIcon(QIcon(pix))
                 break
 
     def _t2v_status_color(self, status):
@@ -2006,6 +1816,7 @@ class Text2VideoPanelV5(QWidget):
                 pr = getattr(self, '_project_root', '')
                 if pr:
                     p = os.path.join(pr, '02_Prompts', f'scene_{scene:02d}.json')
+                    get_artifact_writer().flush(timeout=2.0)  # May still be queued
                     if os.path.isfile(p):
                         txt = open(p, 'r', encoding='utf-8').read()
 
@@ -2071,34 +1882,42 @@ class Text2VideoPanelV5(QWidget):
             )
 
     def _auto_generate_social_and_thumbnail(self, script_data):
-        """Auto-generate social media and thumbnail content"""
-        try:
-            # Generate social media
-            self._append_log("[INFO] Đang tạo nội dung Social Media...")
-            try:
-                if generate_social_media:
-                    social_data = generate_social_media(
-                        script_data, provider="Gemini 2.5"
-                    )
-                    self._display_social_media(social_data)
-                    self._append_log("[INFO] ✅ Social Media content đã tạo xong")
-            except Exception as e:
-                self._append_log(f"[WARN] Không thể tạo Social Media: {e}")
-
-            # Generate thumbnail
-            self._append_log("[INFO] Đang tạo Thumbnail design...")
-            try:
-                if generate_thumbnail_design:
-                    thumbnail_data = generate_thumbnail_design(
-                        script_data, provider="Gemini 2.5"
-                    )
-                    self._display_thumbnail_design(thumbnail_data)
-                    self._append_log("[INFO] ✅ Thumbnail design đã tạo xong")
-            except Exception as e:
-                self._append_log(f"[WARN] Không thể tạo Thumbnail: {e}")
+        """Generate social media and thumbnail content in the background (both at once)"""
+        if not LLMTaskWorker:
+            return
+        # A newer script makes results of still-running calls stale
+        self._enrich_gen += 1
+        gen = self._enrich_gen
+        tasks = [
+            ("social", "Social Media", generate_social_media),
+            ("thumbnail", "Thumbnail design", generate_thumbnail_design),
+        ]
+        for name, label, fn in tasks:
+            if not fn:
+                continue
+            self._append_log(f"[INFO] Đang tạo {label} (chạy nền)...")
+            worker = LLMTaskWorker(name, fn, script_data, provider="Gemini 2.5")
+            worker.done.connect(lambda n, res, g=gen: self._on_enrichment_done(g, n, res))
+            worker.error.connect(lambda n, msg, g=gen: self._on_enrichment_error(g, n, msg))
+            worker.finished.connect(lambda w=worker: self._enrich_workers.discard(w))
+            self._enrich_workers.add(worker)
+            worker.start()
+
+    def _on_enrichment_done(self, gen, name, result):
+        if gen != self._enrich_gen:
+            return
+        if name == "social":
+            self._display_social_media(result)
+            self._append_log("[INFO] ✅ Social Media content đã tạo xong")
+        else:
+            self._display_thumbnail_design(result)
+            self._append_log("[INFO] ✅ Thumbnail design đã tạo xong")
 
-        except Exception as e:
-            self._append_log(f"[ERR] Lỗi khi tạo Social/Thumbnail: {e}")
+    def _on_enrichment_error(self, gen, name, message):
+        if gen != self._enrich_gen:
+            return
+        label = "Social Media" if name == "social" else "Thumbnail"
+        self._append_log(f"[WARN] Không thể tạo {label}: {message}")
 
     def _display_social_media(self, social_data):
         """Display social media content with interactive copy buttons"""
@@ -2573,13 +2392,11 @@ class Text2VideoPanelV5(QWidget):
             self._refresh_storyboard()
 
     def _refresh_storyboard(self):
-        """Refresh storyboard with current scenes"""
-        self.storyboard_view.clear()
-        for scene_num in sorted(self._cards_state.keys()):
-            st = self._cards_state[scene_num]
-            prompt = st.get('tgt', st.get('vi', ''))
-            thumb = st.get('thumb', '')
-            self.storyboard_view.add_scene(scene_num, thumb, prompt, st)
+        """Refresh storyboard with current scenes (one model reset, cards painted on demand)"""
+        self.storyboard_view.set_scenes([
+            (scene_num, st.get('thumb', ''), st.get('tgt', st.get('vi', '')), st)
+            for scene_num, st in sorted(self._cards_state.items())
+        ])
 
     def _open_card_prompt_detail(self, item):
         """Open detail dialog on double-click"""
@@ -2804,7 +2621,8 @@ class Text2VideoPanelV5(QWidget):
             dir_videos=self._ctx.get("dir_videos", ""),
             upscale_4k=self.cb_upscale.isChecked(),
             auto_download=self.cb_auto_download.isChecked(),
-            quality=self.cb_quality.currentText()
+            quality=self.cb_quality.currentText(),
+            priority="interactive"  # Submitted ahead of scenes still queued in a running batch
         )
 
         if not payload["dir_videos"]:
@@ -3076,7 +2894,8 @@ class Text2VideoPanelV5(QWidget):
             dir_videos=self._ctx.get("dir_videos", ""),
             upscale_4k=self.cb_upscale.isChecked(),
             auto_download=self.cb_auto_download.isChecked(),
-            quality=self.cb_quality.currentText()
+            quality=self.cb_quality.currentText(),
+            priority="interactive"  # Submitted ahead of scenes still queued in a running batch
         )
 
         if not payload["dir_videos"]:
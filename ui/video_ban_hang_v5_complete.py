@@ -19,7 +19,6 @@ import json
 import os
 import platform
 import re
-import shutil
 import subprocess
 from pathlib import Path
 
@@ -33,6 +32,9 @@ from PyQt5.QtWidgets import (
     QVBoxLayout, QWidget
 )
 
+from services.utils.asset_staging import get_asset_stager
+from utils.log_sink import LogSink, level_of
+
 # Original imports
 try:
     from services import image_gen_service
@@ -191,6 +193,35 @@ class ImageGenerationWorker(QThread):
 
             # Generate scene images
             scenes = self.outline.get("scenes", [])
+
+            prompts = []
+            for scene in scenes:
+                prompt = scene.get("prompt_image", "")
+                if self.character_bible and hasattr(self.character_bible, 'characters'):
+                    try:
+                        from services.google.character_bible import inject_character_consistency
+                        prompt = inject_character_consistency(prompt, self.character_bible)
+                    except Exception as e:
+                        self.progress.emit(f"[WARNING] Failed to inject: {e}")
+                prompts.append(prompt)
+
+            # Whisk: upload reference images once and run all scene recipes concurrently
+            whisk_results = [None] * len(scenes)
+            if self.use_whisk and self.model_paths and self.prod_paths and scenes:
+                try:
+                    from services import whisk_service
+                    self.progress.emit(f"[INFO] Whisk: {len(scenes)} cảnh song song...")
+                    whisk_results = whisk_service.generate_images(
+                        prompts,
+                        model_image=self.model_paths[0] if self.model_paths else None,
+                        product_image=self.prod_paths[0] if self.prod_paths else None,
+                        aspect_ratio=whisk_aspect_ratio,
+                        debug_callback=self.progress.emit,
+                        should_stop=lambda: self.should_stop,
+                    )
+                except Exception as e:
+                    self.progress.emit(f"Whisk failed: {str(e)[:100]}")
+
             for i, scene in enumerate(scenes):
                 if self.should_stop:
                     break
@@ -200,31 +231,11 @@ class ImageGenerationWorker(QThread):
 
                 self.progress.emit(f"Tạo ảnh cảnh {scene.get('index')}...")
 
-                prompt = scene.get("prompt_image", "")
+                prompt = prompts[i]
 
-                if self.character_bible and hasattr(self.character_bible, 'characters'):
-                    try:
-                        from services.google.character_bible import inject_character_consistency
-                        prompt = inject_character_consistency(prompt, self.character_bible)
-                    except Exception as e:
-                        self.progress.emit(f"[WARNING] Failed to inject: {e}")
-
-                img_data = None
-                if self.use_whisk and self.model_paths and self.prod_paths:
-                    try:
-                        from services import whisk_service
-                        img_data = whisk_service.generate_image(
-                            prompt=prompt,
-                            model_image=self.model_paths[0] if self.model_paths else None,
-                            product_image=self.prod_paths[0] if self.prod_paths else None,
-                            aspect_ratio=whisk_aspect_ratio,
-                            debug_callback=self.progress.emit,
-                        )
-                        if img_data:
-                            self.progress.emit(f"Cảnh {scene.get('index')}: Whisk ✓")
-                    except Exception as e:
-                        self.progress.emit(f"Whisk failed: {str(e)[:100]}")
-                        img_data = None
+                img_data = whisk_results[i]
+                if img_data:
+                    self.progress.emit(f"Cảnh {scene.get('index')}: Whisk ✓")
 
                 if img_data is None and image_gen_service:
                     try:
@@ -569,8 +580,12 @@ class ImageGenerationWorker(QThread):
 class VideoBanHangV5(QWidget):
     """Video Bán Hàng V5 - Complete with Issue #7 fix"""
 
+    # Auto-download staged (destination, error or ""); emitted from the stager's pool
+    video_staged = pyqtSignal(str, str)
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.video_staged.connect(self._on_video_staged)
 
         # State
         self.prod_paths = []
@@ -990,6 +1005,7 @@ class VideoBanHangV5(QWidget):
         lv = QVBoxLayout(gb_log)
         self.ed_log = QPlainTextEdit()
         self.ed_log.setReadOnly(True)
+        self._log_sink = LogSink(self.ed_log)
         self.ed_log.setMaximumHeight(80)
         self.ed_log.setFont(QFont("Courier New", 11))
         self.ed_log.setStyleSheet("""
@@ -1316,7 +1332,7 @@ class VideoBanHangV5(QWidget):
     def _append_log(self, msg):
         """Append log message"""
         ts = datetime.datetime.now().strftime("%H:%M:%S")
-        self.ed_log.appendPlainText(f"[{ts}] {msg}")
+        self._log_sink.write(f"[{ts}] {msg}", level_of(msg))
 
     def _copy_to_clipboard(self, text):
         """Copy to clipboard"""
@@ -1916,29 +1932,41 @@ class VideoBanHangV5(QWidget):
             download_dir.mkdir(parents=True, exist_ok=True)
 
             source = Path(source_path)
-            destination = download_dir / source.name
-
-            # Copy file
-            shutil.copy2(source, destination)
-
-            self._append_log(f"✓ Đã tải về: {destination}")
-
-            # Show notification
-            reply = QMessageBox.question(
-                self,
-                "Tải thành công",
-                f"Video đã được tải về:\n{destination}\n\nMở thư mục?",
-                QMessageBox.Yes | QMessageBox.No,
-                QMessageBox.Yes
+            destination = str(download_dir / source.name)
+
+            # Reflink / hardlink when on the same filesystem, copy otherwise; on the
+            # stager's pool so a large cross-device copy doesn't freeze the window
+            get_asset_stager().stage(
+                str(source), destination,
+                on_done=lambda path, method, err: self.video_staged.emit(
+                    destination, str(err) if err else ""),
             )
 
-            if reply == QMessageBox.Yes:
-                self._open_folder(download_dir)
-
         except Exception as e:
             self._append_log(f"✗ Lỗi tải video: {e}")
             QMessageBox.warning(self, "Lỗi", f"Không thể tải video:\n{e}")
 
+    def _on_video_staged(self, destination, error):
+        """GUI-thread end of _auto_download_video: report and offer to open the folder"""
+        if error:
+            self._append_log(f"✗ Lỗi tải video: {error}")
+            QMessageBox.warning(self, "Lỗi", f"Không thể tải video:\n{error}")
+            return
+
+        self._append_log(f"✓ Đã tải về: {destination}")
+
+        # Show notification
+        reply = QMessageBox.question(
+            self,
+            "Tải thành công",
+            f"Video đã được tải về:\n{destination}\n\nMở thư mục?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.Yes
+        )
+
+        if reply == QMessageBox.Yes:
+            self._open_folder(Path(destination).parent)
+
     def _open_folder(self, folder_path):
         """
         Open folder in file explorer
@@ -10,7 +10,7 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget,
     QTableWidgetItem, QHeaderView, QLabel, QMessageBox, QLineEdit
 )
-from PyQt5.QtCore import Qt, QUrl
+from PyQt5.QtCore import Qt, QTimer, QUrl
 from PyQt5.QtGui import QFont, QDesktopServices
 
 try:
@@ -20,6 +20,9 @@ except ImportError:
     get_history_service = None
     HistoryEntry = None
 
+PAGE_SIZE = 100
+SEARCH_DEBOUNCE_MS = 250
+
 
 class HistoryWidget(QWidget):
     """Widget for displaying video creation history"""
@@ -35,6 +38,11 @@ class HistoryWidget(QWidget):
         super().__init__(parent)
         self.panel_type = panel_type
         self.history_service = get_history_service() if get_history_service else None
+        self._page = 0
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._run_search)
         self._build_ui()
         self._load_history()
     
@@ -167,19 +175,48 @@ class HistoryWidget(QWidget):
         self.table.setEditTriggers(QTableWidget.NoEditTriggers)
         
         layout.addWidget(self.table)
+        
+        # Paging
+        pager = QHBoxLayout()
+        pager.addStretch()
+        self.btn_prev = QPushButton("◀ Trước")
+        self.btn_prev.clicked.connect(lambda: self._show_page(self._page - 1))
+        self.page_label = QLabel()
+        self.page_label.setFont(QFont("Segoe UI", 10))
+        self.btn_next = QPushButton("Sau ▶")
+        self.btn_next.clicked.connect(lambda: self._show_page(self._page + 1))
+        for w in (self.btn_prev, self.page_label, self.btn_next):
+            pager.addWidget(w)
+        layout.addLayout(pager)
     
     def _load_history(self):
-        """Load history from service"""
+        """Load history from service (first page)"""
         if not self.history_service:
             self.table.setRowCount(0)
             self.info_label.setText("⚠️ Dịch vụ lịch sử không khả dụng")
             return
-        
-        # Get history entries
-        entries = self.history_service.get_history(panel_type=self.panel_type)
+        self._show_page(0)
+    
+    def _show_page(self, page: int):
+        """Query one page of (filtered) history; only that page is put in the table"""
+        if not self.history_service:
+            return
+        query = self.search_box.text().strip()
+        total = self.history_service.count(panel_type=self.panel_type)
+        matched = self.history_service.count(panel_type=self.panel_type, query=query) if query else total
+        pages = max(1, (matched + PAGE_SIZE - 1) // PAGE_SIZE)
+        self._page = min(max(0, page), pages - 1)
+        entries = self.history_service.search(query, panel_type=self.panel_type,
+                                              limit=PAGE_SIZE, offset=self._page * PAGE_SIZE)
         
         # Update info label
-        self.info_label.setText(f"📊 Tổng số: {len(entries)} mục")
+        if query:
+            self.info_label.setText(f"🔍 Tìm thấy: {matched}/{total} mục")
+        else:
+            self.info_label.setText(f"📊 Tổng số: {total} mục")
+        self.page_label.setText(f"Trang {self._page + 1}/{pages}")
+        self.btn_prev.setEnabled(self._page > 0)
+        self.btn_next.setEnabled(self._page < pages - 1)
         
         # Populate table
         self._populate_table(entries)
@@ -280,7 +317,7 @@ class HistoryWidget(QWidget):
                 QPushButton:hover { background: #F44336; }
             """)
             btn_delete.clicked.connect(
-                lambda checked, ts=entry.timestamp: self._delete_entry(ts)
+                lambda checked, ts=entry.timestamp, eid=getattr(entry, "entry_id", None): self._delete_entry(ts, eid)
             )
             actions_layout.addWidget(btn_delete)
             
@@ -309,7 +346,7 @@ class HistoryWidget(QWidget):
                 f"Không thể mở thư mục:\n{e}"
             )
     
-    def _delete_entry(self, timestamp: str):
+    def _delete_entry(self, timestamp: str, entry_id=None):
         """Delete a history entry"""
         reply = QMessageBox.question(
             self,
@@ -321,8 +358,12 @@ class HistoryWidget(QWidget):
         
         if reply == QMessageBox.Yes:
             if self.history_service:
-                if self.history_service.delete_entry(timestamp):
-                    self._load_history()
+                if entry_id is not None:
+                    deleted = self.history_service.delete_entry_id(entry_id)
+                else:
+                    deleted = self.history_service.delete_entry(timestamp)
+                if deleted:
+                    self._show_page(self._page)
                     QMessageBox.information(
                         self,
                         "Thành công",
@@ -351,36 +392,11 @@ class HistoryWidget(QWidget):
                 )
     
     def _on_search(self, text: str):
-        """Filter table based on search text"""
-        if not self.history_service:
-            return
-        
-        # Get all entries
-        all_entries = self.history_service.get_history(panel_type=self.panel_type)
-        
-        # Filter entries
-        if text.strip():
-            search_text = text.lower()
-            filtered_entries = [
-                entry for entry in all_entries
-                if (search_text in entry.idea.lower() or
-                    search_text in entry.style.lower() or
-                    (entry.genre and search_text in entry.genre.lower()) or
-                    search_text in entry.folder_path.lower())
-            ]
-        else:
-            filtered_entries = all_entries
-        
-        # Update info label
-        if text.strip():
-            self.info_label.setText(
-                f"🔍 Tìm thấy: {len(filtered_entries)}/{len(all_entries)} mục"
-            )
-        else:
-            self.info_label.setText(f"📊 Tổng số: {len(all_entries)} mục")
-        
-        # Repopulate table
-        self._populate_table(filtered_entries)
+        """Debounce keystrokes; the query runs once typing pauses"""
+        self._search_timer.start()
+    
+    def _run_search(self):
+        self._show_page(0)
     
     def refresh(self):
         """Refresh history display"""
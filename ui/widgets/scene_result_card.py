@@ -18,6 +18,8 @@ from PyQt5.QtWidgets import (
     QVBoxLayout,
 )
 
+from utils.thumbnails import get_thumbnail_service
+
 
 class SceneResultCard(QFrame):
     """
@@ -249,7 +251,12 @@ class SceneResultCard(QFrame):
         self.img_preview.setPixmap(pixmap.scaled(320, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation))
 
     def set_image_path(self, path):
-        """Set image from file path - Issue 1: Updated to 320x200px"""
-        pixmap = QPixmap(path)
-        if not pixmap.isNull():
-            self.img_preview.setPixmap(pixmap.scaled(320, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        """Set image from file path - Issue 1: Updated to 320x200px (decoded off the GUI thread)"""
+        self._image_path = path
+
+        def apply(pixmap):
+            # Ignore a slow decode that finishes after a newer image was set
+            if pixmap and getattr(self, '_image_path', None) == path:
+                self.img_preview.setPixmap(pixmap)
+
+        apply(get_thumbnail_service().load(path, 320, 200, apply))
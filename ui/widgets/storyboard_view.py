@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""
+StoryboardView Widget - model/view grid of scene cards
+
+One QListView in icon mode over a StoryboardModel: cards are painted by
+StoryboardDelegate, so only the visible ones cost anything and a resize just
+re-flows fixed-size cells. Thumbnails come from the shared thumbnail service
+and repaint their card when they finish loading. A 500-scene project opens
+and resizes without building 500 widget trees.
+"""
+import os
+
+from PyQt5.QtCore import QAbstractListModel, QEvent, QModelIndex, QRect, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QFontMetrics, QPainter, QPainterPath, QPen
+from PyQt5.QtWidgets import QListView, QStyle, QStyledItemDelegate, QVBoxLayout, QWidget
+
+from utils.thumbnails import get_thumbnail_service
+
+CARD_WIDTH = 260
+CARD_HEIGHT = 292
+THUMB_WIDTH = 242
+THUMB_HEIGHT = 136
+PADDING = 9
+
+DONE_STATUSES = ('DOWNLOADED', 'COMPLETED', 'UPSCALED_4K')
+FAILED_STATUSES = ('FAILED', 'ERROR', 'FAILED_START', 'DONE_NO_URL', 'DOWNLOAD_FAILED')
+
+SceneRole = Qt.UserRole + 1
+
+# Button id -> (label, color)
+BUTTON_STYLES = {
+    'retry': ("🔄 Retry ({failed})", "#FF9800"),
+    'regenerate': ("🔁 Tạo lại video", "#2196F3"),
+    'generate': ("🎬 Tạo Video", "#4CAF50"),
+}
+
+
+def scene_summary(scene_num, thumbnail_path, prompt_text, state_dict):
+    """Flatten one scene's state into what a card paints"""
+    vids = state_dict.get('videos', {}) or {}
+    video_path = ''
+    if vids:
+        video_path = list(vids.values())[0].get('path', '') or ''
+    return {
+        'scene': scene_num,
+        'thumb': thumbnail_path or '',
+        'prompt': prompt_text or '',
+        'total': len(vids),
+        'completed': sum(1 for v in vids.values() if v.get('status') in DONE_STATUSES),
+        'failed': sum(1 for v in vids.values() if v.get('status') in FAILED_STATUSES),
+        'video_path': video_path,
+    }
+
+
+class StoryboardModel(QAbstractListModel):
+    """One row per scene; rows are plain dicts from scene_summary()"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._row_of = {}  # scene number -> row
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not (0 <= index.row() < len(self._rows)):
+            return None
+        row = self._rows[index.row()]
+        if role == SceneRole:
+            return row
+        if role == Qt.DisplayRole:
+            return f"Cảnh {row['scene']}"
+        if role == Qt.ToolTipRole:
+            return row['prompt']
+        return None
+
+    def set_scenes(self, rows):
+        self.beginResetModel()
+        self._rows = sorted(rows, key=lambda r: r['scene'])
+        self._row_of = {r['scene']: i for i, r in enumerate(self._rows)}
+        self.endResetModel()
+
+    def upsert(self, row):
+        i = self._row_of.get(row['scene'])
+        if i is not None:
+            self._rows[i] = row
+            idx = self.index(i)
+            self.dataChanged.emit(idx, idx)
+            return
+        # Keep scene order; appends are the common case
+        pos = len(self._rows)
+        while pos > 0 and self._rows[pos - 1]['scene'] > row['scene']:
+            pos -= 1
+        self.beginInsertRows(QModelIndex(), pos, pos)
+        self._rows.insert(pos, row)
+        self._row_of = {r['scene']: j for j, r in enumerate(self._rows)}
+        self.endInsertRows()
+
+    def scene_changed(self, scene_num):
+        """Repaint one card (e.g. its thumbnail finished loading)"""
+        i = self._row_of.get(scene_num)
+        if i is not None:
+            idx = self.index(i)
+            self.dataChanged.emit(idx, idx)
+
+    def scene_row(self, scene_num):
+        i = self._row_of.get(scene_num)
+        return self._rows[i] if i is not None else None
+
+    def clear(self):
+        self.set_scenes([])
+
+
+class StoryboardDelegate(QStyledItemDelegate):
+    """Paints a scene card and reports clicks on its thumbnail and buttons"""
+
+    button_clicked = pyqtSignal(str, int)  # button id, scene number
+    thumbnail_clicked = pyqtSignal(int)
+    card_clicked = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.title_font = QFont("Segoe UI", 11, QFont.Bold)
+        self.body_font = QFont("Segoe UI", 10)
+        self.status_font = QFont("Segoe UI", 10, QFont.Bold)
+        self.button_font = QFont("Segoe UI", 9, QFont.Bold)
+
+    def sizeHint(self, option, index):
+        return QSize(CARD_WIDTH, CARD_HEIGHT)
+
+    # ---- geometry ----
+    def _thumb_rect(self, card):
+        return QRect(card.left() + PADDING, card.top() + PADDING, THUMB_WIDTH, THUMB_HEIGHT)
+
+    def _buttons(self, card, row):
+        ids = []
+        if row['total']:
+            if row['failed']:
+                ids.append('retry')
+            ids.append('regenerate')
+        else:
+            ids.append('generate')
+        rects = []
+        bottom = card.bottom() - PADDING
+        for bid in reversed(ids):
+            rect = QRect(card.left() + PADDING, bottom - 28, card.width() - 2 * PADDING, 28)
+            rects.insert(0, (bid, rect))
+            bottom -= 28 + 6
+        return rects
+
+    # ---- painting ----
+    def paint(self, painter, option, index):
+        row = index.data(SceneRole)
+        if not row:
+            return
+        card = option.rect.adjusted(2, 2, -2, -2)
+        hover = bool(option.state & QStyle.State_MouseOver)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        path = QPainterPath()
+        path.addRoundedRect(card.x(), card.y(), card.width(), card.height(), 8, 8)
+        painter.fillPath(path, QColor("#F8FCFF") if hover else QColor("white"))
+        painter.setPen(QPen(QColor("#1E88E5") if hover else QColor("#E0E0E0"), 2))
+        painter.drawPath(path)
+
+        # Thumbnail (decoded at this size on the thumbnail pool)
+        thumb = self._thumb_rect(card)
+        painter.fillRect(thumb, QColor("#F5F5F5"))
+        pix = None
+        if row['thumb']:
+            model = index.model()
+            scene = row['scene']
+            pix = get_thumbnail_service().load(row['thumb'], THUMB_WIDTH, THUMB_HEIGHT,
+                                               lambda p: p and model.scene_changed(scene))
+        if pix:
+            x = thumb.left() + (thumb.width() - pix.width()) // 2
+            y = thumb.top() + (thumb.height() - pix.height()) // 2
+            painter.drawPixmap(x, y, pix)
+        else:
+            painter.setPen(QColor("#9E9E9E"))
+            painter.setFont(self.body_font)
+            painter.drawText(thumb, Qt.AlignCenter, "🖼️\nChưa tạo ảnh")
+
+        y = thumb.bottom() + 8
+        text_rect = QRect(card.left() + PADDING, y, card.width() - 2 * PADDING, 20)
+        painter.setPen(QColor("#1E88E5"))
+        painter.setFont(self.title_font)
+        painter.drawText(text_rect, Qt.AlignCenter, f"🎬 Cảnh {row['scene']}")
+
+        # Two lines of prompt preview
+        painter.setPen(QColor("#757575"))
+        painter.setFont(self.body_font)
+        desc_rect = QRect(text_rect.left(), text_rect.bottom() + 2, text_rect.width(), 34)
+        preview = row['prompt'][:50] + "..." if len(row['prompt']) > 50 else row['prompt']
+        painter.drawText(desc_rect, Qt.AlignHCenter | Qt.AlignTop | Qt.TextWordWrap, preview)
+
+        buttons = self._buttons(card, row)
+        if row['total']:
+            status_rect = QRect(text_rect.left(), buttons[0][1].top() - 22, text_rect.width(), 20)
+            painter.setFont(self.status_font)
+            if row['failed']:
+                painter.setPen(QColor("#E53935"))
+                status = f"❌ {row['failed']} failed, {row['completed']}/{row['total']} OK"
+            else:
+                painter.setPen(QColor("#4CAF50"))
+                status = f"🎥 {row['completed']}/{row['total']} videos"
+            elided = QFontMetrics(self.status_font).elidedText(status, Qt.ElideRight,
+                                                               status_rect.width())
+            painter.drawText(status_rect, Qt.AlignCenter, elided)
+
+        painter.setFont(self.button_font)
+        for bid, rect in buttons:
+            label, color = BUTTON_STYLES[bid]
+            btn_path = QPainterPath()
+            btn_path.addRoundedRect(rect.x(), rect.y(), rect.width(), rect.height(), 4, 4)
+            painter.fillPath(btn_path, QColor(color))
+            painter.setPen(QColor("white"))
+            painter.drawText(rect, Qt.AlignCenter, label.format(failed=row['failed']))
+        painter.restore()
+
+    # ---- clicks ----
+    def editorEvent(self, event, model, option, index):
+        if event.type() != QEvent.MouseButtonRelease or event.button() != Qt.LeftButton:
+            return False
+        row = index.data(SceneRole)
+        if not row:
+            return False
+        card = option.rect.adjusted(2, 2, -2, -2)
+        pos = event.pos()
+        for bid, rect in self._buttons(card, row):
+            if rect.contains(pos):
+                self.button_clicked.emit(bid, row['scene'])
+                return True
+        video = row['video_path']
+        if self._thumb_rect(card).contains(pos) and video and os.path.exists(video):
+            self.thumbnail_clicked.emit(row['scene'])
+            return True
+        self.card_clicked.emit(row['scene'])
+        return True
+
+
+class StoryboardView(QWidget):
+    """Grid view for scenes - Responsive layout adapts to screen size"""
+
+    scene_clicked = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # BUG FIX #1: Store reference to main panel for retry button
+        self.main_panel = parent
+
+        self.model = StoryboardModel(self)
+        self.delegate = StoryboardDelegate(self)
+
+        self.list_view = QListView()
+        self.list_view.setViewMode(QListView.IconMode)
+        self.list_view.setResizeMode(QListView.Adjust)  # Re-flows fixed-size cells only
+        self.list_view.setMovement(QListView.Static)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSpacing(6)
+        self.list_view.setSelectionMode(QListView.NoSelection)
+        self.list_view.setMouseTracking(True)
+        self.list_view.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.list_view.setFrameShape(QListView.NoFrame)
+        self.list_view.setStyleSheet("QListView { background: white; border: none; }")
+        self.list_view.setModel(self.model)
+        self.list_view.setItemDelegate(self.delegate)
+
+        self.delegate.card_clicked.connect(self.scene_clicked)
+        self.delegate.thumbnail_clicked.connect(self._on_thumbnail_clicked)
+        self.delegate.button_clicked.connect(self._on_button_clicked)
+
+        main_layout = QVBoxLayout(self)
+        main_layout.setContentsMargins(6, 6, 6, 6)
+        main_layout.addWidget(self.list_view)
+
+    def set_scenes(self, scenes):
+        """Replace all cards at once; scenes is [(scene_num, thumb, prompt, state_dict)]"""
+        self.model.set_scenes([scene_summary(*s) for s in scenes])
+
+    def add_scene(self, scene_num, thumbnail_path, prompt_text, state_dict):
+        """Add or update one card"""
+        self.model.upsert(scene_summary(scene_num, thumbnail_path, prompt_text, state_dict))
+
+    def clear(self):
+        self.model.clear()
+
+    def _on_thumbnail_clicked(self, scene_num):
+        row = self.model.scene_row(scene_num)
+        if row and hasattr(self.main_panel, '_play_video'):
+            self.main_panel._play_video(row['video_path'])
+
+    def _on_button_clicked(self, button_id, scene_num):
+        panel = self.main_panel
+        if button_id == 'retry':
+            if hasattr(panel, '_retry_failed_scene'):
+                panel._append_log(f"[INFO] 🔄 Retry button clicked for scene {scene_num}")
+                panel._retry_failed_scene(scene_num)
+            else:
+                print("[ERROR] main_panel does not have _retry_failed_scene method!")
+            return
+        if hasattr(panel, '_regenerate_scene_video'):
+            label = "🔁 Regenerate" if button_id == 'regenerate' else "🎬 Generate"
+            panel._append_log(f"[INFO] {label} button clicked for scene {scene_num}")
+            panel._regenerate_scene_video(scene_num)
+        else:
+            print("[ERROR] main_panel does not have _regenerate_scene_video method!")
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+LLM Task Worker - runs one blocking LLM call (social media, thumbnail design...)
+off the GUI thread. Several workers can run side by side; each reports back
+with its task name so results stream into the UI as they finish.
+"""
+import sys
+import traceback
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class LLMTaskWorker(QThread):
+    done = pyqtSignal(str, object)   # task name, result
+    error = pyqtSignal(str, str)     # task name, message
+
+    def __init__(self, name, fn, *args, **kwargs):
+        super().__init__()
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        try:
+            self.done.emit(self.name, self.fn(*self.args, **self.kwargs))
+        except Exception as e:
+            self.error.emit(self.name, f"{type(e).__name__}: {e}")
+            print(f"[ERROR] {type(e).__name__} in LLMTaskWorker({self.name}):", file=sys.stderr)
+            traceback.print_exc()
@@ -5,11 +5,15 @@ Distributes jobs across multiple Google accounts using round-robin
 """
 import threading
 import time
+from contextlib import contextmanager
 from queue import Queue
 from typing import List, Tuple
 
 from PyQt5.QtCore import QObject, pyqtSignal
 
+from services.project_scheduler import get_submit_gate
+from services.telemetry import RenderClock, get_telemetry
+
 
 class ParallelSeqWorker(QObject):
     """
@@ -20,11 +24,12 @@ class ParallelSeqWorker(QObject):
     # Signals
     log = pyqtSignal(str, str)          # Log level, message
     progress = pyqtSignal(int, str)     # Progress value, progress text
-    row_update = pyqtSignal(int, dict)  # Row index, job data
+    row_update = pyqtSignal(int, object)  # Row index, SceneJob (passed by reference)
     started = pyqtSignal()              # Worker started
     finished = pyqtSignal(int)          # Worker finished with count
 
-    def __init__(self, account_mgr, jobs, model, aspect, copies, project_id=None):
+    def __init__(self, account_mgr, jobs, model, aspect, copies, project_id=None, project_name=None,
+                 clock=None):
         """
         Initialize parallel worker
         
@@ -35,6 +40,9 @@ class ParallelSeqWorker(QObject):
             aspect: Aspect ratio
             copies: Number of copies per scene
             project_id: (Deprecated) Google Labs project ID - now uses account-specific IDs
+            project_name: Project this run belongs to; submits share each account's
+                          slots fairly with other running projects (SubmitGate)
+            clock: RenderClock shared with the panel's check/download workers
         """
         super().__init__()
         self.account_mgr = account_mgr
@@ -43,6 +51,9 @@ class ParallelSeqWorker(QObject):
         self.aspect = aspect
         self.copies = copies
         self.project_id = project_id  # Kept for backward compatibility, not used
+        self.project_name = project_name or "default"
+        self.gate = get_submit_gate()
+        self.clock = clock or RenderClock()
 
         # Thread coordination
         self.results_queue = Queue()
@@ -64,8 +75,13 @@ class ParallelSeqWorker(QObject):
                 self._run_sequential()
                 return
 
-            # Get enabled accounts
-            accounts = self.account_mgr.get_enabled_accounts()
+            # Pre-flight token check, then plan only onto accounts with live tokens
+            self.account_mgr.preflight_check(log=lambda msg: self.log.emit("INFO", msg))
+            accounts = self.account_mgr.get_healthy_accounts()
+            if not accounts:
+                self.log.emit("ERR", "No account has a valid Google Labs token")
+                self.finished.emit(0)
+                return
             num_accounts = len(accounts)
 
             self.log.emit("INFO", f"🚀 Parallel mode: {num_accounts} accounts, {self.total_jobs} jobs")
@@ -133,8 +149,9 @@ class ParallelSeqWorker(QObject):
             # Import here to avoid circular imports
             from services.google.labs_flow_client import LabsFlowClient
 
-            # Create client for this account
-            client = LabsFlowClient(account.tokens, on_event=None)
+            # Create client for this account (only tokens that passed pre-flight)
+            tokens = account.live_tokens()
+            client = LabsFlowClient(tokens, on_event=None)
 
             # Use account-specific project_id instead of global one
             account_project_id = account.project_id
@@ -153,7 +170,9 @@ class ParallelSeqWorker(QObject):
                         self.log.emit("INFO", f"{thread_name}: Uploading image for job {job_idx+1}")
 
                         try:
-                            media_id = client.upload_image_file(job["image_path"])
+                            with get_telemetry().span("upload", scene=job.get("scene_id"),
+                                                      account=account.name):
+                                media_id = client.upload_image_file(job["image_path"])
                             job["media_id"] = media_id
                             self.log.emit("HTTP", f"{thread_name}: Upload OK mediaId={media_id}")
                         except Exception as e:
@@ -165,20 +184,21 @@ class ParallelSeqWorker(QObject):
                     # Start generation
                     self.log.emit("INFO", f"{thread_name}: Starting generation for job {job_idx+1}")
 
-                    rc = client.start_one(
-                        job, 
-                        self.model, 
-                        self.aspect, 
-                        job.get("prompt", ""),
-                        copies=self.copies,
-                        project_id=account_project_id
-                    )
+                    with self._submit_slot(job, account.name):
+                        rc = client.start_one(
+                            job, 
+                            self.model, 
+                            self.aspect, 
+                            job.get("prompt", ""),
+                            copies=self.copies,
+                            project_id=account_project_id
+                        )
 
                     # CRITICAL FIX: Store account name and bearer token so CheckWorker can use correct client
                     # Each operation must be checked with the same account that created it
                     # Store bearer token for video downloads (multi-account fix)
                     job["account_name"] = account.name
-                    job["bearer_token"] = account.tokens[0] if account.tokens else None
+                    job["bearer_token"] = tokens[0] if tokens else None
 
                     self.log.emit("HTTP", f"{thread_name}: START OK -> {rc} ref(s)")
 
@@ -197,6 +217,15 @@ class ParallelSeqWorker(QObject):
         except Exception as e:
             self.log.emit("ERR", f"Thread {thread_id+1} error: {e}")
 
+    @contextmanager
+    def _submit_slot(self, job: dict, account_name: str):
+        """Fair-share submit slot; times the submit and starts the job's render clock"""
+        scene = job.get("scene_id")
+        with self.gate.slot(self.project_name, account_name, scene=scene):
+            with get_telemetry().span("submit", scene=scene, account=account_name):
+                yield
+        self.clock.submitted(scene, len(job.get("operation_names", [])), account_name)
+
     def _queue_update(self, job_idx: int, job: dict):
         """
         Queue a job update for the main thread
@@ -284,7 +313,9 @@ class ParallelSeqWorker(QObject):
 
                     if not job.get("media_id"):
                         try:
-                            mid = client.upload_image_file(job["image_path"])
+                            with get_telemetry().span("upload", scene=job.get("scene_id"),
+                                                      account=account.name):
+                                mid = client.upload_image_file(job["image_path"])
                             job["media_id"] = mid
                             self.log.emit("HTTP", f"UPLOAD OK mediaId={mid}")
                         except Exception as e:
@@ -297,10 +328,11 @@ class ParallelSeqWorker(QObject):
                 self.log.emit("INFO", f"[{i+1}/{len(self.jobs)}] Start generate…")
                 try:
                     self.progress.emit(int(done * 100 / total), f"Cảnh {i+1}/{len(self.jobs)}: start…")
-                    rc = client.start_one(
-                        job, self.model, self.aspect, job.get("prompt", ""), 
-                        copies=self.copies, project_id=account_project_id
-                    )
+                    with self._submit_slot(job, account.name):
+                        rc = client.start_one(
+                            job, self.model, self.aspect, job.get("prompt", ""), 
+                            copies=self.copies, project_id=account_project_id
+                        )
                     self.log.emit("HTTP", f"START OK -> {rc} ref(s).")
                 except Exception as e:
                     self.log.emit("ERR", f"Start thất bại: {e}")
@@ -7,11 +7,23 @@ import os
 import shutil
 import subprocess
 import time
+from contextlib import contextmanager
 
 from PyQt5.QtCore import QThread, pyqtSignal
 
 from services.account_manager import get_account_manager
+from services.generation_library import (
+    generation_key,
+    get_generation_library,
+    rendered_model,
+    scene_keys,
+    seed_of,
+)
 from services.google.labs_flow_client import DEFAULT_PROJECT_ID, LabsFlowClient
+from services.project_scheduler import get_submit_gate
+from services.resilience import CircuitOpenError
+from services.telemetry import RenderClock, get_telemetry
+from services.utils.status_updates import CardUpdates
 from services.utils.video_downloader import VideoDownloader
 from utils import config as cfg
 from utils.filename_sanitizer import sanitize_filename
@@ -26,7 +38,7 @@ class VideoGenerationWorker(QThread):
         scene_completed: Emitted when a scene video completes (scene_idx, video_path)
         all_completed: Emitted when all scenes complete (list of video_paths)
         error_occurred: Emitted on error (error_message)
-        job_card: Emitted for video status updates (card_dict)
+        job_cards: Video status transitions, batched (list of card_dict)
         log: Emitted for log messages (log_message)
     """
 
@@ -35,7 +47,7 @@ class VideoGenerationWorker(QThread):
     scene_completed = pyqtSignal(int, str)  # scene_idx, video_path
     all_completed = pyqtSignal(list)  # all video_paths
     error_occurred = pyqtSignal(str)  # error_message
-    job_card = pyqtSignal(dict)  # card data for UI updates
+    job_cards = pyqtSignal(list)  # card status transitions, coalesced to at most ~4 batches/second
     log = pyqtSignal(str)  # log messages
 
     def __init__(self, payload, parent=None):
@@ -52,17 +64,41 @@ class VideoGenerationWorker(QThread):
                 - upscale_4k: Whether to upscale to 4K
                 - auto_download: Whether to auto-download videos
                 - quality: Video quality (1080p, 720p, etc.)
+                - priority: Optional request class ("interactive" for single-scene
+                  retries, so they are submitted ahead of running batches)
+                - deadline: Optional absolute time.time() for ordering within a class
             parent: Parent QObject
         """
         super().__init__(parent)
         self.payload = payload
         self.cancelled = False
+        self._engine_job = None  # (client, job_id) when running in the engine process
+        self.gate = get_submit_gate()
+        # Unchanged cards are dropped; transitions reach the UI in batches
+        self._cards = CardUpdates(self.job_cards.emit)
+        # Render spans, poll lag and videos_total for the telemetry dashboard
+        self._clock = RenderClock()
         self.video_downloader = VideoDownloader(log_callback=lambda msg: self.log.emit(msg))
 
+    @contextmanager
+    def _submit_slot(self, account_name="default", scene=None):
+        """Per-account submit slot, ordered by the payload's request class and deadline"""
+        p = self.payload
+        with self.gate.slot(p.get("title") or "default", account_name, priority=p.get("priority"),
+                            deadline=p.get("deadline"), scene=scene):
+            with get_telemetry().span("submit", scene=scene, account=account_name):
+                yield
+
     def cancel(self):
         """Cancel the video generation operation."""
         self.cancelled = True
         self.log.emit("[INFO] Video generation cancelled by user")
+        if self._engine_job:
+            client, job_id = self._engine_job
+            try:
+                client.cancel(job_id)
+            except Exception as e:
+                self.log.emit(f"[WARN] Engine cancel failed: {e}")
 
     def _handle_labs_event(self, event):
         """Handle diagnostic events from LabsClient."""
@@ -97,6 +133,11 @@ class VideoGenerationWorker(QThread):
             code = event.get("code", "")
             detail = event.get("detail", "")
             self.log.emit(f"[ERROR] HTTP {code}: {detail}")
+        elif kind == "circuit_open":
+            wait = event.get("retry_after", 0)
+            self.log.emit(f"[WARN] Labs endpoint tạm ngừng, thử lại sau {wait:.0f}s")
+        elif kind == "retry_budget_exhausted":
+            self.log.emit("[WARN] Hết ngân sách retry - dừng thử lại để tránh quá tải Labs")
 
     def _download(self, url, dst_path, bearer_token=None):
         """
@@ -117,6 +158,54 @@ class VideoGenerationWorker(QThread):
             self.log.emit(f"[ERR] Download fail: {e}")
             return False
 
+    def _reused_cards(self, scene_num, prompt, model_key, ratio, copies, dir_videos, title, log):
+        """
+        DOWNLOADED cards for a scene whose every copy matches an earlier render,
+        or None to submit it. Opt-in: payload "reuse_identical" or config library.reuse.
+        """
+        lib = get_generation_library()
+        if not self.payload.get("reuse_identical", lib.reuse_default):
+            return None
+        def dest(c):
+            name = sanitize_filename(f"{title}_scene{scene_num}_copy{c}.mp4")
+            return os.path.join(dir_videos, name)
+
+        try:
+            hits = lib.reuse(scene_keys(prompt, model_key, ratio, copies), dest, reuse=True)
+        except Exception as e:
+            log(f"[WARN] Scene {scene_num}: library lookup failed: {e}")
+            return None
+        if not hits:
+            return None
+        log(f"[INFO] Scene {scene_num}: dùng lại {len(hits)} video đã tạo "
+            "với cùng prompt/seed/model")
+        return [{"scene": scene_num, "copy": h["copy"], "status": "DOWNLOADED", "json": prompt,
+                 "url": h["url"], "path": h["path"], "thumb": h["thumb"], "dir": dir_videos,
+                 "reused": True}
+                for h in hits]
+
+    def _record_render(self, job_info, video_path, thumb, url):
+        """Index a downloaded copy in the generation library for later reuse"""
+        lib = get_generation_library()
+        if not lib.enabled:
+            return
+        body = job_info['body']
+        copy_idx = job_info['copy']
+        copies = body.get("copies", 1)
+        op_names = body.get("operation_names", [])
+        op_name = op_names[copy_idx - 1] if copy_idx <= len(op_names) else ""
+        try:
+            seed = seed_of(body, copies, copy_idx)
+            model = rendered_model(body, op_name, body.get("model", ""))
+            ratio = body.get("aspect_ratio", "")
+            lib.record(
+                generation_key(body["prompt"], model, ratio, seed),
+                video_path, thumb, model_key=model, aspect_ratio=ratio,
+                seed=seed, operation=op_name, url=url,
+            )
+        except Exception as e:
+            self.log.emit(f"[WARN] Generation library record failed: {e}")
+
     def _make_thumb(self, video_path, out_dir, scene, copy):
         """Generate thumbnail from video."""
         try:
@@ -125,7 +214,8 @@ class VideoGenerationWorker(QThread):
             if shutil.which("ffmpeg"):
                 cmd = ["ffmpeg", "-y", "-ss", "00:00:00", "-i", video_path,
                        "-frames:v", "1", "-q:v", "3", thumb]
-                subprocess.run(cmd, check=True, capture_output=True)
+                with get_telemetry().span("thumbnail", scene=scene, copy=copy):
+                    subprocess.run(cmd, check=True, capture_output=True)
                 return thumb
         except Exception as e:
             self.log.emit(f"[WARN] Tạo thumbnail lỗi: {e}")
@@ -141,6 +231,8 @@ class VideoGenerationWorker(QThread):
             self.log.emit(f"[ERR] Worker error: {e}")
             self.log.emit(f"[DEBUG] {error_details}")
             self.error_occurred.emit(str(e))
+        finally:
+            self._cards.flush()  # Early returns / errors must not strand pending cards
 
     def _run_video(self):
         """Main video generation logic."""
@@ -153,6 +245,12 @@ class VideoGenerationWorker(QThread):
             self.error_occurred.emit("Invalid configuration")
             return
 
+        # Optional: hand the batch to the shared engine process, which keeps
+        # running if the GUI freezes or closes and throttles all projects together
+        if (st.get("engine") or {}).get("out_of_process"):
+            if self._run_via_engine(p):
+                return
+
         # Get account manager for multi-account support
         account_mgr = get_account_manager()
 
@@ -191,6 +289,7 @@ class VideoGenerationWorker(QThread):
         total_scenes = len(p["scenes"])
         jobs = []
         client_cache = {}
+        reused_videos = []
 
         # Event handler for diagnostic logging
         def on_labs_event(event):
@@ -213,6 +312,15 @@ class VideoGenerationWorker(QThread):
             ratio = scene["aspect"]
             model_key = p.get("model_key", "")
 
+            reused = self._reused_cards(actual_scene_num, scene["prompt"], model_key, ratio, copies,
+                                        dir_videos, title, self.log.emit)
+            if reused:
+                for card in reused:
+                    self._cards.put(card)
+                    reused_videos.append(card["path"])
+                    self.scene_completed.emit(actual_scene_num, card["path"])
+                continue
+
             # Get account for this scene (multi-account or legacy)
             if account_mgr.is_multi_account_enabled():
                 # Use round-robin account selection for this scene
@@ -223,7 +331,7 @@ class VideoGenerationWorker(QThread):
                     self.error_occurred.emit("No enabled accounts")
                     return
 
-                tokens = account.tokens
+                tokens = account.live_tokens()
                 project_id = account.project_id
 
                 # Validate tokens
@@ -261,13 +369,12 @@ class VideoGenerationWorker(QThread):
                     return
 
                 # Get project_id with strict validation and fallback
-                project_id = st.get("default_project_id")
-                if not project_id or not isinstance(project_id, str) or not project_id.strip():
+                project_id = cfg.default_project_id(st)
+                if not project_id:
                     # Use fallback if missing/invalid
                     project_id = DEFAULT_PROJECT_ID
                     self.log.emit(f"[INFO] Using default project_id: {project_id}")
                 else:
-                    project_id = project_id.strip()
                     self.log.emit(f"[INFO] Using configured project_id: {project_id}")
 
                 # Validate project_id format (should be UUID-like)
@@ -303,13 +410,22 @@ class VideoGenerationWorker(QThread):
                 body["tokens"] = tokens
             
             self.log.emit(f"[INFO] Start scene {actual_scene_num} with {copies} copies in one batch…")
-            rc = client.start_one(
-                body, model_key, ratio, scene["prompt"], copies=copies, project_id=project_id
-            )
+            try:
+                with self._submit_slot(body.get("account_name", "default"), actual_scene_num):
+                    rc = client.start_one(
+                        body, model_key, ratio, scene["prompt"], copies=copies,
+                        project_id=project_id
+                    )
+            except CircuitOpenError as e:
+                # Labs is down: fail this scene fast instead of retrying for minutes
+                self.log.emit(f"[WARN] Scene {actual_scene_num}: {e}")
+                rc = 0
 
             if rc > 0:
                 # Only create cards for operations that actually exist in the API response
                 actual_count = len(body.get("operation_names", []))
+                self._clock.submitted(actual_scene_num, actual_count,
+                                      body.get("account_name", "default"))
 
                 if actual_count < copies:
                     self.log.emit(f"[WARN] Scene {actual_scene_num}: API returned {actual_count} operations but {copies} copies were requested")
@@ -326,7 +442,7 @@ class VideoGenerationWorker(QThread):
                         "thumb": "",
                         "dir": dir_videos
                     }
-                    self.job_card.emit(card)
+                    self._cards.put(card)
 
                     # Store card data with copy index for operation name mapping
                     job_info = {
@@ -350,7 +466,8 @@ class VideoGenerationWorker(QThread):
                         "thumb": "",
                         "dir": dir_videos
                     }
-                    self.job_card.emit(card)
+                    self._cards.put(card)
+        self._cards.flush()
 
         # Polling loop with improved error handling
         retry_count = {}
@@ -358,7 +475,7 @@ class VideoGenerationWorker(QThread):
         max_retries = 3
         max_download_retries = 5
 
-        completed_videos = []
+        completed_videos = list(reused_videos)
 
         for poll_round in range(120):
             if self.cancelled:
@@ -411,7 +528,8 @@ class VideoGenerationWorker(QThread):
                             continue
                         
                         # Create client for this account
-                        account_client = LabsFlowClient(account.tokens, on_event=on_labs_event)
+                        account_client = LabsFlowClient(account.live_tokens(),
+                                                        on_event=on_labs_event)
                         
                         # Collect operations and metadata for this account
                         account_names = []
@@ -470,6 +588,7 @@ class VideoGenerationWorker(QThread):
                         rs = client.batch_check_operations(names, metadata)
             except Exception as e:
                 self.log.emit(f"[WARN] Lỗi kiểm tra trạng thái (vòng {poll_round + 1}): {e}")
+                self._cards.flush()
                 time.sleep(10)
                 continue
 
@@ -502,7 +621,7 @@ class VideoGenerationWorker(QThread):
                     self.log.emit(f"[ERR] Cảnh {sc} video {cp}: operation index {op_index} out of bounds")
                     card["status"] = "FAILED"
                     card["error_reason"] = "Operation index out of bounds"
-                    self.job_card.emit(card)
+                    self._cards.put(card)
                     continue
 
                 op_name = op_names[op_index]
@@ -524,6 +643,7 @@ class VideoGenerationWorker(QThread):
                     if video_url:
                         card["status"] = "READY"
                         card["url"] = video_url
+                        self._clock.rendered(scene, copy_num, "READY")
 
                         self.log.emit(f"[SUCCESS] Scene {scene} Copy {copy_num}: Video ready!")
 
@@ -548,9 +668,11 @@ class VideoGenerationWorker(QThread):
                             if self._download(video_url, fp, bearer_token=bearer_token):
                                 card["status"] = "DOWNLOADED"
                                 card["path"] = fp
+                                self._clock.finished(scene, copy_num, "DOWNLOADED")
 
                                 thumb = self._make_thumb(fp, thumbs_dir, scene, copy_num)
                                 card["thumb"] = thumb
+                                self._record_render(job_info, fp, thumb, video_url)
 
                                 self.log.emit(f"[SUCCESS] ✓ Downloaded: {os.path.basename(fp)}")
 
@@ -567,7 +689,7 @@ class VideoGenerationWorker(QThread):
                                     self.log.emit(f"[WARN] Download failed, will retry ({retries + 1}/{max_download_retries})")
                                     card["status"] = "DOWNLOAD_FAILED"
                                     card["url"] = video_url
-                                    self.job_card.emit(card)
+                                    self._cards.put(card)
                                     new_jobs.append(job_info)
                                     continue
                                 else:
@@ -575,7 +697,8 @@ class VideoGenerationWorker(QThread):
                                     card["status"] = "DOWNLOAD_FAILED"
                                     card["url"] = video_url
                                     card["error_reason"] = "Download failed after retries"
-                                    self.job_card.emit(card)
+                                    self._clock.finished(scene, copy_num, "DOWNLOAD_FAILED")
+                                    self._cards.put(card)
                         except Exception as e:
                             download_key = f"{scene}_{copy_num}"
                             retries = download_retry_count.get(download_key, 0)
@@ -584,7 +707,7 @@ class VideoGenerationWorker(QThread):
                                 self.log.emit(f"[ERR] Download error: {e} - will retry ({retries + 1}/{max_download_retries})")
                                 card["status"] = "DOWNLOAD_FAILED"
                                 card["url"] = video_url
-                                self.job_card.emit(card)
+                                self._cards.put(card)
                                 new_jobs.append(job_info)
                                 continue
                             else:
@@ -592,14 +715,16 @@ class VideoGenerationWorker(QThread):
                                 card["status"] = "DOWNLOAD_FAILED"
                                 card["url"] = video_url
                                 card["error_reason"] = f"Download error: {str(e)[:50]}"
-                                self.job_card.emit(card)
+                                self._clock.finished(scene, copy_num, "DOWNLOAD_FAILED")
+                                self._cards.put(card)
 
-                        self.job_card.emit(card)
+                        self._cards.put(card)
                     else:
                         self.log.emit(f"[ERR] Scene {scene} Copy {copy_num}: No video URL in response")
                         card["status"] = "DONE_NO_URL"
                         card["error_reason"] = "No video URL in response"
-                        self.job_card.emit(card)
+                        self._clock.rendered(scene, copy_num, "DONE_NO_URL")
+                        self._cards.put(card)
 
                 elif status == 'MEDIA_GENERATION_STATUS_FAILED':
                     # Extract error details
@@ -620,13 +745,15 @@ class VideoGenerationWorker(QThread):
 
                     card["status"] = "FAILED"
                     card["error_reason"] = error_reason
+                    self._clock.rendered(scene, copy_num, "FAILED")
                     self.log.emit(f"[ERR] Scene {scene} Copy {copy_num} FAILED: {error_reason}")
-                    self.job_card.emit(card)
+                    self._cards.put(card)
 
                 else:
                     # Still processing
                     card["status"] = "PROCESSING"
-                    self.job_card.emit(card)
+                    self._cards.put(card)
+                    self._clock.pending(scene, copy_num)
                     new_jobs.append(job_info)
 
             jobs = new_jobs
@@ -637,6 +764,7 @@ class VideoGenerationWorker(QThread):
                     self.log.emit(f"[WARN] Đang chờ {len(jobs)} video ({poll_info}) - sắp hết thời gian chờ!")
                 else:
                     self.log.emit(f"[INFO] Đang chờ {len(jobs)} video ({poll_info})...")
+                self._cards.flush()
                 time.sleep(5)
 
         # Handle timeout
@@ -645,13 +773,81 @@ class VideoGenerationWorker(QThread):
                 card = job_info['card']
                 card["status"] = "TIMEOUT"
                 card["error_reason"] = "Video generation timed out"
-                self.job_card.emit(card)
+                self._clock.finished(card["scene"], card["copy"], "TIMEOUT")
+                self._cards.put(card)
                 self.log.emit(f"[TIMEOUT] Scene {card['scene']} Copy {card['copy']}: Generation timed out")
 
         # Emit completion signal
+        self._cards.flush()
         self.all_completed.emit(completed_videos)
         self.log.emit(f"[INFO] Video generation completed: {len(completed_videos)} videos downloaded")
 
+    def _run_via_engine(self, p):
+        """
+        Submit the payload to the engine process and relay its events as signals.
+
+        Returns:
+            False if no engine could be reached (caller falls back to in-process)
+        """
+        try:
+            from services.engine.ipc import EngineUnavailable, ensure_engine
+            client = ensure_engine()
+            events = client.events()  # subscribe before submit so no event is missed
+        except Exception as e:
+            self.log.emit(f"[WARN] Engine process unavailable ({e}) - running in-process")
+            return False
+
+        scenes = p["scenes"]
+        total_scenes = len(scenes)
+        job_id = client.submit(
+            [s["prompt"] for s in scenes], p["dir_videos"],
+            title=p["title"], model_key=p.get("model_key", ""),
+            aspect_ratio=scenes[0]["aspect"] if scenes else None,
+            aspect_ratios=[s["aspect"] for s in scenes],  # projects may mix ratios
+            copies=p["copies"],
+            scene_numbers=[s.get("actual_scene_num", i) for i, s in enumerate(scenes, start=1)],
+            priority=p.get("priority") or "batch", deadline=p.get("deadline"),
+        )
+        self._engine_job = (client, job_id)
+        self.log.emit(f"[INFO] Submitted to engine process: job {job_id} ({total_scenes} scenes)")
+
+        completed_videos = []
+        try:
+            for ev in client.follow(job_id, events):
+                kind = ev.get("kind")
+                if kind == "card":
+                    card = ev["card"]
+                    self._cards.put(card)
+                    path = card.get("path")
+                    if card.get("status") == "DOWNLOADED" and path not in completed_videos:
+                        completed_videos.append(path)
+                        self.scene_completed.emit(card["scene"], card["path"])
+                elif kind == "log":
+                    self.log.emit(f"[{ev.get('level', 'INFO')}] {ev.get('message', '')}")
+                elif kind == "progress":
+                    self.progress_updated.emit(len(completed_videos), total_scenes,
+                                               ev.get("message", ""))
+                elif kind == "job_failed":
+                    self.error_occurred.emit(ev.get("error", "Engine job failed"))
+                    return True
+                elif kind == "job_finished":
+                    break
+                else:
+                    self._handle_labs_event(ev)
+        except EngineUnavailable as e:
+            self.log.emit(f"[ERR] Lost connection to engine: {e} "
+                          f"(job {job_id} keeps running there)")
+            self.error_occurred.emit(str(e))
+            return True
+        finally:
+            self._engine_job = None
+
+        self._cards.flush()
+        self.all_completed.emit(completed_videos)
+        self.log.emit(f"[INFO] Video generation completed: "
+                      f"{len(completed_videos)} videos downloaded")
+        return True
+
     def _run_video_parallel(self, p, account_mgr):
         """
         Parallel video generation using multiple accounts with threading.
@@ -666,7 +862,15 @@ class VideoGenerationWorker(QThread):
         dir_videos = p["dir_videos"]
         thumbs_dir = os.path.join(dir_videos, "thumbs")
         
-        accounts = account_mgr.get_enabled_accounts()
+        # Pre-flight: validate all account tokens in one parallel pass so no
+        # scenes are planned onto accounts whose tokens are already dead
+        account_mgr.preflight_check(log=self.log.emit)
+        accounts = account_mgr.get_healthy_accounts()
+        if not accounts:
+            self.log.emit("[ERROR] No account has a valid Google Labs token. "
+                          "Please update tokens in API Credentials.")
+            self.error_occurred.emit("No valid tokens in any enabled account")
+            return
         num_accounts = len(accounts)
         total_scenes = len(p["scenes"])
 
@@ -701,6 +905,7 @@ class VideoGenerationWorker(QThread):
 
         # Monitor progress from all threads
         completed_starts = 0
+        reused_videos = []
 
         while completed_starts < total_scenes:
             if self.cancelled:
@@ -724,13 +929,21 @@ class VideoGenerationWorker(QThread):
                             f"[ERROR] Scene {scene_idx} failed to start "
                             f"({completed_starts}/{total_scenes})"
                         )
+                elif msg_type == "scene_reused":
+                    scene_idx, cards = data
+                    completed_starts += 1
+                    for card in cards:
+                        self._cards.put(card)
+                        reused_videos.append(card["path"])
+                        self.scene_completed.emit(scene_idx, card["path"])
                 elif msg_type == "card":
                     # Emit card update
-                    self.job_card.emit(data)
+                    self._cards.put(data)
                 elif msg_type == "log":
                     self.log.emit(data)
 
             except queue.Empty:
+                self._cards.flush()
                 # Timeout, check if threads still running
                 if all(not t.is_alive() for t in threads):
                     break
@@ -739,12 +952,17 @@ class VideoGenerationWorker(QThread):
                 if all(not t.is_alive() for t in threads):
                     break
 
+        self._cards.flush()
+
         # Wait for all threads to complete scene starts
         for thread in threads:
             thread.join(timeout=60.0)  # 60s timeout for slow network/API
 
         # Summary of scene starts
-        if len(all_jobs) == 0:
+        if len(all_jobs) == 0 and reused_videos:
+            self.log.emit(f"[INFO] Tất cả {total_scenes} cảnh dùng lại video đã tạo "
+                          "- không cần gửi yêu cầu mới")
+        elif len(all_jobs) == 0:
             self.log.emit(
                 f"[ERROR] All {total_scenes} scenes failed to start. "
                 "No video generation jobs were created."
@@ -763,7 +981,7 @@ class VideoGenerationWorker(QThread):
         max_retries = 3
         max_download_retries = 5
 
-        completed_videos = []
+        completed_videos = list(reused_videos)
         jobs = all_jobs  # Use all jobs from parallel processing
 
         for poll_round in range(120):
@@ -820,7 +1038,7 @@ class VideoGenerationWorker(QThread):
                         self._handle_labs_event(event)
                     
                     # Create client for this account
-                    account_client = LabsFlowClient(account.tokens, on_event=on_labs_event)
+                    account_client = LabsFlowClient(account.live_tokens(), on_event=on_labs_event)
                     
                     # Collect operations and metadata for this account
                     account_names = []
@@ -848,6 +1066,7 @@ class VideoGenerationWorker(QThread):
                     
             except Exception as e:
                 self.log.emit(f"[WARN] Lỗi kiểm tra trạng thái (vòng {poll_round + 1}): {e}")
+                self._cards.flush()
                 time.sleep(10)
                 continue
 
@@ -881,7 +1100,7 @@ class VideoGenerationWorker(QThread):
                     self.log.emit(f"[ERR] Cảnh {sc} video {cp}: operation index {op_index} out of bounds")
                     card["status"] = "FAILED"
                     card["error_reason"] = "Operation index out of bounds"
-                    self.job_card.emit(card)
+                    self._cards.put(card)
                     continue
 
                 op_name = op_names[op_index]
@@ -903,6 +1122,7 @@ class VideoGenerationWorker(QThread):
                     if video_url:
                         card["status"] = "READY"
                         card["url"] = video_url
+                        self._clock.rendered(scene, copy_num, "READY")
 
                         self.log.emit(f"[SUCCESS] Scene {scene} Copy {copy_num}: Video ready!")
 
@@ -928,9 +1148,11 @@ class VideoGenerationWorker(QThread):
                             if self._download(video_url, fp, bearer_token=bearer_token):
                                 card["status"] = "DOWNLOADED"
                                 card["path"] = fp
+                                self._clock.finished(scene, copy_num, "DOWNLOADED")
 
                                 thumb = self._make_thumb(fp, thumbs_dir, scene, copy_num)
                                 card["thumb"] = thumb
+                                self._record_render(job_info, fp, thumb, video_url)
 
                                 self.log.emit(f"[SUCCESS] ✓ Downloaded: {os.path.basename(fp)}")
 
@@ -947,7 +1169,7 @@ class VideoGenerationWorker(QThread):
                                     self.log.emit(f"[WARN] Download failed, will retry ({retries + 1}/{max_download_retries})")
                                     card["status"] = "DOWNLOAD_FAILED"
                                     card["url"] = video_url
-                                    self.job_card.emit(card)
+                                    self._cards.put(card)
                                     new_jobs.append(job_info)
                                     continue
                                 else:
@@ -955,7 +1177,8 @@ class VideoGenerationWorker(QThread):
                                     card["status"] = "DOWNLOAD_FAILED"
                                     card["url"] = video_url
                                     card["error_reason"] = "Download failed after retries"
-                                    self.job_card.emit(card)
+                                    self._clock.finished(scene, copy_num, "DOWNLOAD_FAILED")
+                                    self._cards.put(card)
                         except Exception as e:
                             download_key = f"{scene}_{copy_num}"
                             retries = download_retry_count.get(download_key, 0)
@@ -964,7 +1187,7 @@ class VideoGenerationWorker(QThread):
                                 self.log.emit(f"[ERR] Download error: {e} - will retry ({retries + 1}/{max_download_retries})")
                                 card["status"] = "DOWNLOAD_FAILED"
                                 card["url"] = video_url
-                                self.job_card.emit(card)
+                                self._cards.put(card)
                                 new_jobs.append(job_info)
                                 continue
                             else:
@@ -972,14 +1195,16 @@ class VideoGenerationWorker(QThread):
                                 card["status"] = "DOWNLOAD_FAILED"
                                 card["url"] = video_url
                                 card["error_reason"] = f"Download error: {str(e)[:50]}"
-                                self.job_card.emit(card)
+                                self._clock.finished(scene, copy_num, "DOWNLOAD_FAILED")
+                                self._cards.put(card)
 
-                        self.job_card.emit(card)
+                        self._cards.put(card)
                     else:
                         self.log.emit(f"[ERR] Scene {scene} Copy {copy_num}: No video URL in response")
                         card["status"] = "DONE_NO_URL"
                         card["error_reason"] = "No video URL in response"
-                        self.job_card.emit(card)
+                        self._clock.rendered(scene, copy_num, "DONE_NO_URL")
+                        self._cards.put(card)
 
                 elif status == 'MEDIA_GENERATION_STATUS_FAILED':
                     # Extract error details
@@ -1000,13 +1225,15 @@ class VideoGenerationWorker(QThread):
 
                     card["status"] = "FAILED"
                     card["error_reason"] = error_reason
+                    self._clock.rendered(scene, copy_num, "FAILED")
                     self.log.emit(f"[ERR] Scene {scene} Copy {copy_num} FAILED: {error_reason}")
-                    self.job_card.emit(card)
+                    self._cards.put(card)
 
                 else:
                     # Still processing
                     card["status"] = "PROCESSING"
-                    self.job_card.emit(card)
+                    self._cards.put(card)
+                    self._clock.pending(scene, copy_num)
                     new_jobs.append(job_info)
 
             jobs = new_jobs
@@ -1017,6 +1244,7 @@ class VideoGenerationWorker(QThread):
                     self.log.emit(f"[WARN] Đang chờ {len(jobs)} video ({poll_info}) - sắp hết thời gian chờ!")
                 else:
                     self.log.emit(f"[INFO] Đang chờ {len(jobs)} video ({poll_info})...")
+                self._cards.flush()
                 time.sleep(5)
 
         # Handle timeout
@@ -1025,10 +1253,12 @@ class VideoGenerationWorker(QThread):
                 card = job_info['card']
                 card["status"] = "TIMEOUT"
                 card["error_reason"] = "Video generation timed out"
-                self.job_card.emit(card)
+                self._clock.finished(card["scene"], card["copy"], "TIMEOUT")
+                self._cards.put(card)
                 self.log.emit(f"[TIMEOUT] Scene {card['scene']} Copy {card['copy']}: Generation timed out")
 
         # Emit completion signal
+        self._cards.flush()
         self.all_completed.emit(completed_videos)
         self.log.emit(f"[INFO] Parallel video generation completed: {len(completed_videos)} videos downloaded")
 
@@ -1054,8 +1284,9 @@ class VideoGenerationWorker(QThread):
                     msg = f"[INFO] API Call: {endpoint_type} endpoint | {num_req} request(s)"
                     results_queue.put(("log", msg))
 
-            # Create client for this account
-            client = LabsFlowClient(account.tokens, on_event=on_labs_event)
+            # Create client for this account (only tokens that passed pre-flight)
+            tokens = account.live_tokens()
+            client = LabsFlowClient(tokens, on_event=on_labs_event)
 
             copies = p["copies"]
             model_key = p.get("model_key", "")
@@ -1075,6 +1306,13 @@ class VideoGenerationWorker(QThread):
 
                 results_queue.put(("log", f"[INFO] {thread_name}: Processing scene {actual_scene_num}..."))
 
+                reused = self._reused_cards(actual_scene_num, scene["prompt"], model_key, ratio,
+                                            copies, dir_videos, title,
+                                            lambda m: results_queue.put(("log", m)))
+                if reused:
+                    results_queue.put(("scene_reused", (actual_scene_num, reused)))
+                    continue
+
                 # Single API call with copies parameter
                 body = {
                     "prompt": scene["prompt"],
@@ -1084,23 +1322,26 @@ class VideoGenerationWorker(QThread):
                 }
                 
                 # Store bearer token for multi-account download support
-                if account.tokens and len(account.tokens) > 0:
-                    body["bearer_token"] = account.tokens[0]
+                if tokens:
+                    body["bearer_token"] = tokens[0]
                 
                 # Store account info for multi-account batch checking
                 body["account_name"] = account.name
                 body["project_id"] = account.project_id
-                body["tokens"] = account.tokens
+                body["tokens"] = tokens
                 
                 try:
-                    rc = client.start_one(
-                        body, model_key, ratio, scene["prompt"], 
-                        copies=copies, project_id=account.project_id
-                    )
+                    with self._submit_slot(account.name, actual_scene_num):
+                        rc = client.start_one(
+                            body, model_key, ratio, scene["prompt"],
+                            copies=copies, project_id=account.project_id
+                        )
 
                     if rc > 0:
                         # Only create cards for operations that actually exist
                         actual_count = len(body.get("operation_names", []))
+                        self._clock.submitted(actual_scene_num, actual_count,
+                                              body.get("account_name", "default"))
 
                         if actual_count < copies:
                             results_queue.put((
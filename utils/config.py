@@ -122,6 +122,28 @@ def load() -> dict:
     return cfg
 
 
+def default_project_id(cfg: dict = None) -> str:
+    """
+    Configured Labs project ID, or "" when none is set.
+
+    Args:
+        cfg: Loaded configuration (loaded from disk when omitted)
+
+    Returns:
+        Top-level default_project_id, else the legacy nested
+        labs.default_project_id, stripped.
+    """
+    if cfg is None:
+        cfg = load()
+    if not isinstance(cfg, dict):
+        return ""
+    labs = cfg.get("labs") if isinstance(cfg.get("labs"), dict) else {}
+    for pid in (cfg.get("default_project_id"), labs.get("default_project_id")):
+        if isinstance(pid, str) and pid.strip():
+            return pid.strip()
+    return ""
+
+
 def _parse_comma_separated_env(env_value: str) -> list:
     """
     Parse comma-separated environment variable into list of non-empty strings.
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Log Sink - batched, rate-limited log output for the UI consoles
+
+Workers can log thousands of lines a minute. Appending each one to a rich
+text widget on the GUI thread stalls the UI and the widget grows forever.
+LogSink instead:
+- buffers lines in a ring buffer (oldest dropped, with a marker, if a burst
+  outruns it),
+- flushes them to the widget in one cursor insert every ``interval_ms``,
+- caps the on-screen history with QTextDocument.maximumBlockCount,
+- mirrors every line to the rotating file logger through a QueueHandler, so
+  file I/O never runs on the GUI thread.
+
+write() is thread-safe and cheap; it can be called from workers directly.
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Optional
+
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtGui import QTextCursor
+
+FLUSH_INTERVAL_MS = 200   # At most 5 widget updates per second
+MAX_SCREEN_LINES = 5000   # Lines kept in the widget
+RING_SIZE = 2000          # Lines buffered between flushes
+
+
+def level_of(line: str) -> int:
+    """Logging level from the repo's "[ERR] / [WARN] / [INFO]" line prefixes"""
+    head = line.lstrip()[:12].upper()
+    if head.startswith(("[ERR", "❌", "[CRITICAL")):
+        return logging.ERROR
+    if head.startswith(("[WARN", "⚠")):
+        return logging.WARNING
+    if head.startswith("[DEBUG"):
+        return logging.DEBUG
+    return logging.INFO
+
+
+_ui_file_logger = None
+
+
+def ui_file_logger() -> Optional[logging.Logger]:
+    """Shared non-blocking file mirror for every console (None if logs/ is not writable)"""
+    global _ui_file_logger
+    if _ui_file_logger is None:
+        try:
+            from utils.logger_enhanced import setup_queue_logger
+            _ui_file_logger = setup_queue_logger('videoultra.ui')
+        except Exception as e:
+            print(f"[WARN] UI log file disabled: {e}")
+            _ui_file_logger = False
+    return _ui_file_logger or None
+
+
+class LogSink(QObject):
+    """
+    Batches lines into a QTextEdit / QPlainTextEdit; create on the GUI thread.
+    file_logger defaults to ui_file_logger(); pass False to disable the mirror.
+    """
+
+    def __init__(self, widget, interval_ms: int = FLUSH_INTERVAL_MS,
+                 max_lines: int = MAX_SCREEN_LINES, ring_size: int = RING_SIZE, file_logger=None,
+                 parent=None):
+        super().__init__(parent or widget)
+        self.widget = widget
+        self.file_logger = ui_file_logger() if file_logger is None else (file_logger or None)
+        self._ring = deque(maxlen=max(1, int(ring_size)))
+        self._dropped = 0
+        self._lock = threading.Lock()
+        widget.document().setMaximumBlockCount(max(1, int(max_lines)))
+        self._timer = QTimer(self)
+        self._timer.setInterval(max(1, int(interval_ms)))
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+
+    def write(self, line: str, level: Optional[int] = None):
+        line = str(line)
+        with self._lock:
+            if len(self._ring) == self._ring.maxlen:
+                self._dropped += 1
+            self._ring.append(line)
+        if self.file_logger:
+            self.file_logger.log(level if level is not None else level_of(line), line)
+
+    def flush(self):
+        with self._lock:
+            if not self._ring:
+                return
+            lines = list(self._ring)
+            self._ring.clear()
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            lines.insert(0, f"[WARN] … {dropped} dòng log bị bỏ qua trên màn hình (xem file log)")
+
+        bar = self.widget.verticalScrollBar()
+        at_bottom = bar.value() >= bar.maximum() - 4
+        cursor = QTextCursor(self.widget.document())
+        cursor.movePosition(QTextCursor.End)
+        if not self.widget.document().isEmpty():
+            cursor.insertBlock()
+        cursor.insertText("\n".join(lines))
+        if at_bottom:
+            bar.setValue(bar.maximum())
+
+    def stop(self):
+        self._timer.stop()
+        self.flush()
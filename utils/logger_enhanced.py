@@ -4,11 +4,13 @@ Enhanced Logging System for Video Super Ultra
 Provides structured logging with rotation, formatting, and multiple handlers
 """
 
+import atexit
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
 
@@ -193,6 +195,44 @@ class LoggerAdapter:
         self.logger.exception(message)
 
 
+_queue_listeners = {}
+
+
+def setup_queue_logger(name: str = 'videoultra.ui', level: int = logging.INFO,
+                       **kwargs) -> logging.Logger:
+    """
+    Logger that never blocks its caller on disk I/O
+
+    Records go through a QueueHandler; a QueueListener thread hands them to the
+    rotating file handler built by setup_logger. Used to mirror UI console
+    lines (which are logged from the GUI thread) to the log file.
+
+    Args:
+        name: Logger name (one listener per name)
+        level: Logging level
+        **kwargs: Additional arguments for setup_logger (log_dir, max_bytes...)
+    """
+    if name in _queue_listeners:
+        return logging.getLogger(name)
+
+    file_logger = setup_logger(f"{name}.file", level=level, console_output=False, **kwargs)
+    handlers = list(file_logger.handlers)
+    file_logger.handlers.clear()
+
+    records = queue.SimpleQueue()
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)  # Drains the queue on exit
+    _queue_listeners[name] = listener
+
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    logger.handlers.clear()
+    logger.addHandler(QueueHandler(records))
+    logger.propagate = False
+    return logger
+
+
 # Initialize default logger
 _default_logger = None
 
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""
+Thumbnail Service - asynchronous, cached thumbnails for tables and storyboards
+
+Images (local paths or http(s) URLs) are decoded at the requested size with
+QImageReader.setScaledSize on a QThreadPool, so a 4K frame never gets decoded
+at full resolution on the GUI thread. Results are kept in a memory LRU of
+QPixmaps and in an on-disk PNG cache keyed by source + size (+ mtime for
+local files), so reopening a large project does not re-download or re-decode.
+URL keys ignore the query string, so re-signed thumbnail URLs reuse one entry.
+The disk cache is trimmed least-recently-used first to DISK_CACHE_MB.
+
+Usage (GUI thread only):
+    pix = get_thumbnail_service().load(path_or_url, 242, 136, on_ready)
+    if pix: label.setPixmap(pix)      # cache hit, on_ready is not called
+    # otherwise on_ready(pixmap_or_None) runs later on the GUI thread
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from PyQt5.QtCore import (
+    QBuffer,
+    QByteArray,
+    QIODevice,
+    QObject,
+    QRunnable,
+    QSize,
+    Qt,
+    QThreadPool,
+    pyqtSignal,
+)
+from PyQt5.QtGui import QImage, QImageReader, QPixmap
+
+logger = logging.getLogger(__name__)
+
+MEMORY_ITEMS = 512   # Pixmaps kept in memory (~60KB each at storyboard size)
+MAX_WORKERS = 4
+DOWNLOAD_TIMEOUT = 15
+FAILURE_TTL_SEC = 60  # Don't retry an unreadable image on every repaint
+STAT_TTL_SEC = 2.0  # A local file is stat'ed at most this often (not on every paint)
+DISK_CACHE_MB = 256  # On-disk PNG cache size limit
+
+
+def _default_cache_dir() -> str:
+    """Per-user PNG cache, alongside the other ~/.veo_image2video_* state"""
+    return os.path.join(os.path.expanduser('~'), '.veo_image2video_thumbs')
+
+
+def _is_url(source: str) -> bool:
+    return source.startswith(('http://', 'https://'))
+
+
+def file_stamp(source: str) -> str:
+    """mtime/size of a local file ('' for URLs or missing files)"""
+    if _is_url(source):
+        return ''
+    try:
+        st = os.stat(source)
+    except OSError:
+        return ''
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def thumb_key(source: str, width: int, height: int, stamp: Optional[str] = None) -> str:
+    """
+    Cache key: source + size, plus mtime/size for local files so edits invalidate it.
+    URLs are keyed without their query string (signed URLs change on every poll).
+    """
+    if _is_url(source):
+        source = source.split('?', 1)[0]
+    elif stamp is None:
+        stamp = file_stamp(source)
+    return f"{source}|{width}x{height}|{stamp or ''}"
+
+
+def _read_scaled(reader: QImageReader, width: int, height: int) -> QImage:
+    """Decode straight to (at most) width x height, keeping aspect ratio"""
+    size = reader.size()
+    if size.isValid() and (size.width() > width or size.height() > height):
+        reader.setScaledSize(size.scaled(QSize(width, height), Qt.KeepAspectRatio))
+    img = reader.read()
+    if not img.isNull() and (img.width() > width or img.height() > height):
+        # Formats without size info up front: finish on this worker thread
+        img = img.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return img
+
+
+class _ThumbJob(QRunnable):
+    def __init__(self, service: 'ThumbnailService', key: str, source: str, width: int, height: int):
+        super().__init__()
+        self.service = service
+        self.key = key
+        self.source = source
+        self.width = width
+        self.height = height
+
+    def run(self):
+        img = QImage()
+        try:
+            img = self._load()
+        except Exception as e:
+            logger.debug(f"Thumbnail failed for {self.source}: {e}")
+        self.service._done.emit(self.key, img)
+
+    def _load(self) -> QImage:
+        disk_path = self.service._disk_path(self.key)
+        if disk_path and os.path.isfile(disk_path):
+            img = QImage(disk_path)
+            if not img.isNull():
+                try:
+                    os.utime(disk_path, None)  # Recently used: evicted last
+                except OSError:
+                    pass
+                return img
+
+        if _is_url(self.source):
+            from utils.performance import get_session
+            r = get_session().get(self.source, timeout=DOWNLOAD_TIMEOUT)
+            r.raise_for_status()
+            buf = QBuffer()
+            buf.setData(QByteArray(r.content))
+            buf.open(QIODevice.ReadOnly)
+            img = _read_scaled(QImageReader(buf), self.width, self.height)
+        else:
+            img = _read_scaled(QImageReader(self.source), self.width, self.height)
+
+        if not img.isNull() and disk_path:
+            tmp = f"{disk_path}.{threading.get_ident()}.tmp"
+            if img.save(tmp, 'PNG'):
+                os.replace(tmp, disk_path)
+                self.service._note_disk_write(disk_path)
+        return img
+
+
+class _PruneJob(QRunnable):
+    def __init__(self, service: 'ThumbnailService'):
+        super().__init__()
+        self.service = service
+
+    def run(self):
+        self.service.prune_disk_cache()
+
+
+class ThumbnailService(QObject):
+    """Shared thumbnail loader; create and use from the GUI thread"""
+
+    _done = pyqtSignal(str, QImage)
+
+    def __init__(self, cache_dir: Optional[str] = None, memory_items: int = MEMORY_ITEMS,
+                 max_workers: int = MAX_WORKERS, disk_cache_mb: float = DISK_CACHE_MB,
+                 parent=None):
+        super().__init__(parent)
+        self.memory_items = max(1, int(memory_items))
+        self.cache_dir = cache_dir
+        self.disk_limit = int(float(disk_cache_mb) * 1024 * 1024)
+        if cache_dir:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"Thumbnail disk cache disabled: {e}")
+                self.cache_dir = None
+        self._memory: 'OrderedDict[str, QPixmap]' = OrderedDict()
+        self._pending: Dict[str, List[Callable]] = {}
+        self._failed: Dict[str, float] = {}  # key -> time of the failed decode
+        self._stamps: 'OrderedDict[str, tuple]' = OrderedDict()  # path -> (stamp, checked_at)
+        self._written = 0  # Bytes added to the disk cache since the last prune
+        self._disk_lock = threading.Lock()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, int(max_workers)))
+        self._done.connect(self._on_done)
+        if self.cache_dir:
+            self._pool.start(_PruneJob(self))
+
+    def _stamp(self, source: str) -> str:
+        """file_stamp, re-checked at most every STAT_TTL_SEC per path"""
+        now = time.monotonic()
+        hit = self._stamps.get(source)
+        if hit is not None and now - hit[1] < STAT_TTL_SEC:
+            return hit[0]
+        stamp = file_stamp(source)
+        self._stamps[source] = (stamp, now)
+        self._stamps.move_to_end(source)
+        while len(self._stamps) > self.memory_items * 4:
+            self._stamps.popitem(last=False)
+        return stamp
+
+    def _note_disk_write(self, path: str):
+        """Pool thread: schedule a prune once ~10% of the limit was added"""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with self._disk_lock:
+            self._written += size
+            due = self._written > self.disk_limit // 10
+            if due:
+                self._written = 0
+        if due:
+            self.prune_disk_cache()
+
+    def prune_disk_cache(self) -> int:
+        """Delete least recently used cache files until under the limit; returns files removed"""
+        if not self.cache_dir:
+            return 0
+        with self._disk_lock:
+            entries = []
+            total = 0
+            try:
+                with os.scandir(self.cache_dir) as it:
+                    for e in it:
+                        if e.is_file() and e.name.endswith('.png'):
+                            st = e.stat()
+                            entries.append((st.st_mtime, st.st_size, e.path))
+                            total += st.st_size
+            except OSError:
+                return 0
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.disk_limit:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                    removed += 1
+                except OSError:
+                    pass
+            return removed
+
+    def _disk_path(self, key: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest + '.png')
+
+    def load(self, source: str, width: int, height: int,
+             callback: Optional[Callable[[Optional[QPixmap]], None]] = None) -> Optional[QPixmap]:
+        """
+        Thumbnail of ``source`` fitting width x height.
+
+        Returns the pixmap on a memory hit; otherwise returns None and calls
+        ``callback(pixmap or None)`` on the GUI thread once decoded. Requests for
+        the same source and size share one decode.
+        """
+        if not source:
+            return None
+        key = thumb_key(source, width, height, None if _is_url(source) else self._stamp(source))
+        pix = self._memory.get(key)
+        if pix is not None:
+            self._memory.move_to_end(key)
+            return pix
+        failed_at = self._failed.get(key)
+        if failed_at is not None:
+            if time.monotonic() - failed_at < FAILURE_TTL_SEC:
+                return None
+            del self._failed[key]
+        waiters = self._pending.get(key)
+        if waiters is not None:
+            if callback:
+                waiters.append(callback)
+            return None
+        self._pending[key] = [callback] if callback else []
+        self._pool.start(_ThumbJob(self, key, source, int(width), int(height)))
+        return None
+
+    def _on_done(self, key: str, img: QImage):
+        pix = None
+        if not img.isNull():
+            pix = QPixmap.fromImage(img)
+            self._memory[key] = pix
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+        else:
+            self._failed[key] = time.monotonic()
+        for cb in self._pending.pop(key, []):
+            try:
+                cb(pix)
+            except RuntimeError:
+                # Receiver widget was deleted while the thumbnail was loading
+                pass
+            except Exception as e:
+                logger.debug(f"Thumbnail callback failed: {e}")
+
+    def clear_memory(self):
+        self._memory.clear()
+        self._failed.clear()
+
+
+_service: Optional[ThumbnailService] = None
+
+
+def get_thumbnail_service() -> ThumbnailService:
+    """Process-wide service (config thumbnails.cache_dir / memory_items / workers)"""
+    global _service
+    if _service is None:
+        try:
+            from utils import config as cfg
+            conf = cfg.load().get('thumbnails') or {}
+        except Exception:
+            conf = {}
+        _service = ThumbnailService(
+            cache_dir=conf.get('cache_dir') or _default_cache_dir(),
+            memory_items=conf.get('memory_items', MEMORY_ITEMS),
+            max_workers=conf.get('workers', MAX_WORKERS),
+            disk_cache_mb=conf.get('disk_cache_mb', DISK_CACHE_MB),
+        )
+    return _service